@@ -1,10 +1,11 @@
 
 import logging
-import requests
 import os
-from typing import Optional
+import threading
+from typing import Dict, List, Optional
 from config.settings import SYSTEM_CONFIG, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 from core.utils import retry
+from core import clock, http
 
 logger = logging.getLogger("core.alerts.telegram")
 
@@ -37,7 +38,7 @@ class TelegramBot:
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = http.post(url, json=payload)
             if response.status_code == 200:
                 logger.info("Telegram message sent successfully.")
                 return True
@@ -180,3 +181,48 @@ class TelegramBot:
             msg += "_Salida temprana por empeoramiento de condiciones._"
             
         self.send_message(msg)
+
+class RecordingTelegramBot(TelegramBot):
+    """
+    Stand-in for replays and soak tests: builds every notification exactly as
+    the live bot does, but records it with the process clock time (core.clock)
+    instead of sending it.
+    """
+    def __init__(self):
+        self.token = None
+        self.chat_id = None
+        self.enabled = True
+        self.sent: List[Dict] = []
+        self._kind = threading.local()
+        self._lock = threading.Lock()
+
+    def send_message(self, message: str) -> bool:
+        entry = {"time": clock.now(), "kind": getattr(self._kind, "value", None) or "message", "text": message}
+        with self._lock:
+            self.sent.append(entry)
+        logger.debug(f"Recorded {entry['kind']} notification")
+        return True
+
+    def _as(self, kind: str, send, *args, **kwargs):
+        self._kind.value = kind
+        try:
+            return send(*args, **kwargs)
+        finally:
+            self._kind.value = None
+
+    def send_signal_alert(self, signal, plan, is_confirmation: bool = False):
+        return self._as("signal", super().send_signal_alert, signal, plan, is_confirmation=is_confirmation)
+
+    def send_pre_alert(self, signal, plan, minutes_to_close: int = 5):
+        return self._as("pre_alert", super().send_pre_alert, signal, plan, minutes_to_close=minutes_to_close)
+
+    def send_exit_notification(self, *args, **kwargs):
+        return self._as("exit", super().send_exit_notification, *args, **kwargs)
+
+    def counts(self) -> Dict[str, int]:
+        """Recorded notifications per kind."""
+        with self._lock:
+            result: Dict[str, int] = {}
+            for entry in self.sent:
+                result[entry["kind"]] = result.get(entry["kind"], 0) + 1
+            return result
@@ -3,12 +3,9 @@ import numpy as np
 import logging
 from typing import Dict, Optional
 
-# Try to import talib, fallback to pandas
-try:
-    import talib
-    HAS_TALIB = True
-except ImportError:
-    HAS_TALIB = False
+from core.market_calendar import get_session_calendar
+from analysis.patterns import PatternRecognizer
+from core.utils import optional_import
 
 logger = logging.getLogger("core.analysis.indicators")
 
@@ -17,6 +14,13 @@ class TechnicalIndicators:
     Calculates technical indicators for market data.
     """
     
+    pattern_recognizer = PatternRecognizer()
+    
+    # Bars of history needed so every windowed indicator is exact on the last bar
+    # (SMA_200 needs 200, CRSI percent rank 101, ADX ~3x14). EMA_200 is recursive
+    # and is seeded from the previous frame instead.
+    INCREMENTAL_WARMUP_BARS = 300
+    
     def calculate_all(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate all strategy indicators and return DataFrame with added columns.
@@ -56,10 +60,49 @@ class TechnicalIndicators:
         # Connors RSI
         df['CRSI'] = self.connors_rsi(df['Close'], 3, 2, 100)
         
+        # Candle Geometry & Patterns (fused kernel, in place on our working copy)
+        self.pattern_recognizer.annotate(df)
+        
         return df
 
+    def calculate_incremental(self, prev: pd.DataFrame, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Extends an analyzed frame with new (or updated) bars without recomputing
+        the whole history.
+        
+        `new_bars` holds raw OHLCV rows; rows of `prev` at or after its first
+        timestamp are replaced (e.g. the forming bar seen by the pre-alert pass).
+        Indicators are computed on a tail window of INCREMENTAL_WARMUP_BARS and
+        EMA_200 continues from the previous value. Falls back to calculate_all
+        when `prev` does not hold enough history.
+        """
+        if new_bars.empty:
+            return prev
+        
+        cutoff = new_bars.index[0]
+        keep = prev.iloc[:prev.index.searchsorted(cutoff, side='left')]
+        if len(keep) < self.INCREMENTAL_WARMUP_BARS or 'EMA_200' not in keep.columns:
+            raw_cols = [c for c in new_bars.columns if c in prev.columns]
+            return self.calculate_all(pd.concat([keep[raw_cols], new_bars[raw_cols]]))
+        
+        raw_cols = list(new_bars.columns)
+        window = pd.concat([keep[raw_cols].iloc[-self.INCREMENTAL_WARMUP_BARS:], new_bars])
+        tail = self.calculate_all(window).iloc[-len(new_bars):]
+        
+        # Continue the recursive EMA from the last kept value
+        alpha = 2.0 / (200 + 1)
+        ema = float(keep['EMA_200'].iloc[-1])
+        ema_values = np.empty(len(tail))
+        for i, close in enumerate(tail['Close'].to_numpy(dtype=float)):
+            ema = alpha * close + (1 - alpha) * ema
+            ema_values[i] = ema
+        tail['EMA_200'] = ema_values
+        
+        return pd.concat([keep, tail.reindex(columns=keep.columns)])
+
     def rsi(self, close: pd.Series, period: int = 14) -> pd.Series:
-        if HAS_TALIB:
+        talib = optional_import("talib")  # Falls back to pandas if not installed
+        if talib is not None:
             return pd.Series(talib.RSI(close.values.astype(float), timeperiod=period), index=close.index)
         else:
             delta = close.diff()
@@ -71,7 +114,8 @@ class TechnicalIndicators:
             return 100 - (100 / (1 + rs))
 
     def bbands(self, close: pd.Series, period: int = 20, dev: float = 2.0):
-        if HAS_TALIB:
+        talib = optional_import("talib")  # Falls back to pandas if not installed
+        if talib is not None:
             u, m, l = talib.BBANDS(close.values.astype(float), timeperiod=period, nbdevup=dev, nbdevdn=dev, matype=0)
             return pd.Series(u, index=close.index), pd.Series(m, index=close.index), pd.Series(l, index=close.index)
         else:
@@ -82,7 +126,8 @@ class TechnicalIndicators:
             return u, m, l
             
     def adx(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
-        if HAS_TALIB:
+        talib = optional_import("talib")  # Falls back to pandas if not installed
+        if talib is not None:
             return pd.Series(talib.ADX(high.values.astype(float), low.values.astype(float), close.values.astype(float), timeperiod=period), index=close.index)
         else:
             # Simplified Pandas ADX (approximate)
@@ -107,7 +152,8 @@ class TechnicalIndicators:
             return adx
 
     def atr(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
-        if HAS_TALIB:
+        talib = optional_import("talib")  # Falls back to pandas if not installed
+        if talib is not None:
             return pd.Series(talib.ATR(high.values.astype(float), low.values.astype(float), close.values.astype(float), timeperiod=period), index=close.index)
         else:
             tr1 = high - low
@@ -127,27 +173,23 @@ class TechnicalIndicators:
         # 2. Calculate PV (Price * Volume)
         pv = typical_price * df['Volume']
         
-        # 3. Group by Date (NY Timezone) and calculate Cumulative Sums
-        # Ensure the index is a DatetimeIndex and convert to NY to catch the reset correctly
-        try:
-            ny_index = df.index.tz_convert('America/New_York')
-        except Exception:
-            # Fallback if index is not timezone aware (assume UTC)
-            ny_index = df.index.tz_localize('UTC').tz_convert('America/New_York')
+        # 3. Group by NY session (precomputed session ids, no per-call tz conversion)
+        session_id = get_session_calendar().session_frame(df.index)['session_id'].to_numpy()
 
         df_temp = pd.DataFrame(index=df.index)
         df_temp['pv'] = pv
         df_temp['vol'] = df['Volume']
-        df_temp['date'] = ny_index.date
+        df_temp['session'] = session_id
         
-        # Group by date and cumsum
-        df_temp['cum_pv'] = df_temp.groupby('date')['pv'].cumsum()
-        df_temp['cum_vol'] = df_temp.groupby('date')['vol'].cumsum()
+        # Group by session and cumsum
+        df_temp['cum_pv'] = df_temp.groupby('session')['pv'].cumsum()
+        df_temp['cum_vol'] = df_temp.groupby('session')['vol'].cumsum()
         
         return df_temp['cum_pv'] / df_temp['cum_vol']
 
     def sma(self, series: pd.Series, period: int) -> pd.Series:
-        if HAS_TALIB:
+        talib = optional_import("talib")  # Falls back to pandas if not installed
+        if talib is not None:
              return pd.Series(talib.SMA(series.values.astype(float), timeperiod=period), index=series.index)
         return series.rolling(window=period).mean()
 
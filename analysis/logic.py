@@ -49,11 +49,16 @@ def check_vwap_bounce(row: pd.Series, params: Dict[str, Any]) -> Optional[Signal
     # We allow Vol_SMA to be missing? No, strategy requires volume confirmation.
     if pd.isna(vol_sma) or vol_sma == 0: return None
     
-    # Pattern Calculation (Calculated here to ensure consistency with Logic, disregarding pre-calc differences)
-    # Using 'abs' for body just in case
-    body = abs(close - open_p)
-    lower_wick = min(open_p, close) - low
-    upper_wick = high - max(open_p, close)
+    # Pattern Geometry: reuse the fused candle kernel output (PatternRecognizer.annotate)
+    # when the row comes from the indicator pipeline, otherwise compute it here.
+    body = row.get('Body')
+    if body is not None and not pd.isna(body):
+        lower_wick = row.get('Lower_Wick')
+        upper_wick = row.get('Upper_Wick')
+    else:
+        body = abs(close - open_p)
+        lower_wick = min(open_p, close) - low
+        upper_wick = high - max(open_p, close)
     
     # 1. Volume Confirmation
     if vol <= (vol_sma * vol_mult):
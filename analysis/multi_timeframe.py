@@ -0,0 +1,165 @@
+"""
+Multi-Timeframe Join
+====================
+Aligns higher-timeframe context (e.g. Daily trend indicators) onto
+lower-timeframe bars (e.g. 1H) with look-ahead-safe as-of semantics.
+
+A higher-timeframe bar stamped at T is only known once it closes at
+T + period, so each lower bar receives the most recent higher bar whose
+close is at or before the lower bar's timestamp.
+"""
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.storage.database import Database
+
+logger = logging.getLogger("core.analysis.multi_timeframe")
+
+# Duration of a bar per timeframe (used to know when a higher bar is closed)
+TIMEFRAME_PERIODS = {
+    "1h": pd.Timedelta(hours=1),
+    "2h": pd.Timedelta(hours=2),
+    "4h": pd.Timedelta(hours=4),
+    "1d": pd.Timedelta(days=1),
+    "1wk": pd.Timedelta(weeks=1),
+}
+
+
+def _to_utc_index(index: pd.Index) -> pd.DatetimeIndex:
+    """
+    Returns a tz-aware (UTC), nanosecond-resolution DatetimeIndex.
+    Naive timestamps are assumed UTC. A fixed resolution keeps `asi8` values comparable.
+    """
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+    return idx.tz_convert("UTC").as_unit("ns")
+
+
+def asof_join(lower_index: pd.Index, higher: pd.DataFrame, period: pd.Timedelta) -> pd.DataFrame:
+    """
+    Aligns `higher` (indexed by bar start) onto `lower_index`.
+
+    Each lower timestamp gets the row of the latest higher bar that closed
+    at or before it (bar start + period <= lower timestamp). Rows with no
+    closed higher bar yet are NaN. The result is indexed by `lower_index`.
+    """
+    if higher is None or higher.empty or len(lower_index) == 0:
+        return pd.DataFrame(index=lower_index, columns=[] if higher is None else higher.columns, dtype=float)
+
+    higher = higher.sort_index()
+    available_at = (_to_utc_index(higher.index) + period).asi8
+    lower_ts = _to_utc_index(lower_index).asi8
+
+    # Position of the last higher bar available at each lower timestamp
+    pos = np.searchsorted(available_at, lower_ts, side="right") - 1
+    valid = pos >= 0
+
+    values = higher.to_numpy(dtype=float, na_value=np.nan)
+    out = np.full((len(lower_ts), values.shape[1]), np.nan)
+    out[valid] = values[pos[valid]]
+
+    return pd.DataFrame(out, index=lower_index, columns=higher.columns)
+
+
+class MultiTimeframeJoin:
+    """
+    Reusable Daily -> Hourly context component.
+
+    Computes higher-timeframe indicators once (via a builder function) and
+    caches the aligned lower-timeframe result per (symbol, range, builder key),
+    so repeated runs over the same range (e.g. optimizer trials) skip both the
+    DB round-trip and the re-alignment.
+    """
+
+    # Shared across instances: strategies are re-instantiated for every trial
+    _cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+    _lock = Lock()
+
+    def __init__(self, db: Optional[Database] = None, max_entries: int = 128):
+        self.db = db
+        self.max_entries = max_entries
+
+    def load_higher(self, symbol: str, timeframe: str = "1d",
+                    end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Loads the full higher-timeframe history up to `end` from the DB.
+        The whole history is used so that long lookbacks (EMA100, SMA200) are warm
+        at the start of the lower-timeframe range.
+        """
+        if self.db is None:
+            self.db = Database()
+
+        df = self.db.load_market_data(symbol, timeframe)
+        if df.empty:
+            return df
+
+        df = df.sort_index()
+        if 'is_filled' in df.columns:
+            df = df[df['is_filled'] == 0]
+        if end is not None:
+            df = df[df.index <= end]
+        return df
+
+    def join(self,
+             symbol: str,
+             lower_index: pd.Index,
+             builder: Callable[[pd.DataFrame], pd.DataFrame],
+             key: str,
+             timeframe: str = "1d",
+             higher: Optional[pd.DataFrame] = None,
+             use_cache: bool = True) -> pd.DataFrame:
+        """
+        Returns the higher-timeframe context aligned to `lower_index`.
+
+        Args:
+            symbol: Symbol to load higher-timeframe bars for.
+            lower_index: Index of the lower-timeframe bars (e.g. 1H).
+            builder: Function computing indicator columns from higher OHLCV bars.
+            key: Cache key identifying the builder and its parameters.
+            timeframe: Higher timeframe to load ("1d" by default).
+            higher: Pre-loaded higher-timeframe bars (skips the DB load).
+            use_cache: Store/reuse the aligned result.
+        """
+        if len(lower_index) == 0:
+            return pd.DataFrame(index=lower_index)
+
+        cache_key = (symbol, timeframe, key, lower_index[0], lower_index[-1], len(lower_index))
+        if use_cache:
+            with self._lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    logger.debug(f"MTF cache hit for {symbol} ({key})")
+                    return cached
+
+        if higher is None:
+            end = _to_utc_index(lower_index[-1:])[0]
+            higher = self.load_higher(symbol, timeframe, end=end)
+
+        if higher is None or higher.empty:
+            logger.warning(f"No {timeframe} data available for {symbol}, higher-timeframe context disabled.")
+            return pd.DataFrame(index=lower_index)
+
+        context = builder(higher)
+        period = TIMEFRAME_PERIODS.get(timeframe, pd.Timedelta(days=1))
+        aligned = asof_join(lower_index, context, period)
+
+        if use_cache:
+            with self._lock:
+                self._cache[cache_key] = aligned
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        return aligned
+
+    @classmethod
+    def clear_cache(cls):
+        """Drops all cached aligned frames."""
+        with cls._lock:
+            cls._cache.clear()
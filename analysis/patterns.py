@@ -2,15 +2,88 @@ import pandas as pd
 import numpy as np
 import logging
 
-# Try importing TA-Lib
-try:
-    import talib
-    HAS_TALIB = True
-except ImportError:
-    HAS_TALIB = False
+from core.utils import optional_import
 
 logger = logging.getLogger("core.analysis.patterns")
 
+# Bit flags stored in the compact 'pat_flags' column
+FLAG_HAMMER = 1
+FLAG_SHOOTING_STAR = 2
+FLAG_BULL_ENGULFING = 4
+FLAG_BEAR_ENGULFING = 8
+FLAG_DOJI = 16
+FLAG_WICK_BULL = 32
+FLAG_WICK_BEAR = 64
+
+
+def candle_kernel(op: np.ndarray, hi: np.ndarray, lo: np.ndarray, cl: np.ndarray):
+    """
+    Fused candle kernel over raw OHLC arrays.
+
+    Computes body, wicks, all candle patterns and the 2x-body wick rejection
+    flags in a single pass, without intermediate Series/DataFrames.
+
+    Returns:
+        (body, upper_wick, lower_wick, flags) where flags is a uint8 bit-set
+        of the FLAG_* constants.
+    """
+    op = np.asarray(op, dtype=np.float64)
+    hi = np.asarray(hi, dtype=np.float64)
+    lo = np.asarray(lo, dtype=np.float64)
+    cl = np.asarray(cl, dtype=np.float64)
+
+    body_top = np.maximum(cl, op)
+    body_bottom = np.minimum(cl, op)
+    body = body_top - body_bottom
+    upper_wick = hi - body_top
+    lower_wick = body_bottom - lo
+    two_body = 2 * body
+    half_body = body * 0.5
+
+    flags = np.zeros(len(op), dtype=np.uint8)
+
+    # Pure Wick Rejection (VWAP Bounce Strategy) - ALWAYS custom logic
+    wick_bull = lower_wick > two_body
+    wick_bear = upper_wick > two_body
+    flags |= wick_bull.astype(np.uint8) * FLAG_WICK_BULL
+    flags |= wick_bear.astype(np.uint8) * FLAG_WICK_BEAR
+
+    talib = optional_import("talib")  # TA-Lib is optional, imported on first use
+    if talib is not None:
+        # TA-Lib returns integer score (usually 100 or -100)
+        engulfing = talib.CDLENGULFING(op, hi, lo, cl)
+        flags |= (talib.CDLHAMMER(op, hi, lo, cl) != 0).astype(np.uint8) * FLAG_HAMMER
+        flags |= (talib.CDLSHOOTINGSTAR(op, hi, lo, cl) != 0).astype(np.uint8) * FLAG_SHOOTING_STAR
+        flags |= (engulfing > 0).astype(np.uint8) * FLAG_BULL_ENGULFING
+        flags |= (engulfing < 0).astype(np.uint8) * FLAG_BEAR_ENGULFING
+        flags |= (talib.CDLDOJI(op, hi, lo, cl) != 0).astype(np.uint8) * FLAG_DOJI
+        return body, upper_wick, lower_wick, flags
+
+    # 1. Hammer: Lower wick > 2 * body, upper wick very small
+    flags |= (wick_bull & (upper_wick < half_body)).astype(np.uint8) * FLAG_HAMMER
+
+    # 2. Shooting Star: Upper wick > 2 * body, lower wick very small
+    flags |= (wick_bear & (lower_wick < half_body)).astype(np.uint8) * FLAG_SHOOTING_STAR
+
+    # 3. Engulfing (vs previous candle, first bar never engulfs)
+    if len(op) > 1:
+        p_op, p_cl = op[:-1], cl[:-1]
+        c_op, c_cl = op[1:], cl[1:]
+        bull_eng = (c_cl > c_op) & (p_cl < p_op) & (c_op < p_cl) & (c_cl > p_op)
+        bear_eng = (c_cl < c_op) & (p_cl > p_op) & (c_op > p_cl) & (c_cl < p_op)
+        flags[1:] |= bull_eng.astype(np.uint8) * FLAG_BULL_ENGULFING
+        flags[1:] |= bear_eng.astype(np.uint8) * FLAG_BEAR_ENGULFING
+
+    # 4. Doji: Body is very very small
+    flags |= (body <= (hi - lo) * 0.1).astype(np.uint8) * FLAG_DOJI
+
+    return body, upper_wick, lower_wick, flags
+
+
+def _flag_score(flags: np.ndarray, flag: int, score: int) -> np.ndarray:
+    return np.where(flags & flag, score, 0)
+
+
 class PatternRecognizer:
     """
     Detects candle patterns required by the strategy.
@@ -22,71 +95,55 @@ class PatternRecognizer:
     - Doji (Indecision/Reversal context)
     """
     
+    def annotate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds compact pattern columns IN PLACE (no copy):
+        'Body', 'Upper_Wick', 'Lower_Wick' and the 'pat_flags' bit-set.
+        Used by the indicator pipeline on its own working frame.
+        """
+        if df.empty:
+            return df
+            
+        body, upper_wick, lower_wick, flags = candle_kernel(
+            df['Open'].to_numpy(), df['High'].to_numpy(),
+            df['Low'].to_numpy(), df['Close'].to_numpy()
+        )
+        df['Body'] = body
+        df['Upper_Wick'] = upper_wick
+        df['Lower_Wick'] = lower_wick
+        df['pat_flags'] = flags
+        return df
+
     def detect_patterns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Appends boolean columns for patterns: 'is_hammer', 'is_shooting_star', etc.
+        Appends pattern score columns: 'pat_hammer', 'pat_shooting_star', etc.
+        Returns a copy. Frames already annotated by the indicator pipeline
+        ('pat_flags' present) are not recomputed.
         """
         if df.empty:
             return df
             
         data = df.copy()
-        op = data['Open']
-        hi = data['High']
-        lo = data['Low']
-        cl = data['Close']
+        if 'pat_flags' not in data.columns:
+            self.annotate(data)
+        flags = data['pat_flags'].to_numpy()
         
-        body = abs(cl - op)
-        upper_wick = hi - np.maximum(cl, op)
-        lower_wick = np.minimum(cl, op) - lo
-
-        if HAS_TALIB:
-            # TA-Lib returns integer score (usually 100 or -100)
-            data['pat_hammer'] = talib.CDLHAMMER(op, hi, lo, cl)
-            data['pat_shooting_star'] = talib.CDLSHOOTINGSTAR(op, hi, lo, cl)
-            data['pat_engulfing'] = talib.CDLENGULFING(op, hi, lo, cl) # +100 bull, -100 bear
-            data['pat_doji'] = talib.CDLDOJI(op, hi, lo, cl)
-        else:
-            # Pandas / Custom Logic Implementation
-            # 1. Hammer: Small body, long lower wick, small/no upper wick
-            avg_body = body.rolling(10).mean() # relative body size
-            
-            # Logic: Lower wick > 2 * body, Upper wick very small
-            is_hammer = (lower_wick > 2 * body) & (upper_wick < body * 0.5)
-            data['pat_hammer'] = np.where(is_hammer, 100, 0)
-            
-            # 2. Shooting Star: Small body, long upper wick
-            is_star = (upper_wick > 2 * body) & (lower_wick < body * 0.5)
-            data['pat_shooting_star'] = np.where(is_star, -100, 0) # usually strictly bearish
-            
-            # 3. Engulfing
-            # Bullish: Prev Red, Curr Green, Curr Open < Prev Close, Curr Close > Prev Open
-            prev_op = op.shift(1)
-            prev_cl = cl.shift(1)
-            
-            is_bull_eng = (cl > op) & (prev_cl < prev_op) & (op < prev_cl) & (cl > prev_op)
-            is_bear_eng = (cl < op) & (prev_cl > prev_op) & (op > prev_cl) & (cl < prev_op)
-            
-            data['pat_engulfing'] = 0
-            data.loc[is_bull_eng, 'pat_engulfing'] = 100
-            data.loc[is_bear_eng, 'pat_engulfing'] = -100
-            
-            # 4. Doji: Body is very very small
-            is_doji = body <= (hi - lo) * 0.1
-            data['pat_doji'] = np.where(is_doji, 100, 0)
-
-        # 5. Pure Wick Rejection (VWAP Bounce Strategy) - ALWAYS RUN
-        # Bullish: Lower Wick > 2 * Body
-        is_wick_bull = lower_wick > (2 * body)
-        data['pat_wick_bull'] = np.where(is_wick_bull, 100, 0)
-
-        # Bearish: Upper Wick > 2 * Body
-        is_wick_bear = upper_wick > (2 * body)
-        data['pat_wick_bear'] = np.where(is_wick_bear, -100, 0)
+        data['pat_hammer'] = _flag_score(flags, FLAG_HAMMER, 100)
+        data['pat_shooting_star'] = _flag_score(flags, FLAG_SHOOTING_STAR, -100) # usually strictly bearish
+        data['pat_engulfing'] = (_flag_score(flags, FLAG_BULL_ENGULFING, 100)
+                                 + _flag_score(flags, FLAG_BEAR_ENGULFING, -100)) # +100 bull, -100 bear
+        data['pat_doji'] = _flag_score(flags, FLAG_DOJI, 100)
+        data['pat_wick_bull'] = _flag_score(flags, FLAG_WICK_BULL, 100)
+        data['pat_wick_bear'] = _flag_score(flags, FLAG_WICK_BEAR, -100)
 
         return data
 
     def check_bullish_reversal(self, row) -> bool:
         """Check if row has any bullish reversal pattern."""
+        flags = row.get('pat_flags')
+        if flags is not None and not pd.isna(flags):
+            return bool(int(flags) & (FLAG_HAMMER | FLAG_BULL_ENGULFING | FLAG_DOJI))
+            
         hammer = row.get('pat_hammer', 0) > 0
         bull_eng = row.get('pat_engulfing', 0) > 0
         doji = row.get('pat_doji', 0) != 0 # Doji is context dependent, but we treat presence as signal if other conds met
@@ -95,6 +152,10 @@ class PatternRecognizer:
 
     def check_bearish_reversal(self, row) -> bool:
         """Check if row has any bearish reversal pattern."""
+        flags = row.get('pat_flags')
+        if flags is not None and not pd.isna(flags):
+            return bool(int(flags) & (FLAG_SHOOTING_STAR | FLAG_BEAR_ENGULFING | FLAG_DOJI))
+            
         star = row.get('pat_shooting_star', 0) != 0 # TA-lib might return -100
         # Check explicit negative shooting star creation if standard is neg
         # In custom I used -100? No I used +100 for Hammer, -100 for Star?
@@ -113,6 +174,14 @@ class PatternRecognizer:
         """
         Returns 1 for Bullish Wick Rejection, -1 for Bearish, 0 otherwise.
         """
+        flags = row.get('pat_flags')
+        if flags is not None and not pd.isna(flags):
+            if int(flags) & FLAG_WICK_BULL:
+                return 1
+            if int(flags) & FLAG_WICK_BEAR:
+                return -1
+            return 0
+            
         if row.get('pat_wick_bull', 0) > 0:
             return 1
         if row.get('pat_wick_bear', 0) < 0: # Bearish stored as -100
@@ -7,6 +7,7 @@ from config.settings import STRATEGY_CONFIG
 from analysis.signal import Signal, SignalType, SignalStatus
 from analysis.patterns import PatternRecognizer
 from analysis.logic import check_vwap_bounce
+from analysis.multi_timeframe import MultiTimeframeJoin
 
 logger = logging.getLogger("core.analysis.scanner")
 
@@ -17,8 +18,17 @@ class Scanner:
 
     def __init__(self):
         self.pattern_recognizer = PatternRecognizer()
+        self.mtf = MultiTimeframeJoin()
         self.cfg = STRATEGY_CONFIG
 
+    def _build_daily_context(self, df_daily: pd.DataFrame) -> pd.DataFrame:
+        """Daily trend context attached to signals (v3.1 Daily SMA trend filter)."""
+        period = self.cfg.get("SMA_TREND_PERIOD", 200)
+        return pd.DataFrame({
+            'daily_close': df_daily['Close'],
+            'daily_sma_trend': df_daily['Close'].rolling(window=period).mean()
+        }, index=df_daily.index)
+
     def find_signals(self, 
                      symbol: str, 
                      df_hourly: pd.DataFrame, 
@@ -28,14 +38,20 @@ class Scanner:
         Scans a dataframe (Hourly) for entry signals.
         Expects df_hourly to already include technical indicators columns:
         [CRSI, BB_Lower, BB_Upper, ADX, SMA_200, Volume_SMA_20, etc.]
+        If df_daily is given, the last CLOSED daily bar's trend context is
+        attached to each signal's metadata.
         """
         signals = []
         
         if df_hourly.empty:
             return signals
 
-        # Detect patterns first (adds pat_wick_bull, etc.)
-        df = self.pattern_recognizer.detect_patterns(df_hourly)
+        # Candle geometry/patterns: already present when df_hourly comes from
+        # TechnicalIndicators.calculate_all, otherwise computed on a copy.
+        if 'pat_flags' in df_hourly.columns:
+            df = df_hourly
+        else:
+            df = self.pattern_recognizer.annotate(df_hourly.copy())
         
         # Decision Logger
         decision_logger = logging.getLogger("scanner_decisions")
@@ -46,6 +62,9 @@ class Scanner:
             if start_idx < 0: return signals
         else:
             start_idx = 0
+        
+        # Daily context (as-of aligned, built lazily on the first signal)
+        daily_ctx = None
             
         for i in range(start_idx, len(df)):
             row = df.iloc[i]
@@ -73,6 +92,21 @@ class Scanner:
                 vol_sma = row.get('Volume_SMA_20', 0)
                 atr_val = row.get('ATR', 0)
                 
+                if daily_ctx is None and df_daily is not None and not df_daily.empty:
+                    daily_ctx = self.mtf.join(
+                        symbol,
+                        df.index[start_idx:],
+                        builder=self._build_daily_context,
+                        key="scanner_daily_context",
+                        higher=df_daily,
+                        use_cache=False
+                    )
+                
+                daily_close, daily_sma = None, None
+                if daily_ctx is not None and ts in daily_ctx.index:
+                    daily_close = daily_ctx.at[ts, 'daily_close']
+                    daily_sma = daily_ctx.at[ts, 'daily_sma_trend']
+                
                 sig = Signal(
                     symbol=symbol,
                     timestamp=ts,
@@ -84,7 +118,9 @@ class Scanner:
                         "ema_200": float(ema_200) if ema_200 else 0.0,
                         "vol": float(row['Volume']),
                         "vol_sma": float(vol_sma),
-                        "pat_score": 100 if signal_type == SignalType.LONG else -100
+                        "pat_score": 100 if signal_type == SignalType.LONG else -100,
+                        "daily_close": None if pd.isna(daily_close) else float(daily_close),
+                        "daily_sma_trend": None if pd.isna(daily_sma) else float(daily_sma)
                     }
                 )
                 signals.append(sig)
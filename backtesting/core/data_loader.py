@@ -1,8 +1,10 @@
 import pandas as pd
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from data.storage.database import Database
+from core.market_calendar import get_session_calendar
+from data.quality.validator import QualityReport, configured_validator
 
 logger = logging.getLogger("backtesting.core.data_loader")
 
@@ -16,6 +18,8 @@ class DataLoader:
         """
         logger.info(f"[DATA LOAD START] Loading {symbol} | Interval: {interval} | Range: {start_date.date()} to {end_date.date()}")
         
+        # Bar stats before the bars: a concurrent write makes the cached report stale, never wrongly fresh
+        stats = self.db.get_bar_stats(symbol, interval)
         df = self.db.load_market_data(symbol, interval)
         
         if df.empty:
@@ -25,6 +29,7 @@ class DataLoader:
         # Ensure index is datetime
         df.index = pd.to_datetime(df.index)
         df = df.sort_index()
+        stored = df
         
         # Filter by date
         # Filter by date
@@ -42,31 +47,21 @@ class DataLoader:
              return df
 
         logger.info(f"[DATA LOADED] {len(df)} bars loaded for {symbol}.")
-        self._validate_data(df, symbol)
+        self._validate_data(stored, symbol, interval, stats)
         
         return df
         
     def _filter_market_hours(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
         """
-        Filters data to keep only US Market Hours (09:30 - 16:00 ET).
+        Filters data to keep only US Market Hours (09:30 - close ET).
+        Exchange holidays and half-days (13:00 close) come from the session calendar.
         Assumes df.index is UTC.
         """
         original_count = len(df)
         
-        # Convert to NY time for filtering
-        ny_time = df.index.tz_convert('America/New_York')
-        
-        # Define Market Hours:
-        # Weekdays (0-4) AND (Hour > 9 OR (Hour == 9 AND Minute >= 30)) AND (Hour < 16)
-        # Note: 16:00 is usually the close candle. Depending on timestamp convention (start vs end of candle).
-        # Standard: 09:30 candle is 09:30-10:00. 15:30 candle is 15:30-16:00.
-        # So we want >= 09:30 and < 16:00.
-        
-        is_weekday = ny_time.dayofweek < 5
-        is_market_start = (ny_time.hour > 9) | ((ny_time.hour == 9) & (ny_time.minute >= 30))
-        is_market_end = ny_time.hour < 16
-        
-        mask = is_weekday & is_market_start & is_market_end
+        # Note: 09:30 candle is 09:30-10:00, 15:30 candle is 15:30-16:00 (start-of-bar convention).
+        # So we keep bars starting >= 09:30 and before the session close.
+        mask = get_session_calendar().session_frame(df.index)['is_rth'].to_numpy()
         
         df_filtered = df[mask] # Use boolean indexing directly
         
@@ -76,44 +71,34 @@ class DataLoader:
             
         return df_filtered
 
-    def _validate_data(self, df: pd.DataFrame, symbol: str):
+    def _validate_data(self, df: pd.DataFrame, symbol: str, interval: str = "1h",
+                       stats: Optional[Tuple[int, Optional[pd.Timestamp]]] = None) -> Optional[QualityReport]:
         """
-        Performs technical validation on the data.
+        Data quality report of the whole stored series (`df`, as loaded),
+        see data/quality/validator.py. The report stored by a previous load
+        or by the live gap check is reused while the series is unchanged, so
+        repeated backtests do not re-validate. `stats` are the series'
+        Database.get_bar_stats taken before `df` was loaded. Daily series are
+        validated on a fixed interval (see configured_validator).
         """
-        logger.info(f"[VALIDATION START] Validating {symbol} integrity...")
-        issues_found = 0
+        try:
+            validator = configured_validator(self.db, interval)
+        except ValueError as e:
+            logger.info(f"[VALIDATION SKIPPED] {symbol}: {e}")
+            return None
         
-        # 1. Check for duplicates
-        if df.index.duplicated().any():
-            dup_count = df.index.duplicated().sum()
-            logger.warning(f"[VALIDATION WARNING] {symbol}: Found {dup_count} duplicated timestamps. Keeping first.")
-            df = df[~df.index.duplicated(keep='first')]
-            issues_found += 1
-            
-        # 2. Check for impossible values
-        invalid_high_low = df[df['High'] < df['Low']]
-        if not invalid_high_low.empty:
-            logger.error(f"[VALIDATION ERROR] {symbol}: Found {len(invalid_high_low)} bars where High < Low!")
-            issues_found += 1
-            
-        invalid_prices = df[(df['Open'] <= 0) | (df['Close'] <= 0) | (df['High'] <= 0) | (df['Low'] <= 0)]
-        if not invalid_prices.empty:
-            logger.warning(f"[VALIDATION WARNING] {symbol}: Found {len(invalid_prices)} bars with zero/negative prices.")
-            issues_found += 1
-            
-        # 3. Check for gaps
-        expected_intervals = df.index.to_series().diff().value_counts()
-        if not expected_intervals.empty:
-            most_common_interval = expected_intervals.idxmax()
-            gaps = df.index.to_series().diff() > most_common_interval * 1.5
-            gap_count = gaps.sum()
-            if gap_count > 0:
-                logger.warning(f"[VALIDATION WARNING] {symbol}: Detected {gap_count} potential data gaps.")
-                issues_found += 1
-            
-        if issues_found == 0:
-            logger.info(f"[VALIDATION PASSED] {symbol} data is clean.")
+        stats = {symbol: stats or self.db.get_bar_stats(symbol, interval)}
+        report = validator.cached([symbol], interval, stats).get(symbol)
+        if report is not None:
+            logger.info(f"[VALIDATION CACHED] {report.summary()} (validated {report.validated_at:%Y-%m-%d %H:%M})")
         else:
-            logger.info(f"[VALIDATION COMPLETE] Found {issues_found} potential issues in {symbol}.")
-            
-        return df
+            report = validator.validate(df, symbol)
+            validator.store({symbol: report}, interval, stats)
+            logger.info(f"[VALIDATION COMPLETE] {report.summary()}")
+        
+        for warning in report.warnings:
+            logger.warning(f"[VALIDATION WARNING] {symbol}: {warning}")
+        if not report.backtest_ready:
+            logger.error(f"[VALIDATION ERROR] {symbol}: data is not backtest-ready "
+                         f"({report.status.value}, score {report.score:.1f})")
+        return report
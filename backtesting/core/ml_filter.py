@@ -1,7 +1,3 @@
-try:
-    import joblib
-except ImportError:
-    joblib = None
 import os
 import json
 import logging
@@ -9,6 +5,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional, List
 from .features import FeatureEngineer
+from core.utils import optional_import
 
 logger = logging.getLogger("backtesting.core.ml_filter")
 
@@ -34,6 +31,11 @@ class MLFilter:
     def _load_model(self, key: str, path: str):
         """Helper to load a model and its features."""
         if os.path.exists(path):
+            # joblib (and the xgboost it unpickles) is only imported when a model is loaded
+            joblib = optional_import("joblib")
+            if joblib is None:
+                logger.error(f"❌ joblib is not installed, cannot load ML model {path}")
+                return
             try:
                 self.models[key] = joblib.load(path)
                 feat_path = path.replace(".joblib", "_features.json")
@@ -1,9 +1,8 @@
 from backtesting.core.strategy_interface import StrategyInterface, Signal, SignalSide
 import pandas as pd
 import numpy as np
-import ta
 from typing import Dict, Any, List, Optional
-from backtesting.core.data_loader import DataLoader
+from analysis.multi_timeframe import MultiTimeframeJoin
 import logging
 
 logger = logging.getLogger("backtesting.strategies.ema_pullback")
@@ -22,6 +21,7 @@ class EMAPullback(StrategyInterface):
         
         self.params = params
         self.indicators_df = None
+        self.mtf = MultiTimeframeJoin()
         
         # State tracking for the current trade
         self.entry_price = 0.0
@@ -34,6 +34,21 @@ class EMAPullback(StrategyInterface):
     def get_params(self) -> Dict[str, Any]:
         return self.params
 
+    def _build_daily_bias(self, df_daily: pd.DataFrame) -> pd.DataFrame:
+        """
+        Daily bias columns. Alignment (only closed daily bars are visible to 1H)
+        is handled by MultiTimeframeJoin.
+        """
+        import ta  # Heavy optional dependency, only needed by this strategy
+        adx_obj = ta.trend.ADXIndicator(df_daily['High'], df_daily['Low'], df_daily['Close'], window=14)
+        return pd.DataFrame({
+            'EMA100_daily': ta.trend.ema_indicator(df_daily['Close'], window=self.ema_slow_daily_period),
+            'ADX_daily': adx_obj.adx(),
+            'DI_pos_daily': adx_obj.adx_pos(),
+            'DI_neg_daily': adx_obj.adx_neg(),
+            'Close_daily': df_daily['Close'],
+        }, index=df_daily.index)
+
     def _precompute_indicators(self, data: pd.DataFrame):
         """
         Calculates indicators for 1H and merges 1D bias data.
@@ -51,6 +66,8 @@ class EMAPullback(StrategyInterface):
         
         logger.info(f"Computing indicators for {symbol}...")
         
+        import ta  # Heavy optional dependency, only needed by this strategy
+        
         # 1. Calculate 1H Indicators
         # EMA 20 (1H)
         ema20 = ta.trend.ema_indicator(data['Close'], window=self.ema_fast_period)
@@ -61,35 +78,16 @@ class EMAPullback(StrategyInterface):
         # Volume SMA 20 (1H)
         vol_sma = ta.trend.sma_indicator(data['Volume'], window=self.vol_sma_period)
         
-        # 2. Get 1D Bias Data
-        loader = DataLoader()
-        start_date = data.index[0]
-        end_date = data.index[-1]
-        
-        df_daily = loader.load_data(
-            symbol=symbol,
-            interval="1d",
-            start_date=start_date,
-            end_date=end_date
+        # 2. Get 1D Bias Data (computed once per symbol/range, as-of aligned, cached across trials)
+        daily_bias_1h = self.mtf.join(
+            symbol,
+            data.index,
+            builder=self._build_daily_bias,
+            key=f"ema_pullback_bias_{self.ema_slow_daily_period}",
+            timeframe="1d"
         )
         
-        if not df_daily.empty:
-            # EMA 100 (Daily)
-            df_daily['EMA100_daily'] = ta.trend.ema_indicator(df_daily['Close'], window=self.ema_slow_daily_period)
-            
-            # ADX and DI (Daily)
-            adx_obj = ta.trend.ADXIndicator(df_daily['High'], df_daily['Low'], df_daily['Close'], window=14)
-            df_daily['ADX_daily'] = adx_obj.adx()
-            df_daily['DI_pos_daily'] = adx_obj.adx_pos()
-            df_daily['DI_neg_daily'] = adx_obj.adx_neg()
-            df_daily['Close_daily'] = df_daily['Close']
-            
-            # Shift daily indicators by 1 day so 1H see the data from the PREVIOUS day
-            daily_bias = df_daily[['EMA100_daily', 'ADX_daily', 'DI_pos_daily', 'DI_neg_daily', 'Close_daily']].shift(1)
-            
-            # Reindex to 1H index and forward fill
-            daily_bias_1h = daily_bias.reindex(data.index, method='ffill')
-        else:
+        if daily_bias_1h.empty:
             logger.warning(f"Could not load daily data for {symbol}, bias filter will be disabled.")
             daily_bias_1h = pd.DataFrame(index=data.index)
             for col in ['EMA100_daily', 'ADX_daily', 'DI_pos_daily', 'DI_neg_daily', 'Close_daily']:
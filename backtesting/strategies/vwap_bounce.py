@@ -6,12 +6,15 @@ from typing import Dict, Any, List
 
 # Shared Core Logic
 from analysis.indicators import TechnicalIndicators
-from analysis.patterns import PatternRecognizer
 from analysis.logic import check_vwap_bounce
 from analysis.signal import SignalType
+from core.market_calendar import get_session_calendar
 
 logger = logging.getLogger("backtesting.strategies.vwap_bounce")
 
+# Flatten positions this many minutes before the session close
+SESSION_CLOSE_BUFFER_MINUTES = 10
+
 class VWAPBounce(StrategyInterface):
     def setup(self, params: Dict[str, Any]):
         self.risk_pct = params.get("risk_pct", 0.015)
@@ -39,7 +42,6 @@ class VWAPBounce(StrategyInterface):
         
         # Tools
         self.tech_indicators = TechnicalIndicators()
-        self.pattern_recognizer = PatternRecognizer()
         
         # State tracking
         self.entry_price = 0.0
@@ -55,21 +57,23 @@ class VWAPBounce(StrategyInterface):
 
     def _precompute_indicators(self, data: pd.DataFrame):
         """
-        Uses the shared TechnicalIndicators and PatternRecognizer to generate features.
+        Uses the shared TechnicalIndicators (which also annotates candle patterns) to generate features.
         """
         if data.empty:
             return
 
         # 1. Calculate Standard Indicators
+        # 2. Patterns (body/wicks + pattern bit flags) are added by the same pass, no extra copy
         df = self.tech_indicators.calculate_all(data)
         
-        # 2. Calculate Patterns (Wicks, Hammer, etc)
-        df = self.pattern_recognizer.detect_patterns(df)
-        
         # 3. Add any strategy-specific legacy derivations if not present
         if 'Dist_EMA200' not in df.columns and 'EMA_200' in df.columns:
             df['Dist_EMA200'] = (df['Close'] - df['EMA_200']) / df['EMA_200']
             
+        # 4. Session flags (precomputed, avoids per-bar timezone conversion)
+        sessions = get_session_calendar().session_frame(df.index)
+        df['Closing_Soon'] = sessions['minutes_to_close'].to_numpy() <= SESSION_CLOSE_BUFFER_MINUTES
+            
         self.indicators_df = df
         logger.info(f"Precomputed indicators for {self.symbol}: {len(df)} rows.")
 
@@ -141,7 +145,7 @@ class VWAPBounce(StrategyInterface):
                     return Signal(exit_side, quantity_pct=1.0, tag="TIME_STOP_EXIT")
             
             # Session Close
-            if self.is_market_closing_soon(ts):
+            if ind.get('Closing_Soon', False):
                 exit_side = SignalSide.SELL if self.active_side == 'LONG' else SignalSide.BUY
                 self._reset_state()
                 return Signal(exit_side, quantity_pct=1.0, tag="SESSION_CLOSE_EXIT")
@@ -191,12 +195,8 @@ class VWAPBounce(StrategyInterface):
         self.entry_ts = None
 
     def is_market_closing_soon(self, ts: pd.Timestamp) -> bool:
-        """Helper to identify EOD in NY time."""
+        """Helper to identify EOD in NY time (holiday/half-day aware)."""
         try:
-            ny_ts = ts.tz_convert('America/New_York')
-            if ny_ts.weekday() >= 5: return False
-            if ny_ts.hour == 15 and ny_ts.minute >= 50: return True
-            if ny_ts.hour >= 16: return True
-            return False
-        except:
+            return get_session_calendar().is_closing_soon(ts, SESSION_CLOSE_BUFFER_MINUTES)
+        except Exception:
             return False
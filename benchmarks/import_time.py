@@ -0,0 +1,125 @@
+"""
+Import-Time Benchmark
+=====================
+Measures cold import time of the CLI entry points with `python -X importtime`
+and writes a summary report (benchmarks/import_time_report.md).
+
+Each target is imported in a fresh interpreter, so results include every
+transitive import. Budgets are checked against the cumulative time of the
+target module; use --check to exit non-zero when one is exceeded.
+
+Usage:
+    python benchmarks/import_time.py            # Print summary
+    python benchmarks/import_time.py --write    # Also update the report
+    python benchmarks/import_time.py --check    # Fail if over budget
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+REPORT_PATH = Path(__file__).resolve().parent / "import_time_report.md"
+
+# Module -> budget (ms, cumulative). `main` must stay light: heavy imports are
+# deferred to the mode that needs them.
+TARGETS: Dict[str, float] = {
+    "main": 150,
+    "data.manager": 1000,
+    "analysis.scanner": 1000,
+    "backtesting.core.backtester": 1200,
+}
+
+# Modules that must NOT be imported by `import main`
+FORBIDDEN_IN_MAIN = ("pandas", "requests", "yfinance", "talib", "joblib", "xgboost", "ta")
+
+
+def measure(module: str, repeat: int = 3) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """
+    Imports `module` in fresh interpreters and returns (best cumulative ms,
+    [(name, self_ms, cumulative_ms)] of the best run).
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        rows = []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            # "import time:  self [us] | cumulative | imported package" (name indented by depth)
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((name.strip(), int(self_us) / 1000.0, int(cum_us) / 1000.0))
+        total = next((cum for name, _, cum in rows if name == module), None)
+        if total is None:
+            raise RuntimeError(f"No importtime entry for {module}")
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best
+
+
+def top_level_packages(rows: List[Tuple[str, float, float]]) -> Dict[str, float]:
+    """Self time summed per top-level package."""
+    totals: Dict[str, float] = {}
+    for name, self_ms, _ in rows:
+        pkg = name.split(".")[0]
+        totals[pkg] = totals.get(pkg, 0.0) + self_ms
+    return totals
+
+
+def build_report(results: Dict[str, Tuple[float, List[Tuple[str, float, float]]]], top: int = 10) -> str:
+    lines = [
+        "# Import-Time Report",
+        "",
+        f"Generated by `python benchmarks/import_time.py --write` (Python {sys.version.split()[0]}).",
+        "Cumulative cold import time, best of 3 fresh interpreters.",
+        "",
+        "| Target | Cumulative (ms) | Budget (ms) | Status |",
+        "|---|---:|---:|---|",
+    ]
+    for module, (total, _) in results.items():
+        budget = TARGETS[module]
+        lines.append(f"| `{module}` | {total:.0f} | {budget:.0f} | {'OK' if total <= budget else 'OVER'} |")
+
+    for module, (total, rows) in results.items():
+        lines += ["", f"## `{module}` — heaviest packages (self time)", "",
+                  "| Package | Self (ms) |", "|---|---:|"]
+        packages = sorted(top_level_packages(rows).items(), key=lambda kv: kv[1], reverse=True)[:top]
+        lines += [f"| `{pkg}` | {ms:.1f} |" for pkg, ms in packages]
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the CLI entry points")
+    parser.add_argument("--write", action="store_true", help=f"Write {REPORT_PATH.name}")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a budget is exceeded")
+    args = parser.parse_args()
+
+    results = {module: measure(module) for module in TARGETS}
+    report = build_report(results)
+    print(report)
+
+    failures = [m for m, (total, _) in results.items() if total > TARGETS[m]]
+    main_modules = {name.split(".")[0] for name, _, _ in results["main"][1]}
+    leaked = [m for m in FORBIDDEN_IN_MAIN if m in main_modules]
+    if leaked:
+        print(f"Heavy modules imported by `import main`: {', '.join(leaked)}")
+
+    if args.write:
+        REPORT_PATH.write_text(report, encoding="utf-8")
+        print(f"Report written to {REPORT_PATH}")
+
+    if args.check and (failures or leaked):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,495 @@
+"""
+Mock Provider Server
+====================
+Local HTTP server answering with the Polygon, TwelveData, AlphaVantage and
+Yahoo chart response shapes, for load and soak tests of the live loop
+without real APIs (see benchmarks/soak_live_loop.py).
+
+- Bars: session-anchored 1h bars (09:30 grid) and daily bars. Synthetic bars
+  are a deterministic function of (symbol, timestamp); with a trading DB
+  (--db) recorded bars are served where the DB has them. Only bars started
+  before the server clock are returned, and the last one is partial, so with
+  an accelerated clock new bars appear as simulated time passes.
+- Faults per provider: latency range, error rate (HTTP 500), 429 injection
+  rate, and a requests-per-minute quota (real time) answered with
+  429 + Retry-After. Faults come from a seeded RNG, so a run is reproducible
+  for a given request order. AlphaVantage signals limits with a 200 "Note"
+  body, like the real API.
+
+Point the providers at it with POLYGON_BASE_URL, TWELVE_DATA_BASE_URL and
+ALPHA_VANTAGE_BASE_URL (see MockProviderServer.env()). The YFinance provider
+goes through the yfinance library and cannot be redirected; the chart
+endpoint is served for scripts that read it directly.
+
+Usage:
+    python benchmarks/mock_providers.py --port 8900
+    python benchmarks/mock_providers.py --latency-ms 50-400 --error-rate 0.02 --rate-limit-rate 0.01
+    python benchmarks/mock_providers.py --quota POLYGON=5 --quota TWELVEDATA=8
+"""
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from core.market_calendar import NY_TZ, get_session_calendar  # noqa: E402
+
+PROVIDERS = ("POLYGON", "TWELVEDATA", "ALPHAVANTAGE", "YAHOO")
+
+HOUR_NS = 3600 * 1_000_000_000
+
+
+@dataclass
+class FaultConfig:
+    """Fault injection for one provider."""
+    latency_ms: Tuple[float, float] = (0.0, 0.0)   # Uniform per-request delay
+    error_rate: float = 0.0                         # HTTP 500
+    rate_limit_rate: float = 0.0                    # Random 429s
+    quota_per_minute: Optional[int] = None          # 429 above this many requests per minute
+    retry_after_seconds: int = 60                   # Retry-After of injected 429s
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class SyntheticBars:
+    """
+    Deterministic OHLCV bars: each symbol gets a base price and a smooth
+    price curve plus hashed noise, evaluated at the bar boundaries.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.calendar = get_session_calendar()
+
+    def _symbol_hash(self, symbol: str) -> int:
+        return zlib.crc32(f"{self.seed}:{symbol}".encode())
+
+    def _noise(self, symbol: str, ts_ns: np.ndarray, salt: int) -> np.ndarray:
+        """Uniform [0, 1) per (symbol, timestamp, salt)."""
+        x = (ts_ns // 1_000_000_000).astype(np.uint64)
+        x = x * np.uint64(2654435761) + np.uint64(self._symbol_hash(symbol) + salt * 40503)
+        x ^= x >> np.uint64(15)
+        x *= np.uint64(0x2C1B3C6D)
+        x ^= x >> np.uint64(12)
+        return (x % np.uint64(1 << 24)).astype(float) / float(1 << 24)
+
+    def _price(self, symbol: str, ts_ns: np.ndarray) -> np.ndarray:
+        h = self._symbol_hash(symbol)
+        base = 20.0 + h % 480
+        hours = ts_ns / HOUR_NS
+        phase = (h % 1000) / 1000.0 * 2 * math.pi
+        curve = 0.06 * np.sin(2 * math.pi * hours / (24 * 9) + phase) + 0.02 * np.sin(2 * math.pi * hours / 31)
+        return np.round(base * (1 + curve + 0.004 * (self._noise(symbol, ts_ns, 1) - 0.5)), 2)
+
+    def _bars(self, symbol: str, starts: pd.DatetimeIndex, ends: pd.DatetimeIndex) -> pd.DataFrame:
+        s_ns = starts.as_unit("ns").asi8
+        e_ns = ends.as_unit("ns").asi8
+        o = self._price(symbol, s_ns)
+        c = self._price(symbol, e_ns)
+        spread = 1 + 0.003 * self._noise(symbol, s_ns, 2)
+        high = np.round(np.maximum(o, c) * spread, 2)
+        low = np.round(np.minimum(o, c) / spread, 2)
+        done = (e_ns - s_ns) / HOUR_NS
+        volume = np.round(1e5 * (0.5 + self._noise(symbol, s_ns, 3)) * np.clip(done, 0.05, None))
+        return pd.DataFrame({'Open': o, 'High': high, 'Low': low, 'Close': c, 'Volume': volume},
+                            index=pd.DatetimeIndex(starts, name='timestamp'))
+
+    def _sessions(self, start: pd.Timestamp, end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        day = start.tz_convert(NY_TZ).date()
+        last = end.tz_convert(NY_TZ).date()
+        sessions = []
+        while day <= last:
+            bounds = self.calendar.session_bounds(day)
+            if bounds is not None:
+                sessions.append(bounds)
+            day += timedelta(days=1)
+        return sessions
+
+    def hourly(self, symbol: str, start, end, now) -> pd.DataFrame:
+        """1h bars started in [start, end] and before `now` (the last one partial)."""
+        start, end, now = _utc(start), _utc(end), _utc(now)
+        starts, ends = [], []
+        for session_open, session_close in self._sessions(start, min(end, now)):
+            t = session_open
+            while t < session_close:
+                if start <= t <= end and t < now:
+                    starts.append(t)
+                    ends.append(min(t + pd.Timedelta(hours=1), session_close, now))
+                t += pd.Timedelta(hours=1)
+        if not starts:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        return self._bars(symbol, pd.DatetimeIndex(starts), pd.DatetimeIndex(ends))
+
+    def daily(self, symbol: str, start, end, now) -> pd.DataFrame:
+        """Daily bars stamped at NY midnight, for sessions opened by `now`."""
+        start, end, now = _utc(start), _utc(end), _utc(now)
+        rows, index = [], []
+        for session_open, session_close in self._sessions(start, min(end, now)):
+            if session_open >= now:
+                continue
+            hours = self.hourly(symbol, session_open, session_close, now)
+            if hours.empty:
+                continue
+            midnight = pd.Timestamp(session_open.tz_convert(NY_TZ).date()).tz_localize(NY_TZ).tz_convert("UTC")
+            if not start.normalize() <= midnight <= end:
+                continue
+            index.append(midnight)
+            rows.append({'Open': hours['Open'].iloc[0], 'High': hours['High'].max(), 'Low': hours['Low'].min(),
+                         'Close': hours['Close'].iloc[-1], 'Volume': hours['Volume'].sum()})
+        if not rows:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        return pd.DataFrame(rows, index=pd.DatetimeIndex(index, name='timestamp'))
+
+
+class RecordedBars(SyntheticBars):
+    """Bars stored in a trading DB, synthetic where the DB has none."""
+
+    def __init__(self, db, seed: int = 0):
+        super().__init__(seed)
+        self.db = db
+
+    def _recorded(self, symbol: str, timeframe: str, start, end, now) -> Optional[pd.DataFrame]:
+        df = self.db.load_market_data(symbol, timeframe, start=_utc(start))
+        if df.empty:
+            return None
+        df = df[(df.index <= _utc(end)) & (df.index < _utc(now))]
+        return df[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+    def hourly(self, symbol, start, end, now):
+        df = self._recorded(symbol, "1h", start, end, now)
+        return df if df is not None else super().hourly(symbol, start, end, now)
+
+    def daily(self, symbol, start, end, now):
+        df = self._recorded(symbol, "1d", start, end, now)
+        return df if df is not None else super().daily(symbol, start, end, now)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    POLYGON_RANGE = re.compile(r"^/v2/aggs/ticker/([^/]+)/range/(\d+)/(minute|hour|day)/([\d-]+)/([\d-]+)$")
+    POLYGON_GROUPED = re.compile(r"^/v2/aggs/grouped/locale/us/market/stocks/([\d-]+)$")
+    YAHOO_CHART = re.compile(r"^/v8/finance/chart/([^/]+)$")
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        mock: "MockProviderServer" = self.server.mock
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if self.POLYGON_RANGE.match(url.path) or self.POLYGON_GROUPED.match(url.path):
+                provider = "POLYGON"
+            elif url.path == "/time_series":
+                provider = "TWELVEDATA"
+            elif url.path == "/query":
+                provider = "ALPHAVANTAGE"
+            elif self.YAHOO_CHART.match(url.path):
+                provider = "YAHOO"
+            else:
+                return self._send(404, {"error": f"unknown endpoint {url.path}"})
+
+            cost = len(params.get("symbol", "").split(",")) if provider == "TWELVEDATA" else 1
+            fault = mock.draw_fault(provider, cost)
+            if fault == "error":
+                return self._send(500, {"error": "injected server error"})
+            if fault is not None:
+                return self._rate_limited(provider, fault)
+
+            if provider == "POLYGON":
+                return self._send(200, self._polygon(mock, url.path))
+            if provider == "TWELVEDATA":
+                return self._send(200, self._twelvedata(mock, params))
+            if provider == "ALPHAVANTAGE":
+                return self._send(200, self._alphavantage(mock, params))
+            return self._send(200, self._yahoo(mock, url.path, params))
+        except Exception as e:
+            return self._send(500, {"error": str(e)})
+
+    def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rate_limited(self, provider: str, retry_after: int):
+        if provider == "ALPHAVANTAGE":
+            return self._send(200, {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency "
+                                            "is 5 calls per minute and 500 calls per day."})
+        if provider == "TWELVEDATA":
+            return self._send(429, {"code": 429, "status": "error",
+                                    "message": "You have run out of API credits for the current minute."},
+                              {"Retry-After": str(retry_after)})
+        return self._send(429, {"status": "ERROR", "error": "You've exceeded the maximum requests per minute."},
+                          {"Retry-After": str(retry_after)})
+
+    # --- Response shapes ---
+
+    @staticmethod
+    def _day_range(start: str, end: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        return _utc(start), _utc(end) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+
+    def _polygon(self, mock, path: str) -> Dict:
+        now = mock.now()
+        grouped = self.POLYGON_GROUPED.match(path)
+        if grouped:
+            start, end = self._day_range(grouped.group(1), grouped.group(1))
+            results = []
+            for symbol in mock.symbols:
+                for ts, row in mock.bars.daily(symbol, start, end, now).iterrows():
+                    results.append({"T": symbol, "t": int(ts.value // 1_000_000), "o": row.Open, "h": row.High,
+                                    "l": row.Low, "c": row.Close, "v": row.Volume})
+            return {"status": "OK", "adjusted": True, "resultsCount": len(results), "results": results}
+
+        symbol, _, timespan, start, end = self.POLYGON_RANGE.match(path).groups()
+        start, end = self._day_range(start, end)
+        df = (mock.bars.daily if timespan == "day" else mock.bars.hourly)(symbol, start, end, now)
+        payload = {"ticker": symbol, "status": "OK", "adjusted": True, "resultsCount": len(df)}
+        if len(df):
+            payload["results"] = [
+                {"t": int(ts.value // 1_000_000), "o": row.Open, "h": row.High, "l": row.Low,
+                 "c": row.Close, "v": row.Volume, "n": 1}
+                for ts, row in df.iterrows()
+            ]
+        return payload
+
+    def _twelvedata(self, mock, params: Dict) -> Dict:
+        now = mock.now()
+        daily = params.get("interval") == "1day"
+        start = params.get("start_date") or (now - pd.Timedelta(days=30)).strftime('%Y-%m-%d')
+        start, end = self._day_range(start, params.get("end_date") or now.strftime('%Y-%m-%d'))
+        outputsize = int(params.get("outputsize", 30))
+        fmt = '%Y-%m-%d' if daily else '%Y-%m-%d %H:%M:%S'
+
+        def one(symbol: str) -> Dict:
+            df = (mock.bars.daily if daily else mock.bars.hourly)(symbol, start, end, now)
+            if df.empty:
+                return {"code": 400, "status": "error", "message": f"No data is available for {symbol}"}
+            df = df.iloc[-outputsize:]
+            values = [{"datetime": ts.strftime(fmt), "open": f"{row.Open:.5f}", "high": f"{row.High:.5f}",
+                       "low": f"{row.Low:.5f}", "close": f"{row.Close:.5f}", "volume": str(int(row.Volume))}
+                      for ts, row in df.iterrows()]
+            if params.get("order", "DESC").upper() != "ASC":
+                values.reverse()
+            return {"meta": {"symbol": symbol, "interval": params.get("interval"), "exchange_timezone": "UTC"},
+                    "values": values, "status": "ok"}
+
+        symbols = [s for s in params.get("symbol", "").split(",") if s]
+        if len(symbols) == 1:
+            return one(symbols[0])
+        return {symbol: one(symbol) for symbol in symbols}
+
+    def _alphavantage(self, mock, params: Dict) -> Dict:
+        now = mock.now()
+        symbol = params.get("symbol", "")
+        compact = params.get("outputsize", "compact") == "compact"
+        if params.get("function") == "TIME_SERIES_INTRADAY":
+            interval = params.get("interval", "60min")
+            df = mock.bars.hourly(symbol, now - pd.Timedelta(days=30), now, now)
+            key, fmt, tz = f"Time Series ({interval})", '%Y-%m-%d %H:%M:%S', NY_TZ   # Eastern, like the real API
+        else:
+            df = mock.bars.daily(symbol, now - pd.Timedelta(days=730), now, now)
+            key, fmt, tz = "Time Series (Daily)", '%Y-%m-%d', NY_TZ
+        if df.empty:
+            return {"Error Message": f"Invalid API call. No data for {symbol}."}
+        if compact:
+            df = df.iloc[-100:]
+        series = {}
+        for ts, row in df.iloc[::-1].iterrows():
+            series[ts.tz_convert(tz).strftime(fmt)] = {
+                "1. open": f"{row.Open:.4f}", "2. high": f"{row.High:.4f}", "3. low": f"{row.Low:.4f}",
+                "4. close": f"{row.Close:.4f}", "5. volume": str(int(row.Volume))}
+        return {"Meta Data": {"2. Symbol": symbol}, key: series}
+
+    def _yahoo(self, mock, path: str, params: Dict) -> Dict:
+        now = mock.now()
+        symbol = self.YAHOO_CHART.match(path).group(1)
+        start = pd.Timestamp(int(params.get("period1", 0)), unit='s', tz='UTC') if "period1" in params \
+            else now - pd.Timedelta(days=30)
+        end = pd.Timestamp(int(params["period2"]), unit='s', tz='UTC') if "period2" in params else now
+        df = (mock.bars.daily if params.get("interval") == "1d" else mock.bars.hourly)(symbol, start, end, now)
+        return {"chart": {"result": [{
+            "meta": {"symbol": symbol, "currency": "USD", "exchangeTimezoneName": "America/New_York"},
+            "timestamp": [int(ts.value // 1_000_000_000) for ts in df.index],
+            "indicators": {"quote": [{
+                "open": df['Open'].tolist(), "high": df['High'].tolist(), "low": df['Low'].tolist(),
+                "close": df['Close'].tolist(), "volume": [int(v) for v in df['Volume']],
+            }]},
+        }], "error": None}}
+
+
+class MockProviderServer:
+    """
+    Threaded mock of the provider APIs (see module docstring).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, bars: Optional[SyntheticBars] = None,
+                 faults: Optional[Dict[str, FaultConfig]] = None, symbols: Sequence[str] = (),
+                 now_fn: Optional[Callable[[], datetime]] = None, seed: int = 0):
+        """
+        Args:
+            bars: Bar source (deterministic synthetic bars by default).
+            faults: Provider name (POLYGON, TWELVEDATA, ALPHAVANTAGE, YAHOO) -> FaultConfig.
+            symbols: Universe returned by the Polygon grouped daily endpoint.
+            now_fn: Server clock (tz-aware UTC), e.g. the soak harness' accelerated clock.
+        """
+        self.bars = bars or SyntheticBars(seed)
+        self.faults = faults or {}
+        self.symbols = list(symbols)
+        self.now_fn = now_fn or (lambda: datetime.now().astimezone())
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: Dict[str, deque] = {p: deque() for p in PROVIDERS}
+        self._stats: Dict[str, Dict[str, int]] = {
+            p: {"requests": 0, "errors": 0, "rate_limited": 0, "quota_rejected": 0} for p in PROVIDERS}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides pointing the providers at this server."""
+        return {"POLYGON_BASE_URL": self.url, "TWELVE_DATA_BASE_URL": self.url,
+                "ALPHA_VANTAGE_BASE_URL": f"{self.url}/query"}
+
+    def now(self) -> pd.Timestamp:
+        return _utc(self.now_fn())
+
+    def draw_fault(self, provider: str, cost: int = 1):
+        """
+        Applies the provider's latency and returns the injected fault:
+        None, "error", or the Retry-After seconds of a 429.
+        """
+        fault = self.faults.get(provider, FaultConfig())
+        with self._lock:
+            stats = self._stats[provider]
+            stats["requests"] += 1
+            latency = self._rng.uniform(*fault.latency_ms) / 1000.0
+            roll = self._rng.random()
+            outcome = None
+            if fault.quota_per_minute is not None:
+                now = time.monotonic()
+                recent = self._recent[provider]
+                while recent and recent[0] <= now - 60:
+                    recent.popleft()
+                if len(recent) + cost > fault.quota_per_minute:
+                    stats["quota_rejected"] += 1
+                    outcome = max(1, math.ceil(recent[0] + 60 - now)) if recent else fault.retry_after_seconds
+                else:
+                    recent.extend([now] * cost)
+            if outcome is None and roll < fault.error_rate:
+                stats["errors"] += 1
+                outcome = "error"
+            elif outcome is None and roll < fault.error_rate + fault.rate_limit_rate:
+                stats["rate_limited"] += 1
+                outcome = fault.retry_after_seconds
+        if latency > 0:
+            time.sleep(latency)
+        return outcome
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {p: dict(s) for p, s in self._stats.items() if s["requests"]}
+
+    def start(self) -> "MockProviderServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-providers", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_range(value: str) -> Tuple[float, float]:
+    """'50-300' -> (50.0, 300.0); '100' -> (100.0, 100.0)."""
+    low, _, high = value.partition("-")
+    return float(low), float(high or low)
+
+
+def build_faults(args) -> Dict[str, FaultConfig]:
+    """Per-provider FaultConfig from the shared CLI options (--latency-ms, --error-rate, ...)."""
+    quotas = dict(q.split("=", 1) for q in args.quota or [])
+    return {
+        provider: FaultConfig(latency_ms=parse_range(args.latency_ms), error_rate=args.error_rate,
+                              rate_limit_rate=args.rate_limit_rate,
+                              quota_per_minute=int(quotas[provider]) if provider in quotas else None,
+                              retry_after_seconds=args.retry_after)
+        for provider in PROVIDERS
+    }
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", default="0", help="Per-request latency, 'min-max' ms (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--quota", action="append", metavar="PROVIDER=N",
+                        help="Requests per minute before 429s (e.g. POLYGON=5); repeatable")
+    parser.add_argument("--retry-after", type=int, default=60, help="Retry-After of injected 429s (seconds)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of synthetic bars and fault injection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Polygon/TwelveData/AlphaVantage/Yahoo server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--db", help="Serve recorded bars from this trading DB (synthetic where missing)")
+    parser.add_argument("--symbols", help="Comma-separated universe for the grouped daily endpoint")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    bars = None
+    if args.db:
+        from data.storage.database import Database
+        bars = RecordedBars(Database(Path(args.db)), seed=args.seed)
+    server = MockProviderServer(args.host, args.port, bars=bars, faults=build_faults(args),
+                                symbols=(args.symbols or "").split(",") if args.symbols else (), seed=args.seed)
+    server.start()
+    print(f"Mock providers on {server.url}")
+    for key, value in server.env().items():
+        print(f"  export {key}={value}")
+    try:
+        while True:
+            time.sleep(60)
+            print(json.dumps(server.stats()))
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Live-Loop Soak Harness
+======================
+Drives the live scheduler (main.build_live_scheduler: pre-alert,
+confirmation, report and gap-check jobs) against the mock provider server
+(benchmarks/mock_providers.py) with an accelerated clock, and reports cycle
+latency, missed deadlines, rate-limiter and provider-health behaviour for a
+universe of any size. Nothing touches real APIs, Telegram or the live DB:
+the DB and rate-limiter state live in a temp directory.
+
+- Simulated time starts before a past session open and runs at --speed
+  (simulated seconds per real second); the scheduler and the mock server
+  share the clock, so new bars appear as simulated hours pass.
+- Job durations, timeouts and provider quotas stay in real seconds, so a
+  slow cycle shows up as missed deadlines exactly as it would live.
+- The accelerated clock is installed as the process clock (core.clock), so
+  the scans' closed-candle filter and scan-state ages follow simulated time.
+- The YFinance provider cannot be redirected and is left out.
+
+Usage:
+    python benchmarks/soak_live_loop.py --symbols 120 --hours 8 --speed 60
+    python benchmarks/soak_live_loop.py --symbols 150 --latency-ms 50-400 --error-rate 0.02 --rate-limit-rate 0.01
+    python benchmarks/soak_live_loop.py --symbols 120 --rpm POLYGON=100 --json soak.json   # Paid-tier what-if
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+from benchmarks.mock_providers import MockProviderServer, add_fault_arguments, build_faults  # noqa: E402
+from core.clock import AcceleratedClock, set_clock  # noqa: E402
+from core.market_calendar import NY_TZ, get_session_calendar  # noqa: E402
+
+
+def default_start() -> datetime:
+    """10 minutes before the open of the last full session before today."""
+    calendar = get_session_calendar()
+    day = pd.Timestamp.now(tz=NY_TZ).date() - timedelta(days=1)
+    while calendar.session_bounds(day) is None:
+        day -= timedelta(days=1)
+    return (calendar.session_bounds(day)[0] - pd.Timedelta(minutes=10)).to_pydatetime()
+
+
+def build_universe(size: int, base: List[str]) -> List[str]:
+    """`base` symbols, padded with synthetic tickers (T001, T002, ...) up to `size`."""
+    universe = list(base[:size])
+    i = 1
+    while len(universe) < size:
+        universe.append(f"T{i:03d}")
+        i += 1
+    return universe
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    arr = np.asarray(values)
+    return {"p50": float(np.percentile(arr, 50)), "p95": float(np.percentile(arr, 95)), "max": float(arr.max())}
+
+
+def run_soak(args) -> Dict:
+    tmp = Path(tempfile.mkdtemp(prefix="soak_"))
+    start = pd.Timestamp(args.start, tz=NY_TZ).tz_convert("UTC").to_pydatetime() if args.start else default_start()
+    clock = AcceleratedClock(start, args.speed)
+    set_clock(clock)
+
+    # Isolate logs, DB and quota state before the application modules load
+    os.environ["LOG_FILE"] = str(tmp / "soak.log")
+    from config import settings
+    settings.RATE_LIMITER_CONFIG["DB_PATH"] = tmp / "rate_limits.db"
+    for override in args.rpm or []:
+        provider, rpm = override.split("=", 1)
+        limits = settings.RATE_LIMITS.setdefault(provider.upper(), {})
+        limits["requests_per_minute"] = int(rpm)
+        limits["cooldown_seconds"] = min(limits.get("cooldown_seconds", 1), 60.0 / int(rpm))
+    universe = args.universe.split(",") if args.universe else build_universe(args.symbols, settings.SYMBOLS)
+
+    server = MockProviderServer(faults=build_faults(args), symbols=universe, now_fn=clock.now, seed=args.seed)
+    server.start()
+    os.environ.update(server.env())
+
+    from data.storage.database import Database
+    db = Database(tmp / "soak.db")
+
+    import main as live
+    from alerts.telegram import RecordingTelegramBot
+    from analysis.indicators import TechnicalIndicators
+    from analysis.scanner import Scanner
+    from core.scan_state import ScanStateStore
+    from core.scheduler import AsyncScheduler
+    from data.manager import DataManager
+    from data.providers.alphavantage_provider import AlphaVantageProvider
+    from data.providers.polygon_provider import PolygonProvider
+    from data.providers.twelve_provider import TwelveDataProvider
+    from trading.manager import TradeManager
+
+    data_mgr = DataManager()
+    data_mgr.providers = [
+        PolygonProvider(api_key="mock", base_url=server.url),
+        TwelveDataProvider(api_key="mock", base_url=server.url),
+        AlphaVantageProvider(api_key="mock", base_url=f"{server.url}/query"),
+    ]
+    telegram = RecordingTelegramBot()
+    state_store = ScanStateStore(max_age_seconds=settings.SMART_WAKEUP_CONFIG.get("STATE_MAX_AGE_SECONDS", 600))
+
+    if args.gap_check:
+        t0 = time.monotonic()
+        live.run_gap_check(data_mgr, symbols=universe)
+        print(f"Startup gap check: {time.monotonic() - t0:.1f}s")
+
+    trade_mgr = TradeManager()
+    trade_mgr.telegram = telegram
+    scheduler = AsyncScheduler(max_workers=settings.SCHEDULER_CONFIG.get("WORKERS", 4), clock=clock)
+    live.build_live_scheduler(data_mgr, Scanner(), TechnicalIndicators(), trade_mgr, telegram, db,
+                              state_store=state_store, symbols=universe, scheduler=scheduler)
+
+    durations: Dict[str, List[float]] = {job.name: [] for job in scheduler.jobs}
+    lock = threading.Lock()
+
+    def timed(name, func):
+        def run(cancel_event):
+            t0 = time.monotonic()
+            try:
+                return func(cancel_event)
+            finally:
+                with lock:
+                    durations[name].append(time.monotonic() - t0)
+        return run
+
+    for job in scheduler.jobs:
+        job.func = timed(job.name, job.func)
+
+    real_seconds = args.hours * 3600 / args.speed
+    print(f"Soak: {len(universe)} symbols, {args.hours:g} simulated hours from "
+          f"{pd.Timestamp(start).tz_convert(NY_TZ):%Y-%m-%d %H:%M} ET at {args.speed:g}x ({real_seconds:.0f}s real), "
+          f"mock providers on {server.url}, logs in {tmp / 'soak.log'}")
+
+    async def runner():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(real_seconds)
+        scheduler.stop()
+        await task
+
+    wall_start = time.monotonic()
+    asyncio.run(runner())
+    server.stop()
+
+    return {
+        "symbols": len(universe),
+        "simulated_hours": args.hours,
+        "speed": args.speed,
+        "real_seconds": time.monotonic() - wall_start,
+        "jobs": {
+            job.name: {"runs": job.runs, "missed": job.missed, "failures": job.failures,
+                       **percentiles(durations[job.name])}
+            for job in scheduler.jobs
+        },
+        "rate_limiter": {p.name: data_mgr.rate_limiter.get_stats(p.name) for p in data_mgr.providers},
+        "provider_health": data_mgr.health.snapshot(),
+        "mock_server": server.stats(),
+        "notifications": telegram.counts(),
+        "stored_1h_bars": sum(db.get_bar_stats(symbol, "1h")[0] for symbol in universe),
+        "workdir": str(tmp),
+    }
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 78)
+    print(f"SOAK REPORT: {report['symbols']} symbols, {report['simulated_hours']:g}h simulated at "
+          f"{report['speed']:g}x in {report['real_seconds']:.0f}s")
+    print("=" * 78)
+    print(f"{'Job':<14}{'runs':>6}{'missed':>8}{'failed':>8}{'p50 s':>9}{'p95 s':>9}{'max s':>9}")
+    for name, j in report["jobs"].items():
+        fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"  # noqa: E731
+        print(f"{name:<14}{j['runs']:>6}{j['missed']:>8}{j['failures']:>8}{fmt(j['p50'])}{fmt(j['p95'])}{fmt(j['max'])}")
+    print("\nRate limiter:")
+    for name, s in report["rate_limiter"].items():
+        print(f"  {name:<13} limit {s['configured_limit']}/min, acquired {s['acquired']}, "
+              f"waited {s['waited_seconds']:.0f}s, denied {s['denied']}, throttled {s['throttled']}")
+    print("\nProvider health:")
+    for name, h in report["provider_health"].items():
+        median = f"{h['latency_median']}s" if h["latency_median"] is not None else "n/a"
+        print(f"  {name:<13} {h['success_rate']:.0%} of {h['calls']} calls, p50<={median}, 429x{h['rate_limited']}")
+    print("\nMock server:")
+    for name, s in report["mock_server"].items():
+        print(f"  {name:<13} {s['requests']} requests, {s['errors']} errors, {s['rate_limited']} 429s injected, "
+              f"{s['quota_rejected']} over quota")
+    print(f"\nNotifications: {report['notifications'] or 'none'}")
+    print(f"Stored 1h bars: {report['stored_1h_bars']}")
+    print(f"Workdir: {report['workdir']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the live loop against mock providers")
+    parser.add_argument("--symbols", type=int, default=100, help="Universe size (SYMBOLS padded with synthetic tickers)")
+    parser.add_argument("--universe", help="Explicit comma-separated universe (overrides --symbols)")
+    parser.add_argument("--hours", type=float, default=8.0, help="Simulated hours to run")
+    parser.add_argument("--speed", type=float, default=60.0, help="Simulated seconds per real second")
+    parser.add_argument("--start", help="Simulated start, NY local time (default: before the last session open)")
+    parser.add_argument("--rpm", action="append", metavar="PROVIDER=N",
+                        help="Override RATE_LIMITS requests_per_minute (e.g. POLYGON=100); repeatable")
+    parser.add_argument("--gap-check", action="store_true", help="Run the startup gap check first")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    report = run_soak(args)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
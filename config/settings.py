@@ -30,6 +30,11 @@ TWELVE_DATA_API_KEY = os.getenv('TWELVE_DATA_API_KEY')
 ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
 POLYGON_API_KEY = os.getenv('POLYGON_API_KEY')
 
+# Provider endpoints (override to point the providers at a mock server, see benchmarks/mock_providers.py)
+POLYGON_BASE_URL = os.getenv('POLYGON_BASE_URL', 'https://api.polygon.io')
+TWELVE_DATA_BASE_URL = os.getenv('TWELVE_DATA_BASE_URL', 'https://api.twelvedata.com')
+ALPHA_VANTAGE_BASE_URL = os.getenv('ALPHA_VANTAGE_BASE_URL', 'https://www.alphavantage.co/query')
+
 # Telegram Credentials
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_TOKEN') or os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('CHAT_ID') or os.getenv('TELEGRAM_CHAT_ID')
@@ -57,6 +62,73 @@ RISK_CONFIG = {
 DATA_CONFIG = {
     "HISTORY_DAYS": 90, # Default for continuous loop
     "BACKFILL_DAYS": 1600, # Approx 4.5 years to cover 2022 start date
+    "DERIVE_DAILY_FROM_1H": True, # Build new daily bars from stored 1h bars instead of a provider call
+    "DERIVED_TIMEFRAMES": ["2h", "4h", "session"], # Session-aligned bars derived from 1h after each update
+    "EXTENDED_HOURS_BARS": False, # Gap checks expect pre/post-market 1h bars too (04:00-20:00 ET), not just RTH
+    # Data quality validation (see data/quality/validator.py)
+    "QUALITY": {
+        "LEVEL": "STANDARD",       # BASIC, STANDARD, STRICT or EXTENDED thresholds
+        "GATE_SIGNALS": False,     # Drop live signals of symbols whose last report is not backtest-ready
+    },
+    "HEDGED_FETCH": False,        # Start a backup provider in parallel when the primary is slow
+    "HEDGE_DELAY_SECONDS": 3.0,   # Hedge after this delay (or the primary's latency p95, if lower)
+    "HEDGE_MAX_PARALLEL": 2,      # Max providers in flight per fetch
+    # Provider health (see data/utils/provider_health.py)
+    "ADAPTIVE_PROVIDER_ORDER": True,   # Order providers by observed reliability/latency, then priority
+    "CIRCUIT_BREAKER": {
+        "FAILURE_THRESHOLD": 3,        # Consecutive failed/empty fetches that open a provider's circuit
+        "COOLDOWN_SECONDS": 300,       # Skip the provider this long, then let one probe call through
+        "STATS_WINDOW_SECONDS": 3600,  # Outcomes older than this no longer affect the order
+    },
+    # On-disk provider response cache for backfills/scripts (see data/utils/response_cache.py)
+    "RESPONSE_CACHE": {
+        "ENABLED": True,
+        "DIR": DATA_DIR / "cache" / "responses",
+        "MAX_MB": 512,             # LRU eviction above this size
+        "OPEN_TTL_SECONDS": 300,   # Ranges ending today; closed ranges never expire
+    },
+}
+
+# Chunked, resumable backfills (see data/backfill.py, scripts/backfill_data.py)
+BACKFILL_CONFIG = {
+    "TIMEFRAMES": ["1h", "1d"],
+    "CHUNK_DAYS": {"1h": 60, "1d": 730},  # Chunk size per timeframe (grid from 1970-01-01, so re-runs resume)
+    "DAILY_HISTORY_FACTOR": 2,            # Daily bars cover BACKFILL_DAYS x this (trend filter context)
+    "WORKERS": 6,                         # Concurrent chunks; provider quotas are enforced by the RateLimiter
+    "MERGE_PROVIDERS": False,             # Ask every provider per chunk and coalesce (prefers non-zero volume)
+    "MAX_EMPTY_ATTEMPTS": 2,              # Chunks no provider had data for are retried this many times in total
+}
+
+# Live Scan Cycle Concurrency
+SCAN_CONFIG = {
+    "FETCH_WORKERS": 4,      # Concurrent symbol data updates (API quota is enforced by the RateLimiter)
+    "ANALYSIS_WORKERS": 2,   # Concurrent indicator/scanner computations
+    "BATCH_UPDATE": True,    # Update the universe's 1h bars with one batch call per provider (fetch_many)
+    "PRE_ALERT_DEADLINE_SECONDS": 180,     # Pre-alert budget (must leave room before the :00 confirmation)
+    "CONFIRMATION_DEADLINE_SECONDS": 300,  # Confirmation budget; unstarted symbols are skipped and reported
+}
+
+# Live Scheduler (asyncio jobs, see core/scheduler.py)
+SCHEDULER_CONFIG = {
+    "WORKERS": 4,                    # Executor threads for blocking jobs
+    "MISSED_GRACE_SECONDS": 60,      # A scan starting later than this is a missed deadline
+    "PRE_ALERT_TIMEOUT": 240,        # Must finish before the candle closes
+    "CONFIRMATION_TIMEOUT": 600,
+    "REPORT_TIMEOUT": 120,
+    "GAP_CHECK_TIMEOUT": 900,
+    "GAP_CHECK_INTERVAL_HOURS": 6,   # Incremental gap check (bars after each symbol's gap watermark)
+    "GAP_DEEP_CHECK_DAYS": 7,        # Re-verify each symbol's full history this often (daily job, 23:30 UTC)
+    "GAP_DEEP_CHECK_MAX_SYMBOLS": 50,  # Full re-verifications per daily run
+    "GAP_DEEP_CHECK_TIMEOUT": 1800,
+}
+
+# Warm-start snapshots of the live process state (see core/snapshot.py)
+SNAPSHOT_CONFIG = {
+    "ENABLED": True,
+    "PATH": DATA_DIR / "storage" / "live_snapshot.pkl",
+    "INTERVAL_MINUTES": 15,   # Periodic save (also saved on shutdown)
+    "MAX_AGE_HOURS": 12,      # Older snapshots are ignored (cold start)
+    "TAIL_BARS": 400,         # Analyzed hourly bars kept per symbol (>= indicator warmup)
 }
 
 # Database Configuration
@@ -74,9 +146,48 @@ RATE_LIMITS = {
     "YFINANCE": {"requests_per_minute": 60, "cooldown_seconds": 1},
 }
 
+# Shared token-bucket state, so concurrent processes (live loop, backfills) split one quota
+RATE_LIMITER_CONFIG = {
+    "DB_PATH": DATA_DIR / "storage" / "rate_limits.db",
+    "DEFAULT_RETRY_AFTER_SECONDS": 60,  # Back-off after a 429 without a Retry-After header
+}
+
+# Shared HTTP session (see core/http.py): keep-alive pooling for providers and Telegram
+HTTP_CONFIG = {
+    "POOL_CONNECTIONS": 10,         # Hosts with a cached connection pool
+    "POOL_MAXSIZE": 8,              # Keep-alive connections per host (>= concurrent fetch workers)
+    "CONNECT_TIMEOUT": 5,
+    "READ_TIMEOUT": 15,
+    "RETRIES": 2,                   # Connection errors and 5xx; 429s are left to the RateLimiter
+    "BACKOFF_FACTOR": 0.5,
+}
+
+# Real-time bars aggregated from a trade/quote stream (see data/streaming.py)
+STREAM_CONFIG = {
+    "ENABLED": False,
+    "SOURCE": "replay",                 # "replay" (CSV file) or "socket" (newline-delimited JSON over TCP)
+    "REPLAY_PATH": DATA_DIR / "stream" / "ticks.csv",
+    "REPLAY_SPEED": 1.0,                # 1.0 = original pace, 0 = as fast as possible
+    "SOCKET_HOST": "127.0.0.1",
+    "SOCKET_PORT": 9100,
+    "TIMEFRAMES": ["1m", "1h"],         # Bars built in memory (session-anchored)
+    "PERSIST_TIMEFRAMES": ["1m", "1h"], # Closed bars written to market_data (source STREAM)
+    "CLOSE_GRACE_SECONDS": 2,           # Wall-clock close waits this long for late ticks
+    "STALE_SECONDS": 120,               # Symbols without ticks for this long fall back to REST polling
+    "CONFIRM_ON_CLOSE": True,           # Run the confirmation as soon as the hourly bars close...
+    "CONFIRM_WINDOW_SECONDS": 120,      # ...if its scheduled slot is at most this far away
+}
+
 # New Architecture Specifics
 DATABASE_PATH = DATA_DIR / "storage" / "trading.db"
 
+# Replays of the live loop against stored history (`main.py replay`, see core/clock.py)
+REPLAY_CONFIG = {
+    "SOURCE_DB": DATABASE_PATH,                         # Historical bars, opened read-only
+    "OUTPUT_DB": DATA_DIR / "storage" / "replay.db",    # Alerts, performance and fetched bars; recreated per run
+    "STARTUP_GAP_CHECK": True,                          # Run the startup gap check, as live does
+}
+
 # Strategy Configuration (Mean Reversion Selectiva)
 STRATEGY_CONFIG = {
     # Indicators
@@ -127,4 +238,6 @@ SMART_WAKEUP_CONFIG = {
     "SEND_PRE_ALERTS": True,            # Send Telegram pre-alerts
     "PRE_ALERT_EMOJI": "⚡",             # Emoji for pre-alerts
     "CONFIRMATION_BUFFER_SECONDS": 10,  # Seconds after :00 to send final confirmation
+    "REUSE_PRE_ALERT_STATE": True,      # Confirmation extends the pre-alert's analyzed frames incrementally
+    "STATE_MAX_AGE_SECONDS": 600,       # Older states force a full fetch + recompute
 }
@@ -0,0 +1,85 @@
+"""
+Shared HTTP Session
+===================
+One pooled `requests.Session` for all outbound HTTP (data providers,
+Telegram), so repeated calls to the same host reuse keep-alive connections
+instead of paying a new TCP+TLS handshake each time.
+
+- Connection pools per host, bounded by HTTP_CONFIG (POOL_CONNECTIONS hosts,
+  POOL_MAXSIZE connections each).
+- Default (connect, read) timeout for every request unless one is passed.
+- Retries with exponential backoff on connection errors and 5xx responses.
+  Only idempotent methods are retried after a response; 429 responses are
+  returned to the caller so the RateLimiter can back off.
+- gzip/deflate response compression.
+"""
+import logging
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import HTTP_CONFIG
+
+logger = logging.getLogger("core.http")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def default_timeout() -> tuple:
+    return (HTTP_CONFIG.get("CONNECT_TIMEOUT", 5), HTTP_CONFIG.get("READ_TIMEOUT", 15))
+
+
+def build_session() -> requests.Session:
+    """New session with pooled, retrying adapters (see module docstring)."""
+    retries = Retry(
+        total=HTTP_CONFIG.get("RETRIES", 2),
+        backoff_factor=HTTP_CONFIG.get("BACKOFF_FACTOR", 0.5),
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_CONFIG.get("POOL_CONNECTIONS", 10),
+        pool_maxsize=HTTP_CONFIG.get("POOL_MAXSIZE", 8),
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide shared session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session, with the default timeout unless given."""
+    kwargs.setdefault("timeout", default_timeout())
+    return get_session().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST through the shared session, with the default timeout unless given."""
+    kwargs.setdefault("timeout", default_timeout())
+    return get_session().post(url, **kwargs)
+
+
+def close_session() -> None:
+    """Closes pooled connections (e.g. on shutdown). A later call opens a new session."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,345 @@
+"""
+Market Session Calendar
+=======================
+NYSE session calendar (holidays, early closes) with precomputed,
+vectorized session columns for bar indexes:
+
+- session_id:           Integer NY calendar-day id (days since 1970-01-01)
+- is_trading_day:       Exchange open that day
+- is_rth:               Bar starts inside Regular Trading Hours (09:30 - close)
+- minutes_to_close:     Minutes from bar timestamp to the session close (NaN on non-trading days)
+- minutes_from_open:    Minutes from the session open (09:30) to bar timestamp (NaN on non-trading days)
+- is_session_open_bar:  First RTH bar of the session in the index
+- is_session_close_bar: Last RTH bar of the session in the index
+
+Timezone conversion is done once per index and cached, so callers
+(indicators, loaders, strategies) never convert per bar.
+"""
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from threading import Lock
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("core.market_calendar")
+
+NY_TZ = "America/New_York"
+
+RTH_OPEN = time(9, 30)
+RTH_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+EXTENDED_OPEN = time(4, 0)
+EXTENDED_CLOSE = time(20, 0)
+
+# Unscheduled full-day closures (national days of mourning, etc.)
+SPECIAL_CLOSURES = {
+    date(2018, 12, 5),   # President G.H.W. Bush
+    date(2025, 1, 9),    # President Carter
+}
+
+
+def _observed(d: date) -> date:
+    """Weekend holidays are observed on Friday (Saturday) or Monday (Sunday)."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based) weekday of a month. n=-1 returns the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    # Last occurrence
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    last = nxt - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (Anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    return date(year, month, day)
+
+
+@lru_cache(maxsize=64)
+def nyse_holidays(year: int) -> frozenset:
+    """Full-day NYSE holidays for a year."""
+    days = set()
+
+    # New Year's Day (not observed on the preceding Friday when it falls on Saturday)
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        days.add(new_year + timedelta(days=1))
+    elif new_year.weekday() < 5:
+        days.add(new_year)
+
+    days.add(_nth_weekday(year, 1, 0, 3))               # Martin Luther King Jr. Day
+    days.add(_nth_weekday(year, 2, 0, 3))               # Washington's Birthday
+    days.add(_easter(year) - timedelta(days=2))         # Good Friday
+    days.add(_nth_weekday(year, 5, 0, -1))              # Memorial Day
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))          # Juneteenth
+    days.add(_observed(date(year, 7, 4)))               # Independence Day
+    days.add(_nth_weekday(year, 9, 0, 1))               # Labor Day
+    days.add(_nth_weekday(year, 11, 3, 4))              # Thanksgiving
+    days.add(_observed(date(year, 12, 25)))             # Christmas
+
+    days.update(d for d in SPECIAL_CLOSURES if d.year == year)
+    return frozenset(days)
+
+
+@lru_cache(maxsize=64)
+def nyse_early_closes(year: int) -> frozenset:
+    """Half-days (13:00 ET close) for a year."""
+    days = set()
+    holidays = nyse_holidays(year)
+
+    # Day before Independence Day (Mon-Thu only)
+    jul3 = date(year, 7, 3)
+    if jul3.weekday() < 4 and jul3 not in holidays:
+        days.add(jul3)
+
+    # Day after Thanksgiving
+    days.add(_nth_weekday(year, 11, 3, 4) + timedelta(days=1))
+
+    # Christmas Eve (Mon-Thu only)
+    xmas_eve = date(year, 12, 24)
+    if xmas_eve.weekday() < 4 and xmas_eve not in holidays:
+        days.add(xmas_eve)
+
+    return frozenset(days)
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+class SessionCalendar:
+    """
+    NYSE session calendar with cached, vectorized session columns.
+    """
+
+    def __init__(self, max_cached_frames: int = 32):
+        self._frames: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self._max_cached = max_cached_frames
+        self._lock = Lock()
+
+    # --- Single-day queries ---
+
+    def is_trading_day(self, d: date) -> bool:
+        return d.weekday() < 5 and d not in nyse_holidays(d.year)
+
+    def is_early_close(self, d: date) -> bool:
+        return self.is_trading_day(d) and d in nyse_early_closes(d.year)
+
+    def session_close_time(self, d: date) -> Optional[time]:
+        """Local (NY) close time, or None if the exchange is closed."""
+        if not self.is_trading_day(d):
+            return None
+        return EARLY_CLOSE if d in nyse_early_closes(d.year) else RTH_CLOSE
+
+    def session_bounds(self, d: date, extended_hours: bool = False) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """(open, close) in UTC for a trading day, or None."""
+        close = self.session_close_time(d)
+        if close is None:
+            return None
+        open_t = EXTENDED_OPEN if extended_hours else RTH_OPEN
+        if extended_hours and close == RTH_CLOSE:
+            close = EXTENDED_CLOSE
+        elif extended_hours:
+            close = time(17, 0)  # Post-market ends 17:00 ET on half-days
+        start = pd.Timestamp(datetime.combine(d, open_t)).tz_localize(NY_TZ).tz_convert("UTC")
+        end = pd.Timestamp(datetime.combine(d, close)).tz_localize(NY_TZ).tz_convert("UTC")
+        return start, end
+
+    # --- Expected bars ---
+
+    def expected_bars(self, start, end, interval_minutes: int, extended_hours: bool = False) -> pd.DatetimeIndex:
+        """
+        UTC start times of the intraday bars the exchange produces between
+        `start` and `end` (inclusive). See expected_bar_spans.
+        """
+        starts, _ = self.expected_bar_spans(start, end, interval_minutes, extended_hours)
+        return pd.to_datetime(starts, unit="ns", utc=True)
+
+    def expected_bar_spans(self, start, end, interval_minutes: int,
+                           extended_hours: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Intraday bars that should exist between `start` and `end` (bars
+        starting inside the range), as epoch-ns (starts, ends) arrays:
+
+        - RTH buckets of `interval_minutes` anchored at 09:30 and cut at the
+          close (13:00 on early closes), the grid the resampler uses.
+        - With `extended_hours`, also pre-market buckets anchored at 04:00 (cut
+          at 09:30) and post-market buckets anchored at the close (until 20:00,
+          17:00 on early closes).
+        - Weekends and holidays have none.
+
+        Naive timestamps are assumed UTC.
+        """
+        empty = np.empty(0, dtype=np.int64)
+        lo, hi = self._to_ny(start), self._to_ny(end)
+        days = pd.date_range(lo.date(), hi.date(), freq="D")
+        close_min = np.array([_minutes(c) if (c := self.session_close_time(d)) is not None else -1
+                              for d in days.date])
+        trading = close_min >= 0
+        if not trading.any():
+            return empty, empty
+        days, close_min = days[trading], close_min[trading]
+
+        # Segments per session, in local minutes from midnight
+        rth_open = np.full(len(days), _minutes(RTH_OPEN))
+        seg_start, seg_end = [rth_open], [close_min]
+        if extended_hours:
+            post_close = np.where(close_min == _minutes(RTH_CLOSE), _minutes(EXTENDED_CLOSE), _minutes(time(17, 0)))
+            seg_start += [np.full(len(days), _minutes(EXTENDED_OPEN)), close_min]
+            seg_end += [rth_open, post_close]
+        seg_start, seg_end = np.concatenate(seg_start), np.concatenate(seg_end)
+        seg_days = np.tile(days.as_unit("ns").asi8, len(seg_start) // len(days))
+
+        # One tz conversion for all segment bounds (local wall time -> UTC)
+        minute_ns = 60 * 1_000_000_000
+        local = np.concatenate([seg_days + seg_start * minute_ns, seg_days + seg_end * minute_ns])
+        utc = pd.DatetimeIndex(local.view("datetime64[ns]")).tz_localize(NY_TZ).as_unit("ns").asi8
+        seg_start, seg_end = utc[:len(seg_days)], utc[len(seg_days):]
+
+        # Bars per segment: seg_start + k * step, cut at the segment end
+        step = interval_minutes * minute_ns
+        counts = np.maximum(-((seg_start - seg_end) // step), 0)
+        owners = np.repeat(np.arange(len(seg_start)), counts)
+        k = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        bar_starts = seg_start[owners] + k * step
+        bar_ends = np.minimum(bar_starts + step, seg_end[owners])
+
+        order = np.argsort(bar_starts, kind="stable")
+        bar_starts, bar_ends = bar_starts[order], bar_ends[order]
+        lo_ns, hi_ns = lo.tz_convert("UTC").as_unit("ns").value, hi.tz_convert("UTC").as_unit("ns").value
+        keep = (bar_starts >= lo_ns) & (bar_starts <= hi_ns)
+        return bar_starts[keep], bar_ends[keep]
+
+    # --- Single-timestamp queries (live checks) ---
+
+    @staticmethod
+    def _to_ny(ts) -> pd.Timestamp:
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")  # Assume UTC if naive
+        return ts.tz_convert(NY_TZ)
+
+    def minutes_to_close(self, ts) -> Optional[float]:
+        """Minutes from `ts` until the session close (negative after close, None if closed day)."""
+        ny_ts = self._to_ny(ts)
+        close = self.session_close_time(ny_ts.date())
+        if close is None:
+            return None
+        return _minutes(close) - (ny_ts.hour * 60 + ny_ts.minute + ny_ts.second / 60.0)
+
+    def is_closing_soon(self, ts, buffer_minutes: int = 10) -> bool:
+        """True within `buffer_minutes` of the close, or after it, on a trading day."""
+        remaining = self.minutes_to_close(ts)
+        return remaining is not None and remaining <= buffer_minutes
+
+    def is_rth(self, ts) -> bool:
+        ny_ts = self._to_ny(ts)
+        close = self.session_close_time(ny_ts.date())
+        if close is None:
+            return False
+        mod = ny_ts.hour * 60 + ny_ts.minute
+        return _minutes(RTH_OPEN) <= mod < _minutes(close)
+
+    # --- Vectorized session columns ---
+
+    def session_frame(self, index: pd.Index) -> pd.DataFrame:
+        """
+        Session columns for every timestamp in `index` (see module docstring).
+        Naive timestamps are assumed UTC. Results are cached per index.
+        """
+        if len(index) == 0:
+            return pd.DataFrame(index=index, columns=[
+                'session_id', 'is_trading_day', 'is_rth', 'minutes_to_close',
+                'minutes_from_open', 'is_session_open_bar', 'is_session_close_bar'])
+
+        key = (index[0], index[-1], len(index))
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None and cached.index.equals(index):
+                self._frames.move_to_end(key)
+                return cached
+
+        frame = self._build_session_frame(index)
+
+        with self._lock:
+            self._frames[key] = frame
+            while len(self._frames) > self._max_cached:
+                self._frames.popitem(last=False)
+        return frame
+
+    def _build_session_frame(self, index: pd.Index) -> pd.DataFrame:
+        idx = pd.DatetimeIndex(index)
+        if idx.tz is None:
+            idx = idx.tz_localize("UTC")
+        ny = idx.tz_convert(NY_TZ)
+
+        # Local wall-clock components (one conversion for the whole index)
+        local = ny.tz_localize(None)
+        days = local.normalize()
+        session_id = ((days - pd.Timestamp("1970-01-01")) // pd.Timedelta(days=1)).to_numpy().astype(np.int32)
+        mod = (local.hour * 60 + local.minute).to_numpy().astype(np.float64)
+
+        # Per-day close (minutes), resolved once per unique day
+        unique_ids, inverse = np.unique(session_id, return_inverse=True)
+        close_by_day = np.full(len(unique_ids), np.nan)
+        for j, sid in enumerate(unique_ids):
+            close = self.session_close_time(date(1970, 1, 1) + timedelta(days=int(sid)))
+            if close is not None:
+                close_by_day[j] = _minutes(close)
+        close_min = close_by_day[inverse]
+
+        is_trading_day = ~np.isnan(close_min)
+        is_rth = is_trading_day & (mod >= _minutes(RTH_OPEN)) & (mod < np.nan_to_num(close_min))
+        minutes_to_close = close_min - mod
+        minutes_from_open = np.where(is_trading_day, mod - _minutes(RTH_OPEN), np.nan)
+
+        # First / last RTH bar of each session present in the index
+        rth_sessions = np.where(is_rth, session_id, -1)
+        prev_sess = np.r_[-2, rth_sessions[:-1]]
+        next_sess = np.r_[rth_sessions[1:], -2]
+        is_open_bar = is_rth & (rth_sessions != prev_sess)
+        is_close_bar = is_rth & (rth_sessions != next_sess)
+
+        return pd.DataFrame({
+            'session_id': session_id,
+            'is_trading_day': is_trading_day,
+            'is_rth': is_rth,
+            'minutes_to_close': minutes_to_close,
+            'minutes_from_open': minutes_from_open,
+            'is_session_open_bar': is_open_bar,
+            'is_session_close_bar': is_close_bar,
+        }, index=index)
+
+
+# Global singleton instance
+_session_calendar = SessionCalendar()
+
+
+def get_session_calendar() -> SessionCalendar:
+    """Get the global session calendar instance."""
+    return _session_calendar
@@ -0,0 +1,164 @@
+"""
+Ordered Scan Pipeline
+=====================
+Runs a two-stage (fetch -> analyze) pipeline over a list of items with
+bounded worker pools, yielding results in input order.
+
+- Fetch stage: I/O-bound (provider calls, DB writes). Pacing against provider
+  quotas is done by the per-provider RateLimiter inside the fetch function,
+  not by sleeps between items.
+- Analysis stage: CPU-bound (indicators, pattern scan). Starts as soon as an
+  item's fetch completes.
+
+Results are yielded in the original item order as soon as that item and all
+items before it are done, so downstream side effects (DB alerts, Telegram)
+stay deterministic.
+
+Deadline-aware scheduling: callers order items by urgency (see
+`prioritize`), so the most important items are submitted first. With a
+`deadline`, items whose fetch has not started by then are skipped (never
+fetched) and items finishing after it are flagged late, so a cycle degrades
+by dropping its least urgent items instead of overrunning.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger("core.scan_pool")
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of one item through the pipeline."""
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    fetch_seconds: float = 0.0
+    analysis_seconds: float = 0.0
+    priority: int = 0
+    skipped: bool = False    # Deadline passed before the fetch started
+    late: bool = False       # Finished after the deadline
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.skipped
+
+
+@dataclass
+class CycleReport:
+    """What a deadline-bounded cycle processed, skipped or finished late."""
+    processed: List[Any] = field(default_factory=list)
+    skipped: List[Any] = field(default_factory=list)
+    late: List[Any] = field(default_factory=list)
+    failed: List[Any] = field(default_factory=list)
+
+    def record(self, result: PipelineResult):
+        if result.skipped:
+            self.skipped.append(result.item)
+            return
+        if result.late:
+            self.late.append(result.item)
+        if result.ok:
+            self.processed.append(result.item)
+        else:
+            self.failed.append(result.item)
+
+    def summary(self) -> str:
+        return (f"{len(self.processed)} processed, {len(self.failed)} failed, "
+                f"{len(self.late)} late, {len(self.skipped)} skipped")
+
+
+def prioritize(items: Iterable[Any], tiers: Sequence[Iterable[Any]]) -> Dict[Any, int]:
+    """
+    Orders items by urgency tier, keeping the original order within a tier.
+
+    Args:
+        items: All items, in their default order.
+        tiers: Item groups from most to least urgent (e.g. open positions,
+            pre-alerted symbols). Items in no tier get the lowest priority.
+
+    Returns:
+        Ordered dict item -> priority (0 = most urgent), iteration in priority order.
+    """
+    tier_sets = [set(t) for t in tiers]
+    ranked = []
+    for pos, item in enumerate(items):
+        priority = next((i for i, t in enumerate(tier_sets) if item in t), len(tier_sets))
+        ranked.append((priority, pos, item))
+    return {item: priority for priority, _, item in sorted(ranked, key=lambda r: r[:2])}
+
+
+def run_ordered_pipeline(items: List[Any],
+                         fetch_fn: Callable[[Any], Any],
+                         analyze_fn: Callable[[Any, Any], Any],
+                         fetch_workers: int = 4,
+                         analysis_workers: int = 2,
+                         deadline: Optional[float] = None,
+                         priorities: Optional[Dict[Any, int]] = None) -> Iterator[PipelineResult]:
+    """
+    Fetches and analyzes `items` concurrently, yielding PipelineResult in input order.
+
+    Args:
+        items: Work items (e.g. symbols), in the order results should be yielded.
+        fetch_fn: fetch_fn(item) -> fetched data (I/O stage).
+        analyze_fn: analyze_fn(item, fetched) -> value (CPU stage).
+        fetch_workers: Max concurrent fetches.
+        analysis_workers: Max concurrent analyses.
+        deadline: Optional time.monotonic() deadline. Fetches not started by then
+            are skipped; results completing after it are flagged late.
+        priorities: Optional item -> priority, copied onto the results.
+
+    Exceptions raised by either stage are captured in the result, never raised.
+    """
+    if not items:
+        return
+
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, fetch_workers), thread_name_prefix="scan-fetch")
+    analysis_pool = ThreadPoolExecutor(max_workers=max(1, analysis_workers), thread_name_prefix="scan-analysis")
+
+    priorities = priorities or {}
+
+    def _finish(result: PipelineResult) -> PipelineResult:
+        result.priority = priorities.get(result.item, 0)
+        result.late = deadline is not None and not result.skipped and time.monotonic() > deadline
+        return result
+
+    def _done(result: PipelineResult) -> Future:
+        done: Future = Future()
+        done.set_result(_finish(result))
+        return done
+
+    def _analyze(item, fetched, fetch_seconds) -> PipelineResult:
+        start = time.monotonic()
+        try:
+            value = analyze_fn(item, fetched)
+            return _finish(PipelineResult(item, value=value, fetch_seconds=fetch_seconds,
+                                          analysis_seconds=time.monotonic() - start))
+        except Exception as e:
+            return _finish(PipelineResult(item, error=e, fetch_seconds=fetch_seconds,
+                                          analysis_seconds=time.monotonic() - start))
+
+    def _fetch(item) -> Future:
+        # Returns the analysis future, chaining stage 2 as soon as stage 1 is done
+        if deadline is not None and time.monotonic() > deadline:
+            return _done(PipelineResult(item, skipped=True))
+        start = time.monotonic()
+        try:
+            fetched = fetch_fn(item)
+        except Exception as e:
+            return _done(PipelineResult(item, error=e, fetch_seconds=time.monotonic() - start))
+        return analysis_pool.submit(_analyze, item, fetched, time.monotonic() - start)
+
+    try:
+        fetch_futures = [fetch_pool.submit(_fetch, item) for item in items]
+        for item, fut in zip(items, fetch_futures):
+            try:
+                yield fut.result().result()
+            except Exception as e:  # Pool failure (e.g. shutdown)
+                yield _finish(PipelineResult(item, error=e))
+    finally:
+        # If the consumer stops early, drop queued work
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
+        analysis_pool.shutdown(wait=True, cancel_futures=True)
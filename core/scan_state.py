@@ -0,0 +1,83 @@
+"""
+Per-Symbol Scan State
+=====================
+Keeps the analyzed hourly frame of each symbol between scan passes, so the
+confirmation pass at :00 can reuse the pre-alert pass at :55: it only loads
+the bars stored since the pre-alert, extends the indicators incrementally
+(TechnicalIndicators.calculate_incremental) and re-evaluates the last closed
+bar.
+
+States expire after `max_age_seconds` so periodic full passes still pick up
+backfilled or repaired history. States restored from a warm-start snapshot
+(core/snapshot.py) carry their own, longer lifetime and do not reuse their
+daily frame, since the session may have changed while the process was down.
+Ages are measured on the process clock (core.clock), so replays expire
+states by simulated time.
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import pandas as pd
+
+from core import clock
+
+logger = logging.getLogger("core.scan_state")
+
+
+@dataclass
+class SymbolScanState:
+    """Analyzed frames kept from a previous scan pass."""
+    df_analyzed: pd.DataFrame
+    df_daily: pd.DataFrame
+    created_at: float = field(default_factory=clock.monotonic)
+    max_age_seconds: Optional[float] = None   # Overrides the store default
+    reuse_daily: bool = True
+
+    @property
+    def last_bar(self) -> pd.Timestamp:
+        return self.df_analyzed.index[-1]
+
+
+class ScanStateStore:
+    """Thread-safe symbol -> SymbolScanState store (written by scan analysis workers)."""
+
+    def __init__(self, max_age_seconds: float = 600):
+        self.max_age_seconds = max_age_seconds
+        self._states: Dict[str, SymbolScanState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> Optional[SymbolScanState]:
+        """Fresh state for `symbol`, or None if missing or expired."""
+        with self._lock:
+            state = self._states.get(symbol)
+        if state is None:
+            return None
+        max_age = state.max_age_seconds if state.max_age_seconds is not None else self.max_age_seconds
+        if clock.monotonic() - state.created_at > max_age:
+            return None
+        return state
+
+    def put(self, symbol: str, df_analyzed: pd.DataFrame, df_daily: pd.DataFrame):
+        if df_analyzed is None or df_analyzed.empty:
+            return
+        with self._lock:
+            self._states[symbol] = SymbolScanState(df_analyzed, df_daily)
+
+    def restore(self, symbol: str, df_analyzed: pd.DataFrame, df_daily: pd.DataFrame, max_age_seconds: float):
+        """Seeds a validated state from a snapshot (usable by the next pass of either kind)."""
+        if df_analyzed is None or df_analyzed.empty:
+            return
+        with self._lock:
+            self._states[symbol] = SymbolScanState(df_analyzed, df_daily, max_age_seconds=max_age_seconds,
+                                                   reuse_daily=False)
+
+    def latest(self) -> Dict[str, SymbolScanState]:
+        """Copy of the last state of every symbol, expired or not (for snapshots)."""
+        with self._lock:
+            return dict(self._states)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
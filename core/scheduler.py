@@ -0,0 +1,283 @@
+"""
+Async Live Scheduler
+====================
+asyncio event-loop runner for the live jobs (pre-alert, confirmation,
+daily report, gap maintenance).
+
+- Each job has a schedule (next fire time after a given time), a timeout and
+  a grace period. Blocking job functions run in a thread pool executor.
+- A job that starts later than its grace period, times out, or overruns into
+  its next slot is logged as a MISSED DEADLINE. The schedule itself is never
+  shifted: the next run is always the next slot on the schedule.
+- On timeout the job's cancel event is set so cooperative job functions can
+  stop early (Python threads cannot be killed). The job still counts as
+  running until its thread returns.
+- Jobs sharing an `exclusive_group` never run concurrently (e.g. the pre-alert
+  and confirmation scans share data and DB state).
+- trigger() runs a job's pending slot early, from any thread (e.g. the
+  confirmation as soon as the streamed hourly bar closes). The slot is
+  consumed, so the job does not run again at its scheduled time.
+- Time comes from a core.clock Clock (the process clock by default). With a
+  SimulatedClock, run_simulated() steps through the slots in time order
+  without sleeping (replays, see `main.py replay`).
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from core.clock import Clock, SimulatedClock, get_clock
+
+logger = logging.getLogger("core.scheduler")
+
+# schedule(after) -> next fire time strictly after `after` (tz-aware UTC)
+Schedule = Callable[[datetime], datetime]
+
+
+def hourly_at(minute: int, second: int = 0) -> Schedule:
+    """Fires every hour at mm:ss."""
+    def _next(after: datetime) -> datetime:
+        target = after.replace(minute=minute, second=second, microsecond=0)
+        if target <= after:
+            target += timedelta(hours=1)
+        return target
+    return _next
+
+
+def daily_at(hour: int, minute: int = 0) -> Schedule:
+    """Fires every day at hh:mm UTC."""
+    def _next(after: datetime) -> datetime:
+        target = after.astimezone(timezone.utc).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= after:
+            target += timedelta(days=1)
+        return target
+    return _next
+
+
+def every(seconds: float) -> Schedule:
+    """Fires every `seconds`, aligned to the epoch (e.g. every 6h at 00/06/12/18 UTC)."""
+    # Integer microseconds: float slot math can return `after` itself
+    period_us = max(1, int(round(seconds * 1_000_000)))
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def _next(after: datetime) -> datetime:
+        elapsed_us = (after - epoch) // timedelta(microseconds=1)
+        return epoch + timedelta(microseconds=(elapsed_us // period_us + 1) * period_us)
+    return _next
+
+
+@dataclass
+class Job:
+    """A scheduled job and its run statistics."""
+    name: str
+    func: Callable[[threading.Event], object]
+    schedule: Schedule
+    timeout: float
+    grace_seconds: float = 60.0
+    exclusive_group: Optional[str] = None
+
+    runs: int = 0
+    failures: int = 0
+    missed: int = 0
+    last_duration: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    next_due: Optional[datetime] = None
+    running: bool = False
+    wake: Optional[asyncio.Event] = None   # Set by trigger() to run the pending slot now
+
+
+class AsyncScheduler:
+    """
+    Runs jobs on an asyncio event loop (see module docstring).
+    """
+
+    def __init__(self, max_workers: int = 4, now_fn: Optional[Callable[[], datetime]] = None,
+                 speed: Optional[float] = None, clock: Optional[Clock] = None):
+        """
+        Args:
+            clock: Time source (defaults to the process clock, core.clock.get_clock()).
+            now_fn: Overrides `clock.now` (tz-aware UTC).
+            speed: Clock seconds per real second, so sleeps match an accelerated clock
+                (defaults to `clock.speed`). Job timeouts stay in real seconds.
+        """
+        self.jobs: List[Job] = []
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="live-job")
+        self.clock = clock or get_clock()
+        self.now_fn = now_fn or self.clock.now
+        self.speed = speed if speed is not None else self.clock.speed
+        self._group_locks: Dict[str, asyncio.Lock] = {}
+        self._stop: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add_job(self, name: str, func: Callable[[threading.Event], object], schedule: Schedule,
+                timeout: float, grace_seconds: float = 60.0, exclusive_group: Optional[str] = None) -> Job:
+        """
+        Registers a job. `func` receives the job's cancel event, which is set when the
+        job exceeds `timeout`.
+        """
+        job = Job(name, func, schedule, timeout, grace_seconds, exclusive_group)
+        self.jobs.append(job)
+        return job
+
+    async def run(self):
+        """Runs all jobs until stop() is called (or the task is cancelled)."""
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        tasks = [asyncio.create_task(self._job_loop(job), name=f"job:{job.name}") for job in self.jobs]
+        try:
+            await self._stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for job in self.jobs:
+                job.cancel_event.set()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = None
+
+    async def run_simulated(self, until: datetime):
+        """
+        Discrete-event run on a SimulatedClock: sets the clock to the next due
+        slot, runs that job (same timeout and failure handling as run()) and
+        repeats until the next slot is after `until`. The clock stands still
+        while a job runs, so every slot runs on time and a replay is
+        deterministic. Jobs due at the same time run in registration order.
+        """
+        if not isinstance(self.clock, SimulatedClock):
+            raise TypeError("run_simulated() needs a SimulatedClock")
+        self._loop = asyncio.get_running_loop()
+        due = {job.name: job.schedule(self.now_fn()) for job in self.jobs}
+        try:
+            while self.jobs:
+                job = min(self.jobs, key=lambda j: due[j.name])
+                slot = due[job.name]
+                if slot > until:
+                    break
+                self.clock.set(slot)
+                job.next_due = slot
+                job.running = True
+                try:
+                    await self._run_slot(job, slot)
+                finally:
+                    job.running = False
+                due[job.name] = self._next_slot(job, slot)
+            self.clock.set(until)
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self._loop = None
+
+    def stop(self):
+        """Requests a graceful stop of the run loop."""
+        if self._stop is not None:
+            self._stop.set()
+
+    def trigger(self, name: str, within_seconds: Optional[float] = None) -> bool:
+        """
+        Runs the pending slot of job `name` now instead of at its scheduled time.
+        Thread-safe. With `within_seconds`, only a slot due within that many
+        seconds is brought forward. Returns True if the job was woken.
+        """
+        job = next((j for j in self.jobs if j.name == name), None)
+        loop = self._loop
+        if job is None or loop is None or job.wake is None or job.running or job.next_due is None:
+            return False
+        ahead = (job.next_due - self.now_fn()).total_seconds()
+        if within_seconds is not None and ahead > within_seconds:
+            return False
+        loop.call_soon_threadsafe(job.wake.set)
+        logger.info(f"Job [{job.name}] triggered {max(ahead, 0):.0f}s ahead of its slot")
+        return True
+
+    async def _sleep_until(self, target: datetime, wake: Optional[asyncio.Event] = None):
+        # Sleep in short chunks so wall-clock jumps (suspend, NTP) are noticed
+        while True:
+            remaining = (target - self.now_fn()).total_seconds()
+            if remaining <= 0:
+                return
+            chunk = min(remaining, 30.0) / self.speed
+            if wake is None:
+                await asyncio.sleep(chunk)
+                continue
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=chunk)
+            except asyncio.TimeoutError:
+                continue
+            return
+
+    def _missed(self, job: Job, due: datetime, reason: str):
+        job.missed += 1
+        logger.warning(f"MISSED DEADLINE [{job.name}] slot {due.strftime('%Y-%m-%d %H:%M:%S')} UTC: {reason}")
+
+    async def _job_loop(self, job: Job):
+        due = job.schedule(self.now_fn())
+        logger.info(f"Job [{job.name}] scheduled, next run at {due.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+
+        job.wake = asyncio.Event()
+        while True:
+            job.next_due = due
+            job.wake.clear()
+            await self._sleep_until(due, job.wake)
+
+            job.running = True
+            lock = self._group_locks.setdefault(job.exclusive_group, asyncio.Lock()) if job.exclusive_group else None
+            try:
+                if lock is not None:
+                    await lock.acquire()
+                try:
+                    await self._run_slot(job, due)
+                finally:
+                    if lock is not None:
+                        lock.release()
+            finally:
+                job.running = False
+
+            # Next slot on the schedule; slots that already passed are reported, not run late
+            now = self.now_fn()
+            due = self._next_slot(job, due)
+            while due + timedelta(seconds=job.grace_seconds) < now:
+                self._missed(job, due, "previous run overran this slot")
+                due = self._next_slot(job, due)
+
+    @staticmethod
+    def _next_slot(job: Job, previous: datetime) -> datetime:
+        """Next slot strictly after `previous` (guards against schedules returning the same slot)."""
+        nxt = job.schedule(previous)
+        if nxt <= previous:
+            nxt = job.schedule(previous + timedelta(microseconds=1))
+            if nxt <= previous:
+                raise ValueError(f"Schedule of job [{job.name}] does not advance past {previous}")
+        return nxt
+
+    async def _run_slot(self, job: Job, due: datetime):
+        late = (self.now_fn() - due).total_seconds()
+        if late > job.grace_seconds:
+            self._missed(job, due, f"started {late:.0f}s late (grace {job.grace_seconds:.0f}s), skipped")
+            return
+
+        job.cancel_event = threading.Event()
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        job.runs += 1
+        future = loop.run_in_executor(self.executor, job.func, job.cancel_event)
+        try:
+            done, _ = await asyncio.wait({future}, timeout=job.timeout)
+            if not done:
+                job.cancel_event.set()
+                self._missed(job, due, f"timed out after {job.timeout:.0f}s, cancellation requested")
+                # Keep holding the exclusive group until the thread actually returns
+                await asyncio.shield(future)
+            else:
+                future.result()
+        except asyncio.CancelledError:
+            job.cancel_event.set()
+            raise
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Job [{job.name}] failed: {e}", exc_info=True)
+        finally:
+            job.last_duration = time.monotonic() - start
+            logger.debug(f"Job [{job.name}] finished in {job.last_duration:.1f}s")
@@ -0,0 +1,163 @@
+"""
+Warm-Start Snapshots
+====================
+Persists a compact copy of the live process state so a restart (e.g. during
+market hours) does not redo a cold start:
+
+- Per symbol: the tail of the analyzed hourly frame (enough bars for
+  TechnicalIndicators.calculate_incremental), the daily frame, and the hourly
+  bar count / last timestamp it was built from.
+- Active alert ids.
+
+Gap check recency is not snapshotted: it is read from the gap watermarks the
+DB already persists (see Database.get_gap_watermark).
+
+On startup the snapshot is validated cheaply against the DB (one COUNT/MAX
+query per symbol). Symbols whose stored bars changed since the snapshot are
+cold-started as before.
+
+The snapshot file is written atomically (temp file + rename).
+"""
+import logging
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from core import clock
+from core.scan_state import ScanStateStore
+
+logger = logging.getLogger("core.snapshot")
+
+SNAPSHOT_VERSION = 2
+
+
+@dataclass
+class SymbolSnapshot:
+    """State of one symbol at snapshot time."""
+    bar_count: int
+    last_bar: pd.Timestamp
+    df_analyzed: pd.DataFrame
+    df_daily: pd.DataFrame
+
+
+@dataclass
+class LiveSnapshot:
+    """Everything persisted for a warm start."""
+    created_at: datetime
+    symbols: Dict[str, SymbolSnapshot] = field(default_factory=dict)
+    active_alert_ids: List[int] = field(default_factory=list)
+    version: int = SNAPSHOT_VERSION
+
+
+class SnapshotManager:
+    """
+    Saves and restores LiveSnapshot files for the live loop.
+    """
+
+    def __init__(self, db, path: Path, tail_bars: int = 400, max_age_hours: float = 12):
+        self.db = db
+        self.path = Path(path)
+        self.tail_bars = tail_bars
+        self.max_age_hours = max_age_hours
+
+    # --- Gap watermarks ---
+
+    def gap_checked_within(self, symbol: str, seconds: float, timeframe: str = "1h") -> bool:
+        """
+        True if the symbol's gap watermark covers its last stored bar and was
+        set less than `seconds` ago (clock time).
+        """
+        verified_until = self.db.get_gap_watermark(symbol, timeframe)
+        if verified_until is None:
+            return False
+        _, last_bar = self.db.get_bar_stats(symbol, timeframe)
+        if last_bar is None or verified_until < last_bar:
+            return False  # Bars stored after the last check
+        watermarks = self.db.get_gap_watermarks(timeframe)
+        row = watermarks[watermarks['symbol'] == symbol] if not watermarks.empty else watermarks
+        if row.empty or not row['checked_at'].iloc[0]:
+            return False
+        return (clock.now() - pd.Timestamp(row['checked_at'].iloc[0])).total_seconds() < seconds
+
+    # --- Save / restore ---
+
+    def save(self, state_store: ScanStateStore) -> int:
+        """
+        Writes the snapshot. Only states still matching the DB's last hourly bar
+        are kept. Returns the number of symbols saved.
+        """
+        snapshot = LiveSnapshot(created_at=clock.now())
+        for symbol, state in state_store.latest().items():
+            bar_count, last_bar = self.db.get_bar_stats(symbol, "1h")
+            if last_bar is None or last_bar != state.last_bar:
+                continue  # Newer bars stored since this state; not reusable
+            snapshot.symbols[symbol] = SymbolSnapshot(
+                bar_count=bar_count,
+                last_bar=last_bar,
+                df_analyzed=state.df_analyzed.iloc[-self.tail_bars:],
+                df_daily=state.df_daily,
+            )
+        snapshot.active_alert_ids = sorted(a['id'] for a in self.db.get_active_alerts())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        logger.info(f"Snapshot saved: {len(snapshot.symbols)} symbols")
+        return len(snapshot.symbols)
+
+    def load(self) -> Optional[LiveSnapshot]:
+        """Reads the snapshot file, or None if missing, unreadable, outdated or too old."""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot {self.path}: {e}")
+            return None
+        if not isinstance(snapshot, LiveSnapshot) or snapshot.version != SNAPSHOT_VERSION:
+            logger.warning("Ignoring snapshot with an incompatible version")
+            return None
+        age_hours = (clock.now() - snapshot.created_at).total_seconds() / 3600
+        if age_hours > self.max_age_hours:
+            logger.info(f"Ignoring snapshot from {age_hours:.1f}h ago (max {self.max_age_hours}h)")
+            return None
+        return snapshot
+
+    def restore(self, state_store: ScanStateStore, state_max_age_seconds: float) -> List[str]:
+        """
+        Seeds `state_store` from the snapshot, after
+        validating each symbol against the DB. Returns the restored symbols.
+        """
+        snapshot = self.load()
+        if snapshot is None:
+            return []
+
+        restored = []
+        for symbol, sym in snapshot.symbols.items():
+            bar_count, last_bar = self.db.get_bar_stats(symbol, "1h")
+            if bar_count != sym.bar_count or last_bar != sym.last_bar:
+                logger.info(f"Snapshot stale for {symbol} (bars {sym.bar_count} -> {bar_count}), cold start")
+                continue
+            state_store.restore(symbol, sym.df_analyzed, sym.df_daily, max_age_seconds=state_max_age_seconds)
+            restored.append(symbol)
+
+        active_ids = sorted(a['id'] for a in self.db.get_active_alerts())
+        if active_ids != snapshot.active_alert_ids:
+            logger.info(f"Active alerts changed since the snapshot: {snapshot.active_alert_ids} -> {active_ids}")
+
+        logger.info(f"Warm start: restored {len(restored)}/{len(snapshot.symbols)} symbols from snapshot")
+        return restored
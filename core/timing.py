@@ -1,12 +1,30 @@
 """
 Timing Utilities for Smart Wakeup System
+Times come from the process clock (core.clock): the wall clock live, a
+simulated or accelerated one in replays.
 """
 from datetime import datetime, timedelta
 import time
 import logging
 
+from core.clock import get_clock
+
 logger = logging.getLogger("core.timing")
 
+def _now() -> datetime:
+    """Naive local time of the process clock."""
+    clock = get_clock()
+    if clock.realtime:
+        return datetime.now()
+    return clock.now().astimezone().replace(tzinfo=None)
+
+def _sleep(seconds: float):
+    clock = get_clock()
+    if clock.realtime:
+        time.sleep(seconds)
+    else:
+        clock.sleep(seconds)
+
 def wait_until_minute(target_minute: int):
     """
     Wait until the specified minute of the current or next hour.
@@ -14,7 +32,7 @@ def wait_until_minute(target_minute: int):
     Args:
         target_minute: Target minute (0-59) to wake up at
     """
-    now = datetime.now()
+    now = _now()
     target = now.replace(minute=target_minute, second=0, microsecond=0)
     
     # If we've already passed the target minute this hour, wait until next hour
@@ -25,7 +43,7 @@ def wait_until_minute(target_minute: int):
     
     if sleep_seconds > 0:
         logger.info(f"Waiting {sleep_seconds:.0f}s until {target.strftime('%H:%M:%S')}...")
-        time.sleep(sleep_seconds)
+        _sleep(sleep_seconds)
     else:
         logger.warning(f"Target time {target} already passed, skipping wait")
 
@@ -36,14 +54,14 @@ def wait_until_next_hour(buffer_seconds: int = 10):
     Args:
         buffer_seconds: Additional seconds to wait after the hour mark
     """
-    now = datetime.now()
+    now = _now()
     next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
     sleep_seconds = (next_hour - now).total_seconds() + buffer_seconds
     
     if sleep_seconds > 0:
         target_time = next_hour + timedelta(seconds=buffer_seconds)
         logger.info(f"Waiting {sleep_seconds:.0f}s until {target_time.strftime('%H:%M:%S')}...")
-        time.sleep(sleep_seconds)
+        _sleep(sleep_seconds)
     else:
         logger.warning(f"Next hour {next_hour} already passed, skipping wait")
 
@@ -54,5 +72,5 @@ def get_minutes_until_close() -> int:
     Returns:
         Minutes remaining in current hour
     """
-    now = datetime.now()
+    now = _now()
     return 60 - now.minute - (1 if now.second > 0 else 0)
@@ -1,9 +1,24 @@
 import time
 import logging
-from functools import wraps
+import importlib
+from functools import lru_cache, wraps
 
 logger = logging.getLogger("core.utils")
 
+@lru_cache(maxsize=None)
+def optional_import(name: str):
+    """
+    Imports an optional (heavy) dependency on first use, so modules that only
+    might need it (TA-Lib, joblib, ...) do not pay for it at import time.
+
+    :param name: Module name, e.g. "talib".
+    :return: The module, or None if it is not installed (cached either way).
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
 def retry(exceptions, tries=3, delay=1, backoff=2, logger=logger):
     """
     Retry calling the decorated function using an exponential backoff.
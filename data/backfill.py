@@ -0,0 +1,282 @@
+"""
+Chunked Backfill Orchestrator
+=============================
+Backfills long histories for a universe as (symbol, timeframe, date-range)
+chunks that run concurrently and resume after an interruption.
+
+- Chunks sit on a fixed date grid (BACKFILL_CONFIG["CHUNK_DAYS"] per
+  timeframe, counted from 1970-01-01), so re-runs on later days produce the
+  same chunks and find their checkpoints.
+- Chunks run on a worker pool. Every provider call first takes a RateLimiter
+  slot (shared, cross-process quota), so throughput is bounded by provider
+  quotas, not by the number of workers.
+- Each finished chunk is checkpointed in `backfill_checkpoints` (DONE, EMPTY
+  or FAILED). A re-run skips DONE chunks, retries FAILED ones, and retries
+  EMPTY ones until MAX_EMPTY_ATTEMPTS (providers return nothing for both
+  pre-listing ranges and transient errors). Chunks reaching today stay open
+  and are fetched on every run.
+- With `merge_providers`, every provider is asked for each chunk and the
+  results are coalesced per bar (coalesce_frames), preferring bars with
+  non-zero volume. Otherwise the first provider that returns data wins.
+- Bars are stored through DeltaIngestor (only new or changed rows are
+  written), and the derived timeframes are rebuilt from 1h at the end.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import BACKFILL_CONFIG, DATA_CONFIG
+from data.ingest import DeltaIngestor, OHLCV
+from data.resampler import BarResampler
+from data.storage.database import Database
+from data.utils.provider_health import get_provider_health
+from data.utils.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger("core.data.backfill")
+
+DONE, EMPTY, FAILED = "DONE", "EMPTY", "FAILED"
+
+_EPOCH = date(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class BackfillChunk:
+    """One (symbol, timeframe, date range) unit of work; dates are inclusive."""
+    symbol: str
+    timeframe: str
+    start: date
+    end: date
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return self.symbol, self.timeframe, self.start.isoformat(), self.end.isoformat()
+
+
+@dataclass
+class BackfillReport:
+    """Chunk counts of one backfill run."""
+    planned: int = 0
+    skipped: int = 0
+    done: int = 0
+    empty: int = 0
+    failed: int = 0
+    rows: int = 0
+    written: int = 0
+    failures: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"{self.planned} chunks: {self.skipped} already done, {self.done} done, {self.empty} empty, "
+                f"{self.failed} failed; {self.rows} bars fetched, {self.written} written")
+
+
+def plan_chunks(symbols: Iterable[str], timeframes: Iterable[str], start: date, end: date,
+                chunk_days: Optional[Dict[str, int]] = None) -> List[BackfillChunk]:
+    """
+    Grid-aligned chunks covering [start, end] for every symbol and timeframe,
+    ordered oldest first per symbol. The first chunk may start before `start`.
+    """
+    chunk_days = chunk_days or BACKFILL_CONFIG["CHUNK_DAYS"]
+    chunks = []
+    for symbol in symbols:
+        for timeframe in timeframes:
+            days = chunk_days.get(timeframe, 365)
+            first = (start - _EPOCH).days // days * days
+            offset = first
+            while _EPOCH + timedelta(days=offset) <= end:
+                chunk_start = _EPOCH + timedelta(days=offset)
+                chunks.append(BackfillChunk(symbol, timeframe, chunk_start,
+                                            chunk_start + timedelta(days=days - 1)))
+                offset += days
+    return chunks
+
+
+def coalesce_frames(frames: List[Tuple[str, pd.DataFrame]]) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Merges bars of the same range from several providers. `frames` is
+    [(provider name, bars)] in preference order. Per timestamp the first
+    provider with non-zero volume wins, else the first provider with the bar.
+
+    Returns:
+        (bars, source): OHLCV bars on a UTC index, and the provider of each bar.
+    """
+    parts = []
+    for rank, (name, df) in enumerate(frames):
+        if df is None or df.empty:
+            continue
+        idx = pd.DatetimeIndex(df.index)
+        idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+        part = df[OHLCV].set_axis(idx).astype(float)
+        part = part[part['Close'].notna()]
+        parts.append(part.assign(source=name, rank=rank, no_volume=~(part['Volume'] > 0)))
+    if not parts:
+        return pd.DataFrame(columns=OHLCV), pd.Series(dtype=object)
+
+    stacked = pd.concat(parts).rename_axis('timestamp').reset_index()
+    stacked = stacked.sort_values(['timestamp', 'no_volume', 'rank'], kind='stable')
+    best = stacked.drop_duplicates('timestamp', keep='first').set_index('timestamp')
+    return best[OHLCV], best['source']
+
+
+class BackfillOrchestrator:
+    """
+    Runs chunked, checkpointed, quota-bound backfills (see module docstring).
+    """
+
+    def __init__(self, providers: list, db: Optional[Database] = None, workers: Optional[int] = None,
+                 merge_providers: Optional[bool] = None, chunk_days: Optional[Dict[str, int]] = None,
+                 max_empty_attempts: Optional[int] = None):
+        """
+        Args:
+            providers: IDataProvider instances in preference order.
+            workers: Concurrent chunks (defaults to BACKFILL_CONFIG).
+            merge_providers: Ask every provider for each chunk and coalesce.
+            chunk_days: Days per chunk by timeframe.
+        """
+        self.providers = list(providers)
+        self.db = db or Database()
+        self.workers = workers or BACKFILL_CONFIG.get("WORKERS", 6)
+        self.merge_providers = (BACKFILL_CONFIG.get("MERGE_PROVIDERS", False)
+                                if merge_providers is None else merge_providers)
+        self.chunk_days = chunk_days or BACKFILL_CONFIG["CHUNK_DAYS"]
+        self.max_empty_attempts = max_empty_attempts or BACKFILL_CONFIG.get("MAX_EMPTY_ATTEMPTS", 2)
+        self.rate_limiter = get_rate_limiter()
+        self.health = get_provider_health()
+        self.ingestor = DeltaIngestor(self.db)
+
+    def run(self, symbols: List[str], timeframes: List[str], start: date, end: Optional[date] = None,
+            restart: bool = False) -> BackfillReport:
+        """
+        Backfills `symbols` x `timeframes` over [start, end] (end defaults to today).
+        With `restart`, the checkpoints of `symbols` x `timeframes` are discarded first.
+        """
+        end = end or date.today()
+        if restart:
+            self.db.clear_backfill_checkpoints(symbols, timeframes)
+
+        chunks = plan_chunks(symbols, timeframes, start, end, self.chunk_days)
+        report = BackfillReport(planned=len(chunks))
+        pending = self._pending(chunks, today=date.today())
+        report.skipped = len(chunks) - len(pending)
+        logger.info(f"Backfill: {len(symbols)} symbols x {timeframes} from {start} to {end}: "
+                    f"{len(chunks)} chunks, {report.skipped} already done, {len(pending)} to fetch "
+                    f"({self.workers} workers{', merging providers' if self.merge_providers else ''})")
+
+        hourly_written: Dict[str, date] = {}   # symbol -> earliest 1h chunk written
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as pool:
+            futures = {pool.submit(self._run_chunk, chunk): chunk for chunk in pending}
+            for n, future in enumerate(as_completed(futures), 1):
+                chunk = futures[future]
+                status, rows, written, detail = future.result()
+                report.rows += rows
+                report.written += written
+                if status == DONE:
+                    report.done += 1
+                    if written and chunk.timeframe == "1h":
+                        first = hourly_written.get(chunk.symbol)
+                        hourly_written[chunk.symbol] = chunk.start if first is None else min(first, chunk.start)
+                elif status == EMPTY:
+                    report.empty += 1
+                else:
+                    report.failed += 1
+                    report.failures.append(f"{chunk.symbol} {chunk.timeframe} {chunk.start}: {detail}")
+                logger.info(f"[{n}/{len(pending)}] {chunk.symbol} {chunk.timeframe} {chunk.start}..{chunk.end}: "
+                            f"{status} {rows} bars ({written} written){f' {detail}' if detail else ''}")
+
+        self._derive(hourly_written)
+        logger.info(f"Backfill complete: {report.summary()}")
+        return report
+
+    def _pending(self, chunks: List[BackfillChunk], today: date) -> List[BackfillChunk]:
+        """Chunks still to fetch: never checkpointed, FAILED, retryable EMPTY, or still open."""
+        checkpoints = self.db.get_backfill_checkpoints()
+        finished = set()
+        if not checkpoints.empty:
+            retry_empty = (checkpoints['status'] == EMPTY) & (checkpoints['attempts'] < self.max_empty_attempts)
+            closed = checkpoints[(checkpoints['status'].isin([DONE, EMPTY])) & ~retry_empty]
+            finished = set(zip(closed['symbol'], closed['timeframe'], closed['chunk_start'], closed['chunk_end']))
+        return [c for c in chunks if c.end >= today or c.key not in finished]
+
+    def _ordered_providers(self) -> list:
+        if DATA_CONFIG.get("ADAPTIVE_PROVIDER_ORDER", True):
+            return self.health.order(self.providers)
+        return list(self.providers)
+
+    def _fetch(self, provider, chunk: BackfillChunk) -> Optional[pd.DataFrame]:
+        """One quota-paced provider call, clipped to the chunk."""
+        self.rate_limiter.wait_if_needed(provider.name)
+        try:
+            df = provider.fetch_data(chunk.symbol, chunk.timeframe, start_date=chunk.start.isoformat(),
+                                     end_date=chunk.end.isoformat(), days_back=0)
+        except Exception:
+            self.health.record_failure(provider.name, "error")
+            raise
+        if df is None or df.empty:
+            # No bars in range (holidays, before listing): not a provider failure
+            return None
+        self.health.record_success(provider.name)
+        idx = pd.DatetimeIndex(df.index)
+        idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+        df = df.set_axis(idx)
+        # Providers ignoring the range return more than asked for
+        lo = pd.Timestamp(chunk.start, tz="UTC")
+        hi = pd.Timestamp(chunk.end + timedelta(days=1), tz="UTC")
+        return df[(df.index >= lo) & (df.index < hi)]
+
+    def _run_chunk(self, chunk: BackfillChunk) -> Tuple[str, int, int, str]:
+        """Fetches, stores and checkpoints one chunk. Returns (status, rows, written, detail)."""
+        frames, errors = [], []
+        for provider in self._ordered_providers():
+            if not self.health.allow(provider.name):
+                errors.append(f"{provider.name}: circuit open")
+                continue
+            try:
+                df = self._fetch(provider, chunk)
+            except Exception as e:
+                errors.append(f"{provider.name}: {e}")
+                continue
+            if df is not None and not df.empty:
+                frames.append((provider.name, df))
+                if not self.merge_providers:
+                    break
+
+        if not frames:
+            status, detail = (FAILED, "; ".join(errors)) if errors else (EMPTY, "")
+            self._checkpoint(chunk, status, error=detail or None)
+            return status, 0, 0, detail
+
+        try:
+            bars, sources = coalesce_frames(frames)
+            written = 0
+            for source, part in bars.groupby(sources, sort=False):
+                written += self.ingestor.ingest(chunk.symbol, chunk.timeframe, part, source).written
+        except Exception as e:
+            self._checkpoint(chunk, FAILED, error=str(e))
+            return FAILED, 0, 0, str(e)
+        used = sorted(sources.unique())
+        self._checkpoint(chunk, DONE, rows=len(bars), sources=",".join(used))
+        return DONE, len(bars), written, f"from {'+'.join(used)}"
+
+    def _checkpoint(self, chunk: BackfillChunk, status: str, rows: int = 0, sources: Optional[str] = None,
+                    error: Optional[str] = None):
+        self.db.save_backfill_checkpoint(*chunk.key, status=status, rows=rows, sources=sources, error=error)
+
+    def _derive(self, written: Dict[str, date]):
+        """
+        Rebuilds the configured derived timeframes from the backfilled 1h bars,
+        from each symbol's earliest written chunk on (backfilled history is
+        older than the bars derived so far).
+        """
+        if not written:
+            return
+        resampler = BarResampler(self.db)
+        for symbol, first in sorted(written.items()):
+            since = pd.Timestamp(first, tz="UTC")
+            for target in DATA_CONFIG.get("DERIVED_TIMEFRAMES", []):
+                try:
+                    resampler.derive(symbol, target, base_timeframe="1h", since=since)
+                except Exception as e:
+                    logger.error(f"Failed to derive {target} bars for {symbol}: {e}")
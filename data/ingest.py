@@ -0,0 +1,182 @@
+"""
+Delta-Aware Bar Ingest
+======================
+Writes fetched OHLCV bars to `market_data` only when they are new or
+changed, instead of upserting every fetched row.
+
+Fetched bars are compared with the stored bars of the same range in one
+vectorized pass: rows are aligned by timestamp (UTC) and compared by a hash
+of their rounded OHLCV values. Then:
+
+- New timestamps are inserted.
+- Changed bars are rewritten (replacing the stored row whatever timestamp
+  format or UTC offset it was stored with), and a `bar_revisions` row keeps
+  the old and new values when a provider changed history. Not logged as
+  revisions: forward-filled rows replaced by real data, and bars that were
+  still forming when this ingestor stored them (the current hour's bar
+  changes on every poll until it closes).
+- Identical bars are skipped, so a refetch overlapping stored history writes
+  only the handful of genuinely new bars.
+- Forward-filled (`is_filled`) input rows never overwrite stored real bars.
+- New bars older than the series' gap watermark move it back, so the next
+  incremental gap check sees them.
+- Rewritten bars drop the series' cached data quality report (inserts
+  already change the bar count the report is keyed on).
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core import clock
+from data.interfaces import Candle
+from data.resampler import BASE_PERIOD_MINUTES, BUCKET_MINUTES
+from data.storage.database import Database
+
+logger = logging.getLogger("core.data.ingest")
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Rounding before hashing, so float noise between providers is not a change
+PRICE_DECIMALS = 6
+VOLUME_DECIMALS = 0
+
+
+@dataclass
+class IngestResult:
+    """Row counts of one ingest call."""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+
+def bar_hashes(df: pd.DataFrame) -> np.ndarray:
+    """uint64 hash per row of the rounded OHLCV values (index excluded)."""
+    values = df[OHLCV].astype(float)
+    values = pd.concat([values[OHLCV[:4]].round(PRICE_DECIMALS),
+                        values[['Volume']].round(VOLUME_DECIMALS)], axis=1)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def bar_period(timeframe: str) -> pd.Timedelta:
+    """Time from a bar's timestamp to its close (one day for daily/session bars)."""
+    minutes = BASE_PERIOD_MINUTES.get(timeframe) or BUCKET_MINUTES.get(timeframe)
+    return pd.Timedelta(minutes=minutes) if minutes else pd.Timedelta(days=1)
+
+
+def _utc_index(df: pd.DataFrame) -> pd.DataFrame:
+    idx = pd.DatetimeIndex(df.index)
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    df = df.set_axis(idx)
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+class DeltaIngestor:
+    """
+    Stores fetched bars, writing only new or changed rows (see module docstring).
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self.db = db or Database()
+        # (symbol, timeframe) -> bars this ingestor stored before they closed
+        self._open_bars: Dict[Tuple[str, str], Set[pd.Timestamp]] = {}
+        # ingest() is called from concurrent scan fetch threads
+        self._open_lock = threading.Lock()
+
+    def ingest(self, symbol: str, timeframe: str, df: pd.DataFrame, source: str,
+               is_filled: bool = False) -> IngestResult:
+        """
+        Args:
+            symbol: Symbol of the bars.
+            timeframe: Timeframe of the bars (e.g. "1h", "1d").
+            df: Fetched bars (DatetimeIndex, OHLCV columns). An `is_filled` column,
+                if present, marks forward-filled rows.
+            source: Provider name stored on written rows.
+            is_filled: Marks every row as forward-filled (overrides the column).
+
+        Returns:
+            IngestResult with inserted / updated / unchanged counts.
+        """
+        if df is None or df.empty:
+            return IngestResult()
+
+        df = _utc_index(df)
+        if is_filled:
+            incoming_filled = np.ones(len(df), dtype=bool)
+        elif 'is_filled' in df.columns:
+            incoming_filled = df['is_filled'].fillna(0).astype(bool).to_numpy()
+        else:
+            incoming_filled = np.zeros(len(df), dtype=bool)
+
+        stored = self.db.load_market_data(symbol, timeframe, start=df.index[0])
+        if not stored.empty:
+            stored = _utc_index(stored)
+            stored = stored[stored.index <= df.index[-1]]
+        aligned = stored.reindex(df.index) if not stored.empty else pd.DataFrame(index=df.index, columns=OHLCV + ['is_filled'])
+
+        exists = aligned['Close'].notna().to_numpy()
+        stored_filled = aligned['is_filled'].fillna(0).astype(bool).to_numpy() & exists
+        differs = np.zeros(len(df), dtype=bool)
+        if exists.any():
+            differs[exists] = bar_hashes(df[exists]) != bar_hashes(aligned[exists])
+
+        # Real bars replace stored fills (even with equal values, to clear the flag);
+        # fills never replace stored real bars
+        changed = exists & ~incoming_filled & (differs | stored_filled)
+        write = ~exists | changed
+        revised = changed & differs & ~stored_filled
+        key = (symbol, timeframe)
+        with self._open_lock:
+            stored_open = set(self._open_bars.get(key, ()))
+        if stored_open:
+            revised &= ~df.index.isin(list(stored_open))
+
+        result = IngestResult(inserted=int((~exists).sum()), updated=int(changed.sum()),
+                              unchanged=int((exists & ~changed).sum()))
+        if not write.any():
+            logger.debug(f"{symbol} {timeframe}: {result.unchanged} bars unchanged, nothing to write")
+            return result
+
+        to_write = df[write]
+        if changed.any():
+            # The stored row may be keyed on another timestamp string (offset, separator)
+            self.db.delete_market_data(symbol, timeframe, list(df.index[changed]))
+        candles = [
+            Candle(timestamp=ts.to_pydatetime(), open=o, high=h, low=l, close=c, volume=v)
+            for ts, o, h, l, c, v in zip(to_write.index, to_write['Open'], to_write['High'],
+                                         to_write['Low'], to_write['Close'], to_write['Volume'])
+        ]
+        self.db.save_bulk_candles(symbol, timeframe, candles,
+                                  is_filled_list=incoming_filled[write].tolist(), source=source)
+        now, period = pd.Timestamp(clock.now()), bar_period(timeframe)
+        with self._open_lock:
+            open_bars = self._open_bars.setdefault(key, set())
+            open_bars.difference_update(to_write.index)
+            open_bars.difference_update([ts for ts in open_bars if ts + period < now - pd.Timedelta(days=1)])
+            open_bars.update(to_write.index[to_write.index + period > now])
+        if result.inserted:
+            # Bars inserted inside the gap-verified prefix get re-checked
+            self.db.rewind_gap_watermark(symbol, timeframe, df.index[~exists][0])
+        if result.updated:
+            self.db.clear_quality_reports([symbol], [timeframe])
+
+        if revised.any():
+            old = aligned[revised]
+            new = df[revised]
+            self.db.save_bar_revisions([
+                (symbol, timeframe, ts.isoformat(), *map(float, o), *map(float, n), source)
+                for ts, o, n in zip(new.index, old[OHLCV].to_numpy(), new[OHLCV].to_numpy())
+            ])
+            logger.info(f"{source} revised {int(revised.sum())} stored {timeframe} bars for {symbol}")
+
+        logger.debug(f"{symbol} {timeframe}: {result.inserted} new, {result.updated} changed, "
+                     f"{result.unchanged} unchanged")
+        return result
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, List, Dict, Union
 from dataclasses import dataclass
 from datetime import datetime
+import logging
 import pandas as pd
 
+logger = logging.getLogger("core.data.interfaces")
+
 @dataclass
 class Candle:
     """Standardized OHLCV Candle structure"""
@@ -24,6 +28,36 @@ class Candle:
             "Volume": self.volume
         }
 
+@dataclass
+class Tick:
+    """A trade (or quote midpoint) from a real-time stream"""
+    symbol: str
+    timestamp: pd.Timestamp  # tz-aware UTC
+    price: float
+    size: float = 0.0
+
+    @classmethod
+    def from_quote(cls, symbol: str, timestamp: pd.Timestamp, bid: float, ask: float) -> "Tick":
+        """Quote update as a zero-size tick at the midpoint."""
+        return cls(symbol, timestamp, (bid + ask) / 2.0, 0.0)
+
+class ITickSource(ABC):
+    """
+    Interface for real-time trade/quote streams (see data/streaming.py).
+    """
+
+    # Called when ticks may have been missed (e.g. the stream reconnected)
+    on_gap: Optional[Callable[[], None]] = None
+
+    @abstractmethod
+    def ticks(self) -> Iterator[Tick]:
+        """Yields ticks in arrival order until the stream ends or close() is called."""
+        pass
+
+    def close(self) -> None:
+        """Stops the stream (ticks() returns)."""
+        pass
+
 class IDataProvider(ABC):
     """
     Interface for all Data Providers.
@@ -52,3 +86,53 @@ class IDataProvider(ABC):
         [Open, High, Low, Close, Volume]
         """
         pass
+
+    # Max concurrent fetch_data calls in the default fetch_many loop
+    batch_workers: int = 4
+
+    # Optional on-disk cache used by @cached_fetch (attached by DataProviderFactory)
+    response_cache = None
+
+    def supports_batch(self, timeframe: str) -> bool:
+        """
+        True if fetch_many has a real batch endpoint for `timeframe` (fewer
+        API requests than symbols). The default loop over fetch_data does not.
+        """
+        return False
+
+    def fetch_many(self,
+                   symbols: List[str],
+                   timeframe: str,
+                   since: Optional[str] = None,
+                   days_back: int = 30,
+                   throttle: Optional[Callable[[], None]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical data for several symbols.
+        Providers with a batch/grouped endpoint override this; the default is a
+        bounded concurrent loop over fetch_data.
+        
+        Args:
+            since: Start date ('YYYY-MM-DD'); if None, `days_back` of history.
+            throttle: Called before every API request (rate limiting).
+        
+        Returns:
+            Dict symbol -> DataFrame (same format as fetch_data). Symbols without
+            data are omitted.
+        """
+        def _one(symbol):
+            if throttle is not None:
+                throttle()
+            try:
+                return symbol, self.fetch_data(symbol, timeframe, start_date=since,
+                                               days_back=days_back if not since else 0)
+            except Exception as e:
+                logger.warning(f"{self.name} fetch failed for {symbol}: {e}")
+                return symbol, None
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.batch_workers, len(symbols))),
+                                thread_name_prefix=f"{self.name.lower()}-batch") as pool:
+            for symbol, df in pool.map(_one, symbols):
+                if df is not None and not df.empty:
+                    results[symbol] = df
+        return results
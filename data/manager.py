@@ -1,23 +1,38 @@
 import pandas as pd
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 
 from config.settings import DATA_CONFIG, STRATEGY_CONFIG
+from core import clock
+from core.market_calendar import get_session_calendar
 from data.storage.database import Database
 from data.providers.yfinance_provider import YFinanceProvider
 from data.providers.polygon_provider import PolygonProvider
 from data.providers.twelve_provider import TwelveDataProvider
 from data.providers.alphavantage_provider import AlphaVantageProvider
 from data.quality.gap_detector import GapDetector
+from data.quality.validator import QualityReport, configured_validator
 from data.interfaces import Candle
 from data.utils.rate_limiter import get_rate_limiter
+from data.utils.latency_tracker import get_latency_tracker
+from data.utils.provider_health import get_provider_health
+from data.resampler import BarResampler, daily_bar_date, daily_bar_timestamp
+from data.ingest import DeltaIngestor
+from data.streaming import STREAM_SOURCE
 
 # Lazy import to avoid circular dependency if any
 # from analysis.indicators import Indicators # Assuming this exists or we use TA-Lib wrapper
 
 logger = logging.getLogger("core.data.manager")
 
+
+class _BatchStopped(Exception):
+    """Raised by the batch throttle once the update is cancelled or past its deadline."""
+
+
 class DataManager:
     """
     Orchestrates Data Flow:
@@ -26,8 +41,17 @@ class DataManager:
     
     def __init__(self):
         self.db = Database()
-        self.gap_detector = GapDetector(expected_interval_minutes=60) # 1H
+        self.gap_detector = GapDetector(expected_interval_minutes=60, calendar=get_session_calendar(),
+                                        extended_hours=DATA_CONFIG.get("EXTENDED_HOURS_BARS", False)) # 1H
         self.rate_limiter = get_rate_limiter()
+        self.latency = get_latency_tracker()
+        self.health = get_provider_health()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self.resampler = BarResampler(self.db)
+        # symbol -> last 1h bar the DAILY bars were derived from
+        self._daily_derived: Dict[str, pd.Timestamp] = {}
+        self.ingestor = DeltaIngestor(self.db)
+        self.validator = configured_validator(self.db, "1h")
         
         # Initialize Providers
         self.providers = [
@@ -69,6 +93,12 @@ class DataManager:
             
         return df
 
+    def get_data_since(self, symbol: str, start: datetime) -> pd.DataFrame:
+        """
+        Hourly bars stored at or after `start` (incremental reads, no fetch).
+        """
+        return self.db.load_market_data(symbol, "1h", start=start)
+
     def update_data(self, symbol: str):
         """
         Fetches latest data from Provider and updates DB.
@@ -77,62 +107,117 @@ class DataManager:
         logger.debug(f"Checking data update for {symbol}...")
         
         # 1. Fetch
-        # Default to BACKFILL_DAYS if empty, or small window if updating.
-        # Logic: Find last DB timestamp.
-        
-        last_ts = self._get_last_timestamp(symbol)
-        
-        start_date = None
-        days_back = DATA_CONFIG['HISTORY_DAYS']
-        
-        if last_ts:
-            # Fetch from last known to now
-            # YFinance expects string or datetime.
-            # Add a buffer
-            start_date = (last_ts - timedelta(hours=24)).strftime('%Y-%m-%d')
-            days_back = 0 # Use explicit dates
-            
-        
-        df_new = None
-        source_name = "UNKNOWN"
-        for provider in self.providers:
-            try:
-                # Apply rate limiting before making API call
-                self.rate_limiter.wait_if_needed(provider.name)
-                
-                df_new = provider.fetch_data(
-                    symbol, 
-                    "1h", 
-                    start_date=start_date, 
-                    days_back=days_back if not start_date else 0
-                )
-                if df_new is not None and not df_new.empty:
-                    source_name = provider.name
-                    logger.info(f"Successfully fetched 1h data for {symbol} using {source_name}")
-                    break
-            except Exception as e:
-                logger.warning(f"Provider {provider.name} failed for {symbol}: {e}")
-                continue
+        start_date, days_back = self._hourly_window(symbol)
+        df_new, source_name = self._fetch_from_providers(symbol, "1h", start_date, days_back)
         
         if df_new is None or df_new.empty:
             logger.warning(f"No new data fetched for {symbol}")
             return
             
         # 2. Save
-        candles = []
-        for ts, row in df_new.iterrows():
-            c = Candle(
-                timestamp=ts,
-                open=row['Open'],
-                high=row['High'],
-                low=row['Low'],
-                close=row['Close'],
-                volume=row['Volume']
-            )
-            candles.append(c)
+        self._store_hourly(symbol, df_new, source_name)
+
+    def update_data_many(self, symbols: List[str], cancel_event=None,
+                         deadline: Optional[float] = None) -> Dict[str, str]:
+        """
+        Per-cycle update of the 1h bars of many symbols using the providers'
+        batch downloads (IDataProvider.fetch_many): one call per provider for
+        the whole universe where the API allows it. Symbols a provider does
+        not return fall through to the next provider. Providers without a
+        real batch endpoint for 1h bars (see IDataProvider.supports_batch) are
+        skipped, so their throttled per-symbol calls do not run here.
+        
+        Stops between providers, and before each throttled request, once
+        `cancel_event` is set or the `deadline` (time.monotonic()) has passed.
+        
+        Returns:
+            Dict symbol -> provider name, for the symbols that were updated.
+            The others are left to the per-symbol update (update_data).
+        """
+        def stopped():
+            return ((cancel_event is not None and cancel_event.is_set())
+                    or (deadline is not None and time.monotonic() >= deadline))
             
-        self.db.save_bulk_candles(symbol, "1h", candles, source=source_name)
-        logger.info(f"Stored {len(candles)} candles for {symbol} from {source_name}")
+        # Symbols sharing a fetch window are fetched together
+        groups: Dict[Tuple[Optional[str], int], List[str]] = {}
+        for symbol in symbols:
+            groups.setdefault(self._hourly_window(symbol), []).append(symbol)
+            
+        sources: Dict[str, str] = {}
+        for (start_date, days_back), group in groups.items():
+            missing = list(group)
+            providers = self._ordered_providers()
+            for provider in providers:
+                if not missing or stopped():
+                    break
+                if not provider.supports_batch("1h") or self._backing_off(provider, providers):
+                    continue
+                    
+                def throttle(p=provider):
+                    if stopped():
+                        raise _BatchStopped(p.name)
+                    self.rate_limiter.wait_if_needed(p.name)
+                    
+                try:
+                    frames = provider.fetch_many(missing, "1h", since=start_date, days_back=days_back,
+                                                 throttle=throttle)
+                except _BatchStopped:
+                    logger.warning(f"Batch update stopped during {provider.name} (cancelled or past the deadline)")
+                    break
+                except Exception as e:
+                    logger.warning(f"Provider {provider.name} batch failed: {e}")
+                    self.health.record_failure(provider.name, "batch error")
+                    continue
+                if frames:
+                    self.health.record_success(provider.name)  # Batch latency is not per-request
+                else:
+                    self.health.record_failure(provider.name, "empty batch")
+                for symbol, df_new in frames.items():
+                    if symbol in missing and df_new is not None and not df_new.empty:
+                        self._store_hourly(symbol, df_new, provider.name)
+                        sources[symbol] = provider.name
+                missing = [s for s in missing if s not in sources]
+            if missing:
+                logger.info(f"Batch update left {len(missing)} symbols to per-symbol updates: {', '.join(missing)}")
+        return sources
+
+    def _hourly_window(self, symbol: str) -> Tuple[Optional[str], int]:
+        """(start_date, days_back) for the next 1h update of `symbol`."""
+        # Default to HISTORY_DAYS if empty, or small window if updating.
+        last_ts = self._get_last_timestamp(symbol)
+        if last_ts:
+            # Fetch from last known to now, with a buffer
+            return (last_ts - timedelta(hours=24)).strftime('%Y-%m-%d'), 0
+        return None, DATA_CONFIG['HISTORY_DAYS']
+
+    def _store_hourly(self, symbol: str, df_new: pd.DataFrame, source_name: str):
+        """
+        Saves new or changed fetched 1h bars (the fetch window overlaps stored
+        history) and derives the configured higher timeframes.
+        """
+        result = self.ingestor.ingest(symbol, "1h", df_new, source_name)
+        logger.info(f"Stored {result.written} of {len(df_new)} fetched candles for {symbol} from {source_name} "
+                    f"({result.inserted} new, {result.updated} changed)")
+        if result.written:
+            self._derive_from_hourly(symbol)
+
+    def store_stream_bars(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """
+        Stores closed bars from the real-time stream (data/streaming.py).
+        Hourly bars also update the derived timeframes.
+        """
+        if timeframe == "1h":
+            self._store_hourly(symbol, df, STREAM_SOURCE)
+        else:
+            self.ingestor.ingest(symbol, timeframe, df, STREAM_SOURCE)
+
+    def _derive_from_hourly(self, symbol: str):
+        """Incrementally derives the configured session-aligned timeframes from stored 1h bars."""
+        for target in DATA_CONFIG.get("DERIVED_TIMEFRAMES", []):
+            try:
+                self.resampler.derive(symbol, target, base_timeframe="1h")
+            except Exception as e:
+                logger.error(f"Failed to derive {target} bars for {symbol}: {e}")
 
     def get_latest_daily_data(self, symbol: str, days: int = 730) -> pd.DataFrame:
         """
@@ -149,17 +234,23 @@ class DataManager:
 
     def update_daily_data(self, symbol: str):
         """
-        Fetches latest DAILY data from Provider and updates DB.
+        Updates DAILY data in DB.
+        New sessions are derived from stored 1h bars when they cover them,
+        otherwise fetched from a Provider.
         """
         # logger.info(f"Updating DAILY data for {symbol}...") # Too verbose
         logger.debug(f"Checking DAILY data update for {symbol}...")
         
         # Logic: Find last DB timestamp for DAILY
-        # We need a way to check last Daily timestamp.
-        # Assuming load_market_data works for "1d", we can just check max index.
-        df_old = self.db.load_market_data(symbol, "1d")
-        last_ts = df_old.index.max().to_pydatetime() if not df_old.empty else None
+        last_daily = self.db.get_last_timestamp(symbol, "1d")
+        last_ts = last_daily.to_pydatetime() if last_daily is not None else None
         
+        # Prefer deriving new sessions from stored 1h bars (saves a rate-limited API call).
+        # The initial long history still comes from a provider.
+        if last_daily is not None and DATA_CONFIG.get("DERIVE_DAILY_FROM_1H", True):
+            if self._derive_daily_from_hourly(symbol, last_daily):
+                return
+            
         start_date = None
         days_back = 365 * 2 # 2 Years history for daily
         
@@ -167,121 +258,269 @@ class DataManager:
             start_date = (last_ts - timedelta(days=1)).strftime('%Y-%m-%d')
             days_back = 0
             
-        df_new = None
-        source_name = "UNKNOWN"
-        for provider in self.providers:
+        df_new, source_name = self._fetch_from_providers(symbol, "1d", start_date, days_back)
+        
+        if df_new is None or df_new.empty:
+            logger.warning(f"No new DAILY data fetched for {symbol}")
+            return
+            
+        # Save (new or changed sessions only)
+        result = self.ingestor.ingest(symbol, "1d", df_new, source_name)
+        logger.info(f"Stored {result.written} DAILY candles for {symbol} from {source_name}")
+
+        
+    def _fetch_from_providers(self, symbol: str, timeframe: str, start_date: Optional[str],
+                              days_back: int) -> Tuple[Optional[pd.DataFrame], str]:
+        """
+        Fetches from the providers in health order (see _ordered_providers),
+        returning (df, source_name). With DATA_CONFIG["HEDGED_FETCH"], slow
+        providers are hedged (see _fetch_hedged).
+        """
+        if DATA_CONFIG.get("HEDGED_FETCH", False) and len(self.providers) > 1:
+            return self._fetch_hedged(symbol, timeframe, start_date, days_back)
+            
+        providers = self._ordered_providers()
+        for provider in providers:
+            if self._backing_off(provider, providers):
+                continue
             try:
                 # Apply rate limiting before making API call
                 self.rate_limiter.wait_if_needed(provider.name)
-                
-                df_new = provider.fetch_data(
-                    symbol, 
-                    "1d", 
-                    start_date=start_date, 
-                    days_back=days_back if not start_date else 0
-                )
+                df_new = self._timed_fetch(provider, symbol, timeframe, start_date, days_back)
                 if df_new is not None and not df_new.empty:
-                    source_name = provider.name
-                    logger.info(f"Successfully fetched DAILY data for {symbol} using {source_name}")
-                    break
+                    logger.info(f"Successfully fetched {timeframe} data for {symbol} using {provider.name}")
+                    return df_new, provider.name
             except Exception as e:
                 logger.warning(f"Provider {provider.name} failed for {symbol}: {e}")
                 continue
+        return None, "UNKNOWN"
         
-        if df_new is None or df_new.empty:
-            logger.warning(f"No new DAILY data fetched for {symbol}")
-            return
-            
-        # Save
-        candles = []
-        for ts, row in df_new.iterrows():
-            c = Candle(
-                timestamp=ts,
-                open=row['Open'],
-                high=row['High'],
-                low=row['Low'],
-                close=row['Close'],
-                volume=row['Volume']
+    def _ordered_providers(self) -> list:
+        """Providers by observed health (ProviderHealth.order), or static priority."""
+        if DATA_CONFIG.get("ADAPTIVE_PROVIDER_ORDER", True):
+            return self.health.order(self.providers)
+        return list(self.providers)
+        
+    def _backing_off(self, provider, candidates: list) -> bool:
+        """
+        True if the provider should be skipped because another one in `candidates`
+        can answer instead: its circuit is open (ProviderHealth) or it answered 429
+        recently in any process (RateLimiter.report_throttled). The last candidate
+        is always tried.
+        """
+        if provider is candidates[-1]:
+            return False
+        blocked = self.rate_limiter.blocked_for(provider.name)
+        if blocked > 0:
+            logger.debug(f"Skipping {provider.name}: throttled, retry in {blocked:.0f}s")
+            return True
+        # Checked last: after a cool-down this hands out the provider's probe call
+        if not self.health.allow(provider.name):
+            logger.debug(f"Skipping {provider.name}: circuit open")
+            return True
+        return False
+        
+    def _timed_fetch(self, provider, symbol: str, timeframe: str, start_date: Optional[str],
+                     days_back: int) -> Optional[pd.DataFrame]:
+        """
+        Single provider call. Outcomes feed the provider health scoreboard;
+        successful latencies also feed the hedging p95.
+        """
+        start = time.monotonic()
+        try:
+            df_new = provider.fetch_data(
+                symbol, 
+                timeframe, 
+                start_date=start_date, 
+                days_back=days_back if not start_date else 0
             )
-            candles.append(c)
-            
-        self.db.save_bulk_candles(symbol, "1d", candles, source=source_name)
-        logger.info(f"Stored {len(candles)} DAILY candles for {symbol} from {source_name}")
-
+        except Exception:
+            self.health.record_failure(provider.name, "error")
+            raise
+        elapsed = time.monotonic() - start
+        if df_new is not None and not df_new.empty:
+            self.latency.record(provider.name, elapsed)
+            self.health.record_success(provider.name, elapsed)
+        else:
+            # Providers return None on API errors, timeouts and empty responses alike
+            self.health.record_failure(provider.name, "no data")
+        return df_new
         
-    def resolve_gaps(self, symbol: str):
+    def _fetch_hedged(self, symbol: str, timeframe: str, start_date: Optional[str],
+                      days_back: int) -> Tuple[Optional[pd.DataFrame], str]:
         """
-        Checks for gaps and fills them (Forward Fill).
+        Hedged fetch: starts the primary provider, and if it has not answered
+        after HEDGE_DELAY_SECONDS (or its latency p95, if lower), starts the next
+        provider in parallel. The first valid response wins; queued requests are
+        cancelled and late responses are discarded.
+        
+        Hedge requests only start if the provider's quota allows it right now
+        (RateLimiter.try_acquire); fallbacks after a failure wait for quota as in
+        the sequential path.
         """
-        df = self.db.load_market_data(symbol, "1h")
-        if df.empty:
-            return
+        max_parallel = DATA_CONFIG.get("HEDGE_MAX_PARALLEL", 2)
+        hedge_delay = DATA_CONFIG.get("HEDGE_DELAY_SECONDS", 3.0)
+        if self._hedge_pool is None:
+            # Shared by the concurrent scan fetch workers
+            self._hedge_pool = ThreadPoolExecutor(max_workers=max_parallel * 4, thread_name_prefix="hedged-fetch")
+        
+        remaining = self._ordered_providers()
+        pending = {}  # future -> provider
+        
+        def _launch(blocking: bool) -> bool:
+            if blocking:
+                if not remaining:
+                    return False
+                provider = next((p for p in remaining if not self._backing_off(p, remaining)), remaining[0])
+                remaining.remove(provider)
+                self.rate_limiter.wait_if_needed(provider.name)
+            else:
+                # First healthy provider (in order) with quota available right now
+                provider = next((p for p in remaining if not self.health.is_open(p.name)
+                                 and self.rate_limiter.try_acquire(p.name)), None)
+                if provider is None:
+                    return False
+                remaining.remove(provider)
+            future = self._hedge_pool.submit(self._timed_fetch, provider, symbol, timeframe, start_date, days_back)
+            pending[future] = provider
+            return True
             
-        gaps = self.gap_detector.detect_gaps(df, symbol)
+        try:
+            _launch(blocking=True)
+            while pending:
+                primary = next(iter(pending.values()))
+                p95 = self.latency.p95(primary.name)
+                delay = min(hedge_delay, p95) if p95 is not None else hedge_delay
+                
+                done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    if len(pending) < max_parallel and _launch(blocking=False):
+                        logger.info(f"Hedging {timeframe} fetch for {symbol}: {primary.name} slower than {delay:.1f}s, "
+                                    f"also trying {list(pending.values())[-1].name}")
+                    elif len(pending) >= max_parallel or not remaining:
+                        wait(pending, return_when=FIRST_COMPLETED)
+                    # else: no quota for a hedge yet, check again after the next delay
+                    continue
+                    
+                for future in done:
+                    provider = pending.pop(future)
+                    try:
+                        df_new = future.result()
+                    except Exception as e:
+                        logger.warning(f"Provider {provider.name} failed for {symbol}: {e}")
+                        continue
+                    if df_new is not None and not df_new.empty:
+                        logger.info(f"Successfully fetched {timeframe} data for {symbol} using {provider.name}")
+                        return df_new, provider.name
+                        
+                # Everything that finished failed: fall back to the next provider
+                if not pending:
+                    _launch(blocking=True)
+            return None, "UNKNOWN"
+        finally:
+            for future in pending:
+                future.cancel()  # Running calls cannot be interrupted; their results are discarded
         
-        if not gaps:
-            logger.info(f"No gaps detected for {symbol}.")
-            return
+    def _derive_daily_from_hourly(self, symbol: str, last_daily: pd.Timestamp) -> bool:
+        """
+        Builds daily bars from stored 1h bars, starting at the session of the
+        last stored daily bar (it may have been a partial, intraday fetch).
+        Returns False if the 1h data does not cover every closed session,
+        so the caller can fall back to a provider. Skipped when no 1h bars
+        arrived since the last successful derive.
+        """
+        last_hourly = self.db.get_last_timestamp(symbol, "1h")
+        if last_hourly is None or last_hourly < last_daily:
+            return False
+        if self._daily_derived.get(symbol) == last_hourly:
+            return True
             
-        logger.info(f"Found {len(gaps)} gaps for {symbol}. Filling...")
+        first_day = daily_bar_date(last_daily)
+        derived = self.resampler.derive(symbol, "1d", base_timeframe="1h", since=daily_bar_timestamp(first_day))
+        expected = self.resampler.expected_sessions(first_day, last_hourly + timedelta(hours=1))
         
-        filled_candles = []
+        if len(derived) < expected:
+            logger.info(f"1h data covers {len(derived)}/{expected} sessions for {symbol}, fetching DAILY from provider")
+            return False
+            
+        # Provider bar stamped with another convention (UTC midnight) was superseded
+        if not derived.empty and derived.index[0] != last_daily and daily_bar_date(derived.index[0]) == first_day:
+            self.db.delete_market_data(symbol, "1d", [last_daily])
+            
+        self._daily_derived[symbol] = last_hourly
+        logger.debug(f"DAILY data for {symbol} derived locally ({len(derived)} sessions)")
+        return True
+
+    def resolve_gaps(self, symbol: str, full: bool = False):
+        """
+        Checks for gaps and fills them (Forward Fill).
+        Only bars the session calendar expects are filled; gaps too large to
+        fill safely (multi-day outages) are left alone. Forward-filled bars
+        outside the session grid (overnight/weekend fills from older
+        versions) are deleted.
         
-        for gap in gaps:
-            if not gap.is_fillable:
-                # Downgrade to INFO to reduce noise for expected gaps (e.g. weekends/holidays)
-                logger.info(f"Gap too large to fill safely (likely weekend/holiday): {gap.duration_minutes:.1f} min at {gap.start_time}")
-                continue
-                
-            # Logic: Forward Fill
-            # Create candles every hour between start and end.
-            # Use 'gap_start' close price for all OHL.
+        Only bars from the series' gap watermark (the last bar of the
+        already verified prefix) onwards are checked, so a check costs
+        O(new bars); `full` re-verifies the whole history. The watermark then
+        moves to the last stored bar, or to the bar before the first gap left
+        unfilled, so that gap is checked again once the data arrives.
+        """
+        watermark = None if full else self.db.get_gap_watermark(symbol, "1h")
+        df = self.db.load_market_data(symbol, "1h", start=watermark)
+        if df.empty:
+            return
             
-            # Find the candle BEFORE the gap to get values
-            try:
-                # Assuming index is unique
-                start_val = df.loc[gap.start_time] # This exists
-                
-                # Robust extraction in case of remaining duplicates
-                if isinstance(start_val, pd.DataFrame):
-                    start_val = start_val.iloc[-1]
-                
-                fill_price = float(start_val['Close'])
-                fill_vol = 0 # No volume on filled candles
-                
-                # Iterate hours
-                curr = gap.start_time + timedelta(hours=1)
-                while curr < gap.end_time:
-                    # Don't overwrite existing?
-                    # Gaps are by definition missing rows.
-                    
-                    c = Candle(
-                        timestamp=curr,
-                        open=fill_price,
-                        high=fill_price,
-                        low=fill_price,
-                        close=fill_price,
-                        volume=fill_vol
-                    )
-                    filled_candles.append(c)
-                    curr += timedelta(hours=1)
-                    
-            except KeyError:
-                logger.error(f"Could not find start candle for gap at {gap.start_time}")
-                continue
-                
-        if filled_candles:
+        df = df.sort_index()
+        stale = self.gap_detector.unexpected_rows(df) & df['is_filled'].fillna(0).astype(bool).to_numpy()
+        if stale.any():
+            self.db.delete_market_data(symbol, "1h", list(df.index[stale]))
+            df = df[~stale]
+            logger.info(f"Removed {int(stale.sum())} forward-filled bars outside market hours for {symbol}")
+            
+        fill = self.gap_detector.fill_rows(df)
+        if fill.empty:
+            logger.debug(f"No fillable gaps detected for {symbol} in {len(df)} bars.")
+        else:
+            # No volume on filled candles; all prices at the close before the gap
+            filled_candles = [
+                Candle(timestamp=ts.to_pydatetime(), open=p, high=p, low=p, close=p, volume=0)
+                for ts, p in zip(fill.index, fill['Close'].tolist())
+            ]
             self.db.save_bulk_candles(symbol, "1h", filled_candles, is_filled_list=[True]*len(filled_candles))
             logger.info(f"Filled {len(filled_candles)} missing hours for {symbol}")
+            
+        if not df.empty:
+            unresolved = [g for g in self.gap_detector.detect_gaps(df, symbol) if not g.is_fillable]
+            verified_until = unresolved[0].start_time if unresolved else df.index[-1]
+            if unresolved:
+                logger.warning(f"{len(unresolved)} unfillable gaps for {symbol}, first after {verified_until}")
+            self.db.save_gap_watermark(symbol, "1h", verified_until, checked_at=clock.now(),
+                                       deep=watermark is None)
+
+    def deep_gap_check_due(self, symbols: List[str], max_age_days: float) -> List[str]:
+        """
+        Symbols whose 1h history was never re-verified in full, or not within
+        `max_age_days`, oldest full check first.
+        """
+        watermarks = self.db.get_gap_watermarks("1h")
+        last_deep = {}
+        if not watermarks.empty:
+            last_deep = {row.symbol: pd.Timestamp(row.deep_checked_at)
+                         for row in watermarks.itertuples() if row.deep_checked_at}
+        cutoff = pd.Timestamp(clock.now()) - pd.Timedelta(days=max_age_days)
+        due = [s for s in symbols if s not in last_deep or last_deep[s] < cutoff]
+        never = pd.Timestamp.min.tz_localize("UTC")
+        return sorted(due, key=lambda s: last_deep.get(s, never))
+
+    def validate_quality(self, symbols: List[str], force: bool = False) -> Dict[str, QualityReport]:
+        """
+        Data quality reports of the stored 1h series. Cached reports are
+        reused while the series is unchanged; the rest are validated in one
+        batch and stored (see data/quality/validator.py).
+        """
+        return self.validator.refresh(symbols, "1h", force=force)
 
     def _get_last_timestamp(self, symbol: str) -> Optional[datetime]:
-        # Simple query to DB or loading DF
-        # Optimize later with SQL `SELECT MAX(timestamp)...`
-        # Current DB implementation only has `load_market_data`.
-        # We'll stick to loading DF for now (cache issue?)
-        # For performance, adding `get_last_timestamp` to DB is better.
-        # But let's use what we have.
-        df = self.db.load_market_data(symbol, "1h")
-        if not df.empty:
-            return df.index.max().to_pydatetime()
-        return None
+        # SELECT MAX(timestamp) instead of loading the whole series
+        last_ts = self.db.get_last_timestamp(symbol, "1h")
+        return last_ts.to_pydatetime() if last_ts is not None else None
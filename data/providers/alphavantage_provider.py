@@ -1,11 +1,12 @@
 import pandas as pd
-import requests
 import logging
 from typing import Optional
 from datetime import datetime, timedelta
-from config.settings import ALPHA_VANTAGE_API_KEY
+from config.settings import ALPHA_VANTAGE_API_KEY, ALPHA_VANTAGE_BASE_URL
 from data.interfaces import IDataProvider
-from core.utils import retry
+from data.utils.response_cache import cached_fetch
+from data.utils.rate_limiter import get_rate_limiter, retry_after_seconds
+from core import http
 
 logger = logging.getLogger("core.data.alphavantage")
 
@@ -15,9 +16,9 @@ class AlphaVantageProvider(IDataProvider):
     Note: Free tier has strict rate limits (5 calls/min).
     """
     
-    def __init__(self, api_key: str = ALPHA_VANTAGE_API_KEY):
+    def __init__(self, api_key: str = ALPHA_VANTAGE_API_KEY, base_url: str = ALPHA_VANTAGE_BASE_URL):
         self.api_key = api_key
-        self.base_url = "https://www.alphavantage.co/query"
+        self.base_url = base_url
 
     @property
     def name(self) -> str:
@@ -27,7 +28,7 @@ class AlphaVantageProvider(IDataProvider):
     def priority(self) -> int:
         return 3
 
-    @retry(Exception, tries=3, delay=1, logger=logger)
+    @cached_fetch
     def fetch_data(self, 
                    symbol: str, 
                    timeframe: str, 
@@ -59,10 +60,11 @@ class AlphaVantageProvider(IDataProvider):
                 params["function"] = "TIME_SERIES_DAILY_ADJUSTED"
 
             logger.info(f"Fetching {symbol} from AlphaVantage...")
-            response = requests.get(self.base_url, params=params, timeout=15)
+            response = http.get(self.base_url, params=params)
             
             if response.status_code == 429:
                 logger.warning(f"AlphaVantage rate limit hit for {symbol}, skipping to next provider")
+                get_rate_limiter().report_throttled(self.name, retry_after_seconds(response))
                 return None
             
             if response.status_code != 200:
@@ -76,6 +78,7 @@ class AlphaVantageProvider(IDataProvider):
             if "Note" in data:
                 # AlphaVantage returns "Note" when rate limit is hit
                 logger.warning(f"Alpha Vantage rate limit hit: {data['Note']}")
+                get_rate_limiter().report_throttled(self.name)
                 return None
             
             # Find the time series key (it varies)
@@ -5,6 +5,7 @@ from data.interfaces import IDataProvider
 from data.providers.yfinance_provider import YFinanceProvider
 from data.providers.twelvedata_provider import TwelveDataProvider
 from data.providers.polygon_provider import PolygonProvider
+from data.utils.response_cache import ResponseCache, get_response_cache
 
 logger = logging.getLogger("core.data.factory")
 
@@ -12,10 +13,15 @@ class DataProviderFactory:
     """
     Manages data providers.
     Implements the Chain of Responsibility pattern for failover.
+    
+    Providers share the on-disk response cache (DATA_CONFIG['RESPONSE_CACHE']),
+    so re-running a backfill does not re-download ranges already fetched.
+    Pass use_cache=False to always hit the APIs.
     """
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.providers: List[IDataProvider] = []
+        self.response_cache: Optional[ResponseCache] = get_response_cache() if use_cache else None
         self._register_defaults()
         
     def _register_defaults(self):
@@ -28,6 +34,8 @@ class DataProviderFactory:
         self.providers.sort(key=lambda p: p.priority)
         
     def register(self, provider: IDataProvider):
+        if self.response_cache is not None:
+            provider.response_cache = self.response_cache
         self.providers.append(provider)
         
     def get_data(self, symbol: str, timeframe: str, **kwargs) -> Optional[pd.DataFrame]:
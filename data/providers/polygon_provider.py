@@ -1,11 +1,12 @@
 import pandas as pd
-import requests
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from config.settings import POLYGON_API_KEY
+from config.settings import POLYGON_API_KEY, POLYGON_BASE_URL
 from data.interfaces import IDataProvider
-from core.utils import retry
+from data.utils.response_cache import cached_fetch
+from data.utils.rate_limiter import get_rate_limiter, retry_after_seconds
+from core import http
 
 logger = logging.getLogger("core.data.polygon")
 
@@ -14,9 +15,9 @@ class PolygonProvider(IDataProvider):
     High-quality Data Provider using Polygon.io.
     """
     
-    def __init__(self, api_key: str = POLYGON_API_KEY):
+    def __init__(self, api_key: str = POLYGON_API_KEY, base_url: str = POLYGON_BASE_URL):
         self.api_key = api_key
-        self.base_url = "https://api.polygon.io"
+        self.base_url = base_url
 
     @property
     def name(self) -> str:
@@ -26,7 +27,7 @@ class PolygonProvider(IDataProvider):
     def priority(self) -> int:
         return 1 # Highest priority
 
-    @retry(Exception, tries=3, delay=1, logger=logger)
+    @cached_fetch
     def fetch_data(self, 
                    symbol: str, 
                    timeframe: str, 
@@ -59,10 +60,11 @@ class PolygonProvider(IDataProvider):
             }
 
             logger.info(f"Fetching {symbol} from Polygon ({start_date} to {end_date})...")
-            response = requests.get(url, params=params, timeout=15)
+            response = http.get(url, params=params)
             
             if response.status_code == 429:
                 logger.warning(f"Polygon rate limit hit for {symbol}, skipping to next provider")
+                get_rate_limiter().report_throttled(self.name, retry_after_seconds(response))
                 return None
             
             if response.status_code != 200:
@@ -70,6 +72,7 @@ class PolygonProvider(IDataProvider):
                 # Check if error message contains rate limit info
                 if "exceeded the maximum requests" in error_text.lower():
                     logger.warning(f"Polygon rate limit exceeded for {symbol}")
+                    get_rate_limiter().report_throttled(self.name, retry_after_seconds(response))
                     return None
                 logger.error(f"Polygon API error: {error_text}")
                 return None
@@ -81,23 +84,28 @@ class PolygonProvider(IDataProvider):
                 logger.warning(f"No data returned from Polygon for {symbol}")
                 return None
             
-            df = pd.DataFrame(results)
-            
-            # Polygon Returns:
-            # v: volume, vw: vwap, o: open, c: close, h: high, l: low, t: timestamp, n: count
-            # Standardize
-            df.rename(columns={
-                "o": "Open", "h": "High", "l": "Low", 
-                "c": "Close", "v": "Volume", "t": "timestamp"
-            }, inplace=True)
-            
-            # Polygon timestamps are in ms UTC. Keep as UTC.
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
-            df.set_index('timestamp', inplace=True)
-            
-            required_cols = ["Open", "High", "Low", "Close", "Volume"]
-            return df[required_cols]
+            return self._results_to_df(results)
 
         except Exception as e:
             logger.error(f"Polygon fetch failed for {symbol}: {e}")
             return None
+
+    @staticmethod
+    def _results_to_df(results: List[Dict]) -> pd.DataFrame:
+        df = pd.DataFrame(results)
+        
+        # Polygon Returns:
+        # v: volume, vw: vwap, o: open, c: close, h: high, l: low, t: timestamp, n: count
+        # Standardize
+        df.rename(columns={
+            "o": "Open", "h": "High", "l": "Low", 
+            "c": "Close", "v": "Volume", "t": "timestamp"
+        }, inplace=True)
+        
+        # Polygon timestamps are in ms UTC. Keep as UTC.
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
+        df.set_index('timestamp', inplace=True)
+        df.sort_index(inplace=True)
+        
+        required_cols = ["Open", "High", "Low", "Close", "Volume"]
+        return df[required_cols]
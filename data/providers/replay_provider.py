@@ -0,0 +1,107 @@
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from core import clock
+from core.market_calendar import NY_TZ, get_session_calendar
+from data.interfaces import IDataProvider
+from data.resampler import daily_bar_date
+
+logger = logging.getLogger("core.data.replay")
+
+class ReplayProvider(IDataProvider):
+    """
+    Serves historical bars from a trading DB (read-only) as if they were
+    arriving live: only bars that have closed by the process clock
+    (core.clock) are returned. Used by `main.py replay`, with a simulated
+    clock, to run the live path against history.
+
+    - A bar closes at its start plus its timeframe, cut at the session close
+      (the last hourly bucket of a session ends at 16:00 ET); a daily bar
+      closes at its session close.
+    - Forming bars are never returned (the source only has final values), so
+      pre-alert scans see the last closed bar.
+    - Each (symbol, timeframe) series is read once and kept in memory.
+    """
+
+    def __init__(self, source_db: Path):
+        self.source_db = Path(source_db)
+        if not self.source_db.exists():
+            raise FileNotFoundError(f"Replay source DB not found: {self.source_db}")
+        self._conn = sqlite3.connect(f"file:{self.source_db}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], pd.DataFrame] = {}
+
+    @property
+    def name(self) -> str:
+        return "REPLAY"
+
+    @property
+    def priority(self) -> int:
+        return 0
+
+    def _load(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._series:
+                df = pd.read_sql_query(
+                    "SELECT timestamp, open, high, low, close, volume FROM market_data "
+                    "WHERE symbol = ? AND timeframe = ? AND (is_filled IS NULL OR is_filled = 0) "
+                    "ORDER BY timestamp ASC",
+                    self._conn, params=(symbol, timeframe))
+                df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True, format='mixed')
+                df = df.set_index('timestamp')
+                df = df[~df.index.duplicated(keep='last')]
+                df.columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+                df['closes_at'] = bar_close_times(df.index, timeframe)
+                self._series[key] = df
+            return self._series[key]
+
+    def fetch_data(self,
+                   symbol: str,
+                   timeframe: str,
+                   start_date: Optional[str] = None,
+                   end_date: Optional[str] = None,
+                   days_back: int = 30) -> Optional[pd.DataFrame]:
+        df = self._load(symbol, timeframe)
+        if df.empty:
+            return None
+        now = pd.Timestamp(clock.now())
+        start = pd.Timestamp(start_date, tz='UTC') if start_date else now - pd.Timedelta(days=days_back)
+        mask = (df.index >= start) & (df['closes_at'] <= now)
+        if end_date:
+            mask &= df.index < pd.Timestamp(end_date, tz='UTC') + pd.Timedelta(days=1)
+        df = df.loc[mask, ['Open', 'High', 'Low', 'Close', 'Volume']]
+        return df if not df.empty else None
+
+    def close(self):
+        self._conn.close()
+
+def bar_close_times(index: pd.DatetimeIndex, timeframe: str) -> pd.DatetimeIndex:
+    """
+    Time each bar of `index` (UTC starts) is final: start + timeframe, cut at
+    the session close; daily bars close with their session.
+    """
+    calendar = get_session_calendar()
+
+    def session_close(d):
+        bounds = calendar.session_bounds(d)
+        return bounds[1] if bounds is not None else pd.NaT
+
+    if timeframe == "1d":
+        dates = pd.Series([daily_bar_date(ts) for ts in index], index=index)
+        closes = pd.to_datetime(dates.map({d: session_close(d) for d in dates.unique()}), utc=True)
+        # Sessions the calendar does not know (e.g. ad-hoc closures) close at NY midnight
+        fallback = pd.to_datetime(pd.Series([pd.Timestamp(d).tz_localize(NY_TZ).tz_convert("UTC") + pd.Timedelta(days=1)
+                                           for d in dates], index=index), utc=True)
+        return pd.DatetimeIndex(closes.fillna(fallback))
+
+    ends = index + pd.Timedelta(timeframe)
+    dates = index.tz_convert(NY_TZ).date
+    closes = pd.DatetimeIndex(pd.to_datetime(pd.Series(dates).map({d: session_close(d) for d in set(dates)}), utc=True))
+    cut = (index < closes) & (ends > closes)
+    return pd.DatetimeIndex(ends.where(~cut, closes))
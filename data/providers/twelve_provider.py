@@ -1,11 +1,12 @@
 import pandas as pd
-import requests
 import logging
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 from datetime import datetime, timedelta
-from config.settings import TWELVE_DATA_API_KEY
+from config.settings import TWELVE_DATA_API_KEY, TWELVE_DATA_BASE_URL
 from data.interfaces import IDataProvider
-from core.utils import retry
+from data.utils.response_cache import cached_fetch
+from data.utils.rate_limiter import get_rate_limiter, retry_after_seconds
+from core import http
 
 logger = logging.getLogger("core.data.twelvedata")
 
@@ -14,9 +15,13 @@ class TwelveDataProvider(IDataProvider):
     Data Provider using Twelve Data.
     """
     
-    def __init__(self, api_key: str = TWELVE_DATA_API_KEY):
+    # Symbols per batch request. Twelve Data still charges one API credit per
+    # symbol, so batching saves round trips, not quota.
+    BATCH_SIZE = 8
+    
+    def __init__(self, api_key: str = TWELVE_DATA_API_KEY, base_url: str = TWELVE_DATA_BASE_URL):
         self.api_key = api_key
-        self.base_url = "https://api.twelvedata.com"
+        self.base_url = base_url
 
     @property
     def name(self) -> str:
@@ -26,7 +31,7 @@ class TwelveDataProvider(IDataProvider):
     def priority(self) -> int:
         return 2
 
-    @retry(Exception, tries=3, delay=1, logger=logger)
+    @cached_fetch
     def fetch_data(self, 
                    symbol: str, 
                    timeframe: str, 
@@ -59,10 +64,11 @@ class TwelveDataProvider(IDataProvider):
             url = f"{self.base_url}/time_series"
 
             logger.info(f"Fetching {symbol} from TwelveData ({interval})...")
-            response = requests.get(url, params=params, timeout=15)
+            response = http.get(url, params=params)
             
             if response.status_code == 429:
                 logger.warning(f"TwelveData rate limit hit for {symbol}, skipping to next provider")
+                get_rate_limiter().report_throttled(self.name, retry_after_seconds(response))
                 return None
             
             if response.status_code != 200:
@@ -75,6 +81,7 @@ class TwelveDataProvider(IDataProvider):
                 # Check for rate limit errors
                 if "API credits" in error_msg or "rate limit" in error_msg.lower():
                     logger.warning(f"Twelve Data rate limit: {error_msg}")
+                    get_rate_limiter().report_throttled(self.name)
                     return None
                 logger.error(f"Twelve Data Error: {error_msg}")
                 return None
@@ -84,26 +91,90 @@ class TwelveDataProvider(IDataProvider):
                 logger.warning(f"No data returned from TwelveData for {symbol}")
                 return None
             
-            df = pd.DataFrame(values)
-            
-            # Standardize
-            df.rename(columns={
-                "datetime": "timestamp",
-                "open": "Open", "high": "High", "low": "Low", 
-                "close": "Close", "volume": "Volume"
-            }, inplace=True)
-            
-            # Convert to numeric
-            cols = ["Open", "High", "Low", "Close", "Volume"]
-            for col in cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-            # Parse timestamps
-            df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
-            df.set_index('timestamp', inplace=True)
-            
-            return df[cols]
+            return self._values_to_df(values)
 
         except Exception as e:
             logger.error(f"TwelveData fetch failed for {symbol}: {e}")
             return None
+
+    @staticmethod
+    def _values_to_df(values: List[Dict]) -> pd.DataFrame:
+        df = pd.DataFrame(values)
+        
+        # Standardize
+        df.rename(columns={
+            "datetime": "timestamp",
+            "open": "Open", "high": "High", "low": "Low", 
+            "close": "Close", "volume": "Volume"
+        }, inplace=True)
+        
+        # Convert to numeric
+        cols = ["Open", "High", "Low", "Close", "Volume"]
+        for col in cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            
+        # Parse timestamps
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+        df.set_index('timestamp', inplace=True)
+        
+        return df[cols]
+
+    def supports_batch(self, timeframe: str) -> bool:
+        return True
+
+    def fetch_many(self,
+                   symbols: List[str],
+                   timeframe: str,
+                   since: Optional[str] = None,
+                   days_back: int = 30,
+                   throttle: Optional[Callable[[], None]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Batch time_series requests (comma-separated symbols, BATCH_SIZE per call).
+        `throttle` is applied once per symbol, matching Twelve Data's per-symbol
+        credit accounting.
+        """
+        if not self.api_key:
+            logger.debug("Twelve Data API Key not found, skipping...")
+            return {}
+        if len(symbols) < 2:
+            return super().fetch_many(symbols, timeframe, since, days_back, throttle)
+            
+        interval = "1h" if "h" in timeframe else "1day"
+        results = {}
+        for i in range(0, len(symbols), self.BATCH_SIZE):
+            chunk = list(symbols[i:i + self.BATCH_SIZE])
+            if throttle is not None:
+                for _ in chunk:
+                    throttle()
+            params = {
+                "symbol": ",".join(chunk),
+                "interval": interval,
+                "apikey": self.api_key,
+                "outputsize": 5000,
+                "order": "ASC",
+                "timezone": "UTC"
+            }
+            if since:
+                params["start_date"] = since
+            try:
+                logger.info(f"Fetching {len(chunk)} symbols from TwelveData ({interval}, batch)...")
+                response = http.get(f"{self.base_url}/time_series", params=params, timeout=30)
+                if response.status_code == 429:
+                    get_rate_limiter().report_throttled(self.name, retry_after_seconds(response))
+                if response.status_code != 200:
+                    logger.warning(f"TwelveData batch error ({response.status_code}): {response.text[:200]}")
+                    continue
+                data = response.json()
+            except Exception as e:
+                logger.error(f"TwelveData batch fetch failed: {e}")
+                continue
+                
+            if len(chunk) == 1:
+                data = {chunk[0]: data}
+            for symbol in chunk:
+                entry = data.get(symbol) or {}
+                if entry.get("status") == "error" or not entry.get("values"):
+                    logger.debug(f"No batch data from TwelveData for {symbol}: {entry.get('message', '')}")
+                    continue
+                results[symbol] = self._values_to_df(entry["values"])
+        return results
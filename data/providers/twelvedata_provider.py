@@ -1,10 +1,11 @@
 import pandas as pd
-import requests
 import logging
 import os
 from typing import Optional
 from data.interfaces import IDataProvider
-from config.settings import TWELVE_DATA_API_KEY
+from data.utils.response_cache import cached_fetch
+from config.settings import TWELVE_DATA_API_KEY, TWELVE_DATA_BASE_URL
+from core import http
 
 logger = logging.getLogger("core.data.twelvedata")
 
@@ -15,7 +16,7 @@ class TwelveDataProvider(IDataProvider):
     
     def __init__(self):
         self.api_key = TWELVE_DATA_API_KEY
-        self.base_url = "https://api.twelvedata.com"
+        self.base_url = TWELVE_DATA_BASE_URL
         
     @property
     def name(self) -> str:
@@ -25,6 +26,7 @@ class TwelveDataProvider(IDataProvider):
     def priority(self) -> int:
         return 2
 
+    @cached_fetch
     def fetch_data(self, 
                    symbol: str, 
                    timeframe: str, 
@@ -51,7 +53,7 @@ class TwelveDataProvider(IDataProvider):
             # using 'outputsize' to get recent history.
             endpoint = f"{self.base_url}/time_series?symbol={symbol}&interval={interval}&apikey={self.api_key}&outputsize=500"
             
-            response = requests.get(endpoint, timeout=15)
+            response = http.get(endpoint)
             data = response.json()
             
             if "values" not in data:
@@ -1,10 +1,9 @@
-import yfinance as yf
 import pandas as pd
 import logging
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 from datetime import timedelta
 from data.interfaces import IDataProvider
-from core.utils import retry
+from data.utils.response_cache import cached_fetch
 
 logger = logging.getLogger("core.data.yfinance")
 
@@ -21,7 +20,7 @@ class YFinanceProvider(IDataProvider):
     def priority(self) -> int:
         return 10 # Fallback
 
-    @retry(Exception, tries=3, delay=2, backoff=2, logger=logger)
+    @cached_fetch
     def fetch_data(self, 
                    symbol: str, 
                    timeframe: str, 
@@ -40,6 +39,7 @@ class YFinanceProvider(IDataProvider):
                 # but 'Xd' works for some inputs. Better to force max or calc dates if critical.
                 # However, yf.download accepts start/end more reliably.
                 
+            import yfinance as yf  # Fallback provider: pay the (large) import only when used
             ticker = yf.Ticker(symbol)
             
             # Use 'max' if days > 60 and timeframe is small? 
@@ -78,3 +78,54 @@ class YFinanceProvider(IDataProvider):
         except Exception as e:
             logger.error(f"YFinance fetch failed for {symbol}: {e}")
             return None
+
+    def supports_batch(self, timeframe: str) -> bool:
+        return True
+
+    def fetch_many(self,
+                   symbols: List[str],
+                   timeframe: str,
+                   since: Optional[str] = None,
+                   days_back: int = 30,
+                   throttle: Optional[Callable[[], None]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Multi-ticker download: one yf.download call for all symbols.
+        """
+        if len(symbols) < 2:
+            return super().fetch_many(symbols, timeframe, since, days_back, throttle)
+        try:
+            import yfinance as yf
+            if throttle is not None:
+                throttle()
+            logger.info(f"Fetching {len(symbols)} symbols from YFinance ({timeframe}, batch)...")
+            data = yf.download(
+                tickers=list(symbols),
+                period=None if since else (f"{days_back}d" if days_back else "1mo"),
+                interval=timeframe,
+                start=since,
+                prepost=True,  # Extended hours
+                auto_adjust=False,
+                actions=False,
+                group_by="ticker",
+                threads=True,
+                progress=False
+            )
+        except Exception as e:
+            logger.error(f"YFinance batch fetch failed: {e}")
+            return {}
+            
+        if data is None or data.empty:
+            return {}
+            
+        required_cols = ["Open", "High", "Low", "Close", "Volume"]
+        tickers = set(data.columns.get_level_values(0))
+        results = {}
+        for symbol in symbols:
+            if symbol not in tickers:
+                continue
+            df = data[symbol][required_cols].dropna(how="all")
+            if df.empty:
+                continue
+            df.index = df.index.tz_localize("UTC") if df.index.tz is None else df.index.tz_convert("UTC")
+            results[symbol] = df
+        return results
@@ -1,15 +1,17 @@
 import logging
 import time
-from datetime import datetime, timedelta
 from typing import List, Optional
 import pandas as pd
 
-from config.settings import SYMBOLS
+from config.settings import DATA_CONFIG, SYMBOLS
+from core import clock
+from core.market_calendar import get_session_calendar
 from data.providers.factory import DataProviderFactory
 from data.storage.database import Database
 from data.quality.detector import GapDetector, Gap
+from data.quality.gaps import epoch_ns
 from data.quality.repair import GapRepair
-from data.interfaces import Candle
+from data.ingest import DeltaIngestor
 
 logger = logging.getLogger("core.data.quality.continuous")
 
@@ -22,8 +24,11 @@ class ContinuousCollector:
     def __init__(self):
         self.provider_factory = DataProviderFactory()
         self.db = Database()
-        self.detector = GapDetector()
-        self.repair = GapRepair()
+        self.ingestor = DeltaIngestor(self.db)
+        calendar = get_session_calendar()
+        extended_hours = DATA_CONFIG.get("EXTENDED_HOURS_BARS", False)
+        self.detector = GapDetector(calendar=calendar, extended_hours=extended_hours)
+        self.repair = GapRepair(calendar=calendar, extended_hours=extended_hours)
         self.symbols = SYMBOLS
         
     def run_cycle(self):
@@ -53,38 +58,28 @@ class ContinuousCollector:
             logger.warning(f"No data fetched for {symbol}")
             return
 
-        # 2. Detect Gaps
-        gaps = self.detector.detect_gaps(df, symbol, expected_interval_minutes=60)
+        # 2. Detect Gaps (only after the gap watermark; the stored prefix is verified)
+        watermark = self.db.get_gap_watermark(symbol, "1h")
+        times = epoch_ns(df.index)
+        check = df if watermark is None else df[times >= watermark.value]
+        gaps = self.detector.detect_gaps(check, symbol, expected_interval_minutes=60)
         
         if gaps:
             logger.info(f"Found {len(gaps)} gaps for {symbol}")
             # 3. Repair Gaps
-            df = self.repair.fill_gaps(df, gaps)
+            repaired = self.repair.fill_gaps(check, gaps, freq="1h")
+            df = pd.concat([df[~df.index.isin(check.index)], repaired]).sort_index()
             
-        # 4. Convert and Store
-        candles = []
-        for index, row in df.iterrows():
-            candles.append(Candle(
-                timestamp=index.to_pydatetime(),
-                open=row['Open'],
-                high=row['High'],
-                low=row['Low'],
-                close=row['Close'],
-                volume=row['Volume']
-            ))
-            
-        # Store (Upsert)
-        # Note: Optimization - only store new or changed candles? 
-        # For now, bulk saving 30 days every cycle is heavy. 
-        # Ideally we only save the last X candles or the repaired ones.
-        # But this ensures the DB is always in sync with the "Repaired" reality.
-        # Let's limit to last 5 days for efficiency in this loop unless backfilling.
-        
-        recent_cutoff = datetime.now(df.index.tz) - timedelta(days=5)
-        recent_candles = [c for c in candles if c.timestamp >= recent_cutoff]
+        # 4. Store new or changed bars only (the 30-day window overlaps stored history)
+        result = self.ingestor.ingest(symbol, "1h", df, source="YFINANCE")
+        logger.info(f"Saved {result.written} candles for {symbol} "
+                    f"({result.inserted} new, {result.updated} changed, {result.unchanged} unchanged)")
         
-        self.db.save_bulk_candles(symbol, "1h", recent_candles)
-        logger.info(f"Saved {len(recent_candles)} candles for {symbol}")
+        # 5. The window reached back into the verified prefix, so it is contiguous up to its
+        #    last bar (unless the ingest inserted older bars and rewound the watermark)
+        if (watermark is not None and times[0] <= watermark.value and len(check)
+                and self.db.get_gap_watermark(symbol, "1h") == watermark):
+            self.db.save_gap_watermark(symbol, "1h", check.index[-1], checked_at=clock.now())
 
 if __name__ == "__main__":
     # Simple standalone run
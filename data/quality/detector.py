@@ -7,6 +7,10 @@ from dataclasses import dataclass, field
 from enum import Enum
 import pytz
 
+from core.market_calendar import SessionCalendar
+from data.quality.gaps import NS_PER_MINUTE, calendar_gaps, epoch_ns, find_gaps
+from data.quality.validator import bar_flags
+
 # Use new core logger
 logger = logging.getLogger("core.data.quality.detector")
 
@@ -79,9 +83,15 @@ class DataQualityReport:
 class GapDetector:
     """
     Main Gap Detector Logic
+
+    With a `calendar` (SessionCalendar), gaps are missing bars the exchange
+    should have produced (session grid, holidays, early closes, optionally
+    extended hours), so overnight and weekend intervals are not reported.
     """
     
-    def __init__(self):
+    def __init__(self, calendar: Optional[SessionCalendar] = None, extended_hours: bool = False):
+        self.calendar = calendar
+        self.extended_hours = extended_hours
         self.config = {
             'MIN_GAP_MINUTES': 30, # More strict than legacy (60)
             'OVERNIGHT_GAP_HOURS': [20, 4],
@@ -102,30 +112,42 @@ class GapDetector:
             data.index = pd.to_datetime(data.index)
         
         data_sorted = data.sort_index()
-        gaps = []
-        min_gap = self.config['MIN_GAP_MINUTES']
+        times = epoch_ns(data_sorted.index)
+        if self.calendar is not None:
+            expected = self.calendar.expected_bar_spans(
+                pd.Timestamp(times[0], tz='UTC'), pd.Timestamp(times[-1], tz='UTC'),
+                expected_interval_minutes, self.extended_hours)
+            positions, next_positions, _, _ = calendar_gaps(times, *expected,
+                                                          bar_ns=expected_interval_minutes * NS_PER_MINUTE)
+        else:
+            # A regular step is never a gap, whatever MIN_GAP_MINUTES says
+            threshold = max(self.config['MIN_GAP_MINUTES'], expected_interval_minutes)
+            positions = find_gaps(times, threshold)
+            next_positions = positions + 1
+        if len(positions) == 0:
+            return []
+        
+        starts = data_sorted.index[positions]
+        ends = data_sorted.index[next_positions]
+        durations = (times[next_positions] - times[positions]) / NS_PER_MINUTE
+        gap_types, severities = self._classify(starts, durations, expected_interval_minutes)
         
-        # Calculate time diffs
-        time_diffs = data_sorted.index.to_series().diff()
+        # Price change across the gap: Close before -> Open after
+        before = data_sorted['Close'].to_numpy(dtype=float)[positions]
+        after = data_sorted['Open'].to_numpy(dtype=float)[next_positions]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(before != 0, (after - before) / before * 100, 0.0)
         
-        for i, diff in enumerate(time_diffs[1:], 1):
-            if pd.notna(diff):
-                gap_minutes = diff.total_seconds() / 60
-                
-                if gap_minutes > min_gap:
-                    # Found a gap
-                    gap_start = data_sorted.index[i-1]
-                    gap_end = data_sorted.index[i]
-                    
-                    # Create Gap Object
-                    gap = self._create_gap(
-                        symbol, gap_start, gap_end, gap_minutes,
-                        data_sorted.iloc[i-1], data_sorted.iloc[i],
-                        expected_interval_minutes
-                    )
-                    gaps.append(gap)
-                    
-        return gaps
+        return [
+            Gap(
+                symbol=symbol,
+                start_time=start, end_time=end, duration_minutes=float(duration),
+                gap_type=gap_type, severity=severity,
+                before_price=float(p_before), after_price=float(p_after), price_change_pct=float(change)
+            )
+            for start, end, duration, gap_type, severity, p_before, p_after, change
+            in zip(starts, ends, durations, gap_types, severities, before, after, pct)
+        ]
 
     def analyze_quality(self, data: pd.DataFrame, symbol: str, 
                        expected_interval_minutes: int = 15) -> DataQualityReport:
@@ -140,8 +162,12 @@ class GapDetector:
         start = data.index.min()
         end = data.index.max()
         
-        total_minutes = (end - start).total_seconds() / 60
-        expected_points = int(total_minutes / expected_interval_minutes)
+        if self.calendar is not None:
+            expected_points = len(self.calendar.expected_bars(start, end, expected_interval_minutes,
+                                                              self.extended_hours))
+        else:
+            total_minutes = (end - start).total_seconds() / 60
+            expected_points = int(total_minutes / expected_interval_minutes)
         actual_points = len(data)
         
         completeness = min(100.0, (actual_points / max(1, expected_points)) * 100)
@@ -150,9 +176,10 @@ class GapDetector:
         max_gap = max([g.duration_minutes for g in gaps], default=0) / 60
         avg_gap = np.mean([g.duration_minutes for g in gaps]) if gaps else 0
         
-        # Simple anomaly check
-        price_anomalies = 0 # Implement robust check later if needed
-        volume_anomalies = 0
+        # Bar-level anomalies, same rules as the DataValidator checks
+        flags = bar_flags(data.sort_index())
+        price_anomalies = int((flags['price_jump'] | flags['wide_range']).sum())
+        volume_anomalies = int((flags['zero_volume'] | flags['negative_volume'] | flags['volume_spike']).sum())
         
         # Score calculation (Simplified from legacy)
         score = 100 - (len(gaps) * 2) - (max_gap / 24 * 5)
@@ -177,32 +204,21 @@ class GapDetector:
             recommended_actions=[]
         )
 
-    def _create_gap(self, symbol, start, end, duration, before, after, interval) -> Gap:
-        # Determine Type
-        gap_type = GapType.UNKNOWN_GAP
-        if duration > self.config['WEEKEND_GAP_HOURS'] * 60:
-            gap_type = GapType.WEEKEND_GAP
-        elif duration < 4 * 60:
-            gap_type = GapType.SMALL_GAP
-        else:
-            # Check overnight logic simplified
-            if start.hour >= 20 or start.hour < 4:
-                gap_type = GapType.OVERNIGHT_GAP
-        
-        # Determine Severity
-        severity = GapSeverity.MEDIUM
-        intervals_lost = duration / interval
-        if intervals_lost < 4: severity = GapSeverity.LOW
-        elif intervals_lost > 24: severity = GapSeverity.HIGH
-        
-        # Price change
-        p_before = float(before['Close'])
-        p_after = float(after['Open'])
-        pct = ((p_after - p_before) / p_before) * 100 if p_before else 0
+    def _classify(self, starts: pd.DatetimeIndex, durations: np.ndarray,
+                  interval: int) -> Tuple[List[GapType], List[GapSeverity]]:
+        """Gap type and severity of every gap (arrays in, one label per gap out)."""
+        hours = starts.hour.to_numpy()
+        overnight = (hours >= 20) | (hours < 4)
+        gap_types = np.select(
+            [durations > self.config['WEEKEND_GAP_HOURS'] * 60, durations < 4 * 60, overnight],
+            [GapType.WEEKEND_GAP, GapType.SMALL_GAP, GapType.OVERNIGHT_GAP],
+            default=GapType.UNKNOWN_GAP
+        )
         
-        return Gap(
-            symbol=symbol,
-            start_time=start, end_time=end, duration_minutes=duration,
-            gap_type=gap_type, severity=severity,
-            before_price=p_before, after_price=p_after, price_change_pct=pct
+        intervals_lost = durations / interval
+        severities = np.select(
+            [intervals_lost < 4, intervals_lost > 24],
+            [GapSeverity.LOW, GapSeverity.HIGH],
+            default=GapSeverity.MEDIUM
         )
+        return list(gap_types), list(severities)
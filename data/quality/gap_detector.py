@@ -1,11 +1,20 @@
 import pandas as pd
+import numpy as np
 import logging
 from typing import List, Optional
-from datetime import timedelta
 from dataclasses import dataclass
 
+from core.market_calendar import SessionCalendar
+from data.quality.gaps import NS_PER_MINUTE, calendar_gaps, epoch_ns, fill_times, find_gaps
+
 logger = logging.getLogger("core.data.quality.gap_detector")
 
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Simple rule: < 72 hours (weekend) is fillable.
+# > 72 hours might be missing data chunks.
+MAX_FILLABLE_MINUTES = 72 * 60
+
 @dataclass
 class Gap:
     symbol: str
@@ -15,17 +24,24 @@ class Gap:
     
     @property
     def is_fillable(self) -> bool:
-        # Simple rule: < 72 hours (weekend) is fillable.
-        # > 72 hours might be missing data chunks.
-        return self.duration_minutes < (72 * 60)
+        return self.duration_minutes < MAX_FILLABLE_MINUTES
 
 class GapDetector:
     """
     Detects gaps in time-series data.
+
+    With a `calendar` (SessionCalendar), only bars the exchange should have
+    produced are considered: overnight, weekend and holiday intervals are
+    not gaps, and fills land on the expected bar grid (session-open
+    anchored, see SessionCalendar.expected_bar_spans). Without one, any step
+    larger than 1.5 intervals is a gap.
     """
     
-    def __init__(self, expected_interval_minutes: int = 60):
+    def __init__(self, expected_interval_minutes: int = 60, calendar: Optional[SessionCalendar] = None,
+                 extended_hours: bool = False):
         self.interval = expected_interval_minutes
+        self.calendar = calendar
+        self.extended_hours = extended_hours
 
     def detect_gaps(self, df: pd.DataFrame, symbol: str) -> List[Gap]:
         """
@@ -34,51 +50,64 @@ class GapDetector:
         """
         if df.empty or len(df) < 2:
             return []
-            
-        gaps = []
-        
-        # Calculate time diffs
-        # Shift index to compare current with previous
-        # We need to sort just in case
+
+        index = df.index.sort_values()
+        times = epoch_ns(index)
+        before, after, _, _ = self._scan(times)
+        durations = (times[after] - times[before]) / NS_PER_MINUTE
+
+        return [
+            Gap(symbol=symbol, start_time=index[i], end_time=index[j], duration_minutes=float(d))
+            for i, j, d in zip(before, after, durations)
+        ]
+
+    def fill_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Forward-fill bars for every fillable gap of `df` (OHLCV, DatetimeIndex):
+        one bar per missing interval (per missing expected bar with a
+        calendar), all prices at the Close before the gap and Volume 0.
+        Returns an empty frame when there is nothing to fill.
+        """
+        if df.empty or len(df) < 2:
+            return pd.DataFrame(columns=OHLCV)
+
         df = df.sort_index()
-        
-        # Series of timestamps
-        timestamps = df.index.to_series()
-        diffs = timestamps.diff()
-        
-        # Threshold: 2 * interval (buffer for small glitches)
-        # For 1H data, gap if diff > 65 min? No, normally exactly 60.
-        # But allow minimal jitter. 
-        # Actually, let's say gap if > 1.1 * interval.
-        threshold = timedelta(minutes=self.interval * 1.5)
-        
-        for i, delta in enumerate(diffs):
-            if pd.isna(delta):
-                continue
-                
-            if delta > threshold:
-                gap_end = timestamps.iloc[i]     # Current candle time
-                gap_start = timestamps.iloc[i-1] # Previous candle time
-                
-                # Check if it's just overnight/weekend?
-                # For Crypto (24/7) any gap is bad.
-                # For Stocks, overnight gaps are normal if we only have market hours.
-                # IF the data is supposed to include extended hours or we are 24/7, then logic differs.
-                # Assuming Market Hours specific logic is handled by "Business Days" or ignored for now 
-                # and we rely on 'fill' logic which fills forward.
-                
-                duration_min = delta.total_seconds() / 60
-                
-                # Filter out normal overnight gap (e.g. 16:00 to 09:30 = 17.5 hours = 1050 min)
-                # Filter out weekend gap (Friday 16:00 to Mon 09:30 = ~65 hours)
-                # If we want to FILL these gaps for continuity (indicators often need continuity),
-                # we return them as gaps to be filled.
-                
-                gaps.append(Gap(
-                    symbol=symbol,
-                    start_time=gap_start,
-                    end_time=gap_end,
-                    duration_minutes=duration_min
-                ))
-                
-        return gaps
+        times = epoch_ns(df.index)
+        before, after, fill, owners = self._scan(times)
+        fillable = (times[after] - times[before]) < MAX_FILLABLE_MINUTES * NS_PER_MINUTE
+        keep = fillable[owners]
+        fill, owners = fill[keep], owners[keep]
+        if len(fill) == 0:
+            return pd.DataFrame(columns=OHLCV)
+
+        prices = df['Close'].to_numpy(dtype=float)[before][owners]
+        index = pd.DatetimeIndex(fill.view('datetime64[ns]')).tz_localize('UTC')
+        if df.index.tz is None:
+            index = index.tz_localize(None)
+        return pd.DataFrame({'Open': prices, 'High': prices, 'Low': prices, 'Close': prices,
+                             'Volume': np.zeros(len(fill))}, index=index)
+
+    def unexpected_rows(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Boolean mask of the rows of `df` (sorted) that are not on the expected
+        bar grid. Always all False without a calendar.
+        """
+        if self.calendar is None or df.empty:
+            return np.zeros(len(df), dtype=bool)
+        times = epoch_ns(df.index)
+        starts, _ = self._expected(times)
+        return ~np.isin(times, starts)
+
+    def _expected(self, times: np.ndarray):
+        return self.calendar.expected_bar_spans(pd.Timestamp(times[0], tz='UTC'), pd.Timestamp(times[-1], tz='UTC'),
+                                                self.interval, self.extended_hours)
+
+    def _scan(self, times: np.ndarray):
+        """(before, after, fill, owners): positions around each gap, missing bar times and their gap."""
+        if self.calendar is not None:
+            return calendar_gaps(times, *self._expected(times), bar_ns=self.interval * NS_PER_MINUTE)
+        # Gap if the step exceeds 1.5 intervals (allows minimal jitter)
+        before = find_gaps(times, self.interval * 1.5)
+        after = before + 1
+        fill, owners = fill_times(times[before], times[after], self.interval)
+        return before, after, fill, owners
@@ -0,0 +1,126 @@
+"""
+Vectorized Gap Scan
+===================
+Array core shared by the gap detectors (data.quality.gap_detector,
+data.quality.detector) and the gap filler (DataManager.resolve_gaps).
+
+Bar times are handled as int64 epoch nanoseconds:
+
+- `find_gaps` diffs the sorted epoch array once and returns the positions
+  where the step exceeds a threshold, so a gap-free series costs one
+  np.diff and one comparison regardless of its length.
+- `fill_times` generates the missing bar times of many gaps at once
+  (np.repeat of the gap starts plus per-gap step offsets).
+- `calendar_gaps` compares the series with the bars the exchange calendar
+  says should exist (SessionCalendar.expected_bar_spans), so overnight,
+  weekend and holiday intervals are never gaps and only expected bars are
+  filled. An expected bar is covered by any stored bar overlapping it
+  (`covered_spans`), so series stamped on another grid (hour-aligned 15:00
+  bars against the 09:30-anchored [15:30, 16:00) bar) have no false gaps.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def epoch_ns(index) -> np.ndarray:
+    """
+    int64 epoch nanoseconds of a DatetimeIndex (naive times are read as UTC,
+    tz-aware ones are converted), in index order.
+    """
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC")
+    return idx.as_unit("ns").asi8
+
+
+def find_gaps(times: np.ndarray, threshold_minutes: float) -> np.ndarray:
+    """
+    Positions `i` of the sorted `times` (epoch ns) where the step to the next
+    bar, times[i + 1] - times[i], is larger than `threshold_minutes`.
+    """
+    if len(times) < 2:
+        return np.empty(0, dtype=np.int64)
+    steps = np.diff(times)
+    return np.flatnonzero(steps > threshold_minutes * NS_PER_MINUTE)
+
+
+def fill_times(starts: np.ndarray, ends: np.ndarray, step_minutes: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Missing bar times of several gaps: starts[g] + k * step for k >= 1 while
+    strictly before ends[g].
+
+    Args:
+        starts: Epoch ns of the last bar before each gap.
+        ends: Epoch ns of the first bar after each gap.
+        step_minutes: Bar interval.
+
+    Returns:
+        (times, owners): the fill times (epoch ns, ascending per gap) and the
+        index of the gap each one belongs to.
+    """
+    step = int(step_minutes * NS_PER_MINUTE)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    counts = np.maximum((ends - starts - 1) // step, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    owners = np.repeat(np.arange(len(starts)), counts)
+    # k = 1..counts[g] within each gap
+    first = np.cumsum(counts) - counts
+    k = np.arange(total) - np.repeat(first, counts) + 1
+    return starts[owners] + k * step, owners
+
+
+def covered_spans(times: np.ndarray, starts: np.ndarray, ends: np.ndarray, bar_ns: int = 0) -> np.ndarray:
+    """
+    Whether a bar of the sorted `times` (epoch ns) covers each span
+    [starts, ends): one starts inside it or, given the bar length `bar_ns`,
+    one starting earlier still overlaps it.
+    """
+    if len(times) == 0:
+        return np.zeros(len(starts), dtype=bool)
+    # Last bar starting before the span end; earlier bars end earlier
+    last = np.searchsorted(times, ends, side='left') - 1
+    return (last >= 0) & (times[np.maximum(last, 0)] + max(int(bar_ns), 1) > starts)
+
+
+def calendar_gaps(times: np.ndarray, expected_starts: np.ndarray, expected_ends: np.ndarray,
+                  bar_ns: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gaps of the sorted `times` (epoch ns) against the expected bars
+    [expected_starts, expected_ends) between the first and the last bar.
+
+    An expected bar is missing when no stored bar overlaps its span (see
+    covered_spans; `bar_ns` is the stored bars' length), so bars stamped off
+    the grid (e.g. 10:00 instead of 10:30) still count. Consecutive missing
+    bars form one gap.
+
+    Returns:
+        (before, after, missing, owners): per gap, the positions in `times`
+        of the bars around it; the start times of the missing bars and the
+        gap each one belongs to.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(times) < 2 or len(expected_starts) == 0:
+        return empty, empty, empty, empty
+
+    inside = (expected_starts > times[0]) & (expected_starts < times[-1])
+    starts, ends = expected_starts[inside], expected_ends[inside]
+    pos = np.searchsorted(times, starts, side='left')
+    missing_at = np.flatnonzero(~covered_spans(times, starts, ends, bar_ns))
+    if len(missing_at) == 0:
+        return empty, empty, empty, empty
+
+    # Runs of consecutive expected bars
+    new_run = np.r_[True, np.diff(missing_at) != 1]
+    owners = np.cumsum(new_run) - 1
+    first, last = missing_at[new_run], missing_at[np.r_[new_run[1:], True]]
+    before = pos[first] - 1
+    after = np.searchsorted(times, ends[last], side='left')
+    return before, after, starts[missing_at], owners
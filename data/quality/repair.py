@@ -2,15 +2,25 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import List, Optional
+from pandas.tseries.frequencies import to_offset
+from core.market_calendar import SessionCalendar
 from data.quality.detector import Gap, GapType, GapSeverity
+from data.quality.gaps import NS_PER_MINUTE, calendar_gaps, epoch_ns
 
 logger = logging.getLogger("core.data.quality.repair")
 
 class GapRepair:
     """
     Handles filling of data gaps.
+
+    With a `calendar` (SessionCalendar), only the bars the exchange should
+    have produced are added (no overnight, weekend or holiday rows).
     """
     
+    def __init__(self, calendar: Optional[SessionCalendar] = None, extended_hours: bool = False):
+        self.calendar = calendar
+        self.extended_hours = extended_hours
+    
     def fill_gaps(self, data: pd.DataFrame, gaps: List[Gap], freq: str = None) -> pd.DataFrame:
         """
         Fill gaps in the DataFrame.
@@ -38,8 +48,24 @@ class GapRepair:
         logger.info(f"Filling gaps using frequency: {freq}")
             
         # Create full index
-        full_idx = pd.date_range(start=df.index.min(), end=df.index.max(), freq=freq)
+        if self.calendar is not None:
+            # Add the expected bars no stored bar covers
+            df = df.sort_index()
+            minutes = int(pd.Timedelta(to_offset(freq)).total_seconds() // 60)
+            times = epoch_ns(df.index)
+            expected = self.calendar.expected_bar_spans(df.index.min(), df.index.max(), minutes, self.extended_hours)
+            _, _, missing, _ = calendar_gaps(times, *expected, bar_ns=minutes * NS_PER_MINUTE)
+            missing = pd.to_datetime(missing, unit='ns', utc=True)
+            missing = missing.tz_localize(None) if df.index.tz is None else missing.tz_convert(df.index.tz)
+            full_idx = df.index.union(missing)
+        else:
+            full_idx = pd.date_range(start=df.index.min(), end=df.index.max(), freq=freq)
         df_filled = df.reindex(full_idx)
+        # Added rows are synthetic (DeltaIngestor never lets them replace real bars)
+        added = ~full_idx.isin(df.index)
+        if 'is_filled' in df_filled.columns:
+            added |= df_filled['is_filled'].fillna(0).astype(bool).to_numpy()
+        df_filled['is_filled'] = added
         
         # Now fill based on strategies
         for gap in gaps:
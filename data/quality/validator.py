@@ -0,0 +1,657 @@
+"""
+Vectorized Data Quality Validator
+=================================
+Scores OHLCV series before they are used for backtesting or live signals
+(port of the legacy DataValidator). Per symbol it checks:
+
+- COMPLETENESS: real (not forward-filled) bars vs the bars expected between
+  the first and the last bar (session calendar grid, or a fixed interval;
+  daily and longer intervals step over weekends).
+- GAPS_ANALYSIS: runs of missing bars; runs of CRITICAL_GAP_MINUTES (daily
+  series: CRITICAL_GAP_DAYS weekdays) or more are critical.
+- OHLC_CONSISTENCY: bars with missing or non-positive prices, High < Low, or
+  High/Low not enclosing Open and Close.
+- PRICE_ANOMALIES: close-to-close moves above MAX_CLOSE_CHANGE and
+  intrabar ranges above MAX_BAR_RANGE.
+- VOLUME_VALIDATION: zero or negative volume on real bars, and spikes above
+  VOLUME_SPIKE_FACTOR x the series median.
+- TEMPORAL_CONTINUITY: ordering, duplicate timestamps and the share of bar
+  steps that are not gaps.
+- EXTENDED_HOURS, MARKET_SESSIONS (EXTENDED level only): pre/post-market
+  coverage, bars outside any session and sessions without bars.
+
+Each check yields a status and a 0-100 score (legacy formulas and per-level
+thresholds); the weighted mean is the overall score. With a calendar, bars
+outside the session grid are counted but left out of the other checks.
+
+`validate_many` validates a batch of symbols together: per-bar flags are
+computed on one stacked frame and reduced per symbol with np.bincount, and
+statuses and scores are computed for all symbols at once. Only the
+calendar-grid comparison runs per symbol (one searchsorted each).
+
+Reports are persisted in the `data_quality` table with the stored series'
+(bar count, last bar), so loaders reuse a score until bars are added or
+removed (DeltaIngestor drops the report when it rewrites stored bars).
+"""
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_CONFIG
+from core import clock
+from core.market_calendar import NY_TZ, SessionCalendar, get_session_calendar
+from data.quality.gaps import NS_PER_MINUTE, calendar_gaps, covered_spans, epoch_ns, find_gaps
+from data.resampler import BASE_PERIOD_MINUTES, BUCKET_MINUTES
+
+logger = logging.getLogger("core.data.quality.validator")
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Intraday timeframes a validator can be configured for (minutes per bar)
+TIMEFRAME_MINUTES = {**BASE_PERIOD_MINUTES, **BUCKET_MINUTES}
+
+# Bar-level anomaly limits (legacy values)
+MAX_CLOSE_CHANGE = 0.20      # |Close / previous Close - 1|
+MAX_BAR_RANGE = 0.15         # High / Low - 1
+VOLUME_SPIKE_FACTOR = 20     # x median volume of the series
+FLAT_CLOSE_WARN_PCT = 10.0   # Share of unchanged closes reported as a possible feed freeze
+CRITICAL_GAP_MINUTES = 4 * 60
+CRITICAL_GAP_DAYS = 3        # Missing weekdays; a single holiday is not critical
+DAY_MINUTES = 1440
+
+# Timeframes validated on a fixed interval, without the intraday session grid
+FIXED_TIMEFRAME_MINUTES = {'1d': DAY_MINUTES, 'session': DAY_MINUTES}
+
+
+class ValidationLevel(Enum):
+    BASIC = "BASIC"
+    STANDARD = "STANDARD"
+    STRICT = "STRICT"
+    EXTENDED = "EXTENDED"   # Validates the extended-hours grid, adds session checks
+
+
+class ValidationStatus(Enum):
+    """Check outcome, in increasing severity."""
+    PASSED = "PASSED"
+    WARNING = "WARNING"
+    FAILED = "FAILED"
+    CRITICAL = "CRITICAL"
+
+
+_STATUSES = list(ValidationStatus)
+PASSED, WARNING, FAILED, CRITICAL = range(4)
+
+
+class ValidationType(Enum):
+    COMPLETENESS = "COMPLETENESS"
+    GAPS_ANALYSIS = "GAPS_ANALYSIS"
+    OHLC_CONSISTENCY = "OHLC_CONSISTENCY"
+    PRICE_ANOMALIES = "PRICE_ANOMALIES"
+    VOLUME_VALIDATION = "VOLUME_VALIDATION"
+    TEMPORAL_CONTINUITY = "TEMPORAL_CONTINUITY"
+    EXTENDED_HOURS = "EXTENDED_HOURS"
+    MARKET_SESSIONS = "MARKET_SESSIONS"
+
+
+LEVEL_THRESHOLDS = {
+    ValidationLevel.BASIC: {
+        'min_completeness_pct': 85.0, 'max_critical_gaps': 10, 'min_ohlc_consistency': 90.0,
+        'max_price_anomalies_pct': 5.0, 'max_volume_anomalies_pct': 10.0, 'min_overall_score': 70.0,
+    },
+    ValidationLevel.STANDARD: {
+        'min_completeness_pct': 92.0, 'max_critical_gaps': 5, 'min_ohlc_consistency': 95.0,
+        'max_price_anomalies_pct': 2.0, 'max_volume_anomalies_pct': 5.0, 'min_overall_score': 80.0,
+    },
+    ValidationLevel.STRICT: {
+        'min_completeness_pct': 98.0, 'max_critical_gaps': 2, 'min_ohlc_consistency': 98.0,
+        'max_price_anomalies_pct': 1.0, 'max_volume_anomalies_pct': 2.0, 'min_overall_score': 90.0,
+    },
+    ValidationLevel.EXTENDED: {
+        'min_completeness_pct': 95.0, 'max_critical_gaps': 3, 'min_ohlc_consistency': 96.0,
+        'max_price_anomalies_pct': 1.5, 'max_volume_anomalies_pct': 3.0, 'min_overall_score': 85.0,
+        'min_extended_hours_coverage': 80.0,
+    },
+}
+
+WEIGHTS = {
+    ValidationType.COMPLETENESS: 0.25,
+    ValidationType.GAPS_ANALYSIS: 0.20,
+    ValidationType.OHLC_CONSISTENCY: 0.20,
+    ValidationType.PRICE_ANOMALIES: 0.15,
+    ValidationType.VOLUME_VALIDATION: 0.10,
+    ValidationType.TEMPORAL_CONTINUITY: 0.10,
+    ValidationType.EXTENDED_HOURS: 0.05,
+    ValidationType.MARKET_SESSIONS: 0.05,
+}
+
+# A symbol failing any of these is never backtest-ready
+_READINESS_CHECKS = (ValidationType.COMPLETENESS, ValidationType.OHLC_CONSISTENCY,
+                     ValidationType.TEMPORAL_CONTINUITY)
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one check for one symbol."""
+    validation_type: ValidationType
+    status: ValidationStatus
+    score: float
+    details: Dict[str, float] = field(default_factory=dict)
+    issues: List[str] = field(default_factory=list)
+
+
+@dataclass
+class QualityReport:
+    """Validation report of one symbol's series."""
+    symbol: str
+    level: ValidationLevel
+    status: ValidationStatus
+    score: float
+    backtest_ready: bool
+    total_bars: int
+    period: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None
+    checks: Dict[ValidationType, CheckResult] = field(default_factory=dict)
+    critical_issues: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    validated_at: datetime = field(default_factory=clock.now)
+
+    def summary(self) -> str:
+        text = f"{self.symbol}: {self.score:.1f}/100 {self.status.value}"
+        if self.critical_issues:
+            text += f" ({'; '.join(self.critical_issues)})"
+        return text
+
+    def to_json(self) -> str:
+        """Checks, issues and period as JSON (the `report` column of `data_quality`)."""
+        return json.dumps({
+            'period': [ts.isoformat() for ts in self.period] if self.period else None,
+            'checks': {t.value: {'status': c.status.value, 'score': c.score, 'details': c.details,
+                                 'issues': c.issues} for t, c in self.checks.items()},
+            'critical_issues': self.critical_issues,
+            'warnings': self.warnings,
+        })
+
+    @classmethod
+    def from_row(cls, row) -> "QualityReport":
+        """Rebuilds a report from a `data_quality` row (Database.get_quality_reports)."""
+        body = json.loads(row.report)
+        checks = {
+            ValidationType(name): CheckResult(ValidationType(name), ValidationStatus(c['status']), c['score'],
+                                              c['details'], c['issues'])
+            for name, c in body['checks'].items()
+        }
+        period = tuple(pd.Timestamp(ts) for ts in body['period']) if body['period'] else None
+        return cls(symbol=row.symbol, level=ValidationLevel(row.level), status=ValidationStatus(row.status),
+                   score=float(row.score), backtest_ready=bool(row.backtest_ready), total_bars=int(row.total_bars),
+                   period=period, checks=checks, critical_issues=body['critical_issues'],
+                   warnings=body['warnings'], validated_at=pd.Timestamp(row.validated_at))
+
+
+def bar_flags(df: pd.DataFrame, codes: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Per-bar anomaly flags of OHLCV bars in time order.
+
+    With `codes` (one series id per row, rows of a series contiguous),
+    previous-bar comparisons and the volume median stay within each series.
+    Forward-filled rows (`is_filled`) are never flagged as unchanged closes,
+    zero volume or volume spikes.
+
+    Returns:
+        Boolean columns ohlc_invalid, price_jump, wide_range, flat_close,
+        zero_volume, negative_volume, volume_spike.
+    """
+    o, h, l, c, v = (df[col].to_numpy(dtype=float) for col in OHLCV)
+    codes = np.zeros(len(df), dtype=np.int64) if codes is None else np.asarray(codes)
+    real = (~df['is_filled'].fillna(0).astype(bool).to_numpy() if 'is_filled' in df.columns
+            else np.ones(len(df), dtype=bool))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prices = np.column_stack([o, h, l, c])
+        ohlc_invalid = (np.isnan(prices).any(axis=1) | (prices <= 0).any(axis=1) | (h < l)
+                        | (h < np.maximum(o, c)) | (l > np.minimum(o, c)))
+        same = np.zeros(len(c), dtype=bool)
+        same[1:] = codes[1:] == codes[:-1]
+        prev = np.full(len(c), np.nan)
+        prev[1:] = c[:-1]
+        price_jump = same & (np.abs(c / prev - 1) > MAX_CLOSE_CHANGE)
+        wide_range = (h / l - 1) > MAX_BAR_RANGE
+        median = pd.Series(np.where(real, v, np.nan)).groupby(codes).transform('median').to_numpy()
+        volume_spike = real & (median > 0) & (v > median * VOLUME_SPIKE_FACTOR)
+
+    return pd.DataFrame({
+        'ohlc_invalid': ohlc_invalid,
+        'price_jump': price_jump,
+        'wide_range': wide_range,
+        'flat_close': same & real & (c == prev),
+        'zero_volume': real & (v == 0),
+        'negative_volume': v < 0,
+        'volume_spike': volume_spike,
+    }, index=df.index)
+
+
+def _in_spans(times: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Whether each time falls inside one of the sorted spans [starts, ends)."""
+    pos = np.searchsorted(starts, times, side='right') - 1
+    return (pos >= 0) & (times < ends[np.maximum(pos, 0)])
+
+
+class DataValidator:
+    """
+    Batch data quality validator with persisted reports (see module docstring).
+    """
+
+    def __init__(self, level: ValidationLevel = ValidationLevel.STANDARD, interval_minutes: int = 60,
+                 calendar: Optional[SessionCalendar] = None, extended_hours: bool = False, db=None):
+        """
+        Args:
+            level: Validation level (a ValidationLevel or its name).
+            interval_minutes: Bar interval of the validated series.
+            calendar: SessionCalendar for the expected-bar grid; without one the
+                series is expected every `interval_minutes`, around the clock
+                (daily and longer intervals: every weekday).
+            extended_hours: Expect pre/post-market bars too (always on at EXTENDED level).
+            db: Database holding the cached reports (cached/refresh/store).
+        """
+        self.level = ValidationLevel(level)
+        if self.level == ValidationLevel.EXTENDED and calendar is None:
+            raise ValueError("The EXTENDED validation level needs a session calendar")
+        self.interval = interval_minutes
+        self.calendar = calendar
+        self.extended_hours = extended_hours or self.level == ValidationLevel.EXTENDED
+        self.thresholds = LEVEL_THRESHOLDS[self.level]
+        self.db = db
+
+    # --- Validation ---
+
+    def validate(self, data: pd.DataFrame, symbol: str) -> QualityReport:
+        """Validates one symbol's bars."""
+        return self.validate_many({symbol: data})[symbol]
+
+    def validate_many(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, QualityReport]:
+        """
+        Validates several symbols in one pass.
+
+        Args:
+            frames: Symbol -> OHLCV bars (DatetimeIndex; an `is_filled` column
+                marks forward-filled rows).
+
+        Returns:
+            Symbol -> QualityReport, in the order of `frames`.
+        """
+        symbols = list(frames)
+        if not symbols:
+            return {}
+        bars, metrics, grid = self._stack(frames)
+        metrics = metrics.join(self._bar_metrics(bars, len(symbols)))
+        metrics = metrics.join(self._grid_metrics(bars, len(symbols), grid))
+        checks = self._score(metrics)
+        records = metrics.to_dict('records')
+        return {symbol: self._report(symbol, records[code], checks, code)
+                for code, symbol in enumerate(symbols)}
+
+    def _stack(self, frames: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, Optional[tuple]]:
+        """
+        All symbols' bars in one frame (`code` = symbol position), sorted by
+        (code, time), without duplicate timestamps and bars off the session
+        grid. Also returns the per-symbol counts of what was dropped and the
+        expected-bar grid of the batch (see _grid; None without a calendar).
+        """
+        parts = []
+        for code, df in enumerate(frames.values()):
+            if df is None or df.empty:
+                continue
+            part = pd.DataFrame({col: df[col].to_numpy(dtype=float) for col in OHLCV})
+            part['is_filled'] = (df['is_filled'].fillna(0).astype(bool).to_numpy() if 'is_filled' in df.columns
+                                 else False)
+            part['ns'] = epoch_ns(df.index)
+            part['code'] = code
+            parts.append(part)
+
+        n = len(frames)
+        counts = pd.DataFrame({'unsorted': 0, 'duplicates': 0, 'off_session': 0}, index=pd.RangeIndex(n))
+        if not parts:
+            parts = [pd.DataFrame({**{col: np.empty(0) for col in OHLCV}, 'is_filled': np.empty(0, dtype=bool),
+                                   'ns': np.empty(0, dtype=np.int64), 'code': np.empty(0, dtype=np.int64)})]
+
+        bars = pd.concat(parts, ignore_index=True)
+        ns, code = bars['ns'].to_numpy(), bars['code'].to_numpy()
+        same = code[1:] == code[:-1]
+        counts['unsorted'] = np.bincount(code[1:][same & (ns[1:] < ns[:-1])], minlength=n)
+
+        bars = bars.iloc[np.lexsort((ns, code))].reset_index(drop=True)
+        ns, code = bars['ns'].to_numpy(), bars['code'].to_numpy()
+        duplicate = np.zeros(len(ns), dtype=bool)
+        duplicate[1:] = (code[1:] == code[:-1]) & (ns[1:] == ns[:-1])
+        counts['duplicates'] = np.bincount(code[duplicate], minlength=n)
+        bars = bars[~duplicate]
+
+        grid = None
+        if self.calendar is not None and not bars.empty:
+            grid = self._grid(bars['ns'].min(), bars['ns'].max())
+            off = ~_in_spans(bars['ns'].to_numpy(), grid[0], grid[1])
+            counts['off_session'] = np.bincount(bars['code'].to_numpy()[off], minlength=n)
+            bars = bars[~off]
+        return bars.reset_index(drop=True), counts, grid
+
+    def _spans(self, lo_ns: int, hi_ns: int, extended_hours: bool) -> Tuple[np.ndarray, np.ndarray]:
+        return self.calendar.expected_bar_spans(pd.Timestamp(lo_ns, tz='UTC'), pd.Timestamp(hi_ns, tz='UTC'),
+                                                self.interval, extended_hours)
+
+    def _bar_metrics(self, bars: pd.DataFrame, n: int) -> pd.DataFrame:
+        """Per-symbol counts of the bar-level flags (one bincount per flag)."""
+        code = bars['code'].to_numpy()
+        flags = bar_flags(bars, codes=code)
+        counted = {
+            'bars': np.ones(len(bars), dtype=bool),
+            'filled': bars['is_filled'].to_numpy(dtype=bool),
+            'price_anomalies': flags['price_jump'].to_numpy() | flags['wide_range'].to_numpy(),
+            'volume_anomalies': (flags['zero_volume'] | flags['negative_volume'] | flags['volume_spike']).to_numpy(),
+            **{name: flags[name].to_numpy() for name in flags.columns},
+        }
+        return pd.DataFrame({name: np.bincount(code, weights=mask, minlength=n).astype(np.int64)
+                             for name, mask in counted.items()})
+
+    def _grid_metrics(self, bars: pd.DataFrame, n: int, grid: Optional[tuple]) -> pd.DataFrame:
+        """Per-symbol comparison with the expected bars: completeness, gaps, sessions."""
+        rows = {name: np.zeros(n, dtype=np.int64) for name in (
+            'first', 'last', 'expected', 'covered', 'gaps', 'critical_gaps', 'missing_bars',
+            'ext_expected', 'ext_covered', 'sessions', 'missing_sessions')}
+        if bars.empty:
+            return pd.DataFrame(rows)
+
+        ns, filled = bars['ns'].to_numpy(), bars['is_filled'].to_numpy(dtype=bool)
+        code = bars['code'].to_numpy()
+        bounds = np.searchsorted(code, np.arange(n + 1))
+        interval_ns = self.interval * NS_PER_MINUTE
+
+        for c in range(n):
+            times = ns[bounds[c]:bounds[c + 1]]
+            if len(times) == 0:
+                continue
+            real = times[~filled[bounds[c]:bounds[c + 1]]]
+            rows['first'][c], rows['last'][c] = times[0], times[-1]
+            if grid is None and self.interval >= DAY_MINUTES:
+                # One bar per weekday: positions in weekdays, so weekends are no gaps
+                days = times.astype('datetime64[ns]').astype('datetime64[D]')
+                position = np.busday_count(days[0], days)
+                missing = np.diff(position) - 1
+                missing = missing[missing > 0]
+                rows['expected'][c] = position[-1] + 1
+                rows['covered'][c] = len(real)
+                rows['gaps'][c] = len(missing)
+                rows['missing_bars'][c] = missing.sum()
+                rows['critical_gaps'][c] = (missing >= CRITICAL_GAP_DAYS).sum()
+                continue
+            if grid is None:
+                steps = np.diff(times)
+                at = find_gaps(times, self.interval * 1.5)
+                missing = np.rint(steps[at] / interval_ns) - 1
+                rows['expected'][c] = (times[-1] - times[0]) // interval_ns + 1
+                rows['covered'][c] = len(real)
+                rows['gaps'][c] = len(at)
+                rows['missing_bars'][c] = missing.sum()
+                rows['critical_gaps'][c] = (steps[at] - interval_ns >= CRITICAL_GAP_MINUTES * NS_PER_MINUTE).sum()
+                continue
+
+            starts, ends, session, extended_only = grid
+            a, b = np.searchsorted(starts, times[0], 'left'), np.searchsorted(starts, times[-1], 'right')
+            starts, ends, session, extended_only = starts[a:b], ends[a:b], session[a:b], extended_only[a:b]
+            covered = covered_spans(real, starts, ends, interval_ns)
+            _, _, missing, owners = calendar_gaps(times, starts, ends, interval_ns)
+            per_gap = np.bincount(owners) if len(owners) else np.empty(0)
+            rows['expected'][c] = len(starts)
+            rows['covered'][c] = covered.sum()
+            rows['gaps'][c] = len(per_gap)
+            rows['missing_bars'][c] = len(missing)
+            rows['critical_gaps'][c] = (per_gap * self.interval >= CRITICAL_GAP_MINUTES).sum()
+            rows['ext_expected'][c] = extended_only.sum()
+            rows['ext_covered'][c] = (covered & extended_only).sum()
+            sessions, first = np.unique(session, return_index=True)
+            rows['sessions'][c] = len(sessions)
+            rows['missing_sessions'][c] = (np.add.reduceat(covered.astype(int), first) == 0).sum() if len(first) else 0
+        return pd.DataFrame(rows)
+
+    def _grid(self, lo_ns: int, hi_ns: int):
+        """
+        Expected bars over [lo_ns, hi_ns]: (starts, ends, NY session day,
+        pre/post-market flag), computed once for the whole batch.
+        """
+        starts, ends = self._spans(lo_ns, hi_ns, self.extended_hours)
+        local = pd.to_datetime(starts, unit='ns', utc=True).tz_convert(NY_TZ).tz_localize(None)
+        session = local.as_unit('ns').asi8 // (1440 * NS_PER_MINUTE)
+        if self.extended_hours:
+            rth_starts, rth_ends = self._spans(lo_ns, hi_ns, False)
+            extended_only = ~_in_spans(starts, rth_starts, rth_ends)
+        else:
+            extended_only = np.zeros(len(starts), dtype=bool)
+        return starts, ends, session, extended_only
+
+    def _score(self, m: pd.DataFrame) -> Dict[ValidationType, Tuple[np.ndarray, np.ndarray]]:
+        """(status codes, scores) of every check, for all symbols at once (legacy formulas)."""
+        t = self.thresholds
+        bars = np.maximum(m['bars'].to_numpy(dtype=float), 1)
+        checks = {}
+
+        completeness = np.where(m['expected'] > 0, np.minimum(100.0, m['covered'] / m['expected'].clip(lower=1) * 100),
+                                100.0)
+        thr = t['min_completeness_pct']
+        checks[ValidationType.COMPLETENESS] = (
+            np.select([completeness >= thr, completeness >= thr * 0.9], [PASSED, WARNING], FAILED), completeness)
+
+        critical = m['critical_gaps'].to_numpy(dtype=float)
+        max_critical = t['max_critical_gaps']
+        checks[ValidationType.GAPS_ANALYSIS] = (
+            np.select([critical == 0, critical <= max_critical], [PASSED, WARNING], FAILED),
+            np.select([critical == 0, critical <= max_critical],
+                      [100.0, np.maximum(70.0, 100.0 - critical * 10)], np.maximum(0.0, 50.0 - critical * 5)))
+
+        consistency = (1 - m['ohlc_invalid'].to_numpy() / bars) * 100
+        thr = t['min_ohlc_consistency']
+        conditions = [consistency >= thr, consistency >= thr * 0.95]
+        checks[ValidationType.OHLC_CONSISTENCY] = (
+            np.select(conditions, [PASSED, WARNING], FAILED),
+            np.select(conditions, [consistency, consistency * 0.9], consistency * 0.5))
+
+        for vtype, column, key, slopes in (
+                (ValidationType.PRICE_ANOMALIES, 'price_anomalies', 'max_price_anomalies_pct', (5, 3, 2)),
+                (ValidationType.VOLUME_VALIDATION, 'volume_anomalies', 'max_volume_anomalies_pct', (2, 1, 1))):
+            pct = m[column].to_numpy() / bars * 100
+            thr = t[key]
+            conditions = [pct <= thr, pct <= thr * 2]
+            checks[vtype] = (
+                np.select(conditions, [PASSED, WARNING], FAILED),
+                np.select(conditions, [np.maximum(80.0, 100.0 - pct * slopes[0]), np.maximum(60.0, 80.0 - pct * slopes[1])],
+                          np.maximum(0.0, 40.0 - pct * slopes[2])))
+
+        steps = np.maximum(m['bars'].to_numpy() - 1, 1)
+        continuity = (1 - m['gaps'].to_numpy() / steps) * 100
+        ordered = m['unsorted'].to_numpy() == 0
+        conditions = [(continuity >= 90) & ordered & (m['duplicates'].to_numpy() == 0), (continuity >= 80) & ordered]
+        checks[ValidationType.TEMPORAL_CONTINUITY] = (
+            np.select(conditions, [PASSED, WARNING], FAILED),
+            np.select(conditions, [np.minimum(100.0, continuity + 5), continuity], np.maximum(0.0, continuity - 20)))
+
+        if self.level == ValidationLevel.EXTENDED:
+            coverage = np.where(m['ext_expected'] > 0, m['ext_covered'] / m['ext_expected'].clip(lower=1) * 100, 100.0)
+            thr = t['min_extended_hours_coverage']
+            conditions = [coverage >= thr, coverage >= thr * 0.8]
+            checks[ValidationType.EXTENDED_HOURS] = (
+                np.select(conditions, [PASSED, WARNING], FAILED),
+                np.select(conditions, [np.minimum(100.0, coverage), coverage * 0.9], coverage * 0.5))
+
+            total = m['bars'].to_numpy() + m['off_session'].to_numpy()
+            off_ratio = m['off_session'].to_numpy() / np.maximum(total, 1)
+            score = np.select([off_ratio < 0.1, off_ratio < 0.3], [90.0, 75.0], 60.0)
+            score = np.where(m['missing_sessions'] > 0, np.maximum(score * 0.8, 40.0), score)
+            status = np.where(off_ratio < 0.1, PASSED, WARNING)
+            checks[ValidationType.MARKET_SESSIONS] = (np.where(m['bars'] > 0, status, FAILED),
+                                                      np.where(m['bars'] > 0, score, 0.0))
+        return checks
+
+    def _report(self, symbol: str, m: dict, checks, code: int) -> QualityReport:
+        """Assembles one symbol's report from the batch arrays."""
+        if m['bars'] == 0:
+            return QualityReport(symbol=symbol, level=self.level, status=ValidationStatus.CRITICAL, score=0.0,
+                                 backtest_ready=False, total_bars=0, critical_issues=["No data"])
+
+        results = {}
+        for vtype, (statuses, scores) in checks.items():
+            status = _STATUSES[int(statuses[code])]
+            results[vtype] = CheckResult(vtype, status, round(float(scores[code]), 2),
+                                         self._details(vtype, m), self._issues(vtype, m, status))
+
+        weights = np.array([WEIGHTS[vtype] for vtype in results])
+        score = float((np.array([r.score for r in results.values()]) * weights).sum() / max(weights.sum(), 1.0))
+        worst = max(_STATUSES.index(r.status) for r in results.values())
+        if worst >= FAILED:
+            status = _STATUSES[worst]
+        else:
+            status = ValidationStatus.PASSED if score >= self.thresholds['min_overall_score'] else ValidationStatus.WARNING
+        ready = (status not in (ValidationStatus.FAILED, ValidationStatus.CRITICAL)
+                 and score >= self.thresholds['min_overall_score']
+                 and all(results[v].status in (ValidationStatus.PASSED, ValidationStatus.WARNING)
+                         for v in _READINESS_CHECKS))
+
+        critical_issues, warnings = [], []
+        for r in results.values():
+            target = warnings if r.status == ValidationStatus.WARNING else critical_issues
+            if r.status != ValidationStatus.PASSED:
+                target.extend(r.issues)
+        period = (pd.Timestamp(int(m['first']), tz='UTC'), pd.Timestamp(int(m['last']), tz='UTC'))
+        return QualityReport(symbol=symbol, level=self.level, status=status, score=round(score, 2),
+                             backtest_ready=ready, total_bars=int(m['bars']), period=period, checks=results,
+                             critical_issues=list(dict.fromkeys(critical_issues)),
+                             warnings=list(dict.fromkeys(warnings)))
+
+    @staticmethod
+    def _details(vtype: ValidationType, m: dict) -> Dict[str, float]:
+        columns = {
+            ValidationType.COMPLETENESS: ('expected', 'covered', 'filled'),
+            ValidationType.GAPS_ANALYSIS: ('gaps', 'critical_gaps', 'missing_bars'),
+            ValidationType.OHLC_CONSISTENCY: ('ohlc_invalid',),
+            ValidationType.PRICE_ANOMALIES: ('price_anomalies', 'price_jump', 'wide_range', 'flat_close'),
+            ValidationType.VOLUME_VALIDATION: ('volume_anomalies', 'zero_volume', 'negative_volume', 'volume_spike'),
+            ValidationType.TEMPORAL_CONTINUITY: ('unsorted', 'duplicates'),
+            ValidationType.EXTENDED_HOURS: ('ext_expected', 'ext_covered'),
+            ValidationType.MARKET_SESSIONS: ('sessions', 'missing_sessions', 'off_session'),
+        }[vtype]
+        return {name: int(m[name]) for name in columns}
+
+    def _issues(self, vtype: ValidationType, m: dict, status: ValidationStatus) -> List[str]:
+        """Human-readable findings of one check."""
+        bars = max(int(m['bars']), 1)
+        issues = []
+        if vtype == ValidationType.COMPLETENESS and status != ValidationStatus.PASSED:
+            issues.append(f"Completeness {m['covered'] / max(m['expected'], 1) * 100:.1f}% "
+                          f"({int(m['covered'])}/{int(m['expected'])} expected bars, {int(m['filled'])} forward-filled)")
+        elif vtype == ValidationType.GAPS_ANALYSIS and m['critical_gaps']:
+            issues.append(f"{int(m['critical_gaps'])} critical gaps ({int(m['missing_bars'])} missing bars in total)")
+        elif vtype == ValidationType.OHLC_CONSISTENCY and m['ohlc_invalid']:
+            issues.append(f"{int(m['ohlc_invalid'])} bars with inconsistent or non-positive OHLC")
+        elif vtype == ValidationType.PRICE_ANOMALIES:
+            if m['price_jump']:
+                issues.append(f"{int(m['price_jump'])} close-to-close moves above {MAX_CLOSE_CHANGE:.0%}")
+            if m['wide_range']:
+                issues.append(f"{int(m['wide_range'])} intrabar ranges above {MAX_BAR_RANGE:.0%}")
+            if m['flat_close'] / bars * 100 > FLAT_CLOSE_WARN_PCT:
+                issues.append(f"{m['flat_close'] / bars * 100:.1f}% unchanged closes (possible feed freeze)")
+        elif vtype == ValidationType.VOLUME_VALIDATION:
+            for name, label in (('zero_volume', "bars with zero volume"), ('negative_volume', "negative volumes"),
+                                ('volume_spike', f"volume spikes above {VOLUME_SPIKE_FACTOR}x the median")):
+                if m[name]:
+                    issues.append(f"{int(m[name])} {label}")
+        elif vtype == ValidationType.TEMPORAL_CONTINUITY:
+            if m['unsorted']:
+                issues.append("Bars are not in chronological order")
+            if m['duplicates']:
+                issues.append(f"{int(m['duplicates'])} duplicated timestamps")
+            if status != ValidationStatus.PASSED and m['gaps']:
+                issues.append(f"{int(m['gaps'])} breaks in {bars - 1} bar steps")
+        elif vtype == ValidationType.EXTENDED_HOURS and status != ValidationStatus.PASSED:
+            issues.append(f"Extended-hours coverage {m['ext_covered'] / max(m['ext_expected'], 1) * 100:.1f}%")
+        elif vtype == ValidationType.MARKET_SESSIONS:
+            if m['off_session']:
+                issues.append(f"{int(m['off_session'])} bars outside market sessions")
+            if m['missing_sessions']:
+                issues.append(f"{int(m['missing_sessions'])} sessions without bars")
+        return issues
+
+    # --- Persisted reports ---
+
+    def cached(self, symbols: Iterable[str], timeframe: str,
+               stats: Optional[Dict[str, Tuple[int, Optional[pd.Timestamp]]]] = None) -> Dict[str, QualityReport]:
+        """
+        Stored reports still valid for the stored series: same level and grid,
+        and the series' (bar count, last bar) unchanged. `stats` are the
+        Database.get_bar_stats values when the caller has them.
+        """
+        symbols = list(symbols)
+        rows = self.db.get_quality_reports(timeframe, symbols)
+        fresh = {}
+        for row in rows.itertuples():
+            count, last = stats[row.symbol] if stats and row.symbol in stats else self.db.get_bar_stats(row.symbol,
+                                                                                                        timeframe)
+            stored_last = pd.Timestamp(row.last_bar) if row.last_bar else None
+            if (row.level == self.level.value and bool(row.extended_hours) == self.extended_hours
+                    and row.bar_count == count and stored_last == last):
+                fresh[row.symbol] = QualityReport.from_row(row)
+        return fresh
+
+    def latest(self, symbols: Iterable[str], timeframe: str) -> Dict[str, QualityReport]:
+        """Last stored report of each symbol, fresh or not (no bar-stats queries)."""
+        rows = self.db.get_quality_reports(timeframe, list(symbols))
+        return {row.symbol: QualityReport.from_row(row) for row in rows.itertuples()}
+
+    def store(self, reports: Dict[str, QualityReport], timeframe: str,
+              stats: Dict[str, Tuple[int, Optional[pd.Timestamp]]]):
+        """Persists reports with the bar stats of the series they were computed on."""
+        self.db.save_quality_reports([
+            (symbol, timeframe, r.level.value, int(self.extended_hours), stats[symbol][0],
+             stats[symbol][1].isoformat() if stats[symbol][1] is not None else None, r.status.value, r.score,
+             int(r.backtest_ready), r.total_bars, r.to_json(), pd.Timestamp(r.validated_at).isoformat())
+            for symbol, r in reports.items()
+        ])
+
+    def refresh(self, symbols: Iterable[str], timeframe: str, force: bool = False) -> Dict[str, QualityReport]:
+        """
+        Reports of `symbols`' stored series: cached ones are reused, the
+        others (or all, with `force`) are validated in one batch and stored.
+        Symbols without stored bars are left out.
+        """
+        symbols = list(symbols)
+        # Stats are read before the bars: a write in between makes the stored
+        # report look stale (re-validated next time), never wrongly fresh
+        stats = {s: self.db.get_bar_stats(s, timeframe) for s in symbols}
+        reports = {} if force else self.cached(symbols, timeframe, stats)
+        stale = [s for s in symbols if s not in reports and stats[s][0] > 0]
+        if stale:
+            fresh = self.validate_many({s: self.db.load_market_data(s, timeframe) for s in stale})
+            self.store(fresh, timeframe, stats)
+            logger.info(f"Validated {len(stale)} {timeframe} series ({len(reports)} cached): "
+                        f"{sum(not r.backtest_ready for r in fresh.values())} not backtest-ready")
+            reports.update(fresh)
+        return reports
+
+
+def configured_validator(db=None, timeframe: str = "1h") -> DataValidator:
+    """
+    Validator for stored `timeframe` bars with the DATA_CONFIG settings (level,
+    session grid, extended hours), shared by the loaders so they agree on
+    cached reports. Daily timeframes are validated on a fixed interval without
+    the session grid (the EXTENDED level's session checks fall back to STRICT).
+    Raises ValueError for unknown timeframes.
+    """
+    level = ValidationLevel(DATA_CONFIG.get("QUALITY", {}).get("LEVEL", "STANDARD"))
+    if timeframe in FIXED_TIMEFRAME_MINUTES:
+        if level == ValidationLevel.EXTENDED:
+            level = ValidationLevel.STRICT
+        return DataValidator(level=level, interval_minutes=FIXED_TIMEFRAME_MINUTES[timeframe], db=db)
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ValueError(f"No bar grid for timeframe {timeframe!r}")
+    return DataValidator(level=level, interval_minutes=TIMEFRAME_MINUTES[timeframe], calendar=get_session_calendar(),
+                         extended_hours=DATA_CONFIG.get("EXTENDED_HOURS_BARS", False), db=db)
@@ -0,0 +1,273 @@
+"""
+Session-Aware Bar Resampler
+===========================
+Derives higher timeframes from stored base bars instead of fetching them
+from a provider:
+
+- 2h / 4h:  Buckets anchored at the NY session open (09:30), not UTC midnight.
+            The last bucket of a session is cut at the close (e.g. 15:30-16:00).
+- session:  One RTH bar per session, stamped at the session open.
+- 1d:       One RTH bar per session, stamped at NY midnight (same convention as
+            provider daily bars, so derived bars replace/extend them seamlessly).
+- 1h:       From finer bars (30m/15m/5m/1m) when those are stored.
+
+Derived bars are saved to `market_data` with source `RESAMPLED_<base>` plus a
+`bar_lineage` row (base timeframe, base bar count and covered range). Updates
+are incremental: only base bars from the last derived bar onwards are loaded.
+"""
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.market_calendar import NY_TZ, get_session_calendar, SessionCalendar
+from data.interfaces import Candle
+from data.storage.database import Database
+
+logger = logging.getLogger("core.data.resampler")
+
+# Bar duration (minutes) of the timeframes we can read as base bars
+BASE_PERIOD_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60}
+
+# Fixed-size intraday buckets (minutes), anchored at the session open
+BUCKET_MINUTES = {"1h": 60, "2h": 120, "4h": 240}
+
+# Whole-session targets
+SESSION_TARGETS = ("session", "1d")
+
+# Base timeframe candidates per target, in order of preference
+BASE_CANDIDATES = {
+    "1h": ("30m", "15m", "5m", "1m"),
+    "2h": ("1h",),
+    "4h": ("1h",),
+    "session": ("1h",),
+    "1d": ("1h",),
+}
+
+RESAMPLED_SOURCE_PREFIX = "RESAMPLED_"
+
+
+def resampled_source(base_timeframe: str) -> str:
+    """Source tag stored on bars derived from `base_timeframe`."""
+    return f"{RESAMPLED_SOURCE_PREFIX}{base_timeframe}"
+
+
+def daily_bar_date(ts: pd.Timestamp) -> date:
+    """
+    Session date of a stored daily bar. Providers stamp daily bars either at
+    NY midnight (YFinance, Polygon, derived bars) or at UTC midnight
+    (TwelveData, AlphaVantage).
+    """
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    if ts == ts.normalize():
+        return ts.date()
+    return ts.tz_convert(NY_TZ).date()
+
+
+def daily_bar_timestamp(d: date) -> pd.Timestamp:
+    """UTC timestamp of the derived daily bar for session date `d` (NY midnight)."""
+    return pd.Timestamp(d).tz_localize(NY_TZ).tz_convert("UTC")
+
+
+def resample_bars(df: pd.DataFrame, target: str, base_timeframe: str,
+                  calendar: Optional[SessionCalendar] = None) -> pd.DataFrame:
+    """
+    Resamples base OHLCV bars to `target`, aligned to the NY RTH session.
+
+    Only base bars starting inside RTH are used, so pre-market never leaks into
+    derived bars. Base bars not aligned to the 09:30 grid (e.g. hour-aligned
+    10:00, 11:00 bars from some providers) make their bucket incomplete, since
+    the bucket cannot be rebuilt exactly from them, and so does a missing
+    base bar anywhere in the bucket. Forward-filled rows (`is_filled`) are
+    ignored.
+
+    Returns a DataFrame indexed by derived bar timestamp (UTC) with
+    Open/High/Low/Close/Volume plus lineage columns:
+    base_count, base_start, base_end and is_complete (the base bars cover
+    the whole bucket, so the bar will not change anymore).
+    """
+    columns = ['Open', 'High', 'Low', 'Close', 'Volume',
+               'base_count', 'base_start', 'base_end', 'is_complete']
+    if target not in BUCKET_MINUTES and target not in SESSION_TARGETS:
+        raise ValueError(f"Unsupported resample target: {target}")
+    if df is None or df.empty:
+        return pd.DataFrame(columns=columns)
+
+    base_minutes = BASE_PERIOD_MINUTES[base_timeframe]
+    calendar = calendar or get_session_calendar()
+
+    df = df.sort_index()
+    if 'is_filled' in df.columns:
+        df = df[df['is_filled'].fillna(0).astype(bool).to_numpy() == False]  # noqa: E712
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    sessions = calendar.session_frame(df.index)
+    from_open = sessions['minutes_from_open'].to_numpy()
+    to_close = sessions['minutes_to_close'].to_numpy()
+
+    # Keep base bars starting inside [open, close)
+    in_session = (from_open >= 0) & (to_close > 0)
+    if not in_session.any():
+        return pd.DataFrame(columns=columns)
+
+    df = df[in_session]
+    from_open = from_open[in_session]
+    to_close = to_close[in_session]
+    session_id = sessions['session_id'].to_numpy()[in_session].astype(np.int64)
+
+    idx = df.index.tz_convert("UTC") if df.index.tz is not None else df.index.tz_localize("UTC")
+    ts_ns = idx.as_unit("ns").asi8
+    minute_ns = 60 * 1_000_000_000
+    open_ns = ts_ns - (from_open * minute_ns).astype(np.int64)
+    close_ns = ts_ns + (to_close * minute_ns).astype(np.int64)
+
+    if target in BUCKET_MINUTES:
+        bucket_minutes = BUCKET_MINUTES[target]
+        bucket = np.maximum(from_open, 0) // bucket_minutes
+        keys = session_id * 1000 + bucket.astype(np.int64)
+        label_ns = open_ns + (bucket * bucket_minutes * minute_ns).astype(np.int64)
+        end_ns = np.minimum(label_ns + bucket_minutes * minute_ns, close_ns)
+    else:
+        keys = session_id
+        end_ns = close_ns
+        if target == "session":
+            label_ns = open_ns
+        else:
+            # NY midnight of the session date
+            midnight = (pd.to_datetime(session_id, unit='D')
+                        .tz_localize(NY_TZ).tz_convert("UTC"))
+            label_ns = midnight.as_unit("ns").asi8
+
+    # Group boundaries (rows are sorted, so groups are contiguous)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lasts = np.r_[starts[1:] - 1, len(keys) - 1]
+
+    o = df['Open'].to_numpy(dtype=float)
+    h = df['High'].to_numpy(dtype=float)
+    l = df['Low'].to_numpy(dtype=float)
+    c = df['Close'].to_numpy(dtype=float)
+    v = df['Volume'].to_numpy(dtype=float)
+
+    base_start = ts_ns[starts]
+    base_end = ts_ns[lasts] + base_minutes * minute_ns
+    # Complete: base bars on the session grid, first bar at the bucket start,
+    # the last base bar reaches the bucket end, and none missing in between
+    # (as many base bars as the bucket holds, which also covers early closes)
+    bucket_start = open_ns[starts] if target in SESSION_TARGETS else label_ns[starts]
+    aligned = np.minimum.reduceat((from_open % base_minutes == 0).astype(np.int8), starts).astype(bool)
+    base_count = np.diff(np.r_[starts, len(keys)])
+    expected_count = -((bucket_start - end_ns[starts]) // (base_minutes * minute_ns))
+    is_complete = (aligned & (ts_ns[starts] == bucket_start) & (base_end >= end_ns[starts])
+                   & (base_count == expected_count))
+
+    out = pd.DataFrame({
+        'Open': o[starts],
+        'High': np.maximum.reduceat(h, starts),
+        'Low': np.minimum.reduceat(l, starts),
+        'Close': c[lasts],
+        'Volume': np.add.reduceat(v, starts),
+        'base_count': base_count,
+        'base_start': pd.to_datetime(base_start, unit='ns', utc=True),
+        'base_end': pd.to_datetime(base_end, unit='ns', utc=True),
+        'is_complete': is_complete,
+    }, index=pd.DatetimeIndex(pd.to_datetime(label_ns[starts], unit='ns', utc=True), name='timestamp'))
+    return out
+
+
+class BarResampler:
+    """
+    Builds and persists derived timeframes from stored base bars.
+    """
+
+    def __init__(self, db: Optional[Database] = None, calendar: Optional[SessionCalendar] = None):
+        self.db = db or Database()
+        self.calendar = calendar or get_session_calendar()
+        # (symbol, target, base) -> last base timestamp already consumed
+        self._consumed: Dict[Tuple[str, str, str], pd.Timestamp] = {}
+        # derive() is called from concurrent scan fetch threads
+        self._consumed_lock = threading.Lock()
+
+    def pick_base(self, symbol: str, target: str) -> Optional[str]:
+        """First base timeframe with stored data for `target`."""
+        for base in BASE_CANDIDATES.get(target, ()):
+            if self.db.get_last_timestamp(symbol, base) is not None:
+                return base
+        return None
+
+    def derive(self, symbol: str, target: str, base_timeframe: Optional[str] = None,
+               since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Derives complete `target` bars from base bars and stores them.
+
+        Args:
+            symbol: Symbol to resample.
+            target: "1h", "2h", "4h", "session" or "1d".
+            base_timeframe: Base bars to use (auto-detected if None).
+            since: Re-derive bars stamped at or after this time. Defaults to
+                the last bar previously derived (incremental update).
+
+        Returns:
+            The bars written (empty if nothing new).
+        """
+        base = base_timeframe or self.pick_base(symbol, target)
+        if base is None:
+            logger.debug(f"No base data to derive {target} bars for {symbol}")
+            return pd.DataFrame()
+
+        source = resampled_source(base)
+        base_last = self.db.get_last_timestamp(symbol, base)
+        if base_last is None:
+            return pd.DataFrame()
+
+        cache_key = (symbol, target, base)
+        if since is None:
+            with self._consumed_lock:
+                consumed = self._consumed.get(cache_key)
+            if consumed == base_last:
+                return pd.DataFrame()  # No new base bars since the last run
+            since = self.db.get_last_timestamp(symbol, target, source=source)
+
+        df_base = self.db.load_market_data(symbol, base, start=since)
+        bars = resample_bars(df_base, target, base, self.calendar)
+        if not bars.empty:
+            bars = bars[bars['is_complete']]
+            if since is not None:
+                bars = bars[bars.index >= pd.Timestamp(since)]
+
+        with self._consumed_lock:
+            self._consumed[cache_key] = base_last
+        if bars.empty:
+            return bars
+
+        candles = [
+            Candle(timestamp=ts.to_pydatetime(), open=o, high=h, low=l, close=c, volume=v)
+            for ts, o, h, l, c, v in zip(bars.index, bars['Open'], bars['High'],
+                                         bars['Low'], bars['Close'], bars['Volume'])
+        ]
+        self.db.save_bulk_candles(symbol, target, candles, source=source)
+        self.db.save_bar_lineage([
+            (symbol, target, ts.isoformat(), base, int(n), bs.isoformat(), be.isoformat())
+            for ts, n, bs, be in zip(bars.index, bars['base_count'], bars['base_start'], bars['base_end'])
+        ])
+        logger.info(f"Derived {len(bars)} {target} bars for {symbol} from {base}")
+        return bars
+
+    def expected_sessions(self, first_day: date, until: pd.Timestamp) -> int:
+        """Number of trading sessions dated from `first_day` (NY) that closed by `until`."""
+        until = pd.Timestamp(until)
+        until = until.tz_localize("UTC") if until.tzinfo is None else until
+
+        day = first_day
+        last_day = until.tz_convert(NY_TZ).date()
+        count = 0
+        while day <= last_day:
+            bounds = self.calendar.session_bounds(day)
+            if bounds is not None and bounds[1] <= until:
+                count += 1
+            day += timedelta(days=1)
+        return count
@@ -1,7 +1,9 @@
 import sqlite3
 import logging
+import threading
+from functools import wraps
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 import pandas as pd
 from config.settings import DATABASE_PATH
@@ -9,12 +11,26 @@ from data.interfaces import Candle
 
 logger = logging.getLogger("core.data.database")
 
+def _synchronized(method):
+    """Serializes access to the shared connection (scan workers run in threads)."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _utc(ts) -> pd.Timestamp:
+    """Timestamp in UTC (naive values are taken as UTC)."""
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
 class Database:
     """
     SQLite Database Manager.
     Handles persistent connection and schema initialization.
     """
     _instance = None
+    _lock = threading.RLock()
     
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -224,7 +240,85 @@ class Database:
             except sqlite3.OperationalError:
                 pass
             
-            # 6. Indices (Performance)
+            # 6. Derived Bar Lineage (bars resampled locally from a base timeframe)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bar_lineage (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                base_timeframe TEXT NOT NULL,
+                base_count INTEGER NOT NULL,
+                base_start DATETIME NOT NULL,
+                base_end DATETIME NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, timeframe, timestamp)
+            )
+            ''')
+            
+            # 7. Bar Revisions (stored bars a provider later reported with different values)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bar_revisions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                timestamp DATETIME NOT NULL,
+                old_open REAL, old_high REAL, old_low REAL, old_close REAL, old_volume REAL,
+                new_open REAL, new_high REAL, new_low REAL, new_close REAL, new_volume REAL,
+                source TEXT,
+                revised_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_bar_revisions_lookup ON bar_revisions (symbol, timeframe, timestamp)')
+            
+            # 8. Backfill Checkpoints (resumable chunked backfills, see data/backfill.py)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                chunk_start DATE NOT NULL,
+                chunk_end DATE NOT NULL,
+                status TEXT NOT NULL, -- DONE, EMPTY, FAILED
+                rows INTEGER DEFAULT 0,
+                sources TEXT,
+                attempts INTEGER DEFAULT 1,
+                error TEXT,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (symbol, timeframe, chunk_start, chunk_end)
+            )
+            ''')
+            
+            # 9. Gap Watermarks (end of the gap-verified prefix per series, see DataManager.resolve_gaps)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS gap_watermarks (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                verified_until TEXT NOT NULL, -- Last bar of the verified-contiguous prefix (UTC)
+                checked_at TEXT,              -- Last incremental check
+                deep_checked_at TEXT,         -- Last full-history re-verification
+                PRIMARY KEY (symbol, timeframe)
+            )
+            ''')
+            
+            # 10. Data Quality (cached validation reports, see data/quality/validator.py)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_quality (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                level TEXT NOT NULL,
+                extended_hours INTEGER NOT NULL DEFAULT 0,
+                bar_count INTEGER NOT NULL, -- Stored series the report was computed on (get_bar_stats)
+                last_bar TEXT,
+                status TEXT NOT NULL,       -- PASSED, WARNING, FAILED, CRITICAL
+                score REAL NOT NULL,
+                backtest_ready INTEGER NOT NULL,
+                total_bars INTEGER NOT NULL, -- Bars validated (on the session grid)
+                report TEXT NOT NULL,       -- JSON: checks, issues, warnings
+                validated_at TEXT NOT NULL,
+                PRIMARY KEY (symbol, timeframe)
+            )
+            ''')
+            
+            # 11. Indices (Performance)
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_market_data_lookup ON market_data (symbol, timeframe, timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_indicators_lookup ON indicators (symbol, timeframe, timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_market_data_ts ON market_data (timestamp)')
@@ -238,6 +332,7 @@ class Database:
             raise
         # DO NOT CLOSE CONN HERE
 
+    @_synchronized
     def save_candle(self, symbol: str, timeframe: str, candle: Candle, is_filled: bool = False):
         """Save a single candle."""
         try:
@@ -256,6 +351,7 @@ class Database:
             logger.error(f"Error saving candle: {e}")
         # DO NOT CLOSE
 
+    @_synchronized
     def save_bulk_candles(self, symbol: str, timeframe: str, candles: List[Candle], is_filled_list: List[bool] = None, source: str = "YFINANCE"):
         """Save multiple candles efficiently."""
         try:
@@ -284,6 +380,7 @@ class Database:
         except Exception as e:
             logger.error(f"Error saving bulk candles: {e}")
 
+    @_synchronized
     def save_indicators(self, symbol: str, timeframe: str, df: pd.DataFrame):
         """Save calculated indicators to DB."""
         try:
@@ -322,21 +419,37 @@ class Database:
         except Exception as e:
             logger.error(f"Error saving indicators: {e}")
 
-    def load_market_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
-        """Load market data as DataFrame."""
+    @_synchronized
+    def load_market_data(self, symbol: str, timeframe: str, start: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Load market data as DataFrame.
+        If `start` is given, only rows at or after it are returned.
+        """
         try:
             self._ensure_connection()
             query = """
                 SELECT timestamp, open, high, low, close, volume, is_filled 
                 FROM market_data 
                 WHERE symbol = ? AND timeframe = ? 
-                ORDER BY timestamp ASC
             """
-            df = pd.read_sql_query(query, self.conn, params=(symbol, timeframe))
+            params = [symbol, timeframe]
+            if start is not None:
+                # Timestamps are stored in mixed ISO formats ('T' or ' ' separator),
+                # so filter by date prefix in SQL and precisely in pandas below.
+                query += " AND timestamp >= ? "
+                params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+            query += " ORDER BY timestamp ASC"
+            
+            df = pd.read_sql_query(query, self.conn, params=params)
             if not df.empty:
                 df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True, format='mixed')
                 df.set_index('timestamp', inplace=True)
                 
+                if start is not None:
+                    start_ts = pd.Timestamp(start)
+                    start_ts = start_ts.tz_localize('UTC') if start_ts.tzinfo is None else start_ts.tz_convert('UTC')
+                    df = df[df.index >= start_ts]
+                
                 if df.index.duplicated().any():
                     # Check duplication logic?
                     df = df[~df.index.duplicated(keep='last')]
@@ -353,6 +466,308 @@ class Database:
             logger.error(f"Error loading market data {symbol} {timeframe}: {e}")
             return pd.DataFrame()
 
+    @_synchronized
+    def get_last_timestamp(self, symbol: str, timeframe: str, source: Optional[str] = None) -> Optional[pd.Timestamp]:
+        """Latest stored bar timestamp (UTC) without loading the series."""
+        try:
+            self._ensure_connection()
+            # Normalize the 'T' / ' ' separator so text ordering is chronological
+            query = "SELECT MAX(replace(timestamp, 'T', ' ')) FROM market_data WHERE symbol = ? AND timeframe = ?"
+            params = [symbol, timeframe]
+            if source is not None:
+                query += " AND source = ?"
+                params.append(source)
+            row = self.conn.execute(query, params).fetchone()
+            if row is None or row[0] is None:
+                return None
+            return pd.to_datetime(row[0], utc=True, format='mixed')
+        except Exception as e:
+            logger.error(f"Error getting last timestamp {symbol} {timeframe}: {e}")
+            return None
+
+    @_synchronized
+    def get_bar_stats(self, symbol: str, timeframe: str) -> Tuple[int, Optional[pd.Timestamp]]:
+        """(bar count, latest bar timestamp) from the lookup index, without loading the series."""
+        try:
+            self._ensure_connection()
+            row = self.conn.execute(
+                "SELECT COUNT(*), MAX(replace(timestamp, 'T', ' ')) FROM market_data WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe)
+            ).fetchone()
+            if row is None or row[1] is None:
+                return 0, None
+            return int(row[0]), pd.to_datetime(row[1], utc=True, format='mixed')
+        except Exception as e:
+            logger.error(f"Error getting bar stats {symbol} {timeframe}: {e}")
+            return 0, None
+
+    @_synchronized
+    def delete_market_data(self, symbol: str, timeframe: str, timestamps: List[datetime]):
+        """
+        Delete specific bars, matched on the instant: rows stored with another
+        ISO format or UTC offset (e.g. '-05:00') than the canonical UTC key
+        are deleted too.
+        """
+        if not timestamps:
+            return
+        try:
+            self._ensure_connection()
+            wanted = pd.DatetimeIndex([_utc(ts) for ts in timestamps])
+            # Date-prefix bounds wide enough for any offset (see load_market_data)
+            rows = self.conn.execute(
+                "SELECT feature_id, timestamp FROM market_data "
+                "WHERE symbol = ? AND timeframe = ? AND timestamp >= ? AND timestamp < ?",
+                (symbol, timeframe, (wanted.min() - pd.Timedelta(days=1)).strftime('%Y-%m-%d'),
+                 (wanted.max() + pd.Timedelta(days=2)).strftime('%Y-%m-%d'))).fetchall()
+            if not rows:
+                return
+            stored = pd.to_datetime([r[1] for r in rows], utc=True, format='mixed')
+            ids = [(r[0],) for r, hit in zip(rows, stored.isin(wanted)) if hit]
+            self.conn.executemany('DELETE FROM market_data WHERE feature_id = ?', ids)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error deleting market data {symbol} {timeframe}: {e}")
+
+    @_synchronized
+    def save_bar_lineage(self, rows: List[tuple]):
+        """
+        Save lineage for derived bars.
+        rows: (symbol, timeframe, timestamp, base_timeframe, base_count, base_start, base_end)
+        """
+        try:
+            self._ensure_connection()
+            self.conn.executemany('''
+            INSERT OR REPLACE INTO bar_lineage 
+            (symbol, timeframe, timestamp, base_timeframe, base_count, base_start, base_end)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error saving bar lineage: {e}")
+
+    @_synchronized
+    def save_bar_revisions(self, rows: List[tuple]):
+        """
+        Record provider revisions of stored bars.
+        rows: (symbol, timeframe, timestamp, old_open, old_high, old_low, old_close, old_volume,
+               new_open, new_high, new_low, new_close, new_volume, source)
+        """
+        try:
+            self._ensure_connection()
+            self.conn.executemany('''
+            INSERT INTO bar_revisions 
+            (symbol, timeframe, timestamp, old_open, old_high, old_low, old_close, old_volume,
+             new_open, new_high, new_low, new_close, new_volume, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error saving bar revisions: {e}")
+
+    @_synchronized
+    def get_bar_revisions(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Recorded revisions for a symbol/timeframe, oldest first."""
+        try:
+            self._ensure_connection()
+            return pd.read_sql_query(
+                "SELECT * FROM bar_revisions WHERE symbol = ? AND timeframe = ? ORDER BY id ASC",
+                self.conn, params=[symbol, timeframe])
+        except Exception as e:
+            logger.error(f"Error loading bar revisions {symbol} {timeframe}: {e}")
+            return pd.DataFrame()
+
+    @_synchronized
+    def save_backfill_checkpoint(self, symbol: str, timeframe: str, chunk_start: str, chunk_end: str,
+                                 status: str, rows: int = 0, sources: str = None, error: str = None):
+        """Record the outcome of one backfill chunk (attempts are counted across runs)."""
+        try:
+            self._ensure_connection()
+            self.conn.execute('''
+            INSERT INTO backfill_checkpoints (symbol, timeframe, chunk_start, chunk_end, status, rows, sources, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, timeframe, chunk_start, chunk_end) DO UPDATE SET
+                status = excluded.status, rows = excluded.rows, sources = excluded.sources,
+                error = excluded.error, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            ''', (symbol, timeframe, chunk_start, chunk_end, status, rows, sources, error))
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error saving backfill checkpoint {symbol} {timeframe} {chunk_start}: {e}")
+
+    @_synchronized
+    def get_backfill_checkpoints(self, timeframe: Optional[str] = None) -> pd.DataFrame:
+        """Backfill chunk outcomes (optionally for one timeframe)."""
+        try:
+            self._ensure_connection()
+            query = "SELECT * FROM backfill_checkpoints"
+            params = []
+            if timeframe is not None:
+                query += " WHERE timeframe = ?"
+                params.append(timeframe)
+            return pd.read_sql_query(query, self.conn, params=params)
+        except Exception as e:
+            logger.error(f"Error loading backfill checkpoints: {e}")
+            return pd.DataFrame()
+
+    @_synchronized
+    def clear_backfill_checkpoints(self, symbols: Optional[List[str]] = None, timeframes: Optional[List[str]] = None):
+        """Forget backfill progress (optionally only for `symbols` / `timeframes`), so the next run starts over."""
+        try:
+            self._ensure_connection()
+            query, params = "DELETE FROM backfill_checkpoints WHERE 1 = 1", []
+            for column, values in (("symbol", symbols), ("timeframe", timeframes)):
+                if values is not None:
+                    query += f" AND {column} IN ({', '.join('?' * len(values))})"
+                    params.extend(values)
+            self.conn.execute(query, params)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error clearing backfill checkpoints: {e}")
+
+    @_synchronized
+    def save_gap_watermark(self, symbol: str, timeframe: str, verified_until: datetime, checked_at: datetime,
+                           deep: bool = False):
+        """Moves the gap watermark of a series (`deep` records a full-history check)."""
+        try:
+            self._ensure_connection()
+            checked = pd.Timestamp(checked_at).isoformat()
+            self.conn.execute('''
+            INSERT INTO gap_watermarks (symbol, timeframe, verified_until, checked_at, deep_checked_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, timeframe) DO UPDATE SET
+                verified_until = excluded.verified_until, checked_at = excluded.checked_at,
+                deep_checked_at = COALESCE(excluded.deep_checked_at, deep_checked_at)
+            ''', (symbol, timeframe, _utc(verified_until).isoformat(), checked, checked if deep else None))
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error saving gap watermark {symbol} {timeframe}: {e}")
+
+    @_synchronized
+    def get_gap_watermark(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """End of the gap-verified prefix of a series (UTC), or None if never checked."""
+        try:
+            self._ensure_connection()
+            row = self.conn.execute(
+                "SELECT verified_until FROM gap_watermarks WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe)).fetchone()
+            return pd.Timestamp(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Error loading gap watermark {symbol} {timeframe}: {e}")
+            return None
+
+    @_synchronized
+    def get_gap_watermarks(self, timeframe: Optional[str] = None) -> pd.DataFrame:
+        """All gap watermarks (optionally for one timeframe)."""
+        try:
+            self._ensure_connection()
+            query = "SELECT * FROM gap_watermarks"
+            params = []
+            if timeframe is not None:
+                query += " WHERE timeframe = ?"
+                params.append(timeframe)
+            return pd.read_sql_query(query, self.conn, params=params)
+        except Exception as e:
+            logger.error(f"Error loading gap watermarks: {e}")
+            return pd.DataFrame()
+
+    @_synchronized
+    def rewind_gap_watermark(self, symbol: str, timeframe: str, inserted_at: datetime):
+        """
+        A bar was inserted at `inserted_at`: if that is inside the verified
+        prefix, move the watermark back to the start of the day of the previous
+        stored bar (stored timestamps mix ISO formats, so the SQL bound is a
+        date prefix), or drop it when nothing is stored before (history was
+        prepended), so the next check covers the new bar's neighbourhood.
+        """
+        try:
+            self._ensure_connection()
+            row = self.conn.execute(
+                "SELECT verified_until FROM gap_watermarks WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe)).fetchone()
+            inserted_at = _utc(inserted_at)
+            if row is None or pd.Timestamp(row[0]) < inserted_at:
+                return
+            prev = self.conn.execute(
+                "SELECT MAX(timestamp) FROM market_data WHERE symbol = ? AND timeframe = ? AND timestamp < ?",
+                (symbol, timeframe, inserted_at.strftime('%Y-%m-%d'))).fetchone()[0]
+            if prev is None:
+                self.conn.execute("DELETE FROM gap_watermarks WHERE symbol = ? AND timeframe = ?", (symbol, timeframe))
+            else:
+                self.conn.execute(
+                    "UPDATE gap_watermarks SET verified_until = ? WHERE symbol = ? AND timeframe = ?",
+                    (pd.Timestamp(prev[:10], tz='UTC').isoformat(), symbol, timeframe))
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error rewinding gap watermark {symbol} {timeframe}: {e}")
+
+    @_synchronized
+    def clear_gap_watermarks(self, symbols: Optional[List[str]] = None, timeframes: Optional[List[str]] = None):
+        """Forget gap watermarks (optionally only for `symbols` / `timeframes`), forcing full checks."""
+        try:
+            self._ensure_connection()
+            query, params = "DELETE FROM gap_watermarks WHERE 1 = 1", []
+            for column, values in (("symbol", symbols), ("timeframe", timeframes)):
+                if values is not None:
+                    query += f" AND {column} IN ({', '.join('?' * len(values))})"
+                    params.extend(values)
+            self.conn.execute(query, params)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error clearing gap watermarks: {e}")
+
+    @_synchronized
+    def save_quality_reports(self, rows: List[tuple]):
+        """
+        Save (replace) data quality reports.
+        rows: (symbol, timeframe, level, extended_hours, bar_count, last_bar, status, score,
+               backtest_ready, total_bars, report, validated_at)
+        """
+        if not rows:
+            return
+        try:
+            self._ensure_connection()
+            self.conn.executemany('''
+            INSERT OR REPLACE INTO data_quality
+            (symbol, timeframe, level, extended_hours, bar_count, last_bar, status, score,
+             backtest_ready, total_bars, report, validated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error saving data quality reports: {e}")
+
+    @_synchronized
+    def get_quality_reports(self, timeframe: Optional[str] = None, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Stored data quality reports (optionally for one timeframe / some symbols)."""
+        try:
+            self._ensure_connection()
+            query, params = "SELECT * FROM data_quality WHERE 1 = 1", []
+            if timeframe is not None:
+                query += " AND timeframe = ?"
+                params.append(timeframe)
+            if symbols is not None:
+                query += f" AND symbol IN ({', '.join('?' * len(symbols))})"
+                params.extend(symbols)
+            return pd.read_sql_query(query, self.conn, params=params)
+        except Exception as e:
+            logger.error(f"Error loading data quality reports: {e}")
+            return pd.DataFrame()
+
+    @_synchronized
+    def clear_quality_reports(self, symbols: Optional[List[str]] = None, timeframes: Optional[List[str]] = None):
+        """Forget data quality reports (optionally only for `symbols` / `timeframes`), forcing re-validation."""
+        try:
+            self._ensure_connection()
+            query, params = "DELETE FROM data_quality WHERE 1 = 1", []
+            for column, values in (("symbol", symbols), ("timeframe", timeframes)):
+                if values is not None:
+                    query += f" AND {column} IN ({', '.join('?' * len(values))})"
+                    params.extend(values)
+            self.conn.execute(query, params)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error clearing data quality reports: {e}")
+
+    @_synchronized
     def load_indicators(self, symbol: str, timeframe: str) -> pd.DataFrame:
         """Load indicators as DataFrame."""
         try:
@@ -387,6 +802,7 @@ class Database:
             logger.error(f"Error loading indicators {symbol} {timeframe}: {e}")
             return pd.DataFrame()
 
+    @_synchronized
     def save_alert(self, signal, plan, snapshot_data: str = None):
         """Persists a generated alert with its trade plan targets."""
         try:
@@ -426,6 +842,7 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to save alert for {signal.symbol}: {e}")
 
+    @_synchronized
     def get_active_alerts(self) -> List[Dict]:
         """Returns all alerts that are currently SENT (active)."""
         try:
@@ -437,6 +854,7 @@ class Database:
             logger.error(f"Error fetching active alerts: {e}")
             return []
 
+    @_synchronized
     def update_alert_performance(self, alert_id: int, outcome: str, pnl_r: float, exit_price: float, exit_time: datetime, pnl_amount: float = 0.0, duration_minutes: float = 0.0):
         """Updates or inserts performance record and closes the alert."""
         try:
@@ -455,6 +873,7 @@ class Database:
         except Exception as e:
             logger.error(f"Error updating alert performance {alert_id}: {e}")
 
+    @_synchronized
     def signal_exists(self, symbol: str, timestamp: datetime) -> bool:
         """
         Checks if an alert already exists for this symbol and candle timestamp.
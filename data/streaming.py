@@ -0,0 +1,478 @@
+"""
+Real-Time Bar Aggregation
+=========================
+Builds session-anchored bars (1m and 1h by default) in memory from a stream
+of trades or quotes, so the scan cycle can read the forming hourly candle
+without polling a REST API, and closed bars are stored the moment they close.
+
+- Sources (ITickSource): ReplayTickSource reads a CSV file (tests, replays),
+  SocketTickSource reads newline-delimited JSON from a TCP socket (stand-in
+  for a vendor stream).
+- BarAggregator: buckets are anchored at the NY session open (09:30) and the
+  last bucket of a session is cut at the close, the same grid BarResampler
+  uses. Ticks outside RTH and late ticks (for a bar already closed) are
+  counted and dropped. Bars that missed ticks (their bucket started before
+  the first tick of the stream, or the stream reconnected while they were
+  forming) are marked `partial`.
+- BarStreamService: feeds ticks to the aggregator and closes bars on time,
+  both by event time (a tick stamped after a bucket end closes that bucket
+  for every symbol) and by wall clock (no trades needed). Closed bars are
+  stored (DataManager.store_stream_bars), then forming and closed bars are
+  published to subscribers; close listeners fire once per bucket end, after
+  all bars of that bucket are stored. `partial` bars are not stored, and a
+  symbol only counts as live (no REST polling) once a whole hourly bucket
+  was streamed, so REST fills the bars the stream missed.
+"""
+import csv
+import json
+import logging
+import socket
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+from core.market_calendar import NY_TZ, SessionCalendar, get_session_calendar
+from data.interfaces import ITickSource, Tick
+from data.resampler import BASE_PERIOD_MINUTES
+
+logger = logging.getLogger("core.data.streaming")
+
+STREAM_SOURCE = "STREAM"
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+@dataclass
+class StreamBar:
+    """A forming or closed bar built from ticks."""
+    symbol: str
+    timeframe: str
+    start: pd.Timestamp
+    end: pd.Timestamp   # Bucket end (cut at the session close)
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    ticks: int = 1
+    closed: bool = False
+    partial: bool = False   # Missed ticks (see module docstring); never stored
+
+    def update(self, price: float, size: float):
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.volume += size
+        self.ticks += 1
+
+    def to_frame(self) -> pd.DataFrame:
+        """One-row OHLCV frame in the `load_market_data` format."""
+        return pd.DataFrame({'Open': [self.open], 'High': [self.high], 'Low': [self.low],
+                             'Close': [self.close], 'Volume': [self.volume], 'is_filled': [0]},
+                            index=pd.DatetimeIndex([self.start], name='timestamp'))
+
+
+# --- Tick sources ---
+
+class ReplayTickSource(ITickSource):
+    """
+    Replays ticks from a CSV file with columns timestamp,symbol,price,size.
+    Quote files may carry bid,ask instead of price (midpoint, zero size).
+
+    `speed` 1.0 keeps the original spacing between ticks, 2.0 plays twice as
+    fast, 0 replays as fast as possible.
+    """
+
+    def __init__(self, path, speed: float = 0.0):
+        self.path = Path(path)
+        self.speed = speed
+        self._stop = threading.Event()
+
+    def ticks(self) -> Iterator[Tick]:
+        previous = None
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                if self._stop.is_set():
+                    return
+                tick = parse_tick(row)
+                if tick is None:
+                    continue
+                if self.speed > 0 and previous is not None:
+                    delay = (tick.timestamp - previous).total_seconds() / self.speed
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                previous = tick.timestamp
+                yield tick
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+class SocketTickSource(ITickSource):
+    """
+    Reads newline-delimited JSON ticks ({"symbol", "timestamp", "price", "size"}
+    or "bid"/"ask" instead of "price") from a TCP server, reconnecting with
+    backoff when the connection drops.
+    """
+
+    def __init__(self, host: str, port: int, reconnect_seconds: float = 1.0, max_reconnect_seconds: float = 30.0):
+        self.host = host
+        self.port = port
+        self.reconnect_seconds = reconnect_seconds
+        self.max_reconnect_seconds = max_reconnect_seconds
+        self._stop = threading.Event()
+        self._sock: Optional[socket.socket] = None
+
+    def ticks(self) -> Iterator[Tick]:
+        delay = self.reconnect_seconds
+        while not self._stop.is_set():
+            try:
+                self._sock = socket.create_connection((self.host, self.port), timeout=10)
+                self._sock.settimeout(None)
+                logger.info(f"Tick stream connected to {self.host}:{self.port}")
+                delay = self.reconnect_seconds
+                with self._sock.makefile("r", encoding="utf-8") as lines:
+                    for line in lines:
+                        if self._stop.is_set():
+                            return
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            tick = parse_tick(json.loads(line))
+                        except ValueError as e:
+                            logger.warning(f"Malformed tick skipped: {e}")
+                            continue
+                        if tick is not None:
+                            yield tick
+            except OSError as e:
+                if self._stop.is_set():
+                    return
+                logger.warning(f"Tick stream {self.host}:{self.port} unavailable: {e}")
+            finally:
+                if self._sock is not None:
+                    self._sock.close()
+                    self._sock = None
+            # Ticks sent while disconnected are lost
+            if self.on_gap is not None:
+                self.on_gap()
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, self.max_reconnect_seconds)
+
+    def close(self) -> None:
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def parse_tick(row: Dict) -> Optional[Tick]:
+    """Tick from a CSV row / JSON object (trade price or bid/ask quote), or None if incomplete."""
+    symbol = row.get("symbol")
+    timestamp = row.get("timestamp")
+    if not symbol or not timestamp:
+        return None
+    ts = _utc(timestamp)
+    if row.get("price") not in (None, ""):
+        return Tick(symbol, ts, float(row["price"]), float(row.get("size") or 0.0))
+    if row.get("bid") not in (None, "") and row.get("ask") not in (None, ""):
+        return Tick.from_quote(symbol, ts, float(row["bid"]), float(row["ask"]))
+    return None
+
+
+def build_tick_source(config: Dict) -> ITickSource:
+    """Tick source from STREAM_CONFIG."""
+    if config.get("SOURCE", "replay") == "socket":
+        return SocketTickSource(config.get("SOCKET_HOST", "127.0.0.1"), config.get("SOCKET_PORT", 9100))
+    return ReplayTickSource(config["REPLAY_PATH"], speed=config.get("REPLAY_SPEED", 1.0))
+
+
+# --- Aggregation ---
+
+class BarAggregator:
+    """
+    Session-anchored OHLCV bars per (symbol, timeframe), built tick by tick.
+    Thread-safe (ticks and clock closes may come from different threads).
+    """
+
+    def __init__(self, timeframes: Sequence[str] = ("1m", "1h"), calendar: Optional[SessionCalendar] = None):
+        unknown = [tf for tf in timeframes if tf not in BASE_PERIOD_MINUTES]
+        if unknown:
+            raise ValueError(f"Unsupported stream timeframes: {unknown}")
+        self.timeframes = tuple(timeframes)
+        self.calendar = calendar or get_session_calendar()
+        self._forming: Dict[Tuple[str, str], StreamBar] = {}
+        self._closed_until: Dict[Tuple[str, str], pd.Timestamp] = {}
+        # Ticks are complete from this time on (None until the first tick after a gap)
+        self._stream_start: Optional[pd.Timestamp] = None
+        # (symbol, timeframe) keys that closed a complete bar since the last gap
+        self._covered: Set[Tuple[str, str]] = set()
+        self._sessions: Dict[date, Optional[Tuple[pd.Timestamp, pd.Timestamp]]] = {}
+        self._lock = threading.Lock()
+        self.late_ticks = 0
+        self.outside_session_ticks = 0
+
+    def bucket(self, ts: pd.Timestamp, timeframe: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """(start, end) of the `timeframe` bucket holding `ts`, or None outside RTH."""
+        ts = _utc(ts)
+        day = ts.tz_convert(NY_TZ).date()
+        if day not in self._sessions:
+            self._sessions[day] = self.calendar.session_bounds(day)
+        bounds = self._sessions[day]
+        if bounds is None or not bounds[0] <= ts < bounds[1]:
+            return None
+        session_open, session_close = bounds
+        step = pd.Timedelta(minutes=BASE_PERIOD_MINUTES[timeframe])
+        start = session_open + ((ts - session_open) // step) * step
+        return start, min(start + step, session_close)
+
+    def on_tick(self, tick: Tick) -> List[StreamBar]:
+        """
+        Adds a tick. Returns snapshots of the bars it closed (ticks past their
+        end) and of the bars it updated, in that order.
+        """
+        ts = _utc(tick.timestamp)
+        closed, updated = [], []
+        with self._lock:
+            if self._stream_start is None:
+                self._stream_start = ts
+            for timeframe in self.timeframes:
+                bounds = self.bucket(ts, timeframe)
+                if bounds is None:
+                    self.outside_session_ticks += 1
+                    return []
+                key = (tick.symbol, timeframe)
+                bar = self._forming.get(key)
+                if bar is not None and ts >= bar.end:
+                    closed.append(self._close(key))
+                    bar = None
+                if (bar is not None and ts < bar.start) or \
+                        (bar is None and key in self._closed_until and ts < self._closed_until[key]):
+                    self.late_ticks += 1
+                    continue
+                if bar is None:
+                    bar = StreamBar(tick.symbol, timeframe, bounds[0], bounds[1],
+                                    tick.price, tick.price, tick.price, tick.price, tick.size,
+                                    partial=bounds[0] < self._stream_start)
+                    self._forming[key] = bar
+                else:
+                    bar.update(tick.price, tick.size)
+                updated.append(replace(bar))
+        return closed + updated
+
+    def advance(self, now: pd.Timestamp) -> List[StreamBar]:
+        """Closes every forming bar whose bucket ended at or before `now`."""
+        now = _utc(now)
+        with self._lock:
+            due = [key for key, bar in self._forming.items() if bar.end <= now]
+            return [self._close(key) for key in due]
+
+    def flush(self) -> List[StreamBar]:
+        """Closes all forming bars (end of a replay)."""
+        with self._lock:
+            return [self._close(key) for key in list(self._forming)]
+
+    def mark_gap(self):
+        """
+        Ticks may have been missed (stream reconnected): the forming bars and
+        the buckets started before the next tick are partial.
+        """
+        with self._lock:
+            for bar in self._forming.values():
+                bar.partial = True
+            self._stream_start = None
+            self._covered.clear()
+
+    def covered(self, symbol: str, timeframe: str = "1h") -> bool:
+        """True once a complete `timeframe` bar of `symbol` closed since the stream started (or last gap)."""
+        with self._lock:
+            return (symbol, timeframe) in self._covered
+
+    def _close(self, key: Tuple[str, str]) -> StreamBar:
+        bar = self._forming.pop(key)
+        self._closed_until[key] = bar.end
+        if not bar.partial:
+            self._covered.add(key)
+        return replace(bar, closed=True)
+
+    def forming(self, symbol: str, timeframe: str = "1h") -> Optional[StreamBar]:
+        """Snapshot of the forming bar, or None."""
+        with self._lock:
+            bar = self._forming.get((symbol, timeframe))
+            return replace(bar) if bar is not None else None
+
+
+class BarStreamService:
+    """
+    Runs a tick source through a BarAggregator, stores closed bars and
+    publishes bar events (see module docstring).
+    """
+
+    def __init__(self, source: ITickSource, aggregator: Optional[BarAggregator] = None,
+                 store: Optional[Callable[[str, str, pd.DataFrame], None]] = None,
+                 persist_timeframes: Sequence[str] = ("1m", "1h"),
+                 stale_seconds: float = 120.0, close_grace_seconds: float = 2.0,
+                 now_fn: Optional[Callable[[], pd.Timestamp]] = None):
+        """
+        Args:
+            source: Tick source.
+            aggregator: Bar builder (defaults to 1m and 1h bars).
+            store: Called with (symbol, timeframe, bars) for closed bars of
+                `persist_timeframes` (e.g. DataManager.store_stream_bars).
+            stale_seconds: A symbol counts as live while it received a tick
+                within this many seconds.
+            close_grace_seconds: The wall-clock close waits this long after a
+                bucket end for late ticks.
+            now_fn: Wall clock (tz-aware UTC).
+        """
+        self.source = source
+        self.aggregator = aggregator or BarAggregator()
+        self.source.on_gap = self.aggregator.mark_gap
+        self.store = store
+        self.persist_timeframes = set(persist_timeframes)
+        self.stale_seconds = stale_seconds
+        self.close_grace_seconds = close_grace_seconds
+        self.now_fn = now_fn or (lambda: pd.Timestamp.now(tz="UTC"))
+
+        self._subscribers: List[Callable[[StreamBar], None]] = []
+        self._close_listeners: List[Callable[[str, pd.Timestamp], None]] = []
+        self._pending_ends: Dict[str, Set[pd.Timestamp]] = {}
+        self._last_seen: Dict[str, float] = {}   # symbol -> monotonic time of its last tick
+        self._publish_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.ticks = 0
+
+    def subscribe(self, callback: Callable[[StreamBar], None]):
+        """`callback(bar)` for every partial and closed bar."""
+        self._subscribers.append(callback)
+
+    def on_close(self, callback: Callable[[str, pd.Timestamp], None]):
+        """`callback(timeframe, end)` once per closed bucket, after its bars are stored."""
+        self._close_listeners.append(callback)
+
+    # --- Running ---
+
+    def start(self, clock_interval: float = 1.0):
+        """Consumes the source on a background thread and closes bars on the wall clock."""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._consume, name="tick-stream", daemon=True),
+            threading.Thread(target=self._clock_loop, args=(clock_interval,), name="bar-clock", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self.source.close()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run(self, flush: bool = True) -> int:
+        """
+        Consumes the source on the calling thread until it ends (replays).
+        With `flush`, bars still forming at the end are closed. Returns the tick count.
+        """
+        self._consume()
+        if flush:
+            self._process(self.aggregator.flush(), None)
+        return self.ticks
+
+    def _consume(self):
+        try:
+            for tick in self.source.ticks():
+                if self._stop.is_set():
+                    break
+                self.handle_tick(tick)
+        except Exception as e:
+            logger.error(f"Tick stream failed: {e}", exc_info=True)
+
+    def _clock_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                now = self.now_fn() - pd.Timedelta(seconds=self.close_grace_seconds)
+                self._process(self.aggregator.advance(now), now)
+            except Exception as e:
+                logger.error(f"Bar clock failed: {e}", exc_info=True)
+
+    def handle_tick(self, tick: Tick):
+        """Closes buckets ended by the tick's time (all symbols, after the grace), then adds the tick."""
+        self.ticks += 1
+        self._last_seen[tick.symbol] = time.monotonic()
+        # Other symbols' ticks may arrive slightly out of order: same grace as the wall clock
+        now = _utc(tick.timestamp) - pd.Timedelta(seconds=self.close_grace_seconds)
+        events = self.aggregator.advance(now) + self.aggregator.on_tick(tick)
+        self._process(events, now)
+
+    def _process(self, events: List[StreamBar], now: Optional[pd.Timestamp]):
+        with self._publish_lock:
+            for bar in events:
+                if bar.closed:
+                    self._pending_ends.setdefault(bar.timeframe, set()).add(bar.end)
+                    if bar.partial:
+                        logger.debug(f"Partial stream bar {bar.symbol} {bar.timeframe} {bar.start} "
+                                     f"not stored (left to REST)")
+                    elif self.store is not None and bar.timeframe in self.persist_timeframes:
+                        try:
+                            self.store(bar.symbol, bar.timeframe, bar.to_frame())
+                        except Exception as e:
+                            logger.error(f"Failed to store stream bar {bar.symbol} {bar.timeframe} {bar.start}: {e}")
+                for callback in self._subscribers:
+                    try:
+                        callback(bar)
+                    except Exception as e:
+                        logger.error(f"Stream subscriber failed: {e}", exc_info=True)
+
+            # Buckets are complete once the clock passed their end (or the stream ended)
+            for timeframe, ends in self._pending_ends.items():
+                done = sorted(end for end in ends if now is None or end <= _utc(now))
+                for end in done:
+                    ends.discard(end)
+                    for callback in self._close_listeners:
+                        try:
+                            callback(timeframe, end)
+                        except Exception as e:
+                            logger.error(f"Stream close listener failed: {e}", exc_info=True)
+
+    # --- Scan integration ---
+
+    def is_live(self, symbol: str) -> bool:
+        """
+        True if `symbol` received a tick within `stale_seconds` and the stream
+        has built a complete hourly bar of it since it started (or last
+        reconnected); until then its bars are polled from REST.
+        """
+        seen = self._last_seen.get(symbol)
+        return (seen is not None and time.monotonic() - seen <= self.stale_seconds
+                and self.aggregator.covered(symbol, "1h"))
+
+    def forming_bar(self, symbol: str, timeframe: str = "1h") -> Optional[StreamBar]:
+        return self.aggregator.forming(symbol, timeframe)
+
+    def with_forming_bar(self, symbol: str, df: pd.DataFrame, timeframe: str = "1h") -> pd.DataFrame:
+        """
+        `df` (stored bars) with the forming bar appended, replacing any stored
+        row at or after its start. A partial forming bar is not used.
+        """
+        bar = self.forming_bar(symbol, timeframe)
+        if bar is None or bar.partial:
+            return df
+        row = bar.to_frame()
+        if df is None or df.empty:
+            return row
+        kept = df[df.index < bar.start]
+        return pd.concat([kept, row[[c for c in row.columns if c in df.columns]]])
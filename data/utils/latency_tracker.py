@@ -0,0 +1,57 @@
+"""
+Provider Latency Tracker
+========================
+Thread-safe rolling window of successful fetch latencies per provider, used
+to decide when a hedged (parallel backup) request is worth starting.
+"""
+
+import logging
+from threading import Lock
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("core.data.latency_tracker")
+
+
+class LatencyTracker:
+    """
+    Keeps the last `window` latencies (seconds) of each provider.
+    """
+    
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = Lock()
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        
+    def record(self, provider_name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[provider_name.upper()].append(seconds)
+            
+    def percentile(self, provider_name: str, q: float = 95) -> Optional[float]:
+        """
+        Latency percentile for a provider, or None until `min_samples` are recorded.
+        """
+        with self._lock:
+            samples = list(self._samples.get(provider_name.upper(), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return float(np.percentile(samples, q))
+    
+    def p95(self, provider_name: str) -> Optional[float]:
+        return self.percentile(provider_name, 95)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+# Global singleton instance
+_latency_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get the global latency tracker instance."""
+    return _latency_tracker
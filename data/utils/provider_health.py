@@ -0,0 +1,212 @@
+"""
+Provider Health Scoreboard
+==========================
+Thread-safe per-provider health record used by the DataManager to skip
+failing providers and to order the healthy ones.
+
+- Counters: successes, failures, rate-limit hits, plus a latency histogram
+  of successful calls.
+- Circuit breaker: after FAILURE_THRESHOLD consecutive failures (or any
+  rate-limit hit) the provider's circuit opens for COOLDOWN_SECONDS (or the
+  Retry-After, if longer). When the cool-down ends a single probe call is let
+  through; success closes the circuit, failure reopens it. A failing provider
+  therefore costs one call per cool-down window.
+- Adaptive order: open circuits last, then by reliability and latency tier
+  over the recent outcomes (STATS_WINDOW_SECONDS), with the static `priority`
+  order as tie-breaker. Tiers are coarse so providers do not swap places on noise,
+  and old outcomes age out so a demoted provider is eventually tried again.
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, List, Optional
+
+from config.settings import DATA_CONFIG
+
+logger = logging.getLogger("core.data.provider_health")
+
+# Latency histogram upper bounds (seconds); the last bucket is open-ended
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, math.inf)
+
+# Latency tier assumed for providers without enough samples (the <= 1s bucket)
+DEFAULT_LATENCY_TIER = LATENCY_BUCKETS.index(1.0)
+
+
+@dataclass
+class ProviderStats:
+    successes: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    consecutive_failures: int = 0
+    latency_histogram: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    open_until: float = 0.0    # Circuit open (provider skipped) until this time
+    probing: bool = False      # Cool-down over, one probe call let through
+    recent: deque = field(default_factory=lambda: deque(maxlen=50))  # (time, ok, seconds)
+
+    @property
+    def calls(self) -> int:
+        return self.successes + self.failures
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.calls if self.calls else 1.0
+
+    def latency_median(self) -> Optional[float]:
+        """Upper bound of the histogram bucket holding the median latency."""
+        total = sum(self.latency_histogram)
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_histogram):
+            seen += count
+            if seen * 2 >= total:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def recent_outcomes(self, since: float) -> list:
+        return [r for r in self.recent if r[0] >= since]
+
+
+class ProviderHealth:
+    """
+    Health scoreboard and circuit breakers for all providers (see module docstring).
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, cooldown_seconds: Optional[float] = None,
+                 min_samples: int = 5):
+        cfg = DATA_CONFIG.get("CIRCUIT_BREAKER", {})
+        self.failure_threshold = failure_threshold or cfg.get("FAILURE_THRESHOLD", 3)
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else cfg.get("COOLDOWN_SECONDS", 300)
+        self.stats_window_seconds = cfg.get("STATS_WINDOW_SECONDS", 3600)
+        self.min_samples = min_samples
+        self._lock = Lock()
+        self._stats: Dict[str, ProviderStats] = {}
+
+    def _get(self, provider_name: str) -> ProviderStats:
+        return self._stats.setdefault(provider_name.upper(), ProviderStats())
+
+    def allow(self, provider_name: str) -> bool:
+        """
+        True if the provider may be called now. Call right before the request:
+        after a cool-down this hands out the single probe slot.
+        """
+        with self._lock:
+            stats = self._get(provider_name)
+            if stats.open_until == 0.0:
+                return True
+            now = time.time()
+            if now < stats.open_until:
+                return False
+            # Other callers keep skipping the provider while the probe runs
+            stats.open_until = now + self.cooldown_seconds
+            stats.probing = True
+            logger.info(f"Circuit half-open for {provider_name}: probing")
+            return True
+
+    def is_open(self, provider_name: str) -> bool:
+        with self._lock:
+            stats = self._get(provider_name)
+            return time.time() < stats.open_until
+
+    def record_success(self, provider_name: str, seconds: Optional[float] = None) -> None:
+        with self._lock:
+            stats = self._get(provider_name)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.recent.append((time.time(), True, seconds))
+            if seconds is not None:
+                bucket = next(i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound)
+                stats.latency_histogram[bucket] += 1
+            if stats.open_until:
+                logger.info(f"Circuit closed for {provider_name}")
+            stats.open_until = 0.0
+            stats.probing = False
+
+    def record_failure(self, provider_name: str, reason: str = "error") -> None:
+        with self._lock:
+            stats = self._get(provider_name)
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.recent.append((time.time(), False, None))
+            if stats.probing or stats.consecutive_failures >= self.failure_threshold:
+                self._trip(provider_name, stats, self.cooldown_seconds, reason)
+
+    def record_rate_limited(self, provider_name: str, retry_after: Optional[float] = None) -> None:
+        """A 429 / quota message opens the circuit right away."""
+        with self._lock:
+            stats = self._get(provider_name)
+            stats.rate_limited += 1
+            self._trip(provider_name, stats, max(self.cooldown_seconds, retry_after or 0), "rate limited")
+
+    def _trip(self, provider_name: str, stats: ProviderStats, cooldown: float, reason: str) -> None:
+        stats.open_until = max(stats.open_until, time.time() + cooldown)
+        stats.probing = False
+        logger.warning(f"Circuit open for {provider_name} ({reason}, "
+                       f"{stats.consecutive_failures} consecutive failures): skipping for {cooldown:.0f}s")
+
+    def order(self, providers: list) -> list:
+        """
+        Providers sorted for the next fetch: closed circuits first, then by
+        reliability and latency tier. Ties keep the given (priority) order.
+        """
+        now = time.time()
+
+        def _key(provider):
+            with self._lock:
+                stats = self._get(provider.name)
+                is_open = now < stats.open_until
+                recent = stats.recent_outcomes(now - self.stats_window_seconds)
+            if len(recent) < self.min_samples:
+                return (is_open, 0, DEFAULT_LATENCY_TIER)
+            reliability_tier = round(sum(not ok for _, ok, _ in recent) / len(recent) * 10)
+            latencies = sorted(sec for _, ok, sec in recent if ok and sec is not None)
+            latency_tier = DEFAULT_LATENCY_TIER
+            if latencies:
+                median = latencies[len(latencies) // 2]
+                latency_tier = next(i for i, bound in enumerate(LATENCY_BUCKETS) if median <= bound)
+            return (is_open, reliability_tier, latency_tier)
+
+        return sorted(providers, key=_key)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-provider metrics (for logs and diagnostics)."""
+        with self._lock:
+            now = time.time()
+            return {
+                name: {
+                    "calls": s.calls,
+                    "success_rate": round(s.success_rate, 3),
+                    "rate_limited": s.rate_limited,
+                    "consecutive_failures": s.consecutive_failures,
+                    "latency_median": s.latency_median(),
+                    "latency_histogram": dict(zip((str(b) for b in LATENCY_BUCKETS), s.latency_histogram)),
+                    "circuit_open_for": max(0.0, s.open_until - now) if s.open_until else 0.0,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def summary(self) -> str:
+        parts = []
+        for name, m in self.snapshot().items():
+            state = f"OPEN {m['circuit_open_for']:.0f}s" if m["circuit_open_for"] else "ok"
+            median = f"{m['latency_median']}s" if m["latency_median"] is not None else "n/a"
+            parts.append(f"{name} {m['success_rate']:.0%} of {m['calls']}, p50<={median}, "
+                         f"429x{m['rate_limited']}, {state}")
+        return "; ".join(parts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# Global singleton instance
+_provider_health = ProviderHealth()
+
+
+def get_provider_health() -> ProviderHealth:
+    """Get the global provider health instance."""
+    return _provider_health
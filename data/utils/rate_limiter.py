@@ -1,146 +1,280 @@
 """
 Rate Limiter Utility
 =====================
-Thread-safe rate limiting for API providers to prevent quota exhaustion.
+Token-bucket rate limiting for API providers to prevent quota exhaustion.
+
+Bucket state lives in a small SQLite database, so every process on the host
+(live loop, backfill scripts, collectors) draws from the same per-provider
+quota. Each acquisition is a short IMMEDIATE transaction that reserves the
+next free slot; callers then sleep (or `await`) outside the lock, so waiting
+never blocks other processes or threads.
+
+- Bucket: `requests_per_minute` refill rate, `burst` capacity (defaults to
+  requests_per_minute), plus a minimum `cooldown_seconds` between requests.
+- Provider feedback: `report_throttled()` (HTTP 429 / Retry-After) blocks the
+  provider for every process until the retry time and empties the bucket
+  (and opens the provider's circuit, see provider_health.py).
+- Metrics: acquisitions, time spent waiting, denials and throttles per
+  provider (shared across processes), via `get_stats()`.
 """
 
-import time
+import asyncio
 import logging
+import sqlite3
+import time
+from pathlib import Path
 from threading import Lock
-from collections import defaultdict, deque
-from typing import Dict
-from config.settings import RATE_LIMITS
+from typing import Dict, Optional
+from config.settings import RATE_LIMITS, RATE_LIMITER_CONFIG
+from data.utils.provider_health import get_provider_health
 
 logger = logging.getLogger("core.data.rate_limiter")
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    provider TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    last_slot REAL NOT NULL DEFAULT 0,
+    blocked_until REAL NOT NULL DEFAULT 0,
+    acquired INTEGER NOT NULL DEFAULT 0,
+    waited_seconds REAL NOT NULL DEFAULT 0,
+    denied INTEGER NOT NULL DEFAULT 0,
+    throttled INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rate_requests (
+    provider TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rate_requests ON rate_requests (provider, ts);
+"""
+
+
+def _key(provider_name: str) -> str:
+    # "TWELVE_DATA" (provider name) and "TWELVEDATA" (RATE_LIMITS key) are the same quota
+    return provider_name.upper().replace("_", "")
+
 
 class RateLimiter:
     """
-    Thread-safe rate limiter for API providers.
-    Tracks request timestamps and enforces cooldown periods.
+    Cross-process token-bucket rate limiter for API providers.
+
+    Args:
+        db_path: SQLite file holding the shared bucket state. None keeps the
+            state in memory (private to this limiter).
     """
-    
-    def __init__(self):
-        self._locks: Dict[str, Lock] = defaultdict(Lock)
-        self._request_times: Dict[str, deque] = defaultdict(deque)
-        self._last_request: Dict[str, float] = {}
-        
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = str(db_path) if db_path else ":memory:"
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # One connection per limiter; SQLite serializes processes, the lock serializes threads
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        if db_path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _limits(provider: str) -> Optional[Dict]:
+        for name, config in RATE_LIMITS.items():
+            if _key(name) == provider:
+                return config
+        return None
+
+    def _reserve(self, provider_name: str, block: bool) -> Optional[float]:
+        """
+        Reserves the next request slot. Returns the seconds to wait before
+        sending it (0 = now), or None if `block` is False and no slot is free now.
+        """
+        provider = _key(provider_name)
+        config = self._limits(provider)
+        if config is None:
+            return 0.0
+        rpm = config.get("requests_per_minute", 60)
+        capacity = config.get("burst", rpm)
+        cooldown = config.get("cooldown_seconds", 1)
+        rate = rpm / 60.0
+
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated, last_slot, blocked_until FROM rate_buckets WHERE provider = ?",
+                    (provider,)).fetchone()
+                tokens, updated, last_slot, blocked_until = row if row else (capacity, now, 0.0, 0.0)
+
+                # No refill while blocked (report_throttled moves `updated` to the block's end)
+                tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+                updated = max(now, updated)
+                ready = now if tokens >= 1 else now + (1 - tokens) / rate
+                ready = max(ready, blocked_until, last_slot + cooldown)
+                wait = ready - now
+
+                if wait > 0 and not block:
+                    conn.execute(
+                        "INSERT INTO rate_buckets (provider, tokens, updated, denied) VALUES (?, ?, ?, 1) "
+                        "ON CONFLICT(provider) DO UPDATE SET denied = denied + 1",
+                        (provider, capacity, now))
+                    conn.execute("COMMIT")
+                    return None
+
+                # Tokens may go negative: later callers queue behind this reservation
+                conn.execute(
+                    "INSERT INTO rate_buckets (provider, tokens, updated, last_slot, blocked_until, acquired, waited_seconds) "
+                    "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                    "ON CONFLICT(provider) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                    "last_slot = excluded.last_slot, acquired = acquired + 1, "
+                    "waited_seconds = waited_seconds + excluded.waited_seconds",
+                    (provider, tokens - 1, updated, ready, blocked_until, wait))
+                conn.execute("INSERT INTO rate_requests (provider, ts) VALUES (?, ?)", (provider, ready))
+                conn.execute("DELETE FROM rate_requests WHERE provider = ? AND ts < ?", (provider, now - 60))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
     def wait_if_needed(self, provider_name: str) -> None:
         """
         Wait if necessary to comply with rate limits for the given provider.
-        
+
         Args:
             provider_name: Name of the provider (e.g., 'POLYGON', 'TWELVEDATA')
         """
-        provider_upper = provider_name.upper()
-        
-        if provider_upper not in RATE_LIMITS:
-            logger.debug(f"No rate limit configured for {provider_name}")
-            return
-            
-        config = RATE_LIMITS[provider_upper]
-        requests_per_minute = config.get("requests_per_minute", 60)
-        cooldown_seconds = config.get("cooldown_seconds", 1)
-        
-        with self._locks[provider_upper]:
-            current_time = time.time()
-            
-            # Clean old requests (older than 60 seconds)
-            cutoff_time = current_time - 60
-            request_queue = self._request_times[provider_upper]
-            
-            while request_queue and request_queue[0] < cutoff_time:
-                request_queue.popleft()
-            
-            # Check if we've hit the rate limit
-            if len(request_queue) >= requests_per_minute:
-                # Calculate wait time until oldest request expires
-                oldest_request = request_queue[0]
-                wait_time = 60 - (current_time - oldest_request)
-                
-                if wait_time > 0:
-                    logger.warning(
-                        f"Rate limit reached for {provider_name} "
-                        f"({len(request_queue)}/{requests_per_minute} requests). "
-                        f"Waiting {wait_time:.1f}s..."
-                    )
-                    time.sleep(wait_time)
-                    current_time = time.time()
-            
-            # Enforce minimum cooldown between requests
-            last_req = self._last_request.get(provider_upper, 0)
-            time_since_last = current_time - last_req
-            
-            if time_since_last < cooldown_seconds:
-                wait_time = cooldown_seconds - time_since_last
-                logger.debug(f"Cooldown wait for {provider_name}: {wait_time:.1f}s")
-                time.sleep(wait_time)
-                current_time = time.time()
-            
-            # Record this request
-            self._request_times[provider_upper].append(current_time)
-            self._last_request[provider_upper] = current_time
-            
-            logger.debug(
-                f"Rate limiter: {provider_name} - "
-                f"{len(self._request_times[provider_upper])} requests in last 60s"
-            )
-    
+        wait_time = self._reserve(provider_name, block=True)
+        if wait_time > 1:
+            logger.warning(f"Rate limit reached for {provider_name}. Waiting {wait_time:.1f}s...")
+        elif wait_time > 0:
+            logger.debug(f"Cooldown wait for {provider_name}: {wait_time:.1f}s")
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, provider_name: str) -> None:
+        """asyncio variant of wait_if_needed: awaits the reserved slot instead of sleeping."""
+        wait_time = self._reserve(provider_name, block=True)
+        if wait_time > 0:
+            logger.debug(f"Rate limit wait for {provider_name}: {wait_time:.1f}s")
+            await asyncio.sleep(wait_time)
+
+    def try_acquire(self, provider_name: str) -> bool:
+        """
+        Non-blocking variant of wait_if_needed: records a request and returns True
+        only if it can be made right now without exceeding the provider's quota
+        or cooldown (used for optional, hedged requests).
+
+        Args:
+            provider_name: Name of the provider
+        """
+        return self._reserve(provider_name, block=False) is not None
+
+    def blocked_for(self, provider_name: str) -> float:
+        """Seconds until a throttled provider may be called again (0 if not blocked)."""
+        with self._lock:
+            row = self._conn.execute("SELECT blocked_until FROM rate_buckets WHERE provider = ?",
+                                     (_key(provider_name),)).fetchone()
+        return max(0.0, row[0] - time.time()) if row else 0.0
+
+    def report_throttled(self, provider_name: str, retry_after: Optional[float] = None) -> None:
+        """
+        Provider feedback (HTTP 429 / quota message): blocks the provider for
+        all processes for `retry_after` seconds (Retry-After header) or the
+        configured default, and empties its bucket. The bucket only refills
+        from the end of the block, so no burst is released when it lifts.
+        """
+        provider = _key(provider_name)
+        if retry_after is None:
+            retry_after = RATE_LIMITER_CONFIG.get("DEFAULT_RETRY_AFTER_SECONDS", 60)
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO rate_buckets (provider, tokens, updated, blocked_until, throttled) VALUES (?, 0, ?, ?, 1) "
+                "ON CONFLICT(provider) DO UPDATE SET tokens = MIN(tokens, 0), "
+                "updated = MAX(updated, blocked_until, excluded.blocked_until), "
+                "blocked_until = MAX(blocked_until, excluded.blocked_until), throttled = throttled + 1",
+                (provider, now + retry_after, now + retry_after))
+        logger.warning(f"{provider_name} throttled by the provider, backing off {retry_after:.0f}s")
+        get_provider_health().record_rate_limited(provider_name, retry_after)
+
     def reset(self, provider_name: str = None) -> None:
         """
         Reset rate limiter for a specific provider or all providers.
-        
+
         Args:
             provider_name: Provider to reset, or None to reset all
         """
-        if provider_name:
-            provider_upper = provider_name.upper()
-            with self._locks[provider_upper]:
-                self._request_times[provider_upper].clear()
-                self._last_request.pop(provider_upper, None)
+        with self._lock:
+            if provider_name:
+                provider = _key(provider_name)
+                self._conn.execute("DELETE FROM rate_buckets WHERE provider = ?", (provider,))
+                self._conn.execute("DELETE FROM rate_requests WHERE provider = ?", (provider,))
                 logger.info(f"Rate limiter reset for {provider_name}")
-        else:
-            for provider in list(self._locks.keys()):
-                with self._locks[provider]:
-                    self._request_times[provider].clear()
-                    self._last_request.pop(provider, None)
-            logger.info("Rate limiter reset for all providers")
-    
+            else:
+                self._conn.execute("DELETE FROM rate_buckets")
+                self._conn.execute("DELETE FROM rate_requests")
+                logger.info("Rate limiter reset for all providers")
+
     def get_stats(self, provider_name: str) -> Dict:
         """
         Get current rate limit statistics for a provider.
-        
+
         Args:
             provider_name: Provider name
-            
+
         Returns:
             Dictionary with stats (requests_last_minute, last_request_time, etc.)
         """
-        provider_upper = provider_name.upper()
-        
-        with self._locks[provider_upper]:
+        provider = _key(provider_name)
+        config = self._limits(provider) or {}
+        with self._lock:
             current_time = time.time()
-            cutoff_time = current_time - 60
-            
-            # Clean old requests
-            request_queue = self._request_times[provider_upper]
-            while request_queue and request_queue[0] < cutoff_time:
-                request_queue.popleft()
-            
-            last_req = self._last_request.get(provider_upper, 0)
-            
-            return {
-                "provider": provider_name,
-                "requests_last_minute": len(request_queue),
-                "last_request_seconds_ago": current_time - last_req if last_req else None,
-                "configured_limit": RATE_LIMITS.get(provider_upper, {}).get("requests_per_minute", "N/A")
-            }
-
-
-# Global singleton instance
-_rate_limiter = RateLimiter()
+            row = self._conn.execute(
+                "SELECT tokens, updated, last_slot, blocked_until, acquired, waited_seconds, denied, throttled "
+                "FROM rate_buckets WHERE provider = ?", (provider,)).fetchone()
+            recent = self._conn.execute(
+                "SELECT COUNT(*) FROM rate_requests WHERE provider = ? AND ts >= ?",
+                (provider, current_time - 60)).fetchone()[0]
+
+        tokens, updated, last_slot, blocked_until, acquired, waited, denied, throttled = row or (
+            None, None, 0.0, 0.0, 0, 0.0, 0, 0)
+        if tokens is not None and config:
+            rpm = config.get("requests_per_minute", 60)
+            tokens = min(config.get("burst", rpm), tokens + max(0.0, current_time - updated) * rpm / 60.0)
+        return {
+            "provider": provider_name,
+            "requests_last_minute": recent,
+            "last_request_seconds_ago": current_time - last_slot if last_slot else None,
+            "configured_limit": config.get("requests_per_minute", "N/A"),
+            "tokens_available": tokens,
+            "blocked_for_seconds": max(0.0, blocked_until - current_time),
+            "acquired": acquired,
+            "waited_seconds": waited,
+            "denied": denied,
+            "throttled": throttled,
+        }
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Retry-After header of an HTTP response in seconds (None if absent or a date)."""
+    value = getattr(response, "headers", {}).get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# Global singleton instance (created on first use; opens the shared state DB)
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = Lock()
 
 
 def get_rate_limiter() -> RateLimiter:
-    """Get the global rate limiter instance."""
-    return _rate_limiter
+    """Get the global rate limiter instance (shared with other processes on this host)."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(RATE_LIMITER_CONFIG["DB_PATH"])
+        return _rate_limiter
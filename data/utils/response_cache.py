@@ -0,0 +1,229 @@
+"""
+Provider Response Cache
+=======================
+On-disk cache of provider fetch results, keyed by
+(provider, symbol, timeframe, start, end), so backfills and diagnosis
+scripts do not re-download ranges they already fetched.
+
+- Closed ranges (ending before the current NY trading date) never change and
+  never expire.
+- Open ranges (ending today or later) can still receive bars and expire after
+  a short TTL.
+- Relative requests (`days_back`) are resolved to calendar dates first, so
+  repeated runs on the same day share entries.
+- The cache is size-bounded: least recently used entries are evicted first
+  (file mtime is refreshed on every hit).
+- `bypass` (or RESPONSE_CACHE_BYPASS=1) skips reads and writes entirely.
+
+Entries are pickled DataFrames written atomically (temp file + rename).
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from functools import wraps
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import pandas as pd
+
+logger = logging.getLogger("core.data.response_cache")
+
+CACHE_VERSION = 1
+NY_TZ = "America/New_York"
+
+
+class CacheKey(NamedTuple):
+    provider: str
+    symbol: str
+    timeframe: str
+    start: str   # 'YYYY-MM-DD'
+    end: str     # 'YYYY-MM-DD'
+
+
+def _today_ny() -> date:
+    return pd.Timestamp.now(tz=NY_TZ).date()
+
+
+def _as_date(value) -> str:
+    return pd.Timestamp(value).date().isoformat()
+
+
+class ResponseCache:
+    """
+    Size-bounded on-disk cache of provider DataFrames (see module docstring).
+    """
+
+    def __init__(self, directory, max_bytes: int = 512 * 1024 * 1024,
+                 open_ttl_seconds: float = 300.0, bypass: bool = False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.open_ttl_seconds = open_ttl_seconds
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider: str, symbol: str, timeframe: str,
+                 start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 days_back: int = 30) -> CacheKey:
+        """Resolves a fetch_data request to absolute dates."""
+        today = _today_ny()
+        end = _as_date(end_date) if end_date else today.isoformat()
+        start = _as_date(start_date) if start_date else (today - timedelta(days=days_back)).isoformat()
+        return CacheKey(provider.upper(), symbol.upper(), timeframe, start, end)
+
+    @staticmethod
+    def is_closed(key: CacheKey) -> bool:
+        """Closed ranges end before the current NY date, so their bars are final."""
+        return date.fromisoformat(key.end) < _today_ny()
+
+    def _path(self, key: CacheKey) -> Path:
+        digest = hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.pkl"
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        """Cached DataFrame for `key`, or None (missing, expired or bypassed)."""
+        if self.bypass:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return self._miss()
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path.name}: {e}")
+            self._remove(path)
+            return self._miss()
+
+        if entry.get("version") != CACHE_VERSION or tuple(entry.get("key", ())) != tuple(key):
+            return self._miss()
+        if not entry["closed"] and time.time() - entry["fetched_at"] > self.open_ttl_seconds:
+            return self._miss()
+
+        try:
+            os.utime(path)  # LRU: most recently used entries are evicted last
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        logger.debug(f"Cache hit {key.provider} {key.symbol} {key.timeframe} {key.start}..{key.end}")
+        return entry["df"]
+
+    def put(self, key: CacheKey, df: pd.DataFrame) -> None:
+        """Stores a non-empty result and evicts old entries if over budget."""
+        if self.bypass or df is None or df.empty:
+            return
+        entry = {
+            "version": CACHE_VERSION,
+            "key": tuple(key),
+            "closed": self.is_closed(key),
+            "fetched_at": time.time(),
+            "df": df,
+        }
+        path = self._path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Could not write cache entry for {key.symbol}: {e}")
+            self._remove(Path(tmp))
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits `max_bytes`."""
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*.pkl"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                removed += 1
+        if removed:
+            logger.info(f"Response cache evicted {removed} entries")
+        return removed
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.pkl"):
+            self._remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+        return None
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def cached_fetch(fetch):
+    """
+    Decorator for IDataProvider.fetch_data: serves results from the provider's
+    `response_cache` (if one is attached) and stores successful fetches.
+    """
+    @wraps(fetch)
+    def wrapper(self, symbol: str, timeframe: str, start_date: Optional[str] = None,
+                end_date: Optional[str] = None, days_back: int = 30):
+        cache: Optional[ResponseCache] = getattr(self, "response_cache", None)
+        if cache is None or cache.bypass:
+            return fetch(self, symbol, timeframe, start_date, end_date, days_back)
+
+        key = cache.make_key(self.name, symbol, timeframe, start_date, end_date, days_back)
+        df = cache.get(key)
+        if df is not None:
+            return df
+        df = fetch(self, symbol, timeframe, start_date, end_date, days_back)
+        if df is not None and not df.empty:
+            cache.put(key, df)
+        return df
+    return wrapper
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Shared cache configured from DATA_CONFIG['RESPONSE_CACHE'] (None if disabled)."""
+    global _response_cache
+    from config.settings import DATA_CONFIG
+
+    cfg = DATA_CONFIG.get("RESPONSE_CACHE", {})
+    if not cfg.get("ENABLED", False):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                cfg["DIR"],
+                max_bytes=int(cfg.get("MAX_MB", 512) * 1024 * 1024),
+                open_ttl_seconds=cfg.get("OPEN_TTL_SECONDS", 300),
+                bypass=os.getenv("RESPONSE_CACHE_BYPASS", "") not in ("", "0"),
+            )
+        return _response_cache
@@ -4,10 +4,9 @@ import logging
 from logging.handlers import RotatingFileHandler
 import sys
 import os
-import requests
-from datetime import datetime, timedelta, timezone
+import traceback
 from pathlib import Path
-import pandas as pd # Added pandas for Timestamp
+from typing import TYPE_CHECKING
 
 # Setup Path to include root
 sys.path.append(str(Path(__file__).parent))
@@ -19,14 +18,14 @@ try:
 except Exception:
     pass
 
-from config.settings import SYSTEM_CONFIG, SYMBOLS, SMART_WAKEUP_CONFIG
-from data.storage.database import Database
-from data.manager import DataManager
-from analysis.scanner import Scanner
-from analysis.indicators import TechnicalIndicators
-from trading.manager import TradeManager
-from alerts.telegram import TelegramBot
-from core.timing import wait_until_minute, wait_until_next_hour, get_minutes_until_close
+from config.settings import SYSTEM_CONFIG, SYMBOLS, SMART_WAKEUP_CONFIG, SCAN_CONFIG, SCHEDULER_CONFIG, SNAPSHOT_CONFIG, STREAM_CONFIG, DATA_CONFIG
+
+# Heavy modules (pandas, data layer, providers, analysis, trading, alerts) are
+# imported inside the modes that need them, so argument parsing and light
+# modes start fast (see benchmarks/import_time.py).
+if TYPE_CHECKING:
+    from data.manager import DataManager
+    from core.scheduler import AsyncScheduler
 # from backtesting.data.feed import DatabaseFeed 
 # from backtesting.strategy.vwap_bounce import VWAPBounceStrategy # v3.1 fix
 
@@ -52,11 +51,12 @@ def run_diagnostic_check():
     Verifies system readiness before starting.
     """
     logger.info("--- STARTING SYSTEM DIAGNOSTICS ---")
+    from core import http
     all_ok = True
     
     # 1. Internet Check
     try:
-        requests.get("https://8.8.8.8", timeout=5)
+        http.get("https://8.8.8.8", timeout=5)
         logger.info("Internet Connection: OK")
     except Exception:
         logger.error("Internet Connection: FAILED")
@@ -87,56 +87,268 @@ def run_diagnostic_check():
     logger.info("--- DIAGNOSTICS COMPLETE ---")
     return all_ok
 
-def run_gap_check(data_manager: DataManager):
+def run_gap_check(data_manager: "DataManager", cancel_event=None, snapshots=None, skip_checked_within=None,
+                  symbols=None, full_symbols=None):
     """
-    Checks and fills gaps for all symbols at startup.
+    Checks and fills gaps for all symbols (SYMBOLS, or `symbols`) at startup
+    and as periodic maintenance. Each check only covers the bars after the
+    symbol's gap watermark (see DataManager.resolve_gaps); symbols in
+    `full_symbols` are re-verified over their whole history.
+    Stops between symbols if `cancel_event` is set.
+    
+    With `snapshots` (SnapshotManager), symbols whose gap watermark covers
+    their last bar and was set less than `skip_checked_within` seconds ago
+    are skipped (warm start).
+    
+    The data quality reports of the checked symbols are then refreshed (only
+    series that changed since their last report are re-validated).
     """
     logger.info("--- STARTING GAP CHECK ---")
-    for symbol in SYMBOLS:
+    full_symbols = set(full_symbols or ())
+    checked = []
+    for symbol in symbols or SYMBOLS:
+        if cancel_event is not None and cancel_event.is_set():
+            logger.warning(f"Gap check cancelled before {symbol}")
+            break
+        if snapshots is not None and skip_checked_within and snapshots.gap_checked_within(symbol, skip_checked_within):
+            logger.debug(f"Gap check skipped for {symbol}: checked recently (gap watermark)")
+            continue
         try:
-            data_manager.resolve_gaps(symbol)
+            data_manager.resolve_gaps(symbol, full=symbol in full_symbols)
+            checked.append(symbol)
         except Exception as e:
             logger.error(f"Gap check failed for {symbol}: {e}")
+    if checked and (cancel_event is None or not cancel_event.is_set()):
+        try:
+            reports = data_manager.validate_quality(checked)
+            not_ready = [r.summary() for r in reports.values() if not r.backtest_ready]
+            if not_ready:
+                logger.warning(f"Data quality below threshold for {len(not_ready)} symbols: {'; '.join(not_ready)}")
+        except Exception as e:
+            logger.error(f"Data quality validation failed: {e}")
     logger.info("--- GAP CHECK COMPLETE ---")
 
-def run_scan_cycle(data_mgr, scanner, indicators, trade_mgr, telegram, db, is_pre_alert=False):
+def run_deep_gap_check(data_manager: "DataManager", cancel_event=None, symbols=None, max_age_days=None,
+                       max_symbols=None):
+    """
+    Scheduled full-history re-verification: re-checks every symbol whose last
+    full check is older than SCHEDULER_CONFIG["GAP_DEEP_CHECK_DAYS"], at most
+    `max_symbols` per run (the rest are picked up by the next runs).
+    """
+    max_age_days = max_age_days or SCHEDULER_CONFIG.get("GAP_DEEP_CHECK_DAYS", 7)
+    max_symbols = max_symbols or SCHEDULER_CONFIG.get("GAP_DEEP_CHECK_MAX_SYMBOLS", 50)
+    due = data_manager.deep_gap_check_due(symbols or SYMBOLS, max_age_days)[:max_symbols]
+    if not due:
+        logger.debug("Deep gap check: every symbol re-verified recently")
+        return
+    logger.info(f"Deep gap check: re-verifying the full history of {len(due)} symbols")
+    run_gap_check(data_manager, cancel_event=cancel_event, symbols=due, full_symbols=due)
+
+class ScanCancelled(Exception):
+    """Raised inside scan workers once the cycle's cancel event is set."""
+
+def _check_cancelled(cancel_event, symbol):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScanCancelled(f"scan cancelled before fetching {symbol}")
+
+def _fetch_symbol_data(data_mgr, symbol, cancel_event=None, prior=None, update_hourly=True, bar_feed=None):
     """
-    Runs a single scan cycle for all symbols.
+    I/O stage of the scan cycle: update and load Hourly and Daily data.
+    Provider pacing is handled by the DataManager's RateLimiter.
+    Checks `cancel_event` before each provider update.
+    
+    With `prior` (SymbolScanState from the pre-alert pass or a warm-start
+    snapshot) only the hourly bars stored since its last bar are loaded; its
+    daily frame is reused when the state allows it.
+    With `update_hourly=False` the 1h bars were already updated by a batch call.
+    With a `bar_feed` (BarStreamService) streaming the symbol, closed 1h bars
+    are already stored by the stream: no provider poll, and the forming bar
+    is taken from the stream.
+    Returns (df_hourly, df_daily, prior).
+    """
+    live = bar_feed is not None and bar_feed.is_live(symbol)
+    _check_cancelled(cancel_event, symbol)
+    if update_hourly and not live:
+        data_mgr.update_data(symbol)
+    if prior is not None:
+        df_hourly = data_mgr.get_data_since(symbol, prior.last_bar)
+    else:
+        _check_cancelled(cancel_event, symbol)
+        data_mgr.update_daily_data(symbol)
+        df_hourly = data_mgr.get_latest_data(symbol)
+    if live:
+        df_hourly = bar_feed.with_forming_bar(symbol, df_hourly)
+    if prior is None:
+        return df_hourly, data_mgr.get_latest_daily_data(symbol), None
+    if prior.reuse_daily:
+        return df_hourly, prior.df_daily, prior
+    _check_cancelled(cancel_event, symbol)
+    data_mgr.update_daily_data(symbol)
+    return df_hourly, data_mgr.get_latest_daily_data(symbol), prior
+
+def _analyze_symbol_data(scanner, indicators, symbol, fetched, is_active, is_pre_alert, now_utc, state_store=None):
+    """
+    CPU stage of the scan cycle: indicators + signal scan (no side effects).
+    Extends the prior state incrementally when the fetch stage reused one, and
+    keeps the analyzed frame in `state_store` for the next pass.
+    Returns (df_analyzed, df_daily, signals) or None if there is no data.
+    """
+    import pandas as pd
+    
+    df_raw, df_daily, prior = fetched
+    if prior is not None:
+        df_analyzed = indicators.calculate_incremental(prior.df_analyzed, df_raw)
+    elif df_raw.empty:
+        return None
+    else:
+        df_analyzed = indicators.calculate_all(df_raw)
+    
+    if state_store is not None:
+        state_store.put(symbol, df_analyzed, df_daily)
+    
+    # Skip scanning if position active (monitoring only)
+    if is_active:
+        return df_analyzed, df_daily, []
+        
+    # For pre-alerts: scan the current forming candle
+    # For confirmation: scan only fully closed candles
+    if is_pre_alert:
+        df_to_scan = df_analyzed
+    else:
+        n_closed = df_analyzed.index.searchsorted(now_utc - pd.Timedelta(hours=1), side='right')
+        df_to_scan = df_analyzed.iloc[:n_closed]
+        if df_to_scan.empty:
+            logger.debug(f"No fully closed candles for {symbol} yet.")
+            return df_analyzed, df_daily, []
+            
+    signals = scanner.find_signals(symbol, df_to_scan, df_daily=df_daily, scan_latest=True)
+    return df_analyzed, df_daily, signals
+
+def run_scan_cycle(data_mgr, scanner, indicators, trade_mgr, telegram, db, is_pre_alert=False, cancel_event=None,
+                   pre_alerted_symbols=None, deadline_seconds=None, state_store=None, bar_feed=None,
+                   symbols=None):
+    """
+    Runs a single scan cycle for all symbols (SYMBOLS, or `symbols`).
+    
+    Data updates run concurrently on a bounded worker pool (paced per provider by
+    the RateLimiter) and analysis on a second pool. Symbols are ordered by urgency
+    (open positions, then pre-alerted symbols, then the rest of SYMBOLS) and
+    results are handled in that order, so alerts and DB writes stay deterministic.
+    With SCAN_CONFIG["BATCH_UPDATE"], the 1h bars of the whole universe are first
+    updated with one batch call per provider (DataManager.update_data_many);
+    symbols it does not update get the usual per-symbol update in the pipeline.
     
     Args:
         is_pre_alert: If True, sends pre-alerts instead of final alerts
+        cancel_event: Optional threading.Event; when set (e.g. job timeout), the
+            remaining symbols are abandoned
+        pre_alerted_symbols: Symbols pre-alerted at :55 (second priority tier)
+        deadline_seconds: Cycle time budget. Symbols not started by then are
+            skipped and reported (defaults to SCAN_CONFIG)
+        state_store: Optional ScanStateStore. Every pass stores its analyzed
+            frames and reuses fresh ones (the confirmation reuses the pre-alert
+            pass, the first pass after a warm start reuses the snapshot)
+        bar_feed: Optional BarStreamService. Symbols it streams are not polled
+            and their forming hourly bar comes from the stream
+    
+    With DATA_CONFIG["QUALITY"]["GATE_SIGNALS"], new signals of symbols whose
+    last stored data quality report (refreshed by the gap check, never
+    re-validated here) is not backtest-ready are dropped.
     
     Returns:
         Dict mapping symbol -> list of signals found
     """
+    from core.scan_pool import run_ordered_pipeline, prioritize, CycleReport
+    from core.timing import get_minutes_until_close
+    from core import clock
+    
     cycle_type = "PRE-ALERT" if is_pre_alert else "CONFIRMATION"
     logger.info(f"--- {cycle_type} SCAN CYCLE START ---")
+    cycle_start = time.monotonic()
     
     # Get currently active alerts to avoid duplicates
     active_alerts = db.get_active_alerts()
     active_symbols = {a['symbol'] for a in active_alerts}
     
+    pre_alerted_symbols = set(pre_alerted_symbols or ())
+    
     found_signals = {}
+    now_utc = clock.now()
+    
+    if deadline_seconds is None:
+        deadline_key = "PRE_ALERT_DEADLINE_SECONDS" if is_pre_alert else "CONFIRMATION_DEADLINE_SECONDS"
+        deadline_seconds = SCAN_CONFIG.get(deadline_key)
+    deadline = cycle_start + deadline_seconds if deadline_seconds else None
     
-    for symbol in SYMBOLS:
+    priorities = prioritize(symbols or SYMBOLS, [active_symbols, pre_alerted_symbols])
+    report = CycleReport()
+    
+    low_quality = {}
+    if DATA_CONFIG.get("QUALITY", {}).get("GATE_SIGNALS", False):
+        try:
+            low_quality = {s: r for s, r in data_mgr.validator.latest(priorities, "1h").items() if not r.backtest_ready}
+        except Exception as e:
+            logger.error(f"Could not load data quality reports, signals not gated: {e}")
+    
+    # One batch download per provider for the whole universe (fits provider quotas)
+    batch_update = SCAN_CONFIG.get("BATCH_UPDATE", True)
+    updated = {}
+    if batch_update:
+        polled = [s for s in priorities if bar_feed is None or not bar_feed.is_live(s)]
+        try:
+            updated = data_mgr.update_data_many(polled, cancel_event=cancel_event,
+                                                deadline=deadline) if polled else {}
+            logger.info(f"Batch update: {len(updated)}/{len(polled)} symbols updated"
+                        + (f" ({len(priorities) - len(polled)} streamed)" if len(polled) < len(priorities) else ""))
+        except Exception as e:
+            logger.error(f"Batch update failed, falling back to per-symbol updates: {e}")
+            batch_update = False
+    
+    results = run_ordered_pipeline(
+        list(priorities),
+        fetch_fn=lambda symbol: _fetch_symbol_data(
+            data_mgr, symbol, cancel_event,
+            prior=state_store.get(symbol) if state_store is not None else None,
+            update_hourly=not batch_update or symbol not in updated, bar_feed=bar_feed
+        ),
+        analyze_fn=lambda symbol, fetched: _analyze_symbol_data(
+            scanner, indicators, symbol, fetched,
+            is_active=symbol in active_symbols, is_pre_alert=is_pre_alert, now_utc=now_utc,
+            state_store=state_store
+        ),
+        fetch_workers=SCAN_CONFIG.get("FETCH_WORKERS", 4),
+        analysis_workers=SCAN_CONFIG.get("ANALYSIS_WORKERS", 2),
+        deadline=deadline,
+        priorities=priorities
+    )
+    
+    for result in results:
+        symbol = result.item
         is_active = symbol in active_symbols
         
-        try:
-            # A. Update Data (Hourly and Daily)
-            data_mgr.update_data(symbol)
-            data_mgr.update_daily_data(symbol)
-            
-            # B. Get Data
-            df_raw = data_mgr.get_latest_data(symbol)
-            df_daily = data_mgr.get_latest_daily_data(symbol)
+        if cancel_event is not None and cancel_event.is_set():
+            logger.warning(f"{cycle_type} cycle cancelled before {symbol}, remaining symbols skipped")
+            break
+        
+        report.record(result)
+        if result.skipped:
+            continue
+        if result.late:
+            logger.warning(f"{symbol} (priority {result.priority}) finished after the {cycle_type} deadline")
+        
+        if not result.ok:
+            logger.error(f"Error processing {symbol}: {result.error}")
+            logger.error("".join(traceback.format_exception(result.error)))
+            continue
             
-            if df_raw.empty:
-                logger.warning(f"Skipping {symbol}: No data.")
-                continue
-                
-            # C. Indicators
-            df_analyzed = indicators.calculate_all(df_raw)
+        if result.value is None:
+            logger.warning(f"Skipping {symbol}: No data.")
+            continue
             
+        logger.debug(f"{symbol}: fetch {result.fetch_seconds:.2f}s, analysis {result.analysis_seconds:.2f}s")
+        df_analyzed, df_daily, signals = result.value
+        
+        try:
             # D. Save Indicators (Optimize: Only save last 48 hours)
             rows_to_save = df_analyzed.iloc[-48:] 
             db.save_indicators(symbol, "1h", rows_to_save)
@@ -156,25 +368,11 @@ def run_scan_cycle(data_mgr, scanner, indicators, trade_mgr, telegram, db, is_pr
                 logger.debug(f"Skipping Scan for {symbol}: Position active.")
                 continue 
 
-            # --- SCANNING ---
-            
-            # For pre-alerts: scan the current forming candle
-            # For confirmation: scan only fully closed candles
-            if is_pre_alert:
-                # Use all data including current forming candle
-                df_to_scan = df_analyzed
-            else:
-                # Only scan fully closed candles
-                now_utc = datetime.now(timezone.utc)
-                df_to_scan = df_analyzed[df_analyzed.index + pd.Timedelta(hours=1) <= now_utc]
-                
-                if df_to_scan.empty:
-                    logger.debug(f"No fully closed candles for {symbol} yet.")
-                    continue
-            
-            # Scan for signals
-            signals = scanner.find_signals(symbol, df_to_scan, df_daily=df_daily, scan_latest=True)
-            
+            # --- SIGNALS ---
+            if signals and symbol in low_quality:
+                logger.warning(f"Dropping {len(signals)} {cycle_type} signals for {symbol}, "
+                               f"data quality {low_quality[symbol].summary()}")
+                continue
             if signals:
                 logger.info(f"{cycle_type} SIGNALS FOUND FOR {symbol}: {len(signals)}")
                 found_signals[symbol] = []
@@ -208,26 +406,126 @@ def run_scan_cycle(data_mgr, scanner, indicators, trade_mgr, telegram, db, is_pr
                             db.save_alert(sig, plan, snapshot_data=snapshot_json)
                             
                             # Check if this was pre-alerted
-                            is_confirmation = symbol in found_signals
+                            is_confirmation = symbol in pre_alerted_symbols
                             telegram.send_signal_alert(sig, plan, is_confirmation=is_confirmation)
                             found_signals[symbol].append(sig)
                         
         except Exception as e:
             logger.error(f"Error processing {symbol}: {e}")
-            import traceback
             logger.error(traceback.format_exc())
-        
-        # Rate Limit Protection: Small sleep between symbols
-        time.sleep(2)
     
+    if report.skipped:
+        logger.warning(f"{cycle_type} deadline ({deadline_seconds}s) reached, skipped: {', '.join(report.skipped)}")
+    logger.info(f"{cycle_type} cycle: {report.summary()} in {time.monotonic() - cycle_start:.1f}s")
+    if getattr(data_mgr, "health", None) is not None:
+        logger.info(f"Provider health: {data_mgr.health.summary()}")
     logger.info(f"--- {cycle_type} CYCLE COMPLETE ---")
     return found_signals
 
+def build_live_scheduler(data_mgr, scanner, indicators, trade_mgr, telegram, db,
+                         state_store=None, snapshots=None, bar_feed=None, symbols=None,
+                         scheduler=None) -> "AsyncScheduler":
+    """
+    Registers the live jobs: pre-alert (:55), confirmation (:00 + buffer),
+    daily report (22:00 UTC), periodic incremental gap maintenance, a daily
+    full-history gap re-verification (23:30 UTC) and, with `snapshots`,
+    periodic warm-start snapshots of `state_store`.
+    With a `bar_feed` (BarStreamService) the scans read streamed bars, and the
+    confirmation runs as soon as the hourly bars close when its slot is near.
+    Jobs cover SYMBOLS (or `symbols`) and are added to `scheduler` when given
+    (e.g. an accelerated one, see benchmarks/soak_live_loop.py).
+    """
+    from core.scheduler import AsyncScheduler, hourly_at, daily_at, every
+    
+    smart_wakeup_enabled = SMART_WAKEUP_CONFIG.get("ENABLED", False)
+    pre_alert_minute = SMART_WAKEUP_CONFIG.get("PRE_ALERT_MINUTE", 55)
+    buffer_seconds = SMART_WAKEUP_CONFIG.get("CONFIRMATION_BUFFER_SECONDS", 10)
+    
+    if scheduler is None:
+        scheduler = AsyncScheduler(max_workers=SCHEDULER_CONFIG.get("WORKERS", 4))
+    grace = SCHEDULER_CONFIG.get("MISSED_GRACE_SECONDS", 60)
+    
+    # Track pre-alerted symbols for confirmation matching
+    state = {"pre_alerted_symbols": set()}
+    
+    def pre_alert_job(cancel_event):
+        signals = run_scan_cycle(
+            data_mgr, scanner, indicators, trade_mgr, telegram, db,
+            is_pre_alert=True, cancel_event=cancel_event, state_store=state_store, bar_feed=bar_feed,
+            symbols=symbols
+        )
+        state["pre_alerted_symbols"] = set(signals.keys())
+        
+    def confirmation_job(cancel_event):
+        confirmation_signals = run_scan_cycle(
+            data_mgr, scanner, indicators, trade_mgr, telegram, db,
+            is_pre_alert=False, cancel_event=cancel_event,
+            pre_alerted_symbols=state["pre_alerted_symbols"], state_store=state_store, bar_feed=bar_feed,
+            symbols=symbols
+        )
+        
+        # Log confirmation status
+        for symbol in state["pre_alerted_symbols"]:
+            if symbol in confirmation_signals:
+                logger.info(f"✅ Pre-alert CONFIRMED for {symbol}")
+            else:
+                logger.info(f"❌ Pre-alert CANCELLED for {symbol} (signal did not hold)")
+        state["pre_alerted_symbols"] = set()
+        
+    def daily_report_job(cancel_event):
+        report = trade_mgr.generate_performance_report(data_mgr=data_mgr)
+        telegram.send_message(report)
+        
+    def gap_check_job(cancel_event):
+        run_gap_check(data_mgr, cancel_event=cancel_event, snapshots=snapshots, symbols=symbols)
+        
+    def deep_gap_check_job(cancel_event):
+        run_deep_gap_check(data_mgr, cancel_event=cancel_event, symbols=symbols)
+        
+    def snapshot_job(cancel_event):
+        snapshots.save(state_store)
+    
+    if smart_wakeup_enabled:
+        scheduler.add_job("pre_alert", pre_alert_job, hourly_at(pre_alert_minute),
+                          timeout=SCHEDULER_CONFIG.get("PRE_ALERT_TIMEOUT", 240),
+                          grace_seconds=grace, exclusive_group="scan")
+    scheduler.add_job("confirmation", confirmation_job, hourly_at(0, buffer_seconds),
+                      timeout=SCHEDULER_CONFIG.get("CONFIRMATION_TIMEOUT", 600),
+                      grace_seconds=grace, exclusive_group="scan")
+    # Daily Report (22:00 UTC)
+    scheduler.add_job("daily_report", daily_report_job, daily_at(22, 0),
+                      timeout=SCHEDULER_CONFIG.get("REPORT_TIMEOUT", 120), grace_seconds=300)
+    scheduler.add_job("gap_check", gap_check_job, every(SCHEDULER_CONFIG.get("GAP_CHECK_INTERVAL_HOURS", 6) * 3600),
+                      timeout=SCHEDULER_CONFIG.get("GAP_CHECK_TIMEOUT", 900), grace_seconds=600,
+                      exclusive_group="gaps")
+    # Full-history gap re-verification (23:30 UTC, after the close)
+    scheduler.add_job("deep_gap_check", deep_gap_check_job, daily_at(23, 30),
+                      timeout=SCHEDULER_CONFIG.get("GAP_DEEP_CHECK_TIMEOUT", 1800), grace_seconds=3600,
+                      exclusive_group="gaps")
+    if snapshots is not None and state_store is not None:
+        scheduler.add_job("snapshot", snapshot_job, every(SNAPSHOT_CONFIG.get("INTERVAL_MINUTES", 15) * 60),
+                          timeout=60, grace_seconds=300)
+    if bar_feed is not None and STREAM_CONFIG.get("CONFIRM_ON_CLOSE", True):
+        def on_bar_close(timeframe, end):
+            if timeframe == "1h":
+                scheduler.trigger("confirmation", within_seconds=STREAM_CONFIG.get("CONFIRM_WINDOW_SECONDS", 120))
+        bar_feed.on_close(on_bar_close)
+    return scheduler
+
 def run_live_loop():
     """
-    Main Live Trading Loop.
+    Main Live Trading Loop (asyncio scheduler, see core.scheduler).
     """
     logger.info("STARTING LIVE TRADING ADVISOR")
+    import asyncio
+    from data.storage.database import Database
+    from data.manager import DataManager
+    from analysis.scanner import Scanner
+    from analysis.indicators import TechnicalIndicators
+    from trading.manager import TradeManager
+    from alerts.telegram import TelegramBot
+    from core.scan_state import ScanStateStore
+    from core.snapshot import SnapshotManager
     
     # Initialize Components
     db = Database()
@@ -243,103 +541,186 @@ def run_live_loop():
         if not SYSTEM_CONFIG.get("DEVELOPMENT_MODE", False):
             sys.exit(1)
     
-    # 1. Startup Tasks
-    telegram.send_message("🚀 Trading Advisor STARTED. Monitoring market...")
-    run_gap_check(data_mgr)
+    # 1. Startup Tasks (warm start from the last snapshot when it is still valid)
+    state_store = None
+    if SMART_WAKEUP_CONFIG.get("REUSE_PRE_ALERT_STATE", True) or SNAPSHOT_CONFIG.get("ENABLED", False):
+        state_store = ScanStateStore(max_age_seconds=SMART_WAKEUP_CONFIG.get("STATE_MAX_AGE_SECONDS", 600))
+    snapshots = None
+    if SNAPSHOT_CONFIG.get("ENABLED", False):
+        snapshots = SnapshotManager(db, SNAPSHOT_CONFIG["PATH"],
+                                    tail_bars=SNAPSHOT_CONFIG.get("TAIL_BARS", 400),
+                                    max_age_hours=SNAPSHOT_CONFIG.get("MAX_AGE_HOURS", 12))
+        snapshots.restore(state_store, state_max_age_seconds=SNAPSHOT_CONFIG.get("MAX_AGE_HOURS", 12) * 3600)
     
-    # Check if Smart Wakeup is enabled
-    smart_wakeup_enabled = SMART_WAKEUP_CONFIG.get("ENABLED", False)
-    pre_alert_minute = SMART_WAKEUP_CONFIG.get("PRE_ALERT_MINUTE", 55)
-    buffer_seconds = SMART_WAKEUP_CONFIG.get("CONFIRMATION_BUFFER_SECONDS", 10)
+    telegram.send_message("🚀 Trading Advisor STARTED. Monitoring market...")
+    run_gap_check(data_mgr, snapshots=snapshots,
+                  skip_checked_within=SCHEDULER_CONFIG.get("GAP_CHECK_INTERVAL_HOURS", 6) * 3600)
     
-    if smart_wakeup_enabled:
+    if SMART_WAKEUP_CONFIG.get("ENABLED", False):
+        pre_alert_minute = SMART_WAKEUP_CONFIG.get("PRE_ALERT_MINUTE", 55)
         logger.info(f"Smart Wakeup ENABLED - Pre-alerts at minute {pre_alert_minute}")
         telegram.send_message(f"⚡ Smart Wakeup activado - Pre-alertas al minuto :{pre_alert_minute:02d}")
     else:
         logger.info("Smart Wakeup DISABLED - Standard hourly monitoring")
     
-    # Track pre-alerted symbols for confirmation matching
-    pre_alerted_symbols = set()
+    # 2. Real-time bars (optional)
+    bar_feed = None
+    if STREAM_CONFIG.get("ENABLED", False):
+        from data.streaming import BarAggregator, BarStreamService, build_tick_source
+        bar_feed = BarStreamService(
+            build_tick_source(STREAM_CONFIG),
+            BarAggregator(STREAM_CONFIG.get("TIMEFRAMES", ["1m", "1h"])),
+            store=data_mgr.store_stream_bars,
+            persist_timeframes=STREAM_CONFIG.get("PERSIST_TIMEFRAMES", ["1m", "1h"]),
+            stale_seconds=STREAM_CONFIG.get("STALE_SECONDS", 120),
+            close_grace_seconds=STREAM_CONFIG.get("CLOSE_GRACE_SECONDS", 2),
+        )
+        bar_feed.start()
+        logger.info(f"Bar stream STARTED ({STREAM_CONFIG.get('SOURCE', 'replay')})")
     
-    # 2. Main Loop
-    while True:
-        try:
-            if smart_wakeup_enabled:
-                # === DUAL-PHASE MONITORING ===
-                
-                # PHASE 1: Pre-Alert Scan (Minute 55)
-                logger.info(f"Waiting for pre-alert time (minute {pre_alert_minute})...")
-                wait_until_minute(pre_alert_minute)
-                
-                pre_alert_signals = run_scan_cycle(
-                    data_mgr, scanner, indicators, trade_mgr, telegram, db,
-                    is_pre_alert=True
-                )
-                
-                # Track which symbols got pre-alerted
-                pre_alerted_symbols = set(pre_alert_signals.keys())
-                
-                # PHASE 2: Confirmation Scan (Minute :00)
-                logger.info("Waiting for confirmation time (minute :00)...")
-                wait_until_next_hour(buffer_seconds=buffer_seconds)
-                
-                confirmation_signals = run_scan_cycle(
-                    data_mgr, scanner, indicators, trade_mgr, telegram, db,
-                    is_pre_alert=False
-                )
-                
-                # Log confirmation status
-                for symbol in pre_alerted_symbols:
-                    if symbol in confirmation_signals:
-                        logger.info(f"✅ Pre-alert CONFIRMED for {symbol}")
-                    else:
-                        logger.info(f"❌ Pre-alert CANCELLED for {symbol} (signal did not hold)")
-                
-            else:
-                # === STANDARD HOURLY MONITORING ===
-                
-                # Wait until next hour + buffer
-                now = datetime.now()
-                next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-                sleep_seconds = (next_hour - now).total_seconds() + buffer_seconds
-                
-                if sleep_seconds > 0:
-                    logger.info(f"Sleeping {sleep_seconds:.0f}s until {next_hour}...")
-                    time.sleep(sleep_seconds)
-                
-                # Run standard scan
-                run_scan_cycle(
-                    data_mgr, scanner, indicators, trade_mgr, telegram, db,
-                    is_pre_alert=False
-                )
-            
-            # 3. Daily Report (Optional: Send at 22:00 UTC)
-            now_utc = datetime.now(timezone.utc)
-            if now_utc.hour == 22 and now_utc.minute < 5:
-                report = trade_mgr.generate_performance_report(data_mgr=data_mgr)
-                telegram.send_message(report)
-                
-        except KeyboardInterrupt:
-            logger.info("Shutting down gracefully...")
-            telegram.send_message("🛑 Trading Advisor STOPPED")
-            break
-        except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            # Sleep before retrying to avoid rapid error loops
-            time.sleep(60)
+    # 3. Main Loop
+    scheduler = build_live_scheduler(data_mgr, scanner, indicators, trade_mgr, telegram, db,
+                                     state_store=state_store, snapshots=snapshots, bar_feed=bar_feed)
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        logger.info("Shutting down gracefully...")
+        telegram.send_message("🛑 Trading Advisor STOPPED")
+    finally:
+        if bar_feed is not None:
+            bar_feed.stop()
+        if snapshots is not None:
+            try:
+                snapshots.save(state_store)
+            except Exception as e:
+                logger.error(f"Failed to save shutdown snapshot: {e}")
+        from core import http
+        http.close_session()
+
+def _replay_bound(value: str, is_end: bool = False):
+    """NY local date or datetime -> UTC Timestamp (a bare end date includes that whole day)."""
+    import pandas as pd
+    from core.market_calendar import NY_TZ
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize(NY_TZ) if ts.tzinfo is None else ts
+    if is_end and ts == ts.normalize() and len(value) <= 10:
+        ts += pd.Timedelta(days=1)
+    return ts.tz_convert("UTC")
+
+def run_replay(start, end, speed: float = 0.0, symbols=None, source_db=None, output_db=None) -> dict:
+    """
+    Replays the live loop against stored history: the live jobs
+    (build_live_scheduler) run with the real DataManager, Scanner,
+    TradeManager and DB writes, on a simulated clock (core.clock), with a
+    ReplayProvider serving the source DB's bars as they close and a
+    RecordingTelegramBot instead of Telegram. Alerts and alert_performance
+    rows land in a fresh output DB, as live would have written them.
+
+    Args:
+        start, end: Replay window (UTC Timestamps).
+        speed: 0 steps from slot to slot without waiting (deterministic, as fast
+            as possible). N > 0 runs the asyncio scheduler on a clock N times
+            faster than real time, so slow cycles show up as missed deadlines.
+        source_db / output_db: Default to REPLAY_CONFIG.
 
-def run_scan():
+    Returns:
+        Summary dict (jobs, notifications, alert counts, real seconds).
     """
-    Runs a single scan pass.
+    import asyncio
+    from config.settings import REPLAY_CONFIG
+    from core.clock import AcceleratedClock, SimulatedClock, set_clock
+    from core.scheduler import AsyncScheduler
+    from core.scan_state import ScanStateStore
+    from data.storage.database import Database
+    from data.manager import DataManager
+    from data.providers.replay_provider import ReplayProvider
+    from analysis.scanner import Scanner
+    from analysis.indicators import TechnicalIndicators
+    from trading.manager import TradeManager
+    from alerts.telegram import RecordingTelegramBot
+
+    source_db = Path(source_db or REPLAY_CONFIG["SOURCE_DB"])
+    output_db = Path(output_db or REPLAY_CONFIG["OUTPUT_DB"])
+    if output_db.resolve() == source_db.resolve():
+        raise ValueError("The replay output DB must differ from the source DB")
+    if end <= start:
+        raise ValueError("Replay end must be after its start")
+
+    provider = ReplayProvider(source_db)
+    if output_db.exists():
+        output_db.unlink()
+    db = Database(output_db)
+    if Path(db.db_path).resolve() != output_db.resolve():
+        raise RuntimeError(f"Database already open at {db.db_path}; a replay needs its own output DB")
+
+    sim_clock = AcceleratedClock(start.to_pydatetime(), speed) if speed > 0 else SimulatedClock(start.to_pydatetime())
+    previous_clock = set_clock(sim_clock)
+    logger.info(f"--- STARTING REPLAY {start:%Y-%m-%d %H:%M} -> {end:%Y-%m-%d %H:%M} UTC "
+                f"({'stepped' if speed <= 0 else f'{speed:g}x'}) from {source_db} into {output_db} ---")
+
+    wall_start = time.monotonic()
+    try:
+        data_mgr = DataManager()
+        data_mgr.providers = [provider]
+        telegram = RecordingTelegramBot()
+        trade_mgr = TradeManager()
+        trade_mgr.telegram = telegram
+        state_store = None
+        if SMART_WAKEUP_CONFIG.get("REUSE_PRE_ALERT_STATE", True):
+            state_store = ScanStateStore(max_age_seconds=SMART_WAKEUP_CONFIG.get("STATE_MAX_AGE_SECONDS", 600))
+
+        if REPLAY_CONFIG.get("STARTUP_GAP_CHECK", True):
+            run_gap_check(data_mgr, symbols=symbols)
+
+        scheduler = AsyncScheduler(max_workers=SCHEDULER_CONFIG.get("WORKERS", 4), clock=sim_clock)
+        build_live_scheduler(data_mgr, Scanner(), TechnicalIndicators(), trade_mgr, telegram, db,
+                             state_store=state_store, symbols=symbols, scheduler=scheduler)
+
+        if speed > 0:
+            async def runner():
+                task = asyncio.create_task(scheduler.run())
+                while sim_clock.now() < end:
+                    await asyncio.sleep(min(1.0, (end - sim_clock.now()).total_seconds() / speed))
+                scheduler.stop()
+                await task
+            asyncio.run(runner())
+        else:
+            asyncio.run(scheduler.run_simulated(end.to_pydatetime()))
+    finally:
+        set_clock(previous_clock)
+        provider.close()
+
+    conn = db.get_connection()
+    summary = {
+        "start": start,
+        "end": end,
+        "speed": speed,
+        "real_seconds": time.monotonic() - wall_start,
+        "jobs": {job.name: {"runs": job.runs, "missed": job.missed, "failures": job.failures}
+                 for job in scheduler.jobs},
+        "notifications": telegram.counts(),
+        "alerts": conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0],
+        "closed_alerts": conn.execute("SELECT COUNT(*) FROM alert_performance").fetchone()[0],
+        "output_db": str(output_db),
+    }
+    logger.info(f"--- REPLAY COMPLETE in {summary['real_seconds']:.1f}s: {summary['alerts']} alerts, "
+                f"{summary['closed_alerts']} closed, notifications {summary['notifications'] or 'none'} ---")
+    return summary
+
+def run_scan(symbols=None):
+    """
+    Runs a single scan pass (all SYMBOLS, or only `symbols`).
     """
     logger.info("Running Single Scan...")
+    from data.manager import DataManager
+    from analysis.scanner import Scanner
+    from analysis.indicators import TechnicalIndicators
+    
     data_mgr = DataManager()
     scanner = Scanner()
     indicators = TechnicalIndicators()
     
-    for symbol in SYMBOLS:
+    for symbol in symbols or SYMBOLS:
         print(f"Scanning {symbol}...")
         try:
             data_mgr.update_data(symbol)
@@ -357,22 +738,41 @@ def run_scan():
 
 def main():
     parser = argparse.ArgumentParser(description="Trading Advisor Main CLI")
-    parser.add_argument('mode', choices=['live', 'scan', 'backtest'], help="Operating Mode")
+    parser.add_argument('mode', choices=['live', 'scan', 'backtest', 'replay'], help="Operating Mode")
     parser.add_argument('--symbol', help="Specific symbol to run (optional)")
     parser.add_argument('--days', type=int, default=365, help="Days of history to load (default: 365)")
     parser.add_argument('--start-date', help="Start Date (YYYY-MM-DD) for backtest")
     parser.add_argument('--end-date', help="End Date (YYYY-MM-DD) for backtest")
+    parser.add_argument('--start', help="Replay start, NY local date or datetime")
+    parser.add_argument('--end', help="Replay end, NY local date (inclusive) or datetime")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="Replay speed: 0 = step slot to slot (default), N = N times real time")
+    parser.add_argument('--source-db', help="Replay: DB with the historical bars (default REPLAY_CONFIG)")
+    parser.add_argument('--output-db', help="Replay: DB for alerts and performance (recreated, default REPLAY_CONFIG)")
     
     args = parser.parse_args()
     
     if args.mode == 'live':
         run_live_loop()
     elif args.mode == 'scan':
-        run_scan()
+        run_scan([args.symbol] if args.symbol else None)
+    elif args.mode == 'replay':
+        if not args.start or not args.end:
+            parser.error("replay needs --start and --end")
+        summary = run_replay(_replay_bound(args.start), _replay_bound(args.end, is_end=True), speed=args.speed,
+                             symbols=[args.symbol] if args.symbol else None,
+                             source_db=args.source_db, output_db=args.output_db)
+        print(f"\nReplay {args.start} -> {args.end}: {summary['real_seconds']:.1f}s real")
+        for name, job in summary["jobs"].items():
+            print(f"  {name:<14} runs {job['runs']}, missed {job['missed']}, failed {job['failures']}")
+        print(f"  Alerts: {summary['alerts']} ({summary['closed_alerts']} closed), "
+              f"notifications: {summary['notifications'] or 'none'}")
+        print(f"  Output DB: {summary['output_db']}")
     elif args.mode == 'backtest':
         logger.info(f"--- STARTING BACKTEST MODE ---")
         
         # Imports
+        import pandas as pd
         from backtesting.core.backtester import BacktestEngine
         from backtesting.core.data_loader import DataLoader
         from backtesting.strategies.vwap_bounce import VWAPBounce
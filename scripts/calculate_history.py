@@ -10,6 +10,7 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 from config.settings import SYMBOLS
 from data.storage.database import Database
 from analysis.indicators import TechnicalIndicators
+from analysis.multi_timeframe import MultiTimeframeJoin
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("scripts.calculate_history")
@@ -19,6 +20,7 @@ def run_calculation():
     
     db = Database()
     ti = TechnicalIndicators()
+    mtf = MultiTimeframeJoin(db)
     
     for symbol in SYMBOLS:
         try:
@@ -49,41 +51,28 @@ def run_calculation():
             # Rename columns
             df_1h.columns = [c.capitalize() for c in df_1h.columns]
             
-            # 3. Calculate Daily SMA50
-            sma50_daily = pd.Series(dtype=float)
+            # 3. Daily SMA50, as-of joined onto the hourly bars.
+            # Only CLOSED daily bars are visible to an hourly bar (no look-ahead into today's close).
+            sma50_daily = pd.DataFrame(index=df_1h.index)
             if not df_1d.empty:
                 df_1d.columns = [c.capitalize() for c in df_1d.columns]
-                # Calculate SMA50 on Daily
-                # We can use the TechnicalIndicators class if we want, or simple rolling
-                sma50_daily = df_1d['Close'].rolling(window=50).mean()
-                
-            # 4. Merge Daily SMA into Hourly Data
-            # We forward fill the daily SMA value to all hourly candles of that day (or next day?)
-            # Strategy: "Price > SMA(50) Daily".
-            # Real-time: We compare current price vs yesterday's SMA50 (or current live SMA50).
-            # Backtesting: We reindex daily to hourly.
-            
-            # Resample daily SMA to hourly, ffilling forward
-            if not sma50_daily.empty:
-                # We reindex to match hourly index, ffilling
-                sma50_resampled = sma50_daily.reindex(df_1h.index, method='ffill')
-                df_1h['SMA_50'] = sma50_resampled
-            else:
-                df_1h['SMA_50'] = 0.0
-            
-            # 5. Calculate other 1H Indicators
-            # Note: calculate_all computes local SMA50 (hourly). We want to preserve the Daily one we just added.
-            # We should modify calculate_all to NOT overwrite SMA_50 if it exists, or rename it.
-            # Strategy calls it "SMA(50) Daily". Let's verify indicators module behavior.
-            # indicators.py calculates 'SMA_50'. It will overwrite.
-            # Strategy needs 'SMA_50' to be the Daily one.
-            # We will calculate others first, then overwrite/inject the daily one?
+                sma50_daily = mtf.join(
+                    symbol,
+                    df_1h.index,
+                    builder=lambda d: pd.DataFrame({'SMA_50': d['Close'].rolling(window=50).mean()}),
+                    key="sma50_daily",
+                    higher=df_1d,
+                    use_cache=False
+                )
             
+            # 4. Calculate other 1H Indicators
+            # Note: calculate_all computes a local (hourly) SMA_50. Strategy needs "SMA(50) Daily",
+            # so the daily one overwrites it afterwards.
             enriched_df = ti.calculate_all(df_1h)
             
-            # Overwrite SMA_50 with the Daily version if we have it
+            # 5. Overwrite SMA_50 with the Daily version if we have it (else the hourly one is kept)
             if not sma50_daily.empty:
-                enriched_df['SMA_50'] = sma50_resampled
+                enriched_df['SMA_50'] = sma50_daily['SMA_50']
             
             # 6. Save to DB
             db.save_indicators(symbol, "1h", enriched_df)
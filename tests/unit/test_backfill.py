@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+import pandas as pd
+from core.market_calendar import get_session_calendar
+from data.backfill import BackfillOrchestrator, coalesce_frames, plan_chunks, DONE, EMPTY
+from data.storage.database import Database
+from data.utils.provider_health import ProviderHealth
+
+def bars(start, periods, volume=100.0, close=1.0):
+    idx = pd.date_range(start, periods=periods, freq='1D', tz='UTC')
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': volume}, index=idx)
+
+class FakeProvider:
+    def __init__(self, name, df=None, fail=False):
+        self.name = name
+        self.df = df
+        self.fail = fail
+        self.calls = []
+
+    def fetch_data(self, symbol, timeframe, start_date=None, end_date=None, days_back=30):
+        self.calls.append((symbol, start_date, end_date))
+        if self.fail:
+            raise ConnectionError("boom")
+        return self.df
+
+class TestPlanAndCoalesce(unittest.TestCase):
+    def test_chunks_are_grid_aligned(self):
+        a = plan_chunks(["A"], ["1d"], date(2024, 1, 10), date(2024, 6, 1), {"1d": 30})
+        b = plan_chunks(["A"], ["1d"], date(2024, 1, 11), date(2024, 6, 2), {"1d": 30})
+        self.assertEqual([c.key for c in a], [c.key for c in b])
+        self.assertLessEqual(a[0].start, date(2024, 1, 10))
+        self.assertGreaterEqual(a[-1].end, date(2024, 6, 1))
+        self.assertTrue(all(y.start == x.end + timedelta(days=1) for x, y in zip(a, a[1:])))
+
+    def test_coalesce_prefers_non_zero_volume_then_provider_order(self):
+        primary = bars('2024-01-01', 3, close=1.0)
+        primary.iloc[1, primary.columns.get_loc('Volume')] = 0.0
+        backup = bars('2024-01-02', 3, close=2.0)
+        merged, source = coalesce_frames([("P", primary), ("B", backup)])
+        self.assertEqual(list(source), ["P", "B", "P", "B"])
+        self.assertEqual(list(merged['Close']), [1.0, 2.0, 1.0, 2.0])
+
+class TestBackfillOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.db = Database(Path(self.tmp) / "test.db")
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def orchestrator(self, providers, chunk_days=None, **kwargs):
+        orch = BackfillOrchestrator(providers, db=self.db, workers=3, chunk_days=chunk_days or {"1d": 30}, **kwargs)
+        orch.health = ProviderHealth(failure_threshold=100)
+        return orch
+
+    def test_resume_skips_done_chunks_and_retries_failed(self):
+        good = FakeProvider("GOOD", bars('2023-01-01', 400))
+        orch = self.orchestrator([good])
+        report = orch.run(["AAA"], ["1d"], date(2023, 2, 1), date(2023, 6, 30))
+        self.assertEqual(report.done, report.planned)
+        self.assertEqual(self.db.get_bar_stats("AAA", "1d")[0],
+                         len(bars('2023-01-01', 400).loc['2023-01-21':'2023-07-19']))
+        calls = len(good.calls)
+
+        rerun = orch.run(["AAA"], ["1d"], date(2023, 2, 1), date(2023, 6, 30))
+        self.assertEqual(rerun.skipped, rerun.planned)
+        self.assertEqual(len(good.calls), calls)
+
+        broken = self.orchestrator([FakeProvider("BROKEN", fail=True)])
+        report = broken.run(["BBB"], ["1d"], date(2023, 2, 1), date(2023, 3, 1))
+        self.assertEqual(report.failed, report.planned)
+        retry = self.orchestrator([good]).run(["BBB"], ["1d"], date(2023, 2, 1), date(2023, 3, 1))
+        self.assertEqual((retry.skipped, retry.done), (0, retry.planned))
+
+    def test_empty_chunks_are_retried_until_the_limit(self):
+        none = FakeProvider("NONE", None)
+        orch = self.orchestrator([none], max_empty_attempts=2)
+        orch.health = ProviderHealth(failure_threshold=1)
+        self.assertEqual(orch.run(["CCC"], ["1d"], date(2023, 2, 1), date(2023, 2, 5)).empty, 1)
+        self.assertEqual(orch.run(["CCC"], ["1d"], date(2023, 2, 1), date(2023, 2, 5)).empty, 1)
+        self.assertEqual(orch.run(["CCC"], ["1d"], date(2023, 2, 1), date(2023, 2, 5)).skipped, 1)
+        checkpoints = self.db.get_backfill_checkpoints("1d")
+        self.assertEqual(list(checkpoints['status']), [EMPTY])
+        self.assertEqual(int(checkpoints['attempts'].iloc[0]), 2)
+        self.assertTrue(orch.health.allow("NONE"))   # Empty ranges do not trip the breaker
+
+    def test_merge_fills_zero_volume_bars_from_other_providers(self):
+        primary = bars('2023-02-01', 10)
+        primary['Volume'] = 0.0
+        orch = self.orchestrator([FakeProvider("P", primary), FakeProvider("B", bars('2023-02-01', 10, close=2.0))],
+                                 merge_providers=True)
+        orch.run(["DDD"], ["1d"], date(2023, 2, 1), date(2023, 2, 10))
+        stored = self.db.load_market_data("DDD", "1d")
+        self.assertTrue((stored['Volume'] > 0).all())
+        self.assertEqual(set(self.db.get_backfill_checkpoints()['status']), {DONE})
+
+    def test_backfilled_history_is_derived(self):
+        hourly = get_session_calendar().expected_bars(pd.Timestamp('2023-02-01', tz='UTC'),
+                                                      pd.Timestamp('2023-02-18', tz='UTC'), 60)
+        hourly = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 100.0}, index=hourly)
+        recent = hourly[hourly.index >= '2023-02-13']
+        self.orchestrator([FakeProvider("P", recent)], chunk_days={"1h": 7}).run(
+            ["EEE"], ["1h"], date(2023, 2, 13), date(2023, 2, 17))
+        self.assertEqual(len(self.db.load_market_data("EEE", "session")), 5)
+
+        self.orchestrator([FakeProvider("P", hourly)], chunk_days={"1h": 7}).run(
+            ["EEE"], ["1h"], date(2023, 2, 1), date(2023, 2, 8))
+        self.assertEqual(len(self.db.load_market_data("EEE", "session")), 11)   # + Feb 1-3, 6-8
+
+if __name__ == '__main__':
+    unittest.main()
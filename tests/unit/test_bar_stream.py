@@ -0,0 +1,138 @@
+import json
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+import pandas as pd
+from data.interfaces import Tick
+from data.streaming import BarAggregator, BarStreamService, ReplayTickSource, SocketTickSource
+
+def ts(s):
+    return pd.Timestamp(s, tz='UTC')
+
+class TestBarAggregator(unittest.TestCase):
+    def test_buckets_are_session_anchored_and_cut_at_close(self):
+        agg = BarAggregator(("1m", "1h"))
+        # 2024-12-02: RTH 14:30-21:00 UTC
+        self.assertEqual(agg.bucket(ts('2024-12-02 14:59'), "1h"), (ts('2024-12-02 14:30'), ts('2024-12-02 15:30')))
+        self.assertEqual(agg.bucket(ts('2024-12-02 20:45'), "1h"), (ts('2024-12-02 20:30'), ts('2024-12-02 21:00')))
+        self.assertEqual(agg.bucket(ts('2024-12-02 14:31:30'), "1m"), (ts('2024-12-02 14:31'), ts('2024-12-02 14:32')))
+        self.assertIsNone(agg.bucket(ts('2024-12-02 14:00'), "1h"))   # Pre-market
+        self.assertIsNone(agg.bucket(ts('2024-12-25 15:00'), "1h"))   # Holiday
+
+    def test_ohlcv_and_close_on_next_bucket(self):
+        agg = BarAggregator(("1h",))
+        for t, price, size in [('14:31', 10.0, 1), ('14:50', 12.0, 2), ('15:10', 9.0, 3), ('15:29', 11.0, 4)]:
+            agg.on_tick(Tick("AAA", ts(f'2024-12-02 {t}'), price, size))
+        bar = agg.forming("AAA")
+        self.assertEqual((bar.open, bar.high, bar.low, bar.close, bar.volume, bar.ticks), (10.0, 12.0, 9.0, 11.0, 10.0, 4))
+
+        events = agg.on_tick(Tick("AAA", ts('2024-12-02 15:31'), 11.5, 1))
+        self.assertTrue(events[0].closed)
+        self.assertEqual(events[0].start, ts('2024-12-02 14:30'))
+        self.assertFalse(events[1].closed)
+        self.assertEqual(agg.forming("AAA").start, ts('2024-12-02 15:30'))
+
+    def test_clock_close_and_late_ticks(self):
+        agg = BarAggregator(("1h",))
+        agg.on_tick(Tick("AAA", ts('2024-12-02 14:40'), 10.0, 1))
+        self.assertEqual(agg.advance(ts('2024-12-02 15:29')), [])
+        closed = agg.advance(ts('2024-12-02 15:30'))
+        self.assertEqual(len(closed), 1)
+        self.assertIsNone(agg.forming("AAA"))
+
+        self.assertEqual(agg.on_tick(Tick("AAA", ts('2024-12-02 15:29:59'), 99.0, 1)), [])
+        self.assertEqual(agg.late_ticks, 1)
+        agg.on_tick(Tick("AAA", ts('2024-12-02 13:00'), 99.0, 1))
+        self.assertEqual(agg.outside_session_ticks, 1)
+
+class TestBarStreamService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "ticks.csv"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_ticks(self, rows):
+        lines = ["timestamp,symbol,price,size,bid,ask"] + [",".join(str(v) for v in r) for r in rows]
+        self.path.write_text("\n".join(lines) + "\n")
+
+    def test_replay_stores_closed_bars_before_close_listeners(self):
+        rows = []
+        for minute in range(0, 130, 5):
+            t = ts('2024-12-02 14:30') + pd.Timedelta(minutes=minute)
+            rows.append((t.isoformat(), "AAA", 100 + minute, 10, "", ""))
+            rows.append((t.isoformat(), "BBB", "", "", 50 + minute, 51 + minute))   # Quotes
+        self._write_ticks(rows)
+
+        stored, events = [], []
+        service = BarStreamService(ReplayTickSource(self.path), BarAggregator(("1h",)),
+                                   store=lambda sym, tf, df: stored.append((sym, df.index[0])),
+                                   persist_timeframes=("1h",))
+        service.on_close(lambda tf, end: events.append((end, sorted(stored))))
+        self.assertEqual(service.run(), len(rows))
+
+        first_close = events[0]
+        self.assertEqual(first_close[0], ts('2024-12-02 15:30'))
+        self.assertEqual(first_close[1], [("AAA", ts('2024-12-02 14:30')), ("BBB", ts('2024-12-02 14:30'))])
+        self.assertEqual(len(stored), 6)   # 3 hourly buckets x 2 symbols, the last one flushed
+
+    def test_with_forming_bar_replaces_partial_row(self):
+        service = BarStreamService(ReplayTickSource(self.path), BarAggregator(("1h",)))
+        service.handle_tick(Tick("AAA", ts('2024-12-02 14:45'), 100.0, 5))
+        self.assertFalse(service.is_live("AAA"))   # Started mid-bucket: REST until a whole bar is streamed
+        service.handle_tick(Tick("AAA", ts('2024-12-02 15:31'), 104.0, 5))
+        self.assertFalse(service.is_live("AAA"))
+        service.handle_tick(Tick("AAA", ts('2024-12-02 16:31'), 104.5, 5))
+        self.assertTrue(service.is_live("AAA"))
+        service.handle_tick(Tick("AAA", ts('2024-12-02 16:40'), 105.0, 5))
+        stored = pd.DataFrame({'Open': [1.0, 2.0], 'High': 1.0, 'Low': 1.0, 'Close': [1.0, 2.0],
+                               'Volume': 1.0, 'is_filled': 0},
+                              index=pd.DatetimeIndex([ts('2024-12-02 15:30'), ts('2024-12-02 16:30')], name='timestamp'))
+        df = service.with_forming_bar("AAA", stored)
+        self.assertEqual(list(df.index), list(stored.index))
+        self.assertEqual(df['Close'].tolist(), [1.0, 105.0])
+        self.assertFalse(service.is_live("BBB"))
+
+    def test_partial_bars_are_not_stored(self):
+        stored = []
+        source = ReplayTickSource(self.path)
+        service = BarStreamService(source, BarAggregator(("1h",)),
+                                   store=lambda sym, tf, df: stored.append(df.index[0]), persist_timeframes=("1h",))
+        for t in ['14:45', '15:35', '16:35']:   # Starts mid-bucket
+            service.handle_tick(Tick("AAA", ts(f'2024-12-02 {t}'), 100.0, 1))
+        source.on_gap()                           # Reconnect while 16:30 is forming
+        for t in ['16:50', '17:35', '18:35']:
+            service.handle_tick(Tick("AAA", ts(f'2024-12-02 {t}'), 100.0, 1))
+        self.assertEqual(stored, [ts('2024-12-02 15:30'), ts('2024-12-02 17:30')])
+
+class TestSocketTickSource(unittest.TestCase):
+    def test_reads_json_lines(self):
+        server = socket.create_server(("127.0.0.1", 0))
+        port = server.getsockname()[1]
+
+        def serve():
+            conn, _ = server.accept()
+            with conn:
+                for i in range(3):
+                    msg = {"symbol": "AAA", "timestamp": f"2024-12-02T14:3{i}:00Z", "price": 10 + i, "size": 1}
+                    conn.sendall((json.dumps(msg) + "\n").encode())
+                conn.sendall(b"not json\n")
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        source = SocketTickSource("127.0.0.1", port)
+        ticks = []
+        for tick in source.ticks():
+            ticks.append(tick)
+            if len(ticks) == 3:
+                source.close()
+                break
+        server.close()
+        self.assertEqual([t.price for t in ticks], [10.0, 11.0, 12.0])
+        self.assertEqual(ticks[0].timestamp, ts('2024-12-02 14:30'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from core import clock
+from core.clock import SimulatedClock, SystemClock, set_clock
+from core.scan_state import ScanStateStore
+from core.scheduler import AsyncScheduler, hourly_at
+from core.timing import get_minutes_until_close, wait_until_minute
+import pandas as pd
+
+START = datetime(2024, 12, 9, 14, 50, tzinfo=timezone.utc)
+
+class TestSimulatedClock(unittest.TestCase):
+    def setUp(self):
+        self.sim = SimulatedClock(START)
+        self.previous = set_clock(self.sim)
+
+    def tearDown(self):
+        set_clock(self.previous)
+
+    def test_never_goes_backwards(self):
+        self.sim.set(START + timedelta(hours=1))
+        self.sim.set(START)
+        self.assertEqual(clock.now(), START + timedelta(hours=1))
+
+    def test_timing_helpers_follow_the_process_clock(self):
+        self.assertEqual(get_minutes_until_close(), 10)
+        wait_until_minute(55)   # Sleeping advances the simulated clock instantly
+        self.assertEqual(clock.now(), START + timedelta(minutes=5))
+
+    def test_scan_state_ages_by_simulated_time(self):
+        store = ScanStateStore(max_age_seconds=600)
+        store.put("AAPL", pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex([START])), pd.DataFrame())
+        self.assertIsNotNone(store.get("AAPL"))
+        self.sim.advance(601)
+        self.assertIsNone(store.get("AAPL"))
+
+    def test_system_clock_is_the_default(self):
+        set_clock(self.previous)
+        self.assertIsInstance(clock.get_clock(), SystemClock)
+        set_clock(self.sim)
+
+class TestSimulatedScheduler(unittest.TestCase):
+    def test_slots_run_in_time_order_at_their_simulated_time(self):
+        sim = SimulatedClock(START)
+        scheduler = AsyncScheduler(clock=sim)
+        seen = []
+        scheduler.add_job("pre_alert", lambda ev: seen.append(("pre_alert", sim.now())), hourly_at(55), timeout=5)
+        scheduler.add_job("confirmation", lambda ev: seen.append(("confirmation", sim.now())), hourly_at(0, 10),
+                          timeout=5)
+        asyncio.run(scheduler.run_simulated(START + timedelta(hours=2)))
+        self.assertEqual(seen, [
+            ("pre_alert", datetime(2024, 12, 9, 14, 55, tzinfo=timezone.utc)),
+            ("confirmation", datetime(2024, 12, 9, 15, 0, 10, tzinfo=timezone.utc)),
+            ("pre_alert", datetime(2024, 12, 9, 15, 55, tzinfo=timezone.utc)),
+            ("confirmation", datetime(2024, 12, 9, 16, 0, 10, tzinfo=timezone.utc)),
+        ])
+        self.assertEqual(sim.now(), START + timedelta(hours=2))
+        self.assertEqual(sum(job.missed for job in scheduler.jobs), 0)
+
+    def test_requires_a_simulated_clock(self):
+        with self.assertRaises(TypeError):
+            asyncio.run(AsyncScheduler(clock=SystemClock()).run_simulated(START))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from core.market_calendar import get_session_calendar
+from data.ingest import DeltaIngestor
+from data.quality.detector import GapDetector
+from data.quality.validator import (DataValidator, ValidationLevel, ValidationStatus, ValidationType,
+                                    bar_flags, configured_validator)
+from data.storage.database import Database
+
+def session_bars(start, end, price=100.0, extended_hours=False):
+    idx = get_session_calendar().expected_bars(pd.Timestamp(start, tz='UTC'), pd.Timestamp(end, tz='UTC'), 60,
+                                               extended_hours)
+    close = price + np.sin(np.arange(len(idx)))
+    return pd.DataFrame({'Open': close, 'High': close + 0.5, 'Low': close - 0.5, 'Close': close,
+                         'Volume': 1000.0}, index=idx)
+
+class TestDataValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = DataValidator(calendar=get_session_calendar())
+
+    def test_clean_series_passes(self):
+        report = self.validator.validate(session_bars('2024-12-02', '2024-12-14'), "T")
+        self.assertEqual(report.status, ValidationStatus.PASSED)
+        self.assertTrue(report.backtest_ready)
+        self.assertEqual(report.score, 100.0)
+        self.assertEqual(report.total_bars, 70)
+        self.assertNotIn(ValidationType.EXTENDED_HOURS, report.checks)
+
+    def test_batch_counts_defects_per_symbol(self):
+        clean = session_bars('2024-12-02', '2024-12-14')
+        bad = session_bars('2024-12-02', '2024-12-14', price=1000.0)
+        bad.iloc[3, bad.columns.get_loc('High')] = 1.0          # High below Low
+        bad.iloc[10, :4] *= 1.5                                 # 50% jump (and back)
+        bad.iloc[20:25, bad.columns.get_loc('Volume')] = 0.0
+        bad = bad.drop(bad.index[40:47])                        # A whole session missing
+        # Overnight bar and a duplicate: counted, but kept out of the other checks
+        bad = pd.concat([bad, bad.iloc[[0]], bad.iloc[[0]].set_axis([pd.Timestamp('2024-12-03 03:00', tz='UTC')])])
+
+        reports = self.validator.validate_many({"A": clean, "B": bad})
+        a, b = reports["A"], reports["B"]
+        self.assertTrue(a.backtest_ready)
+
+        details = {t: c.details for t, c in b.checks.items()}
+        self.assertEqual(details[ValidationType.OHLC_CONSISTENCY]['ohlc_invalid'], 1)
+        self.assertEqual(details[ValidationType.PRICE_ANOMALIES]['price_jump'], 2)
+        self.assertEqual(details[ValidationType.VOLUME_VALIDATION]['zero_volume'], 5)
+        self.assertEqual(details[ValidationType.GAPS_ANALYSIS],
+                         {'gaps': 1, 'critical_gaps': 1, 'missing_bars': 7})
+        self.assertEqual(details[ValidationType.TEMPORAL_CONTINUITY], {'unsorted': 1, 'duplicates': 1})
+        self.assertEqual(details[ValidationType.COMPLETENESS], {'expected': 70, 'covered': 63, 'filled': 0})
+        self.assertEqual(b.total_bars, 63)
+        self.assertFalse(b.backtest_ready)
+        self.assertIn("Bars are not in chronological order", b.critical_issues)
+
+        # Batching does not change a symbol's report (no carry-over between series)
+        alone = self.validator.validate(bad, "B")
+        self.assertEqual(alone.score, b.score)
+        self.assertEqual({t: c.details for t, c in alone.checks.items()}, details)
+
+    def test_forward_filled_bars_count_against_completeness_only(self):
+        df = session_bars('2024-12-02', '2024-12-07').assign(is_filled=0)
+        df.iloc[5:8, df.columns.get_loc('is_filled')] = 1
+        df.iloc[5:8, df.columns.get_loc('Volume')] = 0.0
+        report = self.validator.validate(df, "T")
+        self.assertEqual(report.checks[ValidationType.COMPLETENESS].details['covered'], 32)
+        self.assertEqual(report.checks[ValidationType.VOLUME_VALIDATION].details['zero_volume'], 0)
+        self.assertEqual(report.checks[ValidationType.GAPS_ANALYSIS].details['gaps'], 0)
+
+    def test_extended_level_checks_sessions(self):
+        validator = DataValidator(ValidationLevel.EXTENDED, calendar=get_session_calendar())
+        rth = validator.validate(session_bars('2024-12-02', '2024-12-07'), "T")
+        self.assertEqual(rth.checks[ValidationType.EXTENDED_HOURS].status, ValidationStatus.FAILED)
+        full = validator.validate(session_bars('2024-12-02', '2024-12-07', extended_hours=True), "T")
+        self.assertEqual(full.checks[ValidationType.EXTENDED_HOURS].score, 100.0)
+        self.assertEqual(full.checks[ValidationType.MARKET_SESSIONS].details,
+                         {'sessions': 5, 'missing_sessions': 0, 'off_session': 0})
+        with self.assertRaises(ValueError):
+            DataValidator(ValidationLevel.EXTENDED)
+
+    def test_daily_series_validated_on_weekdays(self):
+        validator = configured_validator(timeframe="1d")
+        self.assertIsNone(validator.calendar)
+        idx = pd.bdate_range('2024-12-02', '2024-12-31', tz='UTC') + pd.Timedelta(hours=5)
+        close = 100.0 + np.sin(np.arange(len(idx)))
+        df = pd.DataFrame({'Open': close, 'High': close + 0.5, 'Low': close - 0.5, 'Close': close,
+                           'Volume': 1000.0}, index=idx)
+        # Christmas closed (one missing weekday), then a three-weekday outage
+        df = df.drop(df.index[[17, 5, 6, 7]])
+        report = validator.validate(df, "T")
+        self.assertEqual(report.checks[ValidationType.GAPS_ANALYSIS].details,
+                         {'gaps': 2, 'critical_gaps': 1, 'missing_bars': 4})
+        self.assertEqual(report.checks[ValidationType.COMPLETENESS].details, {'expected': 22, 'covered': 18, 'filled': 0})
+        self.assertEqual(configured_validator(timeframe="1d").validate(df.iloc[8:], "T").checks[
+            ValidationType.GAPS_ANALYSIS].details, {'gaps': 1, 'critical_gaps': 0, 'missing_bars': 1})
+
+    def test_empty_series_is_critical(self):
+        report = self.validator.validate(session_bars('2024-12-02', '2024-12-03').iloc[:0], "T")
+        self.assertEqual(report.status, ValidationStatus.CRITICAL)
+        self.assertFalse(report.backtest_ready)
+
+    def test_analyze_quality_counts_anomalies(self):
+        df = session_bars('2024-12-02', '2024-12-07')
+        df.iloc[4, df.columns.get_loc('Volume')] = 0.0
+        df.iloc[9, df.columns.get_loc('High')] = 200.0
+        report = GapDetector(calendar=get_session_calendar()).analyze_quality(df, "T", 60)
+        self.assertEqual(report.volume_anomalies_count, 1)
+        self.assertEqual(report.price_anomalies_count, 1)
+        self.assertEqual(int(bar_flags(df)['wide_range'].sum()), 1)
+
+class TestQualityCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.db = Database(Path(self.tmp) / "test.db")
+        self.ingestor = DeltaIngestor(self.db)
+        self.validator = DataValidator(calendar=get_session_calendar(), db=self.db)
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_refresh_reuses_reports_until_the_series_changes(self):
+        self.ingestor.ingest("A", "1h", session_bars('2024-12-02', '2024-12-07'), "TEST")
+        self.ingestor.ingest("B", "1h", session_bars('2024-12-02', '2024-12-07'), "TEST")
+        first = self.validator.refresh(["A", "B", "C"], "1h")
+        self.assertEqual(sorted(first), ["A", "B"])
+
+        with patch.object(self.validator, 'validate_many', wraps=self.validator.validate_many) as validate:
+            cached = self.validator.refresh(["A", "B"], "1h")
+            validate.assert_not_called()
+            self.assertEqual(cached["A"].score, first["A"].score)
+            self.assertEqual(cached["A"].checks.keys(), first["A"].checks.keys())
+
+            # New bar for A, revised bar for B: both re-validated, in one batch
+            self.ingestor.ingest("A", "1h", session_bars('2024-12-09', '2024-12-10').iloc[:1], "TEST")
+            self.ingestor.ingest("B", "1h", session_bars('2024-12-02', '2024-12-03').iloc[:1] * 2, "TEST")
+            self.assertEqual(len(self.db.get_quality_reports("1h")), 1)
+            self.validator.refresh(["A", "B"], "1h")
+            validate.assert_called_once()
+            self.assertEqual(sorted(validate.call_args.args[0]), ["A", "B"])
+
+        # Another level does not reuse the stored reports
+        strict = DataValidator(ValidationLevel.STRICT, calendar=get_session_calendar(), db=self.db)
+        self.assertEqual(strict.cached(["A", "B"], "1h"), {})
+        self.assertEqual(set(self.validator.latest(["A", "B"], "1h")), {"A", "B"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+import pandas as pd
+from data.interfaces import IDataProvider
+from data.manager import DataManager
+from data.utils.rate_limiter import RateLimiter
+from data.utils.provider_health import ProviderHealth
+
+def one_bar():
+    return pd.DataFrame({'Open': [1.0], 'High': [1.0], 'Low': [1.0], 'Close': [1.0], 'Volume': [1.0]},
+                        index=pd.DatetimeIndex([pd.Timestamp('2024-12-02 14:30', tz='UTC')]))
+
+class LoopProvider(IDataProvider):
+    """Uses the default fetch_many loop."""
+    def __init__(self, name, has):
+        self._name, self.has, self.calls = name, set(has), []
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def priority(self):
+        return 1
+
+    def fetch_data(self, symbol, timeframe, start_date=None, end_date=None, days_back=30):
+        with self._lock:
+            self.calls.append(symbol)
+        return one_bar() if symbol in self.has else None
+
+class BatchProvider(LoopProvider):
+    def supports_batch(self, timeframe):
+        return True
+
+    def fetch_many(self, symbols, timeframe, since=None, days_back=30, throttle=None):
+        if throttle:
+            throttle()
+        self.calls.append(tuple(symbols))
+        return {s: one_bar() for s in symbols if s in self.has}
+
+class TestFetchMany(unittest.TestCase):
+    def test_default_loop_omits_missing(self):
+        provider = LoopProvider("LOOP", has={"A", "C"})
+        throttled = []
+        frames = provider.fetch_many(["A", "B", "C"], "1h", throttle=lambda: throttled.append(1))
+        self.assertEqual(sorted(frames), ["A", "C"])
+        self.assertEqual(len(throttled), 3)
+
+    def manager(self, *providers):
+        mgr = DataManager.__new__(DataManager)
+        mgr.providers = list(providers)
+        mgr.rate_limiter = RateLimiter()
+        mgr.health = ProviderHealth()
+        mgr._hourly_window = lambda symbol: ("2024-12-01", 0)
+        mgr._store_hourly = lambda symbol, df, source: None
+        return mgr
+
+    def test_manager_batches_and_falls_through(self):
+        primary = BatchProvider("PRIMARY", has={"A"})
+        secondary = BatchProvider("SECONDARY", has={"B"})
+        looping = LoopProvider("LOOP", has={"C"})
+        mgr = self.manager(primary, looping, secondary)
+
+        sources = mgr.update_data_many(["A", "B", "C"])
+        self.assertEqual(sources, {"A": "PRIMARY", "B": "SECONDARY"})
+        self.assertEqual(primary.calls, [("A", "B", "C")])  # One call for the universe
+        self.assertEqual(secondary.calls, [("B", "C")])
+        # No per-symbol loop here: C is left to the per-symbol update
+        self.assertEqual(looping.calls, [])
+
+    def test_manager_batch_stops_when_cancelled_or_late(self):
+        primary = BatchProvider("PRIMARY", has={"A"})
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual(self.manager(primary).update_data_many(["A", "B"], cancel_event=cancel), {})
+        self.assertEqual(self.manager(primary).update_data_many(["A", "B"], deadline=time.monotonic() - 1), {})
+        self.assertEqual(primary.calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from core.market_calendar import get_session_calendar
+from data.manager import DataManager
+from data.quality.gap_detector import GapDetector
+from data.quality.gaps import calendar_gaps, epoch_ns, fill_times, find_gaps
+from data.storage.database import Database
+
+def hourly(index, close=None):
+    close = np.arange(len(index), dtype=float) if close is None else close
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 100.0},
+                        index=index)
+
+class TestGapArrays(unittest.TestCase):
+    def test_find_gaps_positions(self):
+        idx = pd.DatetimeIndex(['2024-01-02 14:30', '2024-01-02 15:30', '2024-01-02 18:30',
+                                '2024-01-02 19:30', '2024-01-02 21:30'], tz='UTC')
+        self.assertEqual(list(find_gaps(epoch_ns(idx), 90)), [1, 3])
+        self.assertEqual(len(find_gaps(epoch_ns(idx[:1]), 90)), 0)
+
+    def test_fill_times_per_gap(self):
+        h = 3600 * 10**9
+        times, owners = fill_times(np.array([0, 10 * h]), np.array([3 * h, 12 * h + 1]), 60)
+        self.assertEqual(list(times // h), [1, 2, 11, 12])
+        self.assertEqual(list(owners), [0, 0, 1, 1])
+
+    def test_calendar_gaps_runs_and_off_grid_bars(self):
+        h = 3600 * 10**9
+        expected = np.arange(0, 8) * h
+        # Bar 1 stamped off the grid (covers its bucket), bars 3-4 and 6 missing
+        times = np.array([0, 1 * h + h // 2, 2 * h, 5 * h, 7 * h])
+        before, after, missing, owners = calendar_gaps(times, expected, expected + h)
+        self.assertEqual(list(before), [2, 3])
+        self.assertEqual(list(after), [3, 4])
+        self.assertEqual(list(missing // h), [3, 4, 6])
+        self.assertEqual(list(owners), [0, 0, 1])
+
+    def test_detector_matches_row_by_row_scan(self):
+        idx = pd.date_range('2024-01-01', periods=500, freq='1h', tz='UTC')
+        rng = np.random.default_rng(7)
+        idx = idx[np.sort(rng.choice(len(idx), 300, replace=False))]
+        gaps = GapDetector(60).detect_gaps(hourly(idx), "T")
+
+        expected = [(a, b) for a, b in zip(idx[:-1], idx[1:]) if b - a > pd.Timedelta(minutes=90)]
+        self.assertEqual([(g.start_time, g.end_time) for g in gaps], expected)
+
+    def test_calendar_detector_skips_overnight_and_weekend(self):
+        calendar = get_session_calendar()
+        # Friday 2024-12-06 and Monday 2024-12-09 RTH bars, Monday 11:30-12:30 ET missing
+        idx = calendar.expected_bars(pd.Timestamp('2024-12-06', tz='UTC'), pd.Timestamp('2024-12-10', tz='UTC'), 60)
+        idx = idx.delete([9, 10])
+        detector = GapDetector(60, calendar=calendar)
+        gaps = detector.detect_gaps(hourly(idx), "T")
+        self.assertEqual([(g.start_time, g.end_time) for g in gaps], [(idx[8], idx[9])])
+
+        fill = detector.fill_rows(hourly(idx))
+        self.assertEqual(list(fill.index.tz_convert('America/New_York').strftime('%m-%d %H:%M')),
+                         ['12-09 11:30', '12-09 12:30'])
+        self.assertTrue((fill['Close'] == 8.0).all())
+        # Without a calendar the weekend step is a gap too
+        self.assertEqual(len(GapDetector(60).detect_gaps(hourly(idx), "T")), 2)
+
+    def test_hour_aligned_bars_cover_the_closing_half_hour(self):
+        # Polygon-style 10:00..15:00 ET bars over two sessions
+        idx = pd.DatetimeIndex([f'2024-12-0{d} {h}:00' for d in (2, 3) for h in range(15, 21)], tz='UTC')
+        detector = GapDetector(60, calendar=get_session_calendar())
+        # The 15:00 bar covers [15:30, 16:00) ET
+        self.assertTrue(detector.fill_rows(hourly(idx)).empty)
+        # 13:00 and 14:00 ET missing: the 12:00 bar still overlaps [12:30, 13:30), [13:30, 14:30) is filled
+        fill = detector.fill_rows(hourly(idx.delete([9, 10])))
+        self.assertEqual(list(fill.index.tz_convert('America/New_York').strftime('%m-%d %H:%M')), ['12-03 13:30'])
+
+    def test_fill_rows_forward_fill_and_skip_large(self):
+        idx = pd.DatetimeIndex(['2024-01-02 14:30', '2024-01-02 17:30',   # 2 missing hours
+                                '2024-01-08 14:30'], tz='UTC')            # > 72h, left alone
+        fill = GapDetector(60).fill_rows(hourly(idx, close=np.array([5.0, 6.0, 7.0])))
+        self.assertEqual(list(fill.index), [pd.Timestamp('2024-01-02 15:30', tz='UTC'),
+                                            pd.Timestamp('2024-01-02 16:30', tz='UTC')])
+        self.assertTrue((fill[['Open', 'High', 'Low', 'Close']] == 5.0).all().all())
+        self.assertTrue((fill['Volume'] == 0).all())
+
+class TestResolveGaps(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.db = Database(Path(self.tmp) / "test.db")
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_resolve_gaps_fills_session_bars_and_drops_stale_fills(self):
+        from data.ingest import DeltaIngestor
+        # Tue 2024-01-02 09:30, 10:30 and 13:30 ET, then Wed 09:30 ET
+        idx = pd.DatetimeIndex(['2024-01-02 14:30', '2024-01-02 15:30', '2024-01-02 18:30',
+                                '2024-01-03 14:30'], tz='UTC')
+        ingestor = DeltaIngestor(self.db)
+        ingestor.ingest("T", "1h", hourly(idx), "TEST")
+        # Overnight fill left by an older version
+        ingestor.ingest("T", "1h", hourly(pd.DatetimeIndex(['2024-01-03 02:30'], tz='UTC')), "TEST", is_filled=True)
+
+        mgr = DataManager.__new__(DataManager)
+        mgr.db = self.db
+        mgr.gap_detector = GapDetector(60, calendar=get_session_calendar())
+        mgr.resolve_gaps("T")
+
+        stored = self.db.load_market_data("T", "1h")
+        filled = stored[stored['is_filled'].astype(bool)]
+        self.assertEqual(list(filled.index.strftime('%m-%d %H:%M')),
+                         ['01-02 16:30', '01-02 17:30', '01-02 19:30', '01-02 20:30'])
+        self.assertEqual(list(filled['Close']), [1.0, 1.0, 2.0, 2.0])
+        self.assertEqual(len(stored), 8)
+
+        mgr.resolve_gaps("T")
+        self.assertEqual(self.db.get_bar_stats("T", "1h")[0], 8)
+
+if __name__ == '__main__':
+    unittest.main()
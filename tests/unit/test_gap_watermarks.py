@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from core.market_calendar import get_session_calendar
+from data.ingest import DeltaIngestor
+from data.manager import DataManager
+from data.quality.gap_detector import GapDetector
+from data.storage.database import Database
+
+def session_bars(start, end):
+    idx = get_session_calendar().expected_bars(pd.Timestamp(start, tz='UTC'), pd.Timestamp(end, tz='UTC'), 60)
+    close = np.arange(len(idx), dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 100.0}, index=idx)
+
+class TestGapWatermarks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.db = Database(Path(self.tmp) / "test.db")
+        self.ingestor = DeltaIngestor(self.db)
+        self.mgr = DataManager.__new__(DataManager)
+        self.mgr.db = self.db
+        self.mgr.gap_detector = GapDetector(60, calendar=get_session_calendar())
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def filled(self):
+        stored = self.db.load_market_data("T", "1h")
+        return list(stored.index[stored['is_filled'].astype(bool)])
+
+    def test_incremental_check_only_reads_after_watermark(self):
+        history = session_bars('2024-12-02', '2024-12-07')
+        self.ingestor.ingest("T", "1h", history, "TEST")
+        self.mgr.resolve_gaps("T")
+        self.assertEqual(self.db.get_gap_watermark("T", "1h"), history.index[-1])
+        self.assertIsNotNone(self.db.get_gap_watermarks("1h")['deep_checked_at'].iloc[0])
+
+        # A hole inside the verified prefix is not rescanned; new bars with a gap are
+        self.db.delete_market_data("T", "1h", [history.index[3]])
+        new = session_bars('2024-12-09', '2024-12-10').drop(pd.Timestamp('2024-12-09 16:30', tz='UTC'))
+        self.ingestor.ingest("T", "1h", new, "TEST")
+        with patch.object(self.db, 'load_market_data', wraps=self.db.load_market_data) as load:
+            self.mgr.resolve_gaps("T")
+        self.assertEqual(load.call_args.kwargs['start'], history.index[-1])
+        self.assertEqual(self.filled(), [pd.Timestamp('2024-12-09 16:30', tz='UTC')])
+        self.assertEqual(self.db.get_gap_watermark("T", "1h"), new.index[-1])
+
+        # The full re-verification finds the older hole
+        self.mgr.resolve_gaps("T", full=True)
+        self.assertEqual(self.filled(), [history.index[3], pd.Timestamp('2024-12-09 16:30', tz='UTC')])
+
+    def test_watermark_stops_before_an_unfillable_gap(self):
+        first = session_bars('2024-12-02', '2024-12-03')
+        later = session_bars('2024-12-09', '2024-12-10')   # Tue-Fri missing: > 72h
+        self.ingestor.ingest("T", "1h", pd.concat([first, later]), "TEST")
+        self.mgr.resolve_gaps("T")
+        self.assertEqual(self.filled(), [])
+        self.assertEqual(self.db.get_gap_watermark("T", "1h"), first.index[-1])
+
+        # Once the missing days arrive, the next incremental check covers them
+        self.ingestor.ingest("T", "1h", session_bars('2024-12-03', '2024-12-07'), "TEST")
+        self.mgr.resolve_gaps("T")
+        self.assertEqual(self.db.get_gap_watermark("T", "1h"), later.index[-1])
+
+    def test_inserting_before_watermark_rewinds_it(self):
+        history = session_bars('2024-12-02', '2024-12-07')
+        self.ingestor.ingest("T", "1h", history.drop(history.index[10]), "TEST")
+        self.db.save_gap_watermark("T", "1h", history.index[-1], checked_at=datetime.now(timezone.utc))
+
+        # Late bar on Tue 2024-12-03: back to the start of the previous stored day
+        self.ingestor.ingest("T", "1h", history.iloc[[10]], "TEST")
+        self.assertEqual(self.db.get_gap_watermark("T", "1h"), pd.Timestamp('2024-12-02', tz='UTC'))
+
+        # Updates and bars after the watermark leave it alone
+        self.ingestor.ingest("T", "1h", history.iloc[[10]].assign(Close=99.0), "TEST")
+        self.assertEqual(self.db.get_gap_watermark("T", "1h"), pd.Timestamp('2024-12-02', tz='UTC'))
+
+        # Prepended history: nothing stored before it, so the next check is a full one
+        self.ingestor.ingest("T", "1h", session_bars('2024-11-25', '2024-11-26'), "TEST")
+        self.assertIsNone(self.db.get_gap_watermark("T", "1h"))
+
+    def test_deep_check_due_oldest_first(self):
+        now = datetime.now(timezone.utc)
+        self.db.save_gap_watermark("A", "1h", now, checked_at=now - pd.Timedelta(days=10), deep=True)
+        self.db.save_gap_watermark("B", "1h", now, checked_at=now, deep=True)
+        self.db.save_gap_watermark("C", "1h", now, checked_at=now - pd.Timedelta(days=30), deep=True)
+        # An incremental check keeps the last full check time
+        self.db.save_gap_watermark("C", "1h", now, checked_at=now)
+        self.assertEqual(self.mgr.deep_gap_check_due(["A", "B", "C", "D"], 7), ["D", "C", "A"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import time
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from data.manager import DataManager
+from data.utils.rate_limiter import RateLimiter
+from data.utils.provider_health import ProviderHealth
+from data.utils.latency_tracker import LatencyTracker
+
+class FakeProvider:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def fetch_data(self, symbol, timeframe, start_date=None, end_date=None, days_back=30):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("down")
+        return pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex([pd.Timestamp('2024-12-02', tz='UTC')]))
+
+def make_manager(providers):
+    mgr = DataManager.__new__(DataManager)
+    mgr.providers = providers
+    mgr.rate_limiter = RateLimiter()
+    mgr.health = ProviderHealth()
+    mgr.latency = LatencyTracker()
+    mgr._hedge_pool = None
+    return mgr
+
+HEDGED = {"HEDGED_FETCH": True, "HEDGE_DELAY_SECONDS": 0.05, "HEDGE_MAX_PARALLEL": 2}
+
+class TestHedgedFetch(unittest.TestCase):
+    def test_slow_primary_is_hedged(self):
+        mgr = make_manager([FakeProvider("SLOW", delay=0.5), FakeProvider("FAST")])
+        with patch.dict("data.manager.DATA_CONFIG", HEDGED):
+            start = time.monotonic()
+            df, source = mgr._fetch_from_providers("SPY", "1h", None, 5)
+        self.assertEqual(source, "FAST")
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertFalse(df.empty)
+
+    def test_failed_primary_falls_back(self):
+        mgr = make_manager([FakeProvider("BAD", fail=True), FakeProvider("GOOD")])
+        with patch.dict("data.manager.DATA_CONFIG", HEDGED):
+            _, source = mgr._fetch_from_providers("SPY", "1h", None, 5)
+        self.assertEqual(source, "GOOD")
+
+    def test_fast_primary_not_hedged(self):
+        backup = FakeProvider("BACKUP")
+        mgr = make_manager([FakeProvider("PRIMARY"), backup])
+        with patch.dict("data.manager.DATA_CONFIG", HEDGED):
+            _, source = mgr._fetch_from_providers("SPY", "1h", None, 5)
+        self.assertEqual(source, "PRIMARY")
+        self.assertEqual(backup.calls, 0)
+
+    def test_no_hedge_without_quota(self):
+        backup = FakeProvider("BACKUP")
+        mgr = make_manager([FakeProvider("SLOW", delay=0.3), backup])
+        limits = {"BACKUP": {"requests_per_minute": 1, "cooldown_seconds": 0}}
+        with patch.dict("data.manager.DATA_CONFIG", HEDGED), patch("data.utils.rate_limiter.RATE_LIMITS", limits):
+            mgr.rate_limiter.wait_if_needed("BACKUP")  # Quota used up
+            _, source = mgr._fetch_from_providers("SPY", "1h", None, 5)
+        self.assertEqual(source, "SLOW")
+        self.assertEqual(backup.calls, 0)
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_p95_needs_min_samples(self):
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record("x", 1.0)
+        self.assertIsNone(tracker.p95("X"))
+        for v in (1.0, 1.0, 10.0):
+            tracker.record("x", v)
+        self.assertGreater(tracker.p95("X"), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
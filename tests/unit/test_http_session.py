@@ -0,0 +1,62 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from core import http
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    ports = set()
+    statuses = []
+
+    def do_GET(self):
+        Handler.ports.add(self.client_address[1])
+        status = Handler.statuses.pop(0) if Handler.statuses else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestHttpSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Handler.ports.clear()
+        Handler.statuses = []
+        http.close_session()
+
+    def tearDown(self):
+        http.close_session()
+
+    def test_connections_are_reused(self):
+        for _ in range(5):
+            self.assertEqual(http.get(self.url).status_code, 200)
+        self.assertEqual(len(Handler.ports), 1)
+
+    def test_server_errors_are_retried(self):
+        Handler.statuses = [503, 200]
+        with patch.dict("core.http.HTTP_CONFIG", {"BACKOFF_FACTOR": 0}):
+            http.close_session()
+            self.assertEqual(http.get(self.url).status_code, 200)
+
+    def test_rate_limit_is_returned_to_caller(self):
+        Handler.statuses = [429, 200]
+        self.assertEqual(http.get(self.url).status_code, 429)
+
+if __name__ == '__main__':
+    unittest.main()
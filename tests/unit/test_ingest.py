@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from core import clock
+from core.clock import SimulatedClock, set_clock
+from data.storage.database import Database
+from data.ingest import DeltaIngestor
+
+def hourly_bars(start, periods):
+    idx = pd.date_range(start, periods=periods, freq='h', tz='UTC')
+    n = np.arange(periods, dtype=float) + 100
+    return pd.DataFrame({'Open': n, 'High': n + 1, 'Low': n - 1, 'Close': n, 'Volume': 10.0}, index=idx)
+
+class TestDeltaIngestor(unittest.TestCase):
+    def setUp(self):
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tmp.name) / "test.db")
+        self.ingestor = DeltaIngestor(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        self.tmp.cleanup()
+
+    def test_refetch_writes_only_new_bars(self):
+        df = hourly_bars('2024-12-02 14:30', 10)
+        first = self.ingestor.ingest("TEST", "1h", df.iloc[:8], source="TEST")
+        self.assertEqual((first.inserted, first.updated, first.unchanged), (8, 0, 0))
+
+        second = self.ingestor.ingest("TEST", "1h", df, source="TEST")
+        self.assertEqual((second.inserted, second.updated, second.unchanged), (2, 0, 8))
+        self.assertEqual(len(self.db.load_market_data("TEST", "1h")), 10)
+
+        third = self.ingestor.ingest("TEST", "1h", df, source="TEST")
+        self.assertEqual(third.written, 0)
+
+    def test_changed_bar_is_updated_and_revision_recorded(self):
+        df = hourly_bars('2024-12-02 14:30', 5)
+        self.ingestor.ingest("TEST", "1h", df, source="TEST")
+        revised = df.copy()
+        revised.iloc[2, revised.columns.get_loc('Close')] = 250.0
+
+        result = self.ingestor.ingest("TEST", "1h", revised, source="OTHER")
+        self.assertEqual((result.inserted, result.updated, result.unchanged), (0, 1, 4))
+        stored = self.db.load_market_data("TEST", "1h")
+        self.assertEqual(stored['Close'].iloc[2], 250.0)
+
+        revisions = self.db.get_bar_revisions("TEST", "1h")
+        self.assertEqual(len(revisions), 1)
+        self.assertEqual(revisions['old_close'].iloc[0], 102.0)
+        self.assertEqual(revisions['new_close'].iloc[0], 250.0)
+        self.assertEqual(revisions['source'].iloc[0], "OTHER")
+
+    def test_float_noise_is_not_a_change(self):
+        df = hourly_bars('2024-12-02 14:30', 5)
+        self.ingestor.ingest("TEST", "1h", df, source="TEST")
+        noisy = df.copy()
+        noisy['Close'] += 1e-9
+        self.assertEqual(self.ingestor.ingest("TEST", "1h", noisy, source="TEST").written, 0)
+
+    def test_fills_never_overwrite_real_bars(self):
+        df = hourly_bars('2024-12-02 14:30', 3)
+        self.ingestor.ingest("TEST", "1h", df, source="TEST")
+        filled = df.copy()
+        filled['Close'] = 1.0
+        result = self.ingestor.ingest("TEST", "1h", filled, source="FFILL", is_filled=True)
+        self.assertEqual(result.written, 0)
+        self.assertEqual(self.db.load_market_data("TEST", "1h")['Close'].tolist(), [100.0, 101.0, 102.0])
+
+    def test_real_bars_replace_fills_without_revision(self):
+        df = hourly_bars('2024-12-02 14:30', 3)
+        self.ingestor.ingest("TEST", "1h", df, source="FFILL", is_filled=True)
+        result = self.ingestor.ingest("TEST", "1h", df, source="TEST")
+        self.assertEqual(result.updated, 3)
+        stored = self.db.load_market_data("TEST", "1h")
+        self.assertFalse(stored['is_filled'].astype(bool).any())
+        self.assertTrue(self.db.get_bar_revisions("TEST", "1h").empty)
+
+    def test_revising_a_bar_stored_with_an_offset_replaces_it(self):
+        self.db.conn.execute(
+            "INSERT INTO market_data (feature_id, symbol, timeframe, timestamp, open, high, low, close, volume, source) "
+            "VALUES ('TEST_1h_2024-12-02T09:30:00-05:00', 'TEST', '1h', '2024-12-02T09:30:00-05:00', "
+            "100, 101, 99, 100, 10, 'TEST')")
+        revised = hourly_bars('2024-12-02 14:30', 1).assign(Close=250.0)
+        self.assertEqual(self.ingestor.ingest("TEST", "1h", revised, source="OTHER").updated, 1)
+        count = self.db.conn.execute("SELECT COUNT(*) FROM market_data WHERE symbol = 'TEST'").fetchone()[0]
+        self.assertEqual(count, 1)
+        self.assertEqual(self.db.load_market_data("TEST", "1h")['Close'].tolist(), [250.0])
+        self.assertEqual(len(self.db.get_bar_revisions("TEST", "1h")), 1)
+
+    def test_forming_bar_updates_are_not_revisions(self):
+        previous = set_clock(SimulatedClock(datetime(2024, 12, 2, 15, 0, tzinfo=timezone.utc)))
+        try:
+            df = hourly_bars('2024-12-02 13:30', 2)  # 14:30 bar is still forming
+            self.ingestor.ingest("TEST", "1h", df, source="TEST")
+            clock.get_clock().advance(20 * 60)
+            self.ingestor.ingest("TEST", "1h", df.assign(Close=df['Close'] + [0, 1]), source="TEST")
+            clock.get_clock().advance(60 * 60)
+            closed = df.assign(Close=df['Close'] + [0, 2])
+            self.assertEqual(self.ingestor.ingest("TEST", "1h", closed, source="TEST").updated, 1)
+            self.assertTrue(self.db.get_bar_revisions("TEST", "1h").empty)
+
+            # Once stored closed, later changes are revisions again
+            self.ingestor.ingest("TEST", "1h", closed.assign(Close=closed['Close'] + 5), source="OTHER")
+            self.assertEqual(len(self.db.get_bar_revisions("TEST", "1h")), 2)
+        finally:
+            set_clock(previous)
+
+if __name__ == '__main__':
+    unittest.main()
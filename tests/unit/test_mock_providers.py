@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from benchmarks.mock_providers import MockProviderServer, FaultConfig
+from data.providers.polygon_provider import PolygonProvider
+from data.providers.twelve_provider import TwelveDataProvider
+from data.utils.rate_limiter import RateLimiter
+from data.utils.provider_health import get_provider_health
+
+NOW = pd.Timestamp('2024-12-04 17:10', tz='UTC')
+
+class TestMockProviderServer(unittest.TestCase):
+    def test_polygon_and_twelvedata_shapes(self):
+        with MockProviderServer(now_fn=lambda: NOW) as server:
+            polygon = PolygonProvider(api_key="mock", base_url=server.url)
+            df = polygon.fetch_data("AAA", "1h", start_date="2024-12-02", end_date="2024-12-31")
+            # 7 bars on each full session, then 14:30, 15:30 and the forming 16:30 bar
+            self.assertEqual(len(df), 17)
+            self.assertEqual(df.index[-1], pd.Timestamp('2024-12-04 16:30', tz='UTC'))
+            self.assertTrue((df['High'] >= df[['Open', 'Close']].max(axis=1)).all())
+
+            twelve = TwelveDataProvider(api_key="mock", base_url=server.url)
+            batch = twelve.fetch_many(["AAA", "BBB"], "1h", since="2024-12-02")
+            self.assertEqual(list(batch["AAA"].index), list(df.index))
+            self.assertEqual(batch["AAA"]['Close'].tolist(), df['Close'].tolist())
+            self.assertEqual(server.stats()["TWELVEDATA"]["requests"], 1)
+
+    def test_bars_are_deterministic(self):
+        frames = []
+        for _ in range(2):
+            with MockProviderServer(now_fn=lambda: NOW, seed=7) as server:
+                polygon = PolygonProvider(api_key="mock", base_url=server.url)
+                frames.append(polygon.fetch_data("AAA", "1d", start_date="2024-11-01", end_date="2024-12-04"))
+        pd.testing.assert_frame_equal(frames[0], frames[1])
+
+    def test_quota_answers_429_and_throttles_provider(self):
+        limiter = RateLimiter()
+        faults = {"POLYGON": FaultConfig(quota_per_minute=1, retry_after_seconds=30)}
+        try:
+            with MockProviderServer(now_fn=lambda: NOW, faults=faults) as server, \
+                    patch("data.providers.polygon_provider.get_rate_limiter", return_value=limiter):
+                polygon = PolygonProvider(api_key="mock", base_url=server.url)
+                self.assertIsNotNone(polygon.fetch_data("AAA", "1h", start_date="2024-12-02"))
+                self.assertIsNone(polygon.fetch_data("BBB", "1h", start_date="2024-12-02"))
+                self.assertEqual(server.stats()["POLYGON"]["quota_rejected"], 1)
+            self.assertGreater(limiter.blocked_for("POLYGON"), 0)
+        finally:
+            get_provider_health().reset()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import pandas as pd
+import numpy as np
+from analysis.multi_timeframe import asof_join, MultiTimeframeJoin
+
+class TestMultiTimeframeJoin(unittest.TestCase):
+    def setUp(self):
+        MultiTimeframeJoin.clear_cache()
+
+        # Daily bars stamped at midnight NY (04:00/05:00 UTC), like the providers store them
+        self.daily_idx = pd.date_range('2024-01-01 05:00', periods=5, freq='D', tz='UTC')
+        self.daily = pd.DataFrame({
+            'Open': [1.0, 2.0, 3.0, 4.0, 5.0],
+            'High': [1.0, 2.0, 3.0, 4.0, 5.0],
+            'Low': [1.0, 2.0, 3.0, 4.0, 5.0],
+            'Close': [10.0, 20.0, 30.0, 40.0, 50.0],
+            'Volume': [100] * 5
+        }, index=self.daily_idx)
+
+        self.hourly_idx = pd.date_range('2024-01-01 14:00', '2024-01-04 20:00', freq='h', tz='UTC')
+
+    def test_asof_join_no_lookahead(self):
+        """Hourly bars only see daily bars that already closed."""
+        aligned = asof_join(self.hourly_idx, self.daily[['Close']], pd.Timedelta(days=1))
+
+        # Day 1 (Jan 1): no daily bar closed yet
+        self.assertTrue(np.isnan(aligned.loc['2024-01-01 20:00+00:00', 'Close']))
+        # Jan 2 afternoon sees Jan 1 close, NOT Jan 2 close
+        self.assertEqual(aligned.loc['2024-01-02 15:00+00:00', 'Close'], 10.0)
+        # Jan 4 sees Jan 3 close
+        self.assertEqual(aligned.loc['2024-01-04 15:00+00:00', 'Close'], 30.0)
+
+    def test_asof_join_matches_shift_reindex(self):
+        """Same result as the old shift(1) + reindex(ffill) approach."""
+        aligned = asof_join(self.hourly_idx, self.daily[['Close']], pd.Timedelta(days=1))
+        legacy = self.daily[['Close']].shift(1).reindex(self.hourly_idx, method='ffill')
+        pd.testing.assert_series_equal(aligned['Close'], legacy['Close'], check_names=False)
+
+    def test_join_caches_result(self):
+        calls = []
+
+        def builder(d):
+            calls.append(1)
+            return pd.DataFrame({'SMA_2': d['Close'].rolling(2).mean()})
+
+        mtf = MultiTimeframeJoin()
+        first = mtf.join("TEST", self.hourly_idx, builder, key="sma2", higher=self.daily)
+        second = mtf.join("TEST", self.hourly_idx, builder, key="sma2", higher=self.daily)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIs(first, second)
+        self.assertEqual(first.loc['2024-01-04 15:00+00:00', 'SMA_2'], 25.0)
+
+    def test_join_empty_higher(self):
+        mtf = MultiTimeframeJoin()
+        res = mtf.join("TEST", self.hourly_idx, lambda d: d, key="x", higher=pd.DataFrame(), use_cache=False)
+        self.assertTrue(res.empty)
+        self.assertEqual(len(res.index), len(self.hourly_idx))
+
+if __name__ == '__main__':
+    unittest.main()
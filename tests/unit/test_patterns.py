@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 import numpy as np
-from analysis.patterns import PatternRecognizer
+from analysis.patterns import PatternRecognizer, candle_kernel, FLAG_WICK_BULL, FLAG_WICK_BEAR, FLAG_BULL_ENGULFING
 
 class TestPatterns(unittest.TestCase):
     def setUp(self):
@@ -116,7 +116,30 @@ class TestPatterns(unittest.TestCase):
         self.assertEqual(res2.iloc[-1]['pat_wick_bull'], 0)
         self.assertEqual(self.recognizer.check_wick_reversal(res2.iloc[-1]), -1)
 
-    # ... existing tests ...
+    def test_kernel_flags_and_geometry(self):
+        # Bar 0: red candle, Bar 1: green candle engulfing it with a long lower wick
+        op = np.array([101.0, 99.5])
+        hi = np.array([101.5, 102.5])
+        lo = np.array([99.8, 90.0])
+        cl = np.array([100.0, 102.0])
+        body, upper, lower, flags = candle_kernel(op, hi, lo, cl)
+
+        np.testing.assert_allclose(body, [1.0, 2.5])
+        np.testing.assert_allclose(upper, [0.5, 0.5])
+        np.testing.assert_allclose(lower, [0.2, 9.5])
+        self.assertTrue(flags[1] & FLAG_WICK_BULL)
+        self.assertFalse(flags[1] & FLAG_WICK_BEAR)
+        self.assertTrue(flags[1] & FLAG_BULL_ENGULFING)
+        self.assertFalse(flags[0] & FLAG_BULL_ENGULFING)
+
+    def test_annotate_in_place(self):
+        df = self.create_candle(100.0, 107.0, 95.0, 102.0)
+        out = self.recognizer.annotate(df)
+        self.assertIs(out, df)
+        self.assertEqual(df.iloc[0]['Body'], 2.0)
+        self.assertEqual(df.iloc[0]['Lower_Wick'], 5.0)
+        self.assertEqual(self.recognizer.check_wick_reversal(df.iloc[0]), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
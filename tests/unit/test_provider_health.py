@@ -0,0 +1,88 @@
+import time
+import unittest
+import pandas as pd
+from data.manager import DataManager
+from data.utils.rate_limiter import RateLimiter
+from data.utils.latency_tracker import LatencyTracker
+from data.utils.provider_health import ProviderHealth
+
+class FakeProvider:
+    def __init__(self, name, ok=True):
+        self.name = name
+        self.ok = ok
+        self.calls = 0
+
+    def fetch_data(self, symbol, timeframe, start_date=None, end_date=None, days_back=30):
+        self.calls += 1
+        if not self.ok:
+            return None
+        return pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex([pd.Timestamp('2024-12-02', tz='UTC')]))
+
+def make_manager(providers, health):
+    mgr = DataManager.__new__(DataManager)
+    mgr.providers = providers
+    mgr.rate_limiter = RateLimiter()
+    mgr.health = health
+    mgr.latency = LatencyTracker()
+    mgr._hedge_pool = None
+    return mgr
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        health = ProviderHealth(failure_threshold=3, cooldown_seconds=60)
+        for _ in range(2):
+            health.record_failure("P")
+        self.assertTrue(health.allow("P"))
+        health.record_failure("P")
+        self.assertFalse(health.allow("P"))
+        self.assertTrue(health.is_open("P"))
+
+    def test_single_probe_after_cooldown(self):
+        health = ProviderHealth(failure_threshold=1, cooldown_seconds=0.05)
+        health.record_failure("P")
+        self.assertFalse(health.allow("P"))
+        time.sleep(0.06)
+        self.assertTrue(health.allow("P"))   # Probe
+        self.assertFalse(health.allow("P"))  # Others keep skipping while it runs
+        health.record_success("P", 0.1)
+        self.assertTrue(health.allow("P"))
+
+    def test_rate_limit_opens_immediately(self):
+        health = ProviderHealth(failure_threshold=3, cooldown_seconds=1)
+        health.record_rate_limited("P", retry_after=120)
+        self.assertFalse(health.allow("P"))
+        self.assertGreater(health.snapshot()["P"]["circuit_open_for"], 100)
+        self.assertEqual(health.snapshot()["P"]["rate_limited"], 1)
+
+    def test_failing_provider_costs_one_call_per_cooldown(self):
+        broken, backup = FakeProvider("BROKEN", ok=False), FakeProvider("BACKUP")
+        mgr = make_manager([broken, backup], ProviderHealth(failure_threshold=1, cooldown_seconds=60))
+        for symbol in ["A", "B", "C", "D"]:
+            _, source = mgr._fetch_from_providers(symbol, "1h", "2024-12-01", 0)
+            self.assertEqual(source, "BACKUP")
+        self.assertEqual(broken.calls, 1)
+
+class TestAdaptiveOrder(unittest.TestCase):
+    def test_unreliable_and_slow_providers_are_demoted(self):
+        health = ProviderHealth(min_samples=3)
+        a, b, c = FakeProvider("A"), FakeProvider("B"), FakeProvider("C")
+        self.assertEqual(health.order([a, b, c]), [a, b, c])
+        for _ in range(3):
+            health.record_success("A", 3.0)
+            health.record_success("B", 0.2)
+            health.record_failure("C")
+            health.record_success("C", 0.1)
+        self.assertEqual(health.order([a, b, c]), [b, a, c])
+
+    def test_old_outcomes_age_out(self):
+        health = ProviderHealth(min_samples=3)
+        health.stats_window_seconds = 0.05
+        a, b = FakeProvider("A"), FakeProvider("B")
+        for _ in range(3):
+            health.record_success("A", 10.0)
+        self.assertEqual(health.order([a, b]), [b, a])
+        time.sleep(0.06)
+        self.assertEqual(health.order([a, b]), [a, b])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -75,5 +75,21 @@ class TestGapRepair(unittest.TestCase):
         val = filled.loc[dates[1], 'Close']
         self.assertEqual(val, 10.0) # Should be ffilled from 10:00
 
+    def test_calendar_fill_adds_only_session_bars(self):
+        """With a calendar, overnight hours are not filled"""
+        from core.market_calendar import get_session_calendar
+        from data.quality.detector import GapDetector
+        calendar = get_session_calendar()
+        # Tue 2024-01-02 and Wed 2024-01-03 RTH hours, Wed 10:30 ET missing
+        dates = calendar.expected_bars(pd.Timestamp('2024-01-02', tz='UTC'), pd.Timestamp('2024-01-04', tz='UTC'), 60)
+        dates = dates.delete(8)
+        data = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=dates)
+
+        gaps = GapDetector(calendar=calendar).detect_gaps(data, "TEST", expected_interval_minutes=60)
+        self.assertEqual(len(gaps), 1)
+        filled = GapRepair(calendar=calendar).fill_gaps(data, gaps, freq='1h')
+        self.assertEqual(len(filled), 14)
+        self.assertEqual(list(filled.index[filled['is_filled']]), [pd.Timestamp('2024-01-03 15:30', tz='UTC')])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+import pandas as pd
+from core.clock import SimulatedClock, set_clock
+from data.interfaces import Candle
+from data.providers.replay_provider import ReplayProvider, bar_close_times
+from data.storage.database import Database
+
+class TestBarCloseTimes(unittest.TestCase):
+    def test_last_hourly_bucket_ends_at_the_close(self):
+        idx = pd.DatetimeIndex(['2024-12-09 19:30', '2024-12-09 20:30'], tz='UTC')
+        self.assertEqual(list(bar_close_times(idx, "1h")),
+                         [pd.Timestamp('2024-12-09 20:30', tz='UTC'), pd.Timestamp('2024-12-09 21:00', tz='UTC')])
+
+    def test_daily_bar_closes_with_its_session(self):
+        idx = pd.DatetimeIndex(['2024-11-29 05:00'], tz='UTC')   # Half-day (13:00 ET)
+        self.assertEqual(bar_close_times(idx, "1d")[0], pd.Timestamp('2024-11-29 18:00', tz='UTC'))
+
+class TestReplayProvider(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.db = Database(Path(self.tmp) / "source.db")
+        hours = pd.date_range('2024-12-09 14:30', periods=7, freq='1h', tz='UTC')
+        self.db.save_bulk_candles("AAPL", "1h", [Candle(ts.to_pydatetime(), 1, 2, 0.5, 1.5, 100) for ts in hours],
+                                  source="TEST")
+        self.db.save_bulk_candles("AAPL", "1d", [Candle(datetime(2024, 12, 9, 5, tzinfo=timezone.utc), 1, 2, 0.5, 1.5, 700)],
+                                  source="TEST")
+        self.clock = SimulatedClock(datetime(2024, 12, 9, 16, 0, 10, tzinfo=timezone.utc))
+        self.previous = set_clock(self.clock)
+        self.provider = ReplayProvider(Path(self.tmp) / "source.db")
+
+    def tearDown(self):
+        set_clock(self.previous)
+        self.provider.close()
+        self.db.close()
+        Database._instance = self._orig_instance
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_only_closed_bars_are_served(self):
+        df = self.provider.fetch_data("AAPL", "1h", start_date="2024-12-09")
+        self.assertEqual(list(df.index), [pd.Timestamp('2024-12-09 14:30', tz='UTC')])
+        self.assertIsNone(self.provider.fetch_data("AAPL", "1d", days_back=5))
+        self.clock.set(datetime(2024, 12, 9, 21, 0, tzinfo=timezone.utc))
+        self.assertEqual(len(self.provider.fetch_data("AAPL", "1h", start_date="2024-12-09")), 7)
+        self.assertEqual(len(self.provider.fetch_data("AAPL", "1d", days_back=5)), 1)
+
+    def test_unknown_symbol(self):
+        self.assertIsNone(self.provider.fetch_data("MSFT", "1h", days_back=5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from data.storage.database import Database
+from data.interfaces import Candle
+from data.manager import DataManager
+from data.resampler import resample_bars, BarResampler, daily_bar_date
+
+def hourly_bars(start, end):
+    idx = pd.date_range(start, end, freq='h', tz='UTC')
+    n = np.arange(len(idx), dtype=float)
+    return pd.DataFrame({'Open': n, 'High': n + 1, 'Low': n - 1, 'Close': n + 0.5, 'Volume': 10.0}, index=idx)
+
+class TestResampleBars(unittest.TestCase):
+    def test_two_hour_buckets_anchor_at_session_open(self):
+        df = hourly_bars('2024-12-02 14:30', '2024-12-02 22:30')
+        bars = resample_bars(df, '2h', '1h')
+        # 09:30, 11:30, 13:30, 15:30 (cut at the close)
+        self.assertEqual(list(bars.index.strftime('%H:%M')), ['14:30', '16:30', '18:30', '20:30'])
+        self.assertEqual(list(bars['base_count']), [2, 2, 2, 1])
+        self.assertEqual(bars.iloc[0]['High'], 2.0)
+        self.assertEqual(bars.iloc[0]['Volume'], 20.0)
+
+    def test_daily_bar_rth_only_and_half_day(self):
+        # Black Friday 2024 closes at 13:00 ET (18:00 UTC)
+        df = hourly_bars('2024-11-29 12:30', '2024-11-29 22:30')
+        bars = resample_bars(df, '1d', '1h')
+        self.assertEqual(len(bars), 1)
+        self.assertEqual(bars.index[0], pd.Timestamp('2024-11-29 05:00', tz='UTC'))  # NY midnight
+        self.assertEqual(bars.iloc[0]['base_count'], 4)  # 09:30, 10:30, 11:30, 12:30
+        self.assertEqual(bars.iloc[0]['Open'], 2.0)
+        self.assertTrue(bars.iloc[0]['is_complete'])
+
+    def test_incomplete_session(self):
+        df = hourly_bars('2024-12-02 14:30', '2024-12-02 17:30')
+        bars = resample_bars(df, 'session', '1h')
+        self.assertFalse(bars.iloc[0]['is_complete'])
+
+    def test_missing_hour_mid_bucket_is_incomplete(self):
+        df = hourly_bars('2024-12-02 14:30', '2024-12-02 20:30').drop(pd.Timestamp('2024-12-02 17:30', tz='UTC'))
+        bars = resample_bars(df, '4h', '1h')
+        # 09:30 bucket has its first and last hours but not 12:30; 13:30 bucket runs to the close
+        self.assertEqual(list(bars['base_count']), [3, 3])
+        self.assertEqual(list(bars['is_complete']), [False, True])
+        self.assertFalse(resample_bars(df, '1d', '1h').iloc[0]['is_complete'])
+
+    def test_premarket_and_hour_aligned_bars_excluded(self):
+        # 09:00 ET bar must not set the daily Open; 10:00-aligned bars cannot rebuild the session
+        df = hourly_bars('2024-12-02 14:00', '2024-12-02 20:00')
+        bars = resample_bars(df, '1d', '1h')
+        self.assertEqual(bars.iloc[0]['Open'], 1.0)
+        self.assertFalse(bars.iloc[0]['is_complete'])
+
+    def test_daily_bar_date_conventions(self):
+        self.assertEqual(str(daily_bar_date(pd.Timestamp('2024-12-02 05:00', tz='UTC'))), '2024-12-02')
+        self.assertEqual(str(daily_bar_date(pd.Timestamp('2024-12-02 00:00', tz='UTC'))), '2024-12-02')
+
+class TestBarResampler(unittest.TestCase):
+    def setUp(self):
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tmp.name) / "test.db")
+        self.resampler = BarResampler(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        self.tmp.cleanup()
+
+    def _store(self, df):
+        candles = [Candle(ts, r.Open, r.High, r.Low, r.Close, r.Volume) for ts, r in df.iterrows()]
+        self.db.save_bulk_candles("TEST", "1h", candles, source="TEST")
+
+    def test_incremental_derive_with_lineage(self):
+        self._store(hourly_bars('2024-12-02 14:30', '2024-12-02 20:30'))
+        first = self.resampler.derive("TEST", "1d")
+        self.assertEqual(len(first), 1)
+
+        # Nothing new -> no work
+        self.assertTrue(self.resampler.derive("TEST", "1d").empty)
+
+        self._store(hourly_bars('2024-12-03 14:30', '2024-12-03 20:30'))
+        second = self.resampler.derive("TEST", "1d")
+        self.assertEqual(list(second.index.strftime('%Y-%m-%d')), ['2024-12-02', '2024-12-03'])
+
+        stored = self.db.load_market_data("TEST", "1d")
+        self.assertEqual(len(stored), 2)
+        lineage = self.db.conn.execute("SELECT base_timeframe, base_count FROM bar_lineage WHERE timeframe='1d'").fetchall()
+        self.assertEqual([tuple(r) for r in lineage], [("1h", 7), ("1h", 7)])
+
+    def test_daily_update_skips_derive_without_new_hourly_bars(self):
+        mgr = DataManager.__new__(DataManager)
+        mgr.db, mgr.resampler, mgr._daily_derived = self.db, self.resampler, {}
+        self._store(hourly_bars('2024-12-02 14:30', '2024-12-02 20:30'))
+        last_daily = self.resampler.derive("TEST", "1d").index[-1]
+
+        with patch.object(self.resampler, 'derive', wraps=self.resampler.derive) as derive:
+            self.assertTrue(mgr._derive_daily_from_hourly("TEST", last_daily))
+            self.assertTrue(mgr._derive_daily_from_hourly("TEST", last_daily))
+            self.assertEqual(derive.call_count, 1)
+            self._store(hourly_bars('2024-12-03 14:30', '2024-12-03 20:30'))
+            self.assertTrue(mgr._derive_daily_from_hourly("TEST", last_daily))
+            self.assertEqual(derive.call_count, 2)
+
+    def test_last_timestamp_mixed_separators(self):
+        self._store(hourly_bars('2024-12-02 14:30', '2024-12-02 15:30'))
+        self.db.conn.execute(
+            "INSERT INTO market_data (feature_id, symbol, timeframe, timestamp, open, high, low, close, volume, source) "
+            "VALUES ('x', 'TEST', '1h', '2024-12-02 16:30:00+00:00', 1, 1, 1, 1, 1, 'TEST')")
+        self.assertEqual(self.db.get_last_timestamp("TEST", "1h"), pd.Timestamp('2024-12-02 16:30', tz='UTC'))
+
+if __name__ == '__main__':
+    unittest.main()
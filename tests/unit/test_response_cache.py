@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from data.interfaces import IDataProvider
+from data.utils.response_cache import ResponseCache, cached_fetch
+
+def bars(n=10):
+    idx = pd.date_range('2024-12-02 14:30', periods=n, freq='h', tz='UTC')
+    return pd.DataFrame({'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': np.arange(n, dtype=float)},
+                        index=idx)
+
+class CountingProvider(IDataProvider):
+    def __init__(self):
+        self.calls = 0
+
+    @property
+    def name(self):
+        return "COUNT"
+
+    @property
+    def priority(self):
+        return 1
+
+    @cached_fetch
+    def fetch_data(self, symbol, timeframe, start_date=None, end_date=None, days_back=30):
+        self.calls += 1
+        return bars()
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp.name, open_ttl_seconds=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_closed_range_never_expires(self):
+        key = self.cache.make_key("X", "spy", "1h", "2024-01-01", "2024-02-01")
+        self.assertTrue(self.cache.is_closed(key))
+        self.cache.put(key, bars())
+        self.cache.open_ttl_seconds = 0
+        pd.testing.assert_frame_equal(self.cache.get(key), bars(), check_freq=False)
+
+    def test_open_range_expires(self):
+        key = self.cache.make_key("X", "SPY", "1h", days_back=5)
+        self.assertFalse(self.cache.is_closed(key))
+        self.cache.put(key, bars())
+        self.assertIsNotNone(self.cache.get(key))
+        self.cache.open_ttl_seconds = 0
+        time.sleep(0.01)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_lru_eviction(self):
+        keys = [self.cache.make_key("X", f"S{i}", "1h", "2024-01-01", "2024-02-01") for i in range(3)]
+        self.cache.put(keys[0], bars())
+        size = os.path.getsize(self.cache._path(keys[0]))
+        self.cache.max_bytes = size * 2
+        self.cache.put(keys[1], bars())
+        # Touch the oldest entry so the middle one becomes least recently used
+        past = time.time() - 100
+        os.utime(self.cache._path(keys[1]), (past, past))
+        os.utime(self.cache._path(keys[0]), (past + 50, past + 50))
+        self.cache.put(keys[2], bars())
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_rerun_costs_no_api_calls(self):
+        provider = CountingProvider()
+        provider.response_cache = self.cache
+        for _ in range(2):
+            provider.fetch_data("SPY", "1h", start_date="2024-01-01", end_date="2024-02-01")
+            provider.fetch_data("SPY", "1h", days_back=30)
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 2})
+
+    def test_bypass(self):
+        provider = CountingProvider()
+        provider.response_cache = self.cache
+        self.cache.bypass = True
+        provider.fetch_data("SPY", "1h", start_date="2024-01-01", end_date="2024-02-01")
+        provider.fetch_data("SPY", "1h", start_date="2024-01-01", end_date="2024-02-01")
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(list(os.scandir(self.tmp.name)), [])
+
+if __name__ == '__main__':
+    unittest.main()
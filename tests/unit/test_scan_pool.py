@@ -0,0 +1,53 @@
+import time
+import unittest
+from core.scan_pool import run_ordered_pipeline, prioritize, CycleReport
+
+class TestOrderedPipeline(unittest.TestCase):
+    def test_results_in_input_order(self):
+        delays = {"A": 0.05, "B": 0.0, "C": 0.02}
+        results = list(run_ordered_pipeline(
+            ["A", "B", "C"],
+            fetch_fn=lambda s: time.sleep(delays[s]) or s.lower(),
+            analyze_fn=lambda s, fetched: fetched * 2,
+            fetch_workers=3
+        ))
+        self.assertEqual([r.item for r in results], ["A", "B", "C"])
+        self.assertEqual([r.value for r in results], ["aa", "bb", "cc"])
+
+    def test_errors_are_captured_per_item(self):
+        def fetch(s):
+            if s == "BAD":
+                raise ValueError("provider down")
+            return s
+
+        results = list(run_ordered_pipeline(["OK", "BAD", "OK2"], fetch, lambda s, f: f))
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertEqual(results[2].value, "OK2")
+
+    def test_fetches_run_concurrently(self):
+        start = time.monotonic()
+        list(run_ordered_pipeline(list(range(8)), lambda s: time.sleep(0.1), lambda s, f: s, fetch_workers=8))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_deadline_skips_unstarted_items(self):
+        results = list(run_ordered_pipeline(
+            ["A", "B", "C", "D"], lambda s: time.sleep(0.1) or s, lambda s, f: f,
+            fetch_workers=1, deadline=time.monotonic() + 0.15
+        ))
+        report = CycleReport()
+        for r in results:
+            report.record(r)
+        self.assertEqual(report.processed, ["A", "B"])
+        self.assertEqual(report.late, ["B"])
+        self.assertEqual(report.skipped, ["C", "D"])
+
+class TestPrioritize(unittest.TestCase):
+    def test_tiers_then_default_order(self):
+        order = prioritize(["A", "B", "C", "D", "E"], [{"D"}, {"B", "E"}])
+        self.assertEqual(list(order), ["D", "B", "E", "A", "C"])
+        self.assertEqual(order["D"], 0)
+        self.assertEqual(order["A"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
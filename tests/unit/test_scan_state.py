@@ -0,0 +1,51 @@
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from analysis.indicators import TechnicalIndicators
+from core.scan_state import ScanStateStore
+
+def random_bars(n, seed=7):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-02 14:30', periods=n, freq='h', tz='UTC')
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.3, n),
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, n).astype(float)
+    }, index=idx)
+
+class TestIncrementalIndicators(unittest.TestCase):
+    def test_matches_full_recompute_on_last_bar(self):
+        ind = TechnicalIndicators()
+        df = random_bars(600)
+        full = ind.calculate_all(df)
+
+        # Pre-alert pass saw the last bar still forming (different close)
+        forming = df.iloc[:-1].copy()
+        forming.iloc[-1, forming.columns.get_loc('Close')] += 2.0
+        prev = ind.calculate_all(forming)
+
+        inc = ind.calculate_incremental(prev, df.iloc[-2:])
+        self.assertTrue(inc.index.equals(full.index))
+        cols = ['RSI', 'BB_Lower', 'ADX', 'ATR', 'VWAP', 'SMA_200', 'EMA_200', 'CRSI', 'Volume_SMA_20']
+        np.testing.assert_allclose(inc[cols].iloc[-2:].to_numpy(), full[cols].iloc[-2:].to_numpy(), rtol=1e-9)
+
+    def test_short_history_falls_back_to_full(self):
+        ind = TechnicalIndicators()
+        df = random_bars(50)
+        inc = ind.calculate_incremental(ind.calculate_all(df.iloc[:-1]), df.iloc[-1:])
+        pd.testing.assert_frame_equal(inc, ind.calculate_all(df))
+
+class TestScanStateStore(unittest.TestCase):
+    def test_states_expire(self):
+        store = ScanStateStore(max_age_seconds=0.05)
+        store.put("AAA", random_bars(3), pd.DataFrame())
+        self.assertEqual(store.get("AAA").last_bar, random_bars(3).index[-1])
+        time.sleep(0.06)
+        self.assertIsNone(store.get("AAA"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import unittest
+from datetime import datetime, timezone
+from core.scheduler import AsyncScheduler, hourly_at, daily_at, every
+
+class TestSchedules(unittest.TestCase):
+    def test_hourly_at(self):
+        sched = hourly_at(55)
+        now = datetime(2026, 2, 5, 10, 30, tzinfo=timezone.utc)
+        self.assertEqual(sched(now), datetime(2026, 2, 5, 10, 55, tzinfo=timezone.utc))
+        now = datetime(2026, 2, 5, 10, 55, tzinfo=timezone.utc)
+        self.assertEqual(sched(now), datetime(2026, 2, 5, 11, 55, tzinfo=timezone.utc))
+
+    def test_confirmation_buffer(self):
+        sched = hourly_at(0, 10)
+        now = datetime(2026, 2, 5, 10, 55, tzinfo=timezone.utc)
+        self.assertEqual(sched(now), datetime(2026, 2, 5, 11, 0, 10, tzinfo=timezone.utc))
+
+    def test_daily_at(self):
+        sched = daily_at(22)
+        now = datetime(2026, 2, 5, 22, 1, tzinfo=timezone.utc)
+        self.assertEqual(sched(now), datetime(2026, 2, 6, 22, 0, tzinfo=timezone.utc))
+
+    def test_every_aligned(self):
+        sched = every(6 * 3600)
+        now = datetime(2026, 2, 5, 7, 15, tzinfo=timezone.utc)
+        self.assertEqual(sched(now), datetime(2026, 2, 5, 12, 0, tzinfo=timezone.utc))
+
+    def test_every_strictly_advances_on_slot_boundary(self):
+        sched = every(0.1)
+        slot = sched(datetime(2026, 2, 5, 21, 10, 36, 650000, tzinfo=timezone.utc))
+        self.assertEqual(slot, datetime(2026, 2, 5, 21, 10, 36, 700000, tzinfo=timezone.utc))
+        self.assertGreater(sched(slot), slot)
+
+class TestAsyncScheduler(unittest.TestCase):
+    def _run_for(self, scheduler, seconds):
+        async def runner():
+            task = asyncio.create_task(scheduler.run())
+            await asyncio.sleep(seconds)
+            scheduler.stop()
+            await task
+        asyncio.run(runner())
+
+    def test_jobs_run_on_schedule(self):
+        scheduler = AsyncScheduler()
+        calls = []
+        job = scheduler.add_job("tick", lambda ev: calls.append(1), every(0.05), timeout=1, grace_seconds=1)
+        self._run_for(scheduler, 0.3)
+        self.assertGreaterEqual(len(calls), 3)
+        self.assertEqual(job.missed, 0)
+
+    def test_timeout_is_missed_deadline_and_cancels(self):
+        scheduler = AsyncScheduler()
+        cancelled = []
+
+        def slow(cancel_event):
+            cancel_event.wait(1.0)
+            cancelled.append(cancel_event.is_set())
+
+        job = scheduler.add_job("slow", slow, every(0.1), timeout=0.05, grace_seconds=0.05)
+        self._run_for(scheduler, 0.35)
+        time.sleep(0.05)
+        self.assertGreaterEqual(job.missed, 1)
+        self.assertTrue(cancelled and all(cancelled))
+
+    def test_exclusive_group_held_until_timed_out_job_returns(self):
+        scheduler = AsyncScheduler()
+        running = []
+        overlaps = []
+
+        def job(cancel_event):
+            if running:
+                overlaps.append(1)
+            running.append(1)
+            time.sleep(0.15)  # Ignores cancellation on purpose
+            running.pop()
+
+        scheduler.add_job("a", job, every(0.1), timeout=0.05, grace_seconds=1, exclusive_group="scan")
+        scheduler.add_job("b", job, every(0.1), timeout=0.05, grace_seconds=1, exclusive_group="scan")
+        self._run_for(scheduler, 0.5)
+        time.sleep(0.2)
+        self.assertEqual(overlaps, [])
+
+    def test_trigger_runs_pending_slot_early(self):
+        scheduler = AsyncScheduler()
+        calls = []
+        job = scheduler.add_job("confirm", lambda ev: calls.append(1), every(3600), timeout=1, grace_seconds=1)
+
+        async def runner():
+            task = asyncio.create_task(scheduler.run())
+            await asyncio.sleep(0.05)
+            slot = job.next_due
+            self.assertFalse(scheduler.trigger("confirm", within_seconds=0.01))
+            woke = await asyncio.to_thread(scheduler.trigger, "confirm")
+            await asyncio.sleep(0.1)
+            scheduler.stop()
+            await task
+            return woke, slot
+
+        woke, slot = asyncio.run(runner())
+        self.assertTrue(woke)
+        self.assertEqual(calls, [1])
+        self.assertGreater(job.next_due, slot)  # Slot consumed, next one is an hour later
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from datetime import date
+import numpy as np
+import pandas as pd
+from core.market_calendar import SessionCalendar, nyse_holidays, nyse_early_closes
+
+class TestSessionCalendar(unittest.TestCase):
+    def setUp(self):
+        self.cal = SessionCalendar()
+
+    def test_holidays(self):
+        h2024 = nyse_holidays(2024)
+        self.assertIn(date(2024, 3, 29), h2024)   # Good Friday
+        self.assertIn(date(2024, 6, 19), h2024)   # Juneteenth
+        self.assertIn(date(2024, 11, 28), h2024)  # Thanksgiving
+        self.assertIn(date(2026, 7, 3), nyse_holidays(2026))   # July 4th on Saturday
+        self.assertNotIn(date(2021, 12, 31), nyse_holidays(2022))  # New Year on Saturday not observed
+        self.assertFalse(self.cal.is_trading_day(date(2024, 12, 25)))
+        self.assertTrue(self.cal.is_trading_day(date(2024, 12, 26)))
+
+    def test_early_closes(self):
+        self.assertIn(date(2024, 11, 29), nyse_early_closes(2024))
+        self.assertIn(date(2024, 12, 24), nyse_early_closes(2024))
+        self.assertIn(date(2024, 7, 3), nyse_early_closes(2024))
+        self.assertNotIn(date(2026, 7, 3), nyse_early_closes(2026))
+
+    def test_session_frame(self):
+        # 2024-11-29 (half-day) then Monday 2024-12-02, hourly bars in UTC
+        idx = pd.date_range('2024-11-29 14:30', '2024-12-02 21:30', freq='h', tz='UTC')
+        frame = self.cal.session_frame(idx)
+
+        # Half-day: 09:30-13:00 ET = 14:30-18:00 UTC
+        self.assertTrue(frame.loc['2024-11-29 17:30+00:00', 'is_rth'])
+        self.assertFalse(frame.loc['2024-11-29 18:30+00:00', 'is_rth'])
+        self.assertEqual(frame.loc['2024-11-29 17:30+00:00', 'minutes_to_close'], 30)
+
+        # Weekend is closed
+        self.assertFalse(frame.loc['2024-11-30 15:30+00:00', 'is_trading_day'])
+        self.assertTrue(np.isnan(frame.loc['2024-11-30 15:30+00:00', 'minutes_to_close']))
+
+        # Session open/close bars
+        opens = frame.index[frame['is_session_open_bar']]
+        closes = frame.index[frame['is_session_close_bar']]
+        self.assertEqual(list(opens.strftime('%Y-%m-%d %H:%M')), ['2024-11-29 14:30', '2024-12-02 14:30'])
+        self.assertEqual(list(closes.strftime('%Y-%m-%d %H:%M')), ['2024-11-29 17:30', '2024-12-02 20:30'])
+
+        # Cached
+        self.assertIs(frame, self.cal.session_frame(idx))
+
+    def test_is_closing_soon(self):
+        self.assertTrue(self.cal.is_closing_soon(pd.Timestamp('2024-12-02 20:55', tz='UTC')))
+        self.assertFalse(self.cal.is_closing_soon(pd.Timestamp('2024-12-02 20:30', tz='UTC')))
+        # Half-day closes at 13:00 ET
+        self.assertTrue(self.cal.is_closing_soon(pd.Timestamp('2024-11-29 17:55', tz='UTC')))
+        # Holiday / weekend never triggers
+        self.assertFalse(self.cal.is_closing_soon(pd.Timestamp('2024-12-25 21:00', tz='UTC')))
+        self.assertFalse(self.cal.is_closing_soon(pd.Timestamp('2024-11-30 21:00', tz='UTC')))
+
+    def test_expected_bars(self):
+        # Half-day Friday, weekend, Monday; Thanksgiving itself has none
+        bars = self.cal.expected_bars(pd.Timestamp('2024-11-28', tz='America/New_York'),
+                                      pd.Timestamp('2024-12-02 23:00', tz='America/New_York'), 60)
+        local = bars.tz_convert('America/New_York').strftime('%m-%d %H:%M')
+        self.assertEqual(list(local), ['11-29 09:30', '11-29 10:30', '11-29 11:30', '11-29 12:30',
+                                       '12-02 09:30', '12-02 10:30', '12-02 11:30', '12-02 12:30',
+                                       '12-02 13:30', '12-02 14:30', '12-02 15:30'])
+        starts, ends = self.cal.expected_bar_spans(bars[0], bars[-1], 60)
+        # Last bucket of a session is cut at the close
+        self.assertEqual(pd.Timestamp(ends[-1], tz='UTC'), pd.Timestamp('2024-12-02 21:00', tz='UTC'))
+
+        # Extended hours: pre-market from 04:00 (cut at 09:30), post-market from the close
+        ext = self.cal.expected_bars(pd.Timestamp('2024-12-02 00:00', tz='America/New_York'),
+                                     pd.Timestamp('2024-12-02 23:00', tz='America/New_York'), 60, extended_hours=True)
+        local = list(ext.tz_convert('America/New_York').strftime('%H:%M'))
+        self.assertEqual(local[:7], ['04:00', '05:00', '06:00', '07:00', '08:00', '09:00', '09:30'])
+        self.assertEqual(local[-5:], ['15:30', '16:00', '17:00', '18:00', '19:00'])
+
+if __name__ == '__main__':
+    unittest.main()
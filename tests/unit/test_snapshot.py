@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from data.storage.database import Database
+from data.interfaces import Candle
+from core import clock
+from core.clock import SimulatedClock, set_clock
+from core.scan_state import ScanStateStore
+from core.snapshot import SnapshotManager
+
+def hourly_bars(start, periods):
+    idx = pd.date_range(start, periods=periods, freq='h', tz='UTC')
+    n = np.arange(periods, dtype=float) + 100
+    return pd.DataFrame({'Open': n, 'High': n + 1, 'Low': n - 1, 'Close': n, 'Volume': 10.0}, index=idx)
+
+class TestSnapshotManager(unittest.TestCase):
+    def setUp(self):
+        self._orig_instance = Database._instance
+        Database._instance = None
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tmp.name) / "test.db")
+        self.path = Path(self.tmp.name) / "snapshot.pkl"
+
+    def tearDown(self):
+        self.db.close()
+        Database._instance = self._orig_instance
+        self.tmp.cleanup()
+
+    def _store(self, df):
+        candles = [Candle(ts, r.Open, r.High, r.Low, r.Close, r.Volume) for ts, r in df.iterrows()]
+        self.db.save_bulk_candles("TEST", "1h", candles, source="TEST")
+
+    def test_roundtrip_and_validation(self):
+        df = hourly_bars('2024-12-02 14:30', 10)
+        self._store(df)
+        store = ScanStateStore()
+        store.put("TEST", df, pd.DataFrame())
+
+        mgr = SnapshotManager(self.db, self.path, tail_bars=4)
+        self.assertFalse(mgr.gap_checked_within("TEST", 60))
+        self.db.save_gap_watermark("TEST", "1h", df.index[-1], checked_at=clock.now())
+        self.assertEqual(mgr.save(store), 1)
+
+        restored_store = ScanStateStore(max_age_seconds=0)
+        restorer = SnapshotManager(self.db, self.path)
+        self.assertEqual(restorer.restore(restored_store, state_max_age_seconds=3600), ["TEST"])
+        state = restored_store.get("TEST")
+        self.assertEqual(len(state.df_analyzed), 4)
+        self.assertFalse(state.reuse_daily)
+        self.assertTrue(restorer.gap_checked_within("TEST", 60))
+
+        # A bar stored after the snapshot invalidates the symbol, and its gap check is due again
+        self._store(hourly_bars('2024-12-03 14:30', 1))
+        self.assertEqual(SnapshotManager(self.db, self.path).restore(ScanStateStore(), 3600), [])
+        self.assertFalse(restorer.gap_checked_within("TEST", 60))
+
+    def test_snapshot_age_follows_the_clock(self):
+        self._store(hourly_bars('2024-12-02 14:30', 10))
+        previous = set_clock(SimulatedClock(datetime(2024, 12, 2, 20, tzinfo=timezone.utc)))
+        try:
+            mgr = SnapshotManager(self.db, self.path, max_age_hours=12)
+            mgr.save(ScanStateStore())
+            self.assertIsNotNone(mgr.load())
+            clock.get_clock().advance(13 * 3600)
+            self.assertIsNone(mgr.load())
+        finally:
+            set_clock(previous)
+
+    def test_missing_snapshot_is_cold_start(self):
+        self.assertEqual(SnapshotManager(self.db, self.path).restore(ScanStateStore(), 3600), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from data.utils.rate_limiter import RateLimiter
+
+LIMITS = {"POLYGON": {"requests_per_minute": 2, "cooldown_seconds": 0},
+          "TWELVEDATA": {"requests_per_minute": 600, "cooldown_seconds": 0.1}}
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "rate_limits.db")
+        self.patcher = patch("data.utils.rate_limiter.RATE_LIMITS", LIMITS)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def test_quota_shared_between_limiters(self):
+        # Two limiters on one file behave like two processes on the same host
+        a, b = RateLimiter(self.path), RateLimiter(self.path)
+        self.assertTrue(a.try_acquire("POLYGON"))
+        self.assertTrue(b.try_acquire("POLYGON"))
+        self.assertFalse(a.try_acquire("POLYGON"))
+        self.assertFalse(b.try_acquire("POLYGON"))
+        stats = a.get_stats("POLYGON")
+        self.assertEqual(stats["acquired"], 2)
+        self.assertEqual(stats["denied"], 2)
+        self.assertEqual(stats["requests_last_minute"], 2)
+
+    def test_unconfigured_provider_is_not_limited(self):
+        limiter = RateLimiter()
+        for _ in range(10):
+            self.assertTrue(limiter.try_acquire("UNKNOWN"))
+
+    def test_cooldown_and_provider_name_alias(self):
+        limiter = RateLimiter()
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait_if_needed("TWELVE_DATA")  # Same quota as TWELVEDATA
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertEqual(limiter.get_stats("TWELVEDATA")["acquired"], 3)
+
+    def test_throttle_feedback_blocks_all_processes(self):
+        a, b = RateLimiter(self.path), RateLimiter(self.path)
+        a.report_throttled("TWELVEDATA", retry_after=0.3)
+        self.assertGreater(b.blocked_for("TWELVEDATA"), 0.1)
+        self.assertFalse(b.try_acquire("TWELVEDATA"))
+        start = time.monotonic()
+        b.wait_if_needed("TWELVEDATA")
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(b.get_stats("TWELVEDATA")["throttled"], 1)
+
+    def test_bucket_stays_empty_through_the_block(self):
+        limiter = RateLimiter()
+        with patch("data.utils.rate_limiter.time.time", return_value=1000.0):
+            self.assertTrue(limiter.try_acquire("POLYGON"))
+            limiter.report_throttled("POLYGON", retry_after=60)
+        # 2 requests/minute: a full burst would have refilled during the block
+        with patch("data.utils.rate_limiter.time.time", return_value=1061.0):
+            self.assertFalse(limiter.try_acquire("POLYGON"))
+        with patch("data.utils.rate_limiter.time.time", return_value=1090.0):
+            self.assertTrue(limiter.try_acquire("POLYGON"))
+
+    def test_async_acquire_does_not_block_loop(self):
+        limiter = RateLimiter()
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def main():
+            await asyncio.gather(*(limiter.acquire_async("TWELVEDATA") for _ in range(3)), ticker())
+
+        start = time.monotonic()
+        asyncio.run(main())
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[1] - ticks[0], 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,8 @@ from config.settings import STRATEGY_CONFIG
 from analysis.signal import Signal, SignalType
 from analysis.risk import RiskManager
 from data.storage.database import Database
+from core.market_calendar import get_session_calendar
+from core import clock
 
 logger = logging.getLogger("core.trading.manager")
 
@@ -330,7 +332,7 @@ class TradeManager:
         conn = self.db.get_connection()
         try:
             # 1. Closed Trades Stats (TODAY ONLY)
-            start_of_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            start_of_day = clock.now().astimezone().replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
             start_of_day_str = start_of_day.isoformat()
             
             query = """
@@ -400,26 +402,12 @@ class TradeManager:
             conn.close()
     def is_market_closing_soon(self, current_ts: datetime) -> bool:
         """
-        Checks if the US market is close to ending (15:55 EST/EDT).
+        Checks if the US market is close to ending (last 10 minutes of the session).
+        Uses the session calendar, so holidays and half-days (13:00 close) are respected.
         """
         try:
-            # Convert to NY time
-            if current_ts.tzinfo is None:
-                current_ts = current_ts.replace(tzinfo=pd.Timestamp.now(tz='UTC').tzinfo) # Assume UTC if naive
-            
-            ny_ts = pd.Timestamp(current_ts).tz_convert('America/New_York')
-            
-            # Market closes at 16:00. We trigger at 15:50 or later.
-            # Only on weekdays
-            if ny_ts.weekday() >= 5: # Weekend
-                return False
-                
-            if ny_ts.hour == 15 and ny_ts.minute >= 50:
-                return True
-            if ny_ts.hour >= 16: # Already after close
-                return True
-                
-            return False
+            # Naive timestamps are assumed UTC
+            return get_session_calendar().is_closing_soon(current_ts, buffer_minutes=10)
         except Exception as e:
             logger.error(f"Error checking market close: {e}")
             return False